@@ -3,13 +3,22 @@ Lernziele:
 - LLM-Antworten automatisch mit einem zweiten LLM bewerten (LLM-as-Judge)
 - Scores aus der Judge-Antwort parsen und validieren
 - Bewertungen als Scores in Langfuse-Traces loggen
+- Judge-Urteile inhaltsadressiert cachen (gleiche Antwort -> kein zweiter Judge-Call)
 
 Voraussetzungen: .env mit LANGFUSE_PUBLIC_KEY, LANGFUSE_SECRET_KEY, LANGFUSE_HOST
                  LM Studio läuft auf http://localhost:1234/v1 mit Qwen3
+
+Judge-Cache: SQLite-Datei unter JUDGE_CACHE_PATH (Standard: .cache/judge_cache.sqlite3).
+Das Tabellenformat ist dasselbe wie in machineLearning/languageModel
+(evaluation/judge_cache.py) — zeigt JUDGE_CACHE_PATH auf dieselbe Datei,
+teilen sich beide Projekte einen Cache.
 """
 
+import hashlib
+import json
 import os
 import re
+import sqlite3
 import sys
 from pathlib import Path
 
@@ -25,6 +34,20 @@ load_dotenv(ENV_PATH)
 
 console = Console()
 
+DEFAULT_JUDGE_CACHE = Path(__file__).resolve().parent.parent / ".cache" / "judge_cache.sqlite3"
+
+JUDGE_PROMPT_TEMPLATE = (
+    "Du bist ein strenger Qualitätsprüfer für KI-Antworten.\n\n"
+    "Frage: {question}\n\n"
+    "Antwort: {answer}\n\n"
+    "Bewerte die Qualität der Antwort auf einer Skala von 1 bis 10.\n"
+    "Kriterien: Korrektheit, Vollständigkeit, Verständlichkeit.\n"
+    "Antworte NUR mit einer einzigen Zahl zwischen 1 und 10."
+)
+
+# Ändert sich mit jeder Änderung am Judge-Prompt -> alte Urteile werden nicht mehr getroffen
+JUDGE_PROMPT_VERSION = hashlib.sha256(JUDGE_PROMPT_TEMPLATE.encode("utf-8")).hexdigest()[:12]
+
 
 def create_langfuse_client() -> Langfuse:
     """Create and verify a Langfuse client."""
@@ -64,6 +87,44 @@ def call_llm(client: OpenAI, model: str, messages: list[dict]) -> str:
         sys.exit(1)
 
 
+def open_judge_cache() -> sqlite3.Connection:
+    """Open the shared judge cache (same schema as languageModel's judge_cache.py)."""
+    path = Path(os.getenv("JUDGE_CACHE_PATH", DEFAULT_JUDGE_CACHE))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS judge_scores ("
+        " key TEXT PRIMARY KEY, judge_model TEXT NOT NULL, prompt_version TEXT NOT NULL,"
+        " prompt TEXT NOT NULL, generated_text TEXT NOT NULL, result TEXT NOT NULL,"
+        " created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+    )
+    return conn
+
+
+def judge_cache_key(judge_model: str, prompt: str, answer: str) -> str:
+    """sha256(judge model, prompt version, prompt, answer) — identical to languageModel."""
+    payload = "\0".join((judge_model, JUDGE_PROMPT_VERSION, prompt, answer))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached_judge_response(conn: sqlite3.Connection, key: str) -> str | None:
+    row = conn.execute("SELECT result FROM judge_scores WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0])["raw"] if row else None
+
+
+def store_judge_response(
+    conn: sqlite3.Connection, key: str, judge_model: str, prompt: str, answer: str, response: str
+) -> None:
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO judge_scores "
+            "(key, judge_model, prompt_version, prompt, generated_text, result) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, judge_model, JUDGE_PROMPT_VERSION, prompt, answer,
+             json.dumps({"raw": response}, ensure_ascii=False)),
+        )
+
+
 def parse_score(judge_response: str) -> float | None:
     """Extract a numeric score (1-10) from the judge response."""
     # Look for a number between 1 and 10
@@ -102,28 +163,31 @@ def main() -> None:
 
     console.print(Panel(answer, title="Antwort", border_style="green"))
 
-    # -- Step 2: Judge the answer with a second LLM call --
-    judge_prompt = (
-        "Du bist ein strenger Qualitätsprüfer für KI-Antworten.\n\n"
-        f"Frage: {question}\n\n"
-        f"Antwort: {answer}\n\n"
-        "Bewerte die Qualität der Antwort auf einer Skala von 1 bis 10.\n"
-        "Kriterien: Korrektheit, Vollständigkeit, Verständlichkeit.\n"
-        "Antworte NUR mit einer einzigen Zahl zwischen 1 und 10."
-    )
+    # -- Step 2: Judge the answer with a second LLM call (or from the cache) --
+    judge_prompt = JUDGE_PROMPT_TEMPLATE.format(question=question, answer=answer)
 
-    judge_gen = trace.start_generation(
-        name="judge-evaluation",
-        model=model,
-        input=[{"role": "user", "content": judge_prompt}],
-        metadata={"role": "judge"},
-    )
+    cache = open_judge_cache()
+    cache_key = judge_cache_key(model, question, answer)
+    judge_response = cached_judge_response(cache, cache_key)
+    from_cache = judge_response is not None
 
-    judge_response = call_llm(
-        client, model, [{"role": "user", "content": judge_prompt}]
-    )
-    judge_gen.update(output=judge_response)
-    judge_gen.end()
+    if from_cache:
+        console.print("[dim]Judge-Urteil aus dem Cache (kein zweiter LLM-Call)[/dim]")
+    else:
+        judge_gen = trace.start_generation(
+            name="judge-evaluation",
+            model=model,
+            input=[{"role": "user", "content": judge_prompt}],
+            metadata={"role": "judge"},
+        )
+
+        judge_response = call_llm(
+            client, model, [{"role": "user", "content": judge_prompt}]
+        )
+        judge_gen.update(output=judge_response)
+        judge_gen.end()
+        store_judge_response(cache, cache_key, model, question, answer, judge_response)
+    cache.close()
 
     # -- Step 3: Parse and log the score --
     score = parse_score(judge_response)
@@ -141,7 +205,8 @@ def main() -> None:
             "answer": answer,
             "judge_response": judge_response,
             "score": score,
-        }
+        },
+        metadata={"evaluation_method": "llm-as-judge", "judge_cache_hit": from_cache},
     )
     trace.end()
     langfuse.flush()
@@ -152,6 +217,7 @@ def main() -> None:
     table.add_column("Wert")
 
     table.add_row("Judge-Antwort (roh)", judge_response.strip())
+    table.add_row("Aus Judge-Cache", "Ja" if from_cache else "Nein")
     table.add_row(
         "Erkannter Score",
         f"{score:.0f}/10" if score else "Nicht erkannt",
@@ -0,0 +1,610 @@
+"""
+LLM-Stub: OpenAI-kompatibler Testserver
+=======================================
+
+Lokaler Server ohne Abhängigkeiten (nur Standardbibliothek), der sich wie
+LM Studio/Ollama/OpenAI verhält, aber kein Modell braucht. Damit lassen
+sich die LLM-Clients der Projekte offline messen (Durchsatz, Parallelität,
+Retries, Streaming), deterministisch und reproduzierbar.
+
+Endpunkte:
+    GET  /v1/models              Modell-Liste
+    POST /v1/chat/completions    Chat Completions (auch stream=true als SSE)
+    GET  /stats                  Zähler: Anfragen, Status-Codes, max. Parallelität, Tokens
+    GET  /health
+
+Unterstützt:
+    - JSON-Modus: response_format json_object / json_schema (Antwort erfüllt das Schema)
+    - Vision: image_url-Teile (Data-URLs) werden gezählt und als Tokens abgerechnet
+    - Streaming: SSE-Chunks im Tempo von --tokens-per-second, optional mit usage
+    - Latenz: Zeit bis zum ersten Token aus einer Verteilung (siehe Latency)
+    - Fehlerinjektion: HTTP-Status, Timeouts und Verbindungsabbrüche mit Rate
+    - Skriptantworten: JSON-Datei mit Regeln (Regex -> Inhalt, JSON, Tool-Calls, Status)
+
+Verwendung:
+    python llm-stub/llm_stub.py --port 8090 --latency lognormal:0.3,0.4 --tokens-per-second 40
+    python llm-stub/llm_stub.py --errors 429:0.05,500:0.02,timeout:0.01 --seed 1
+    python llm-stub/llm_stub.py --script llm-stub/examples/responses.json
+
+Oder im Prozess:
+    server, url = start_stub(latency="uniform:0.1,0.3", tokens_per_second=50)
+    ...
+    print(server.stats())
+    server.shutdown()
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+DEFAULT_MODEL = "stub"
+IMAGE_TOKENS = 256          # Prompt-Tokens pro Bild (grob wie bei Vision-Modellen)
+CHARS_PER_TOKEN = 4         # Token-Schätzung für Text
+DEFAULT_COMPLETION_TOKENS = 32
+HANG_SECONDS = 60.0         # "timeout"-Fehler: so lange bleibt die Anfrage hängen
+
+FILLER_WORDS = (
+    "Dies ist eine Antwort des LLM-Stubs ohne echtes Modell, "
+    "sie dient nur zum Messen von Durchsatz und Latenz."
+).split()
+
+
+# =============================================================================
+# LATENZ UND FEHLER
+# =============================================================================
+
+class Latency:
+    """
+    Verteilung der Zeit bis zum ersten Token (Sekunden).
+
+    Spezifikation als String:
+        "0.2"                     fest
+        "uniform:0.1,0.5"         gleichverteilt zwischen min und max
+        "normal:0.2,0.05"         Mittelwert, Standardabweichung (>= 0 abgeschnitten)
+        "lognormal:0.2,0.5"       Median, sigma (lange Schwänze wie echte Server)
+        "exp:0.2"                 exponentiell mit Mittelwert
+    """
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal", "exp")
+
+    def __init__(self, spec="0"):
+        spec = str(spec).strip()
+        kind, _, params = spec.partition(":")
+        if not params:
+            kind, params = "fixed", kind
+        if kind not in self.KINDS:
+            raise ValueError(f"Unbekannte Latenzverteilung: {kind} (erlaubt: {', '.join(self.KINDS)})")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",")]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}[kind]
+        if len(self.params) != expected:
+            raise ValueError(f"{kind} erwartet {expected} Parameter: {spec}")
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            value = p[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            value = rng.gauss(p[0], p[1])
+        elif self.kind == "lognormal":
+            value = p[0] * math.exp(rng.gauss(0.0, p[1]))
+        else:
+            value = rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        return max(0.0, value)
+
+    def __repr__(self):
+        return f"Latency({self.spec!r})"
+
+
+ERROR_KINDS = ("timeout", "disconnect")
+
+
+def parse_errors(spec) -> list[tuple[str, float]]:
+    """
+    "429:0.05,500:0.02,timeout:0.01" -> [("429", 0.05), ("500", 0.02), ("timeout", 0.01)]
+
+    Art: HTTP-Status, "timeout" (Anfrage hängt HANG_SECONDS) oder
+    "disconnect" (Verbindung bricht ab, beim Streaming mitten im Stream).
+    """
+    errors = []
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        kind, _, rate = part.partition(":")
+        if not (kind.isdigit() or kind in ERROR_KINDS):
+            raise ValueError(f"Unbekannte Fehlerart: {kind}")
+        errors.append((kind, float(rate)))
+    if sum(rate for _, rate in errors) > 1.0:
+        raise ValueError("Summe der Fehlerraten > 1")
+    return errors
+
+
+# =============================================================================
+# ANFRAGEN AUSWERTEN
+# =============================================================================
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def inspect_messages(messages) -> dict:
+    """Text (alle Nachrichten), letzter User-Text, Bilder und Bildgröße."""
+    texts, images, image_bytes, last_user = [], 0, 0, ""
+    for message in messages or []:
+        content = message.get("content")
+        parts = content if isinstance(content, list) else [{"type": "text", "text": content or ""}]
+        message_text = []
+        for part in parts:
+            if part.get("type") == "text":
+                message_text.append(part.get("text") or "")
+            elif part.get("type") == "image_url":
+                images += 1
+                url = (part.get("image_url") or {}).get("url", "")
+                if url.startswith("data:"):
+                    # Base64: 4 Zeichen -> 3 Bytes
+                    image_bytes += len(url.partition(",")[2]) * 3 // 4
+        text = "\n".join(message_text)
+        texts.append(text)
+        if message.get("role") == "user":
+            last_user = text
+    return {
+        "text": "\n".join(texts),
+        "system": "\n".join(
+            t for t, m in zip(texts, messages or []) if m.get("role") == "system"
+        ),
+        "last_user": last_user,
+        "images": images,
+        "image_bytes": image_bytes,
+    }
+
+
+def schema_instance(schema: dict):
+    """Minimaler Wert, der ein (einfaches) JSON-Schema erfüllt."""
+    if not isinstance(schema, dict):
+        return None
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if schema.get(key):
+            return schema_instance(schema[key][0])
+    kind = schema.get("type", "object")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        properties = schema.get("properties", {})
+        return {name: schema_instance(sub) for name, sub in properties.items()}
+    if kind == "array":
+        count = schema.get("minItems", 0)
+        return [schema_instance(schema.get("items", {})) for _ in range(count)]
+    if kind == "string":
+        return "stub" + "x" * max(0, schema.get("minLength", 0) - 4)
+    if kind == "integer":
+        return int(schema.get("minimum", 0))
+    if kind == "number":
+        return float(schema.get("minimum", 0))
+    if kind == "boolean":
+        return False
+    return None
+
+
+def default_content(request: dict, info: dict, completion_tokens: int) -> str:
+    """Antwort ohne Skriptregel: JSON im JSON-Modus, sonst Fülltext."""
+    response_format = request.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        schema = (response_format.get("json_schema") or {}).get("schema", {})
+        return json.dumps(schema_instance(schema), ensure_ascii=False)
+    if response_format.get("type") == "json_object":
+        return json.dumps({"antwort": "Stub-Antwort"}, ensure_ascii=False)
+
+    max_tokens = request.get("max_completion_tokens") or request.get("max_tokens")
+    words = completion_tokens if not max_tokens else min(completion_tokens, int(max_tokens))
+    prefix = f"[Stub: {info['images']} Bild(er)] " if info["images"] else ""
+    filler = (FILLER_WORDS * (words // len(FILLER_WORDS) + 1))[:max(1, words)]
+    return prefix + " ".join(filler)
+
+
+class Script:
+    """
+    Skriptantworten aus JSON:
+
+        {"rules": [
+            {"match": "bewertung", "json": {"score": 3}},
+            {"match": "Extrahiere", "images": true, "content": "Seite mit Text"},
+            {"match": "Wetter", "tool_calls": [{"name": "get_weather", "arguments": {"ort": "Berlin"}}]},
+            {"model": "kaputt", "status": 503},
+            {"contents": ["erste Antwort", "zweite Antwort"]}
+         ],
+         "default": "Fallback-Text"}
+
+    Die erste passende Regel gewinnt. match: Regex über den Text aller
+    Nachrichten; model: exakter Modellname; images: nur Anfragen mit
+    (true) oder ohne (false) Bilder. "contents" liefert die Einträge der
+    Reihe nach, danach immer den letzten. "latency" überschreibt die
+    Latenzverteilung für die Regel. "default" gilt nicht für Anfragen
+    im JSON-Modus.
+    """
+
+    def __init__(self, data: dict):
+        self.rules = list(data.get("rules", []))
+        self.default = data.get("default")
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        for rule in self.rules:
+            if "match" in rule:
+                rule["_regex"] = re.compile(rule["match"], re.IGNORECASE | re.DOTALL)
+            if "latency" in rule:
+                rule["_latency"] = Latency(rule["latency"])
+
+    @classmethod
+    def load(cls, path) -> "Script":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def match(self, request: dict, info: dict) -> dict | None:
+        for i, rule in enumerate(self.rules):
+            if "_regex" in rule and not rule["_regex"].search(info["text"]):
+                continue
+            if "model" in rule and rule["model"] != request.get("model"):
+                continue
+            if "images" in rule and bool(rule["images"]) != bool(info["images"]):
+                continue
+            if "contents" in rule:
+                with self._lock:
+                    n = self._counters[i]
+                    self._counters[i] += 1
+                return {**rule, "content": rule["contents"][min(n, len(rule["contents"]) - 1)]}
+            return rule
+        # JSON-Modus ohne passende Regel: Antwort aus dem Schema statt default
+        if self.default is not None and not request.get("response_format"):
+            return {"content": self.default}
+        return None
+
+
+def _tool_calls(calls) -> list[dict]:
+    return [
+        {
+            "id": f"call_{i}",
+            "type": "function",
+            "function": {
+                "name": call["name"],
+                "arguments": call["arguments"] if isinstance(call.get("arguments"), str)
+                else json.dumps(call.get("arguments", {}), ensure_ascii=False),
+            },
+        }
+        for i, call in enumerate(calls)
+    ]
+
+
+# =============================================================================
+# HTTP-SERVER
+# =============================================================================
+
+class StubServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer mit Konfiguration, Zufallsquelle und Zählern."""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency="0", tokens_per_second: float = 0.0,
+                 completion_tokens: int = DEFAULT_COMPLETION_TOKENS, errors=None,
+                 script: Script | None = None, responder=None, seed: int | None = None,
+                 models=(DEFAULT_MODEL,), hang_seconds: float = HANG_SECONDS):
+        super().__init__(address, _Handler)
+        self.latency = latency if isinstance(latency, Latency) else Latency(latency)
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.errors = parse_errors(errors) if isinstance(errors, str) else list(errors or [])
+        self.script = script
+        # responder(request, info) -> dict wie eine Skriptregel oder None
+        self.responder = responder
+        self.models = list(models)
+        self.hang_seconds = hang_seconds
+        self.lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.reset_stats()
+
+    # -------------------------------------------------------------------------
+    # Zufall und Zähler (thread-sicher)
+    # -------------------------------------------------------------------------
+
+    def draw(self, latency: Latency | None = None) -> tuple[float, str | None]:
+        """Latenz und ggf. injizierter Fehler für eine Anfrage."""
+        with self.lock:
+            delay = (latency or self.latency).sample(self._rng)
+            roll, error = self._rng.random(), None
+            for kind, rate in self.errors:
+                if roll < rate:
+                    error = kind
+                    break
+                roll -= rate
+        return delay, error
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self._stats = Counter()
+            self._status = Counter()
+
+    def count(self, **values):
+        with self.lock:
+            self._stats.update(values)
+
+    def enter(self):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self, status):
+        with self.lock:
+            self.in_flight -= 1
+            self._status[str(status)] += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "status": dict(self._status),
+                **{key: self._stats[key] for key in (
+                    "streamed", "json_mode", "images", "image_bytes",
+                    "prompt_tokens", "completion_tokens", "scripted",
+                )},
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Header und Body werden getrennt geschrieben; ohne TCP_NODELAY kostet
+    # das bei Keep-Alive ~40 ms pro Antwort (Nagle + Delayed ACK)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int):
+        kind = "rate_limit_error" if status == 429 else "server_error"
+        headers = {"Retry-After": "1"} if status == 429 else None
+        self._send_json(status, {
+            "error": {"message": f"Stub: injizierter Fehler {status}", "type": kind, "code": status},
+        }, headers)
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path.endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [
+                {"id": model, "object": "model", "owned_by": "llm-stub"}
+                for model in self.server.models
+            ]})
+        elif path == "/stats":
+            self._send_json(200, self.server.stats())
+        elif path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "invalid JSON"}})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        server = self.server
+        server.enter()
+        status = 200
+        try:
+            status = self._complete(request)
+        finally:
+            server.leave(status)
+
+    def _complete(self, request: dict):
+        server = self.server
+        info = inspect_messages(request.get("messages"))
+        rule = None
+        if server.responder is not None:
+            rule = server.responder(request, info)
+        if rule is None and server.script is not None:
+            rule = server.script.match(request, info)
+
+        latency = None
+        if rule and "latency" in rule:
+            latency = rule.get("_latency") or Latency(rule["latency"])
+        delay, error = server.draw(latency)
+        time.sleep(delay)
+
+        if error == "timeout":
+            time.sleep(server.hang_seconds)
+            self.close_connection = True
+            return "timeout"
+        if rule and rule.get("status"):
+            error = str(rule["status"])
+        if error and error.isdigit():
+            self._send_error(int(error))
+            return int(error)
+
+        if rule and "json" in rule:
+            content = json.dumps(rule["json"], ensure_ascii=False)
+        elif rule and "content" in rule:
+            content = rule["content"]
+        elif rule and "tool_calls" in rule:
+            content = None
+        else:
+            content = default_content(request, info, server.completion_tokens)
+        tool_calls = _tool_calls(rule["tool_calls"]) if rule and "tool_calls" in rule else None
+
+        prompt_tokens = estimate_tokens(info["text"]) + IMAGE_TOKENS * info["images"]
+        completion_tokens = estimate_tokens(content or json.dumps(tool_calls))
+        server.count(
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+            images=info["images"], image_bytes=info["image_bytes"],
+            json_mode=int(bool(request.get("response_format"))),
+            scripted=int(rule is not None),
+        )
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        model = request.get("model", DEFAULT_MODEL)
+        finish_reason = "tool_calls" if tool_calls else "stop"
+
+        if request.get("stream"):
+            server.count(streamed=1)
+            return self._stream(request, model, content, tool_calls, finish_reason, usage,
+                                disconnect=error == "disconnect")
+
+        if error == "disconnect":
+            self.close_connection = True
+            return "disconnect"
+        if server.tokens_per_second > 0:
+            time.sleep(completion_tokens / server.tokens_per_second)
+        message = {"role": "assistant", "content": content}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        self._send_json(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": usage,
+        })
+        return 200
+
+    # -------------------------------------------------------------------------
+    # Streaming (Server-Sent Events)
+    # -------------------------------------------------------------------------
+
+    def _write_event(self, payload):
+        data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+        event = f"data: {data}\n\n".encode("utf-8")
+        # Chunked Transfer-Encoding: Länge (hex), Daten, CRLF
+        self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, request, model, content, tool_calls, finish_reason, usage, disconnect):
+        server = self.server
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(delta, finish=None):
+            return {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+
+        # Wortweise, mit führendem Leerzeichen wie bei BPE-Tokens
+        pieces = re.findall(r"\s*\S+", content or "")
+        self._write_event(chunk({"role": "assistant", "content": ""}))
+        for i, piece in enumerate(pieces):
+            if disconnect and i >= len(pieces) // 2:
+                self.close_connection = True
+                return "disconnect"
+            if server.tokens_per_second > 0:
+                time.sleep(estimate_tokens(piece) / server.tokens_per_second)
+            self._write_event(chunk({"content": piece}))
+        if tool_calls:
+            self._write_event(chunk({"tool_calls": [
+                {"index": i, **call} for i, call in enumerate(tool_calls)
+            ]}))
+        self._write_event(chunk({}, finish_reason))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            self._write_event({**chunk({}), "choices": [], "usage": usage})
+        self._write_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        return 200
+
+
+def start_stub(host="127.0.0.1", port=0, latency="0", **options):
+    """
+    Startet den Stub in einem Hintergrund-Thread.
+
+    options: tokens_per_second, completion_tokens, errors, script (Script
+    oder Pfad), responder, seed, models, hang_seconds (siehe StubServer).
+
+    Returns:
+        (server, base_url) - base_url endet auf /v1
+    """
+    script = options.pop("script", None)
+    if script is not None and not isinstance(script, Script):
+        script = Script.load(script)
+    server = StubServer((host, port), latency=latency, script=script, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-kompatibler LLM-Stub für Performance-Tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="0.2",
+                        help='Zeit bis zum ersten Token, z. B. "0.2", "uniform:0.1,0.5", '
+                             '"lognormal:0.2,0.5", "exp:0.2"')
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Generierungstempo (0 = sofort)")
+    parser.add_argument("--completion-tokens", type=int, default=DEFAULT_COMPLETION_TOKENS,
+                        help="Länge der Standardantwort in Wörtern (max_tokens begrenzt)")
+    parser.add_argument("--errors", default="",
+                        help='Fehlerraten, z. B. "429:0.05,500:0.02,timeout:0.01,disconnect:0.01"')
+    parser.add_argument("--hang-seconds", type=float, default=HANG_SECONDS,
+                        help="Dauer eines injizierten Timeouts")
+    parser.add_argument("--script", type=Path, help="JSON-Datei mit Skriptantworten")
+    parser.add_argument("--seed", type=int, help="Seed für Latenz und Fehler (reproduzierbar)")
+    parser.add_argument("--models", default=DEFAULT_MODEL,
+                        help="Kommagetrennte Modellnamen für /v1/models")
+    args = parser.parse_args()
+
+    server, url = start_stub(
+        args.host, args.port, args.latency,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        errors=args.errors,
+        hang_seconds=args.hang_seconds,
+        script=args.script,
+        seed=args.seed,
+        models=args.models.split(","),
+    )
+    print(f"LLM-Stub läuft auf {url} (Latenz {server.latency.spec} s, "
+          f"{args.tokens_per_second or '∞'} Tokens/s, Fehler: {args.errors or 'keine'})")
+    print("Statistik: GET /stats, Strg+C zum Beenden")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Evaluations-Benchmark: sequentiell vs. Pipeline
+===============================================
+
+Legt einige kleine MiniGPT-Checkpoints in einem temporären Verzeichnis an
+und bewertet sie zweimal gegen den lokalen Judge-Stub:
+
+    sequentiell - Modell laden, generieren, auf den Judge warten, nächstes Modell
+    pipeline    - EvaluationPipeline: Generierung (Producer-Thread) und
+                  Judge (Dispatcher) überlappen über eine begrenzte Queue
+
+Generierungs- und Judge-Cache sind bei jedem Lauf leer. Erwartung:
+sequentiell ≈ Generierung + Judge, Pipeline ≈ max(Generierung, Judge).
+
+Verwendung:
+    python benchmarks/bench_evaluation_pipeline.py
+    python benchmarks/bench_evaluation_pipeline.py --models 4 --prompts 20 --latency 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+from judge_stub import start_stub  # noqa: E402
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Sequentielle und gepipelte Evaluation vergleichen")
+    parser.add_argument("--models", type=int, default=3, help="Anzahl Checkpoints")
+    parser.add_argument("--prompts", type=int, default=10, help="Prompts pro Modell")
+    parser.add_argument("--latency", type=float, default=0.1,
+                        help="Stub-Latenz pro Anfrage in Sekunden")
+    parser.add_argument("--embed-dim", type=int, default=128)
+    parser.add_argument("--layers", type=int, default=4)
+    return parser.parse_args()
+
+
+def create_checkpoints(base_dir: Path, count: int, embed_dim: int, layers: int) -> dict:
+    """Zufällig initialisierte MiniGPT-Checkpoints im discover_models-Format."""
+    import torch
+    from training.data import TRAINING_DATA
+    from training.training_transformer import MiniGPT, SimpleTokenizer, save_transformer_model
+
+    tokenizer = SimpleTokenizer()
+    tokenizer.build_vocab(TRAINING_DATA)
+    models = {}
+    for i in range(count):
+        torch.manual_seed(i)
+        model = MiniGPT(tokenizer.vocab_size, embed_dim=embed_dim, num_heads=4, num_layers=layers)
+        path = base_dir / f"model_{i}"
+        save_transformer_model(model, tokenizer, str(path))
+        models[f"model_{i}"] = {"path": path, "type": "standard", "label": f"Modell {i}"}
+    return models
+
+
+def run_sequential(models, prompts, base_dir, generation_cache, dispatcher):
+    """Altes Verhalten: pro Modell erst generieren, dann alle Ausgaben bewerten.
+
+    Gibt die Zeit für Laden + Generieren zurück.
+    """
+    from evaluation.evaluation_pipeline import load_evaluation_model
+    from evaluation.judge_config import GENERATION_MAX_LENGTH, GENERATION_SEED, GENERATION_TEMPERATURE
+    from inference.inference_finetuned import generate_text
+
+    generation_seconds = 0.0
+    for model_key, info in models.items():
+        start = time.perf_counter()
+        model, tokenizer = load_evaluation_model(info, base_dir)
+        generations = [
+            (prompt, generation_cache.generate(
+                model_key, model, tokenizer, prompt, generate_text, GENERATION_SEED,
+                max_length=GENERATION_MAX_LENGTH, temperature=GENERATION_TEMPERATURE,
+            ))
+            for prompt in prompts
+        ]
+        generation_seconds += time.perf_counter() - start
+        dispatcher.score_all(generations)
+    return generation_seconds
+
+
+def main():
+    args = parse_arguments()
+    server, url = start_stub(latency=args.latency)
+    os.environ["LLM_PROVIDER_URL"] = url
+
+    from evaluation.evaluation_pipeline import EvaluationPipeline
+    from evaluation.evaluation_store import EvaluationStore, evaluation_config
+    from evaluation.judge_dispatcher import JudgeDispatcher
+    from inference.generation_cache import GenerationCache
+    from training.data import TRAINING_DATA
+
+    prompts = [" ".join(text.split()[:2]) for text in TRAINING_DATA[:args.prompts]]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            models = create_checkpoints(base_dir, args.models, args.embed_dim, args.layers)
+
+        print(f"Judge-Stub: {url}, Latenz {args.latency * 1000:.0f} ms, "
+              f"{args.models} Modelle x {len(prompts)} Prompts\n")
+        header = f"{'Variante':<12} {'Wall (s)':>9} {'Generierung (s)':>16} {'Speedup':>8}"
+        print(header)
+        print("-" * len(header))
+
+        timings = {}
+        for variant in ("sequentiell", "pipeline"):
+            store = EvaluationStore(base_dir / f"{variant}_store.sqlite3")
+            generation_cache = GenerationCache(base_dir / f"{variant}_generations.sqlite3")
+            config = evaluation_config(prompts)
+            to_evaluate = {
+                name: {**info, "run_id": store.open_run(name, info["label"], name, config), "done": {}}
+                for name, info in models.items()
+            }
+            # Lade-Ausgaben der Modelle unterdrücken
+            with JudgeDispatcher(log=None) as dispatcher, contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                if variant == "sequentiell":
+                    generation = run_sequential(models, prompts, base_dir, generation_cache,
+                                                dispatcher)
+                else:
+                    pipeline = EvaluationPipeline(dispatcher, store, generation_cache, prompts,
+                                                  base_dir, log=None)
+                    pipeline.run(to_evaluate)
+                    generation = pipeline.generation_seconds
+                timings[variant] = time.perf_counter() - start
+            speedup = timings["sequentiell"] / timings[variant]
+            print(f"{variant:<12} {timings[variant]:>9.2f} {generation:>16.2f} {speedup:>7.2f}x")
+            store.close()
+            generation_cache.close()
+
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
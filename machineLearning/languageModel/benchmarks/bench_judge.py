@@ -0,0 +1,95 @@
+"""
+Judge-Benchmark gegen den lokalen Stub
+======================================
+
+Misst die Wall-Time für N Judge-Bewertungen mit dem JudgeDispatcher
+bei verschiedenen Parallelitätsstufen und Batch-Größen. Bei fester
+Stub-Latenz sollte die Zeit etwa mit 1/Parallelität fallen, bis der
+Client oder der Server limitiert. Batches senken Anfragen und
+Prompt-Tokens pro Ausgabe (der System-Prompt wird nur einmal gesendet).
+
+"Max. parallel" ist die höchste Zahl gleichzeitig offener Anfragen, die
+der Stub gesehen hat. Mit --errors injiziert der Stub Fehler (z. B.
+429/500), dann zeigen Retries und Fehler das Verhalten des Dispatchers.
+
+Verwendung:
+    python benchmarks/bench_judge.py
+    python benchmarks/bench_judge.py --concurrency 1,4,16 --items 64 --latency 0.1
+    python benchmarks/bench_judge.py --batch-sizes 1,5,10
+    python benchmarks/bench_judge.py --latency lognormal:0.1,0.5 --errors 429:0.05,500:0.02 --seed 1
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+from judge_stub import start_stub  # noqa: E402
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Judge-Dispatcher gegen den Stub messen")
+    parser.add_argument("--concurrency", default="1,2,4,8,16",
+                        help="Parallelitätsstufen, kommagetrennt")
+    parser.add_argument("--items", type=int, default=32, help="Bewertungen pro Stufe")
+    parser.add_argument("--latency", default="0.1",
+                        help='Stub-Latenz pro Anfrage in Sekunden oder Verteilung, z. B. "uniform:0.05,0.2"')
+    parser.add_argument("--errors", default="", help='Fehlerraten des Stubs, z. B. "429:0.05,500:0.02"')
+    parser.add_argument("--seed", type=int, help="Seed für Latenz und Fehler des Stubs")
+    parser.add_argument("--batch-sizes", default="1,5",
+                        help="Ausgaben pro Judge-Anfrage, kommagetrennt")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    server, url = start_stub(latency=args.latency, errors=args.errors, seed=args.seed)
+    os.environ["LLM_PROVIDER_URL"] = url
+
+    from evaluation.judge_dispatcher import JudgeDispatcher
+    from evaluation.llm_client import get_usage_stats, reset_usage_stats
+
+    items = [(f"prompt {i}", f"prompt {i} generierter text") for i in range(args.items)]
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b.strip()]
+
+    print(f"Judge-Stub: {url}, Latenz {server.latency.spec} s, Fehler: {args.errors or 'keine'}, "
+          f"{args.items} Bewertungen/Stufe\n")
+    header = (f"{'Batch':>5} {'Parallel':>8} {'Wall (s)':>9} {'Bew./s':>8} {'Speedup':>8} "
+              f"{'Anfr./Bew.':>10} {'Tokens/Bew.':>11} {'Max. parallel':>13} {'Retries':>8} "
+              f"{'Fehler':>7}")
+    print(header)
+    print("-" * len(header))
+
+    baseline = None
+    for batch_size in batch_sizes:
+        for concurrency in levels:
+            reset_usage_stats()
+            server.reset_stats()
+            with JudgeDispatcher(max_concurrency=concurrency, batch_size=batch_size,
+                                 backoff=0.05, log=None) as dispatcher:
+                start = time.perf_counter()
+                scores = dispatcher.score_all(items)
+                elapsed = time.perf_counter() - start
+                stats = dispatcher.stats()
+            usage = get_usage_stats()
+            baseline = baseline or elapsed
+            errors = sum(score is None for score in scores)
+            # llm_client wiederholt 429/5xx selbst, der Dispatcher den Rest
+            retries = usage["retries"] + stats["retries"]
+            tokens = (usage["prompt_tokens"] + usage["completion_tokens"]) / len(items)
+            print(f"{batch_size:>5} {concurrency:>8} {elapsed:>9.2f} {len(items) / elapsed:>8.1f} "
+                  f"{baseline / elapsed:>7.1f}x {stats['requests_per_output']:>10.2f} "
+                  f"{tokens:>11.0f} {server.max_in_flight:>13} {retries:>8} {errors:>7}")
+
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
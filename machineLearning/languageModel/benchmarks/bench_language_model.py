@@ -0,0 +1,406 @@
+"""
+Benchmarks für das languageModel-Paket
+======================================
+
+Abgedeckt:
+- Tokenizer: Vokabular bauen, encode/decode (Transformer + LSTM)
+- TextDataset-Konstruktion (Transformer + LSTM)
+- Forward-Pass und Trainingsschritt (MiniGPT + LSTM)
+- Alle generate_text-Varianten
+- LoRA anwenden und mergen
+- Checkpoint speichern/laden
+- discover_models und Laden aller gefundenen Modelle
+- Kontaminations-Index: Aufbau und Abfragen (n-Gramme + MinHash-LSH)
+
+Jede Setup-Funktion erhält die Korpusgröße und gibt die zu messende
+Funktion zurück (siehe harness.py).
+"""
+
+import atexit
+import copy
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import torch
+import torch.nn.functional as F
+
+from harness import PerCall, benchmark, quiet
+from corpora import make_corpus
+
+from training.training_config import (
+    BATCH_SIZE_LSTM, BATCH_SIZE_TRANSFORMER, EMBED_DIM_TRANSFORMER,
+    EMBEDDING_DIM_LSTM, HIDDEN_DIM_LSTM, LEARNING_RATE_LSTM,
+    LEARNING_RATE_TRANSFORMER, NUM_HEADS_TRANSFORMER, NUM_LAYERS_TRANSFORMER,
+    SEQ_LENGTH, SEQ_LENGTH_TRANSFORMER,
+)
+from training.training_transformer import (
+    MiniGPT, SimpleTokenizer, TextDataset as TransformerDataset,
+    load_transformer_model, save_transformer_model,
+)
+from training.training_lstm import (
+    SimpleLanguageModel, Tokenizer, TextDataset as LSTMDataset,
+    generate_text as lstm_training_generate, load_model as load_lstm_model,
+    save_model as save_lstm_model,
+)
+from training.finetuning_transformer import apply_lora, merge_lora_weights, save_lora_adapter
+from inference.inference_transformer import generate_text as transformer_generate
+from inference.inference_finetuned import (
+    discover_models, generate_text as finetuned_generate, load_model_by_type,
+)
+from inference.inference_lstm import generate_text_interactive as lstm_generate
+from inference.inference_fact_correction import generate_text as fact_correction_generate
+from evaluation.contamination_index import ContaminationIndex
+
+ALL_SIZES = ("S", "M", "L", "XL")
+GENERATE_MAX_LENGTH = 10
+LORA_RANK = 4
+
+
+# =============================================================================
+# GEMEINSAMER ZUSTAND (pro Größe einmal aufgebaut)
+# =============================================================================
+
+def _temp_dir() -> Path:
+    path = Path(tempfile.mkdtemp(prefix="lm_bench_"))
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+@lru_cache(maxsize=None)
+def transformer_tokenizer(size: str) -> SimpleTokenizer:
+    tokenizer = SimpleTokenizer()
+    tokenizer.build_vocab(make_corpus(size))
+    return tokenizer
+
+
+@lru_cache(maxsize=None)
+def lstm_tokenizer(size: str) -> Tokenizer:
+    tokenizer = Tokenizer()
+    with quiet():
+        tokenizer.build_vocab(list(make_corpus(size)))
+    return tokenizer
+
+
+@lru_cache(maxsize=None)
+def transformer_model(size: str) -> MiniGPT:
+    torch.manual_seed(0)
+    with quiet():
+        model = MiniGPT(
+            vocab_size=transformer_tokenizer(size).vocab_size,
+            embed_dim=EMBED_DIM_TRANSFORMER,
+            num_heads=NUM_HEADS_TRANSFORMER,
+            num_layers=NUM_LAYERS_TRANSFORMER,
+        )
+    return model.eval()
+
+
+@lru_cache(maxsize=None)
+def lstm_model(size: str) -> SimpleLanguageModel:
+    torch.manual_seed(0)
+    with quiet():
+        model = SimpleLanguageModel(
+            vocab_size=lstm_tokenizer(size).vocab_size,
+            embedding_dim=EMBEDDING_DIM_LSTM,
+            hidden_dim=HIDDEN_DIM_LSTM,
+        )
+    return model.eval()
+
+
+def _prompt(size: str) -> str:
+    return " ".join(make_corpus(size)[0].split()[:3])
+
+
+def _random_batch(vocab_size: int, batch_size: int, seq_len: int):
+    generator = torch.Generator().manual_seed(0)
+    x = torch.randint(0, vocab_size, (batch_size, seq_len), generator=generator)
+    y = torch.randint(0, vocab_size, (batch_size, seq_len), generator=generator)
+    return x, y
+
+
+# =============================================================================
+# TOKENIZER
+# =============================================================================
+
+@benchmark("tokenizer.transformer.build_vocab", ALL_SIZES)
+def bench_transformer_build_vocab(size):
+    corpus = make_corpus(size)
+    return lambda: SimpleTokenizer().build_vocab(corpus)
+
+
+@benchmark("tokenizer.lstm.build_vocab", ALL_SIZES)
+def bench_lstm_build_vocab(size):
+    corpus = list(make_corpus(size))
+    return lambda: Tokenizer().build_vocab(corpus)
+
+
+@benchmark("tokenizer.transformer.encode", ALL_SIZES)
+def bench_transformer_encode(size):
+    tokenizer, corpus = transformer_tokenizer(size), make_corpus(size)
+    return lambda: [tokenizer.encode(text) for text in corpus]
+
+
+@benchmark("tokenizer.transformer.decode", ALL_SIZES)
+def bench_transformer_decode(size):
+    tokenizer = transformer_tokenizer(size)
+    encoded = [tokenizer.encode(text) for text in make_corpus(size)]
+    return lambda: [tokenizer.decode(ids) for ids in encoded]
+
+
+@benchmark("tokenizer.lstm.encode", ALL_SIZES)
+def bench_lstm_encode(size):
+    tokenizer, corpus = lstm_tokenizer(size), make_corpus(size)
+    return lambda: [tokenizer.encode(text) for text in corpus]
+
+
+@benchmark("tokenizer.lstm.decode", ALL_SIZES)
+def bench_lstm_decode(size):
+    tokenizer = lstm_tokenizer(size)
+    encoded = [tokenizer.encode(text) for text in make_corpus(size)]
+    return lambda: [tokenizer.decode(ids) for ids in encoded]
+
+
+# =============================================================================
+# DATASET
+# =============================================================================
+
+@benchmark("dataset.transformer", ALL_SIZES)
+def bench_transformer_dataset(size):
+    tokenizer, corpus = transformer_tokenizer(size), make_corpus(size)
+    return lambda: TransformerDataset(corpus, tokenizer, seq_len=SEQ_LENGTH_TRANSFORMER)
+
+
+@benchmark("dataset.lstm", ALL_SIZES)
+def bench_lstm_dataset(size):
+    tokenizer, corpus = lstm_tokenizer(size), list(make_corpus(size))
+    return lambda: LSTMDataset(corpus, tokenizer, seq_length=SEQ_LENGTH)
+
+
+# =============================================================================
+# FORWARD / TRAININGSSCHRITT
+# =============================================================================
+
+def _forward(model, x):
+    def run():
+        with torch.no_grad():
+            model(x)
+    return run
+
+
+def _train_step(model, x, y, vocab_size, lr):
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+
+    def run():
+        optimizer.zero_grad()
+        output = model(x)
+        logits = output[0] if isinstance(output, tuple) else output
+        loss = F.cross_entropy(logits.reshape(-1, vocab_size), y.reshape(-1))
+        loss.backward()
+        optimizer.step()
+    return run
+
+
+@benchmark("model.minigpt.forward", ALL_SIZES)
+def bench_minigpt_forward(size):
+    model = transformer_model(size)
+    x, _ = _random_batch(model.vocab_size, BATCH_SIZE_TRANSFORMER, SEQ_LENGTH_TRANSFORMER)
+    return _forward(model, x)
+
+
+@benchmark("model.minigpt.train_step", ALL_SIZES)
+def bench_minigpt_train_step(size):
+    model = copy.deepcopy(transformer_model(size)).train()
+    x, y = _random_batch(model.vocab_size, BATCH_SIZE_TRANSFORMER, SEQ_LENGTH_TRANSFORMER)
+    return _train_step(model, x, y, model.vocab_size, LEARNING_RATE_TRANSFORMER)
+
+
+@benchmark("model.lstm.forward", ALL_SIZES)
+def bench_lstm_forward(size):
+    model = lstm_model(size)
+    x, _ = _random_batch(model.vocab_size, BATCH_SIZE_LSTM, SEQ_LENGTH)
+    return _forward(model, x)
+
+
+@benchmark("model.lstm.train_step", ALL_SIZES)
+def bench_lstm_train_step(size):
+    model = copy.deepcopy(lstm_model(size)).train()
+    x, y = _random_batch(model.vocab_size, BATCH_SIZE_LSTM, SEQ_LENGTH)
+    return _train_step(model, x, y, model.vocab_size, LEARNING_RATE_LSTM)
+
+
+# =============================================================================
+# GENERIERUNG
+# =============================================================================
+
+def _seeded(generate):
+    """Fester Seed pro Aufruf, damit jede Messung gleich viele Tokens erzeugt."""
+    def run():
+        torch.manual_seed(0)
+        generate()
+    return run
+
+
+@benchmark("generate.transformer", ALL_SIZES)
+def bench_generate_transformer(size):
+    model, tokenizer, prompt = transformer_model(size), transformer_tokenizer(size), _prompt(size)
+    return _seeded(lambda: transformer_generate(
+        model, tokenizer, prompt, max_length=GENERATE_MAX_LENGTH, temperature=0.8, top_p=0.9))
+
+
+@benchmark("generate.transformer.prefix_cache", ALL_SIZES)
+def bench_generate_transformer_prefix_cache(size):
+    model, tokenizer, prompt = transformer_model(size), transformer_tokenizer(size), _prompt(size)
+    return _seeded(lambda: transformer_generate(
+        model, tokenizer, prompt, max_length=GENERATE_MAX_LENGTH, temperature=0.8, top_p=0.9,
+        use_prefix_cache=True))
+
+
+@benchmark("generate.finetuned", ALL_SIZES)
+def bench_generate_finetuned(size):
+    model, tokenizer, prompt = transformer_model(size), transformer_tokenizer(size), _prompt(size)
+    return _seeded(lambda: finetuned_generate(
+        model, tokenizer, prompt, max_length=GENERATE_MAX_LENGTH, temperature=0.8, top_p=0.9))
+
+
+@benchmark("generate.fact_correction", ALL_SIZES)
+def bench_generate_fact_correction(size):
+    model, tokenizer, prompt = transformer_model(size), transformer_tokenizer(size), _prompt(size)
+    return _seeded(lambda: fact_correction_generate(
+        model, tokenizer, prompt, max_length=GENERATE_MAX_LENGTH, temperature=0.8))
+
+
+@benchmark("generate.lstm_interactive", ALL_SIZES)
+def bench_generate_lstm_interactive(size):
+    model, tokenizer, prompt = lstm_model(size), lstm_tokenizer(size), _prompt(size)
+    return _seeded(lambda: lstm_generate(
+        model, tokenizer, prompt, max_length=GENERATE_MAX_LENGTH, temperature=0.8))
+
+
+@benchmark("generate.lstm_training", ALL_SIZES)
+def bench_generate_lstm_training(size):
+    model, tokenizer, prompt = lstm_model(size), lstm_tokenizer(size), _prompt(size)
+    return _seeded(lambda: lstm_training_generate(
+        model, tokenizer, prompt, max_length=GENERATE_MAX_LENGTH, temperature=0.8,
+        show_logits=False))
+
+
+# =============================================================================
+# LORA
+# =============================================================================
+
+@benchmark("lora.apply", ALL_SIZES)
+def bench_lora_apply(size):
+    base = transformer_model(size)
+    return PerCall(
+        prepare=lambda: copy.deepcopy(base),
+        run=lambda model: apply_lora(model, rank=LORA_RANK),
+    )
+
+
+@benchmark("lora.merge", ALL_SIZES)
+def bench_lora_merge(size):
+    base = transformer_model(size)
+
+    def prepare():
+        model = copy.deepcopy(base)
+        apply_lora(model, rank=LORA_RANK)
+        return model
+
+    return PerCall(prepare=prepare, run=merge_lora_weights)
+
+
+# =============================================================================
+# CHECKPOINTS
+# =============================================================================
+
+@benchmark("checkpoint.transformer.save", ALL_SIZES, repeat=3)
+def bench_transformer_save(size):
+    model, tokenizer, target = transformer_model(size), transformer_tokenizer(size), _temp_dir()
+    return lambda: save_transformer_model(model, tokenizer, str(target))
+
+
+@benchmark("checkpoint.transformer.load", ALL_SIZES)
+def bench_transformer_load(size):
+    target = _temp_dir()
+    save_transformer_model(transformer_model(size), transformer_tokenizer(size), str(target))
+    return lambda: load_transformer_model(str(target))
+
+
+@benchmark("checkpoint.lstm.save", ALL_SIZES, repeat=3)
+def bench_lstm_save(size):
+    model, tokenizer, target = lstm_model(size), lstm_tokenizer(size), _temp_dir()
+    return lambda: save_lstm_model(model, tokenizer, str(target))
+
+
+@benchmark("checkpoint.lstm.load", ALL_SIZES)
+def bench_lstm_load(size):
+    target = _temp_dir()
+    save_lstm_model(lstm_model(size), lstm_tokenizer(size), str(target))
+    return lambda: load_lstm_model(str(target))
+
+
+# =============================================================================
+# MODELL-DISCOVERY
+# =============================================================================
+
+@lru_cache(maxsize=None)
+def model_tree(size: str) -> Path:
+    """
+    Baut einen dist-Ordner wie nach Option 2 + Fine-Tuning auf:
+    Basismodell, drei Standard-Varianten und ein LoRA-Adapter.
+    """
+    base_dir = _temp_dir()
+    model, tokenizer = transformer_model(size), transformer_tokenizer(size)
+    save_transformer_model(model, tokenizer, str(base_dir / "transformer_model"))
+
+    ft_dir = base_dir / "finetuning_results"
+    for variant in ("full_finetuned", "layer_frozen", "lora_merged"):
+        shutil.copytree(base_dir / "transformer_model", ft_dir / variant)
+
+    lora_model = copy.deepcopy(model)
+    apply_lora(lora_model, rank=LORA_RANK)
+    save_lora_adapter(lora_model, tokenizer, str(ft_dir), rank=LORA_RANK,
+                      base_vocab_size=tokenizer.vocab_size)
+    return base_dir
+
+
+@benchmark("discover_models.scan", ("-",))
+def bench_discover_scan(size):
+    base_dir = model_tree("S")
+    return lambda: discover_models(base_dir)
+
+
+@benchmark("discover_models.load_all", ALL_SIZES, repeat=3)
+def bench_discover_load_all(size):
+    base_dir = model_tree(size)
+
+    def run():
+        for info in discover_models(base_dir).values():
+            load_model_by_type(info, base_dir)
+    return run
+
+
+# =============================================================================
+# KONTAMINATIONS-INDEX
+# =============================================================================
+
+CONTAMINATION_QUERIES = 1000
+
+
+@benchmark("contamination.build", ALL_SIZES, repeat=3)
+def bench_contamination_build(size):
+    corpus = make_corpus(size)
+    return lambda: ContaminationIndex.build(corpus)
+
+
+@benchmark("contamination.query", ALL_SIZES)
+def bench_contamination_query(size):
+    """CONTAMINATION_QUERIES Ausgaben pro Aufruf: Satzanfang + fremder Satz."""
+    corpus = make_corpus(size)
+    index = ContaminationIndex.build(corpus)
+    queries = [
+        " ".join(corpus[i % len(corpus)].split()[:3] + corpus[(i * 7 + 1) % len(corpus)].split())
+        for i in range(CONTAMINATION_QUERIES)
+    ]
+    return lambda: [index.query(text) for text in queries]
@@ -0,0 +1,105 @@
+"""
+LLM-Client-Benchmark: neuer Client pro Aufruf vs. gepoolter Client
+==================================================================
+
+Schickt N Judge-Aufrufe nacheinander an den lokalen Stub (Latenz 0)
+und misst den Overhead pro Aufruf:
+
+    fresh   - OpenAI-Client + Verbindung pro Aufruf (altes Verhalten)
+    pooled  - call_judge_llm mit dem prozessweiten Client (Keep-Alive)
+    async   - acall_judge_llm, N Aufrufe parallel über asyncio.gather
+
+Verwendung:
+    python benchmarks/bench_llm_client.py
+    python benchmarks/bench_llm_client.py --calls 200 --latency 0.01
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+from judge_stub import start_stub  # noqa: E402
+
+SYSTEM_PROMPT = "Bewerte den Text."
+USER_PROMPT = "**Prompt (Eingabe):** die katze\n**Generierter Text:** die katze sitzt"
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Overhead pro LLM-Aufruf messen")
+    parser.add_argument("--calls", type=int, default=100, help="Aufrufe pro Variante")
+    parser.add_argument("--latency", default="0",
+                        help='Stub-Latenz pro Anfrage in Sekunden oder Verteilung, z. B. "exp:0.02"')
+    return parser.parse_args()
+
+
+def fresh_client_call():
+    """Altes Verhalten: für jeden Aufruf einen neuen Client bauen."""
+    from openai import OpenAI
+    from evaluation.llm_client import get_model_name, parse_json_content
+
+    client = OpenAI(base_url=os.environ["LLM_PROVIDER_URL"], api_key="not-needed")
+    response = client.chat.completions.create(
+        model=get_model_name(),
+        messages=[{"role": "system", "content": SYSTEM_PROMPT},
+                  {"role": "user", "content": USER_PROMPT}],
+        temperature=0.1,
+    )
+    return parse_json_content(response.choices[0].message.content)
+
+
+def measure(label, calls, run):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<8} {elapsed:>9.2f} {elapsed / calls * 1000:>12.2f} {calls / elapsed:>10.1f}")
+    return elapsed
+
+
+def main():
+    args = parse_arguments()
+    server, url = start_stub(latency=args.latency)
+    os.environ["LLM_PROVIDER_URL"] = url
+
+    from evaluation.llm_client import (
+        acall_judge_llm, aclose_llm_client, call_judge_llm, format_usage_stats,
+        reset_usage_stats,
+    )
+
+    # Aufwärmen (Imports, erste Verbindung)
+    fresh_client_call()
+    call_judge_llm(SYSTEM_PROMPT, USER_PROMPT)
+    reset_usage_stats()
+
+    print(f"Judge-Stub: {url}, Latenz {server.latency.spec} s, {args.calls} Aufrufe\n")
+    header = f"{'Variante':<8} {'Wall (s)':>9} {'ms/Aufruf':>12} {'Aufrufe/s':>10}"
+    print(header)
+    print("-" * len(header))
+
+    fresh = measure("fresh", args.calls,
+                    lambda: [fresh_client_call() for _ in range(args.calls)])
+    pooled = measure("pooled", args.calls,
+                     lambda: [call_judge_llm(SYSTEM_PROMPT, USER_PROMPT) for _ in range(args.calls)])
+
+    async def run_async():
+        try:
+            await asyncio.gather(*(acall_judge_llm(SYSTEM_PROMPT, USER_PROMPT)
+                                   for _ in range(args.calls)))
+        finally:
+            await aclose_llm_client()
+    measure("async", args.calls, lambda: asyncio.run(run_async()))
+
+    print(f"\nGespart pro Aufruf (pooled vs. fresh): {(fresh - pooled) / args.calls * 1000:.2f} ms")
+    print(format_usage_stats())
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
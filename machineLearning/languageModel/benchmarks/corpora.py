@@ -0,0 +1,76 @@
+"""
+Synthetische Korpora für die Benchmarks
+=======================================
+
+Erzeugt deterministische Trainingssätze in vier Größen (S/M/L/XL).
+Wortschatz und Satzanzahl wachsen mit der Größe, damit sich sowohl
+datengetriebene Schritte (Tokenizer, Dataset) als auch vokabular-
+abhängige Schritte (Embedding, lm_head) messbar verändern.
+
+Die Wörter stammen aus dem echten L-Datensatz und werden bei Bedarf
+mit künstlichen Wörtern aufgefüllt. Die Häufigkeiten folgen grob
+Zipfs Gesetz, wie in natürlicher Sprache.
+"""
+
+import random
+from dataclasses import dataclass
+from functools import lru_cache
+
+from training.training_data import TRAINING_DATA_L
+
+CORPUS_SEED = 1234
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    name: str
+    num_sentences: int
+    vocab_size: int
+    min_words: int = 4
+    max_words: int = 12
+
+
+CORPUS_SIZES = {
+    "S": CorpusSpec("S", num_sentences=200, vocab_size=300),
+    "M": CorpusSpec("M", num_sentences=2_000, vocab_size=1_500),
+    "L": CorpusSpec("L", num_sentences=10_000, vocab_size=5_000),
+    "XL": CorpusSpec("XL", num_sentences=50_000, vocab_size=20_000),
+}
+
+
+def _base_words() -> list:
+    """Wörter des echten Datensatzes, nach Häufigkeit sortiert."""
+    counts = {}
+    for sentence in TRAINING_DATA_L:
+        for word in sentence.lower().split():
+            counts[word] = counts.get(word, 0) + 1
+    return sorted(counts, key=lambda w: (-counts[w], w))
+
+
+@lru_cache(maxsize=None)
+def make_corpus(size: str) -> tuple:
+    """
+    Erzeugt das Korpus einer Größe (gecacht, da mehrere Benchmarks
+    dasselbe Korpus nutzen).
+
+    Returns:
+        Tupel von Sätzen (lowercase, durch Leerzeichen getrennt)
+    """
+    spec = CORPUS_SIZES[size.upper()]
+    rng = random.Random(CORPUS_SEED)
+
+    words = _base_words()[:spec.vocab_size]
+    words += [f"wort{i}" for i in range(spec.vocab_size - len(words))]
+
+    # Zipf-Verteilung: Wort auf Rang r hat Gewicht 1/r
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(words) + 1):
+        total += 1.0 / rank
+        cum_weights.append(total)
+
+    sentences = []
+    for _ in range(spec.num_sentences):
+        length = rng.randint(spec.min_words, spec.max_words)
+        sentences.append(" ".join(rng.choices(words, cum_weights=cum_weights, k=length)))
+    return tuple(sentences)
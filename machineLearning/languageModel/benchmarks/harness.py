@@ -0,0 +1,237 @@
+"""
+Benchmark-Harness
+=================
+
+Kleines, abhängigkeitsfreies Mess-Framework im Stil von asv:
+
+- Benchmarks werden per Dekorator registriert und pro Korpusgröße
+  ausgeführt. Die Setup-Funktion baut den Zustand auf und gibt die zu
+  messende Funktion zurück.
+- Die Anzahl Aufrufe pro Messung wird automatisch kalibriert, sodass
+  jede Messung mindestens MIN_SAMPLE_TIME dauert. Berichtet wird der
+  Median über mehrere Messungen (robust gegen Ausreißer).
+- Ergebnisse werden als JSON gespeichert und gegen eine Baseline
+  verglichen. Ist eine Messung um mehr als die Schwelle langsamer,
+  gilt sie als Regression.
+"""
+
+import contextlib
+import io
+import json
+import platform
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import torch
+
+# Mindestdauer einer einzelnen Messung (mehrere Aufrufe) in Sekunden
+MIN_SAMPLE_TIME = 0.05
+
+# Obergrenze für Aufrufe pro Messung (sehr schnelle Funktionen)
+MAX_NUMBER = 10_000
+
+# Standard-Schwelle: 20% langsamer als die Baseline = Regression
+DEFAULT_THRESHOLD = 0.20
+
+
+@dataclass
+class Benchmark:
+    """Ein registrierter Benchmark."""
+    name: str
+    setup: callable
+    sizes: tuple
+    group: str
+    repeat: int = 5
+
+
+@dataclass
+class PerCall:
+    """
+    Rückgabewert einer Setup-Funktion, wenn jeder Aufruf frischen Zustand
+    braucht (z.B. LoRA auf ein unverändertes Modell anwenden).
+    prepare() wird vor jedem Aufruf ausgeführt und nicht mitgemessen,
+    sein Ergebnis wird an run() übergeben.
+    """
+    run: callable
+    prepare: callable
+
+
+@dataclass
+class Measurement:
+    name: str
+    size: str
+    group: str
+    median: float
+    minimum: float
+    stdev: float
+    number: int
+    repeat: int
+    samples: list = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "size": self.size,
+            "group": self.group,
+            "median": self.median,
+            "min": self.minimum,
+            "stdev": self.stdev,
+            "number": self.number,
+            "repeat": self.repeat,
+        }
+
+
+REGISTRY = []
+
+
+def benchmark(name: str, sizes=("S", "M", "L", "XL"), group: str = None, repeat: int = 5):
+    """
+    Registriert eine Setup-Funktion als Benchmark.
+
+    Die Setup-Funktion erhält die Korpusgröße ("S", "M", ...) und gibt
+    entweder eine parameterlose Funktion oder ein PerCall-Objekt zurück.
+    Benchmarks ohne Größenabhängigkeit nutzen sizes=("-",).
+    """
+    def decorator(setup):
+        REGISTRY.append(Benchmark(
+            name=name,
+            setup=setup,
+            sizes=tuple(sizes),
+            group=group or name.split(".")[0],
+            repeat=repeat,
+        ))
+        return setup
+    return decorator
+
+
+@contextlib.contextmanager
+def quiet():
+    """Unterdrückt die (reichlichen) print-Ausgaben des Projekts."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _time_calls(target, number: int) -> float:
+    """Misst number Aufrufe und liefert die Zeit pro Aufruf."""
+    if isinstance(target, PerCall):
+        total = 0.0
+        for _ in range(number):
+            state = target.prepare()
+            start = time.perf_counter()
+            target.run(state)
+            total += time.perf_counter() - start
+        return total / number
+
+    start = time.perf_counter()
+    for _ in range(number):
+        target()
+    return (time.perf_counter() - start) / number
+
+
+def _calibrate(target) -> int:
+    """Verdoppelt die Aufrufzahl, bis eine Messung MIN_SAMPLE_TIME erreicht."""
+    number = 1
+    while number < MAX_NUMBER:
+        if _time_calls(target, number) * number >= MIN_SAMPLE_TIME:
+            break
+        number *= 2
+    return number
+
+
+def run_benchmark(bench: Benchmark, size: str) -> Measurement:
+    """Führt einen Benchmark für eine Größe aus."""
+    with quiet():
+        target = bench.setup(size)
+        _time_calls(target, 1)  # Warmup
+        number = _calibrate(target)
+        samples = [_time_calls(target, number) for _ in range(bench.repeat)]
+
+    return Measurement(
+        name=bench.name,
+        size=size,
+        group=bench.group,
+        median=statistics.median(samples),
+        minimum=min(samples),
+        stdev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        number=number,
+        repeat=bench.repeat,
+        samples=samples,
+    )
+
+
+def select_benchmarks(sizes: list, pattern: str = None) -> list:
+    """Liefert (Benchmark, Größe)-Paare für die gewählten Größen und Filter."""
+    selected = []
+    for bench in REGISTRY:
+        if pattern and pattern not in bench.name:
+            continue
+        for size in bench.sizes:
+            if size == "-" or size in sizes:
+                selected.append((bench, size))
+    return selected
+
+
+def environment_info() -> dict:
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "threads": torch.get_num_threads(),
+    }
+
+
+def save_results(measurements: list, path) -> None:
+    data = {
+        "meta": environment_info(),
+        "results": {m.key: m.to_dict() for m in measurements},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def load_results(path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(measurements: list, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Vergleicht Messungen mit einer Baseline.
+
+    Returns:
+        Liste von (Measurement, baseline_median | None, ratio | None, status)
+        mit status in "regression", "improved", "ok", "new"
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    for m in measurements:
+        base = base_results.get(m.key)
+        if base is None:
+            rows.append((m, None, None, "new"))
+            continue
+        ratio = m.median / base["median"] if base["median"] > 0 else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((m, base["median"], ratio, status))
+    return rows
+
+
+def format_time(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.1f} µs"
@@ -0,0 +1,76 @@
+"""
+Lokaler Stub für die Judge-API
+==============================
+
+Startet den gemeinsamen LLM-Stub (llm-stub/llm_stub.py im Repo-Root) mit
+einer Antwortfunktion für den Judge: jede Anfrage bekommt eine gültige
+Bewertung als JSON, im Batch-Modus eine pro nummeriertem Text "[n]".
+Damit lassen sich Judge-Dispatcher und LLM-Client ohne laufendes
+Ollama/LM Studio messen.
+
+Latenz, Token-Tempo und Fehlerinjektion kommen aus dem LLM-Stub, z. B.
+latency="lognormal:0.2,0.5" oder errors="429:0.05".
+
+Verwendung:
+    python benchmarks/judge_stub.py --port 8090 --latency 0.2
+    python benchmarks/judge_stub.py --latency lognormal:0.2,0.5 --errors 429:0.05,500:0.02
+    LLM_PROVIDER_URL=http://127.0.0.1:8090/v1 python src/main.py   # Option 9
+
+Oder im Prozess:
+    server, url = start_stub(latency=0.2)
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import re
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "llm-stub"))
+
+import llm_stub  # noqa: E402
+
+JUDGE_RESPONSE = {
+    "grammatik_score": 3,
+    "kohaerenz_score": 3,
+    "relevanz_score": 4,
+    "begruendung": "Stub-Bewertung",
+}
+
+
+def judge_responder(request: dict, info: dict) -> dict:
+    """Antwortregel für den LLM-Stub: Einzel- oder Batch-Bewertung."""
+    if '"bewertungen"' in info["system"]:
+        # Batch-Modus: eine Bewertung pro nummeriertem Text "[n]"
+        ids = [int(n) for n in re.findall(r"^\[(\d+)\]", info["last_user"], flags=re.MULTILINE)]
+        return {"json": {"bewertungen": [{"id": i, **JUDGE_RESPONSE} for i in ids]}}
+    return {"json": JUDGE_RESPONSE}
+
+
+def start_stub(host="127.0.0.1", port=0, latency=0.2, **options):
+    """Startet den Stub in einem Hintergrund-Thread. Gibt (server, base_url) zurück."""
+    return llm_stub.start_stub(host, port, latency, responder=judge_responder, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub-Server für die Judge-API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="0.2",
+                        help='Antwortzeit pro Anfrage in Sekunden oder Verteilung, z. B. "uniform:0.1,0.3"')
+    parser.add_argument("--errors", default="", help='Fehlerraten, z. B. "429:0.05,500:0.02"')
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server, url = start_stub(args.host, args.port, args.latency, errors=args.errors, seed=args.seed)
+    print(f"Judge-Stub läuft auf {url} (Latenz {server.latency.spec} s), Strg+C zum Beenden")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
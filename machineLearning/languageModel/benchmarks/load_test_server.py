@@ -0,0 +1,240 @@
+"""
+Lasttest für den Inferenz-Server
+================================
+
+Schickt für mehrere Concurrency-Stufen parallel Anfragen an
+/v1/completions und berichtet Durchsatz (Anfragen/s, Tokens/s),
+Latenz-Perzentile und die mittlere Decode-Batch-Größe des Servers.
+Mit --stream wird zusätzlich die Time-to-First-Token gemessen.
+
+Verwendung:
+    python src/server_app.py                                # Server starten
+    python benchmarks/load_test_server.py                   # 1,2,4,8,16,32
+    python benchmarks/load_test_server.py --concurrency 1,8,64 --requests 200
+    python benchmarks/load_test_server.py --model lstm --stream
+    python benchmarks/load_test_server.py --output results/load_test.json
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+DEFAULT_PROMPTS = [
+    "die katze",
+    "der hund",
+    "das kind spielt",
+    "die sonne scheint",
+    "der vogel",
+]
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LoadTester:
+    def __init__(self, url, model, max_tokens, temperature, stream, timeout=60):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.stream = stream
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        # Eine Keep-Alive-Verbindung pro Worker-Thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _reset_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def get_json(self, path):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request("GET", path)
+            return json.loads(conn.getresponse().read())
+        finally:
+            conn.close()
+
+    def one_request(self, prompt):
+        """Returns (latency, ttft, completion_tokens, ok)."""
+        body = json.dumps({
+            "model": self.model,
+            "prompt": prompt,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "stream": self.stream,
+        })
+        start = time.perf_counter()
+        try:
+            conn = self._connection()
+            conn.request("POST", "/v1/completions", body=body,
+                         headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            if self.stream:
+                return self._read_stream(response, start)
+            data = json.loads(response.read())
+            latency = time.perf_counter() - start
+            if response.status != 200:
+                return latency, None, 0, False
+            return latency, None, data["usage"]["completion_tokens"], True
+        except (OSError, http.client.HTTPException, ValueError):
+            self._reset_connection()
+            return time.perf_counter() - start, None, 0, False
+
+    def _read_stream(self, response, start):
+        ttft = None
+        tokens = 0
+        ok = response.status == 200
+        for raw in response:
+            line = raw.decode("utf-8").strip()
+            if not line.startswith("data: "):
+                continue
+            payload = line[len("data: "):]
+            if payload == "[DONE]":
+                break
+            data = json.loads(payload)
+            if "error" in data:
+                ok = False
+                break
+            if data["choices"][0].get("text"):
+                tokens += 1
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+        # Server schließt Streaming-Verbindungen
+        self._reset_connection()
+        return time.perf_counter() - start, ttft, tokens, ok
+
+    def run_level(self, concurrency, num_requests, prompts):
+        results = []
+        lock = threading.Lock()
+        counter = iter(range(num_requests))
+
+        def worker():
+            while True:
+                with lock:
+                    index = next(counter, None)
+                if index is None:
+                    break
+                result = self.one_request(prompts[index % len(prompts)])
+                with lock:
+                    results.append(result)
+            self._reset_connection()
+
+        before = self.get_json("/metrics?format=json")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker)
+        elapsed = time.perf_counter() - start
+        after = self.get_json("/metrics?format=json")
+
+        ok = [r for r in results if r[3]]
+        latencies = [r[0] for r in ok]
+        ttfts = [r[1] for r in ok if r[1] is not None]
+        tokens = sum(r[2] for r in ok)
+
+        # Mittlere Batch-Größe der Decode-Schritte in diesem Zeitraum
+        m_before = before["models"].get(self.model, {})
+        m_after = after["models"].get(self.model, {})
+        steps = m_after.get("decode_steps", 0) - m_before.get("decode_steps", 0)
+        step_tokens = m_after.get("avg_batch_size", 0) * m_after.get("decode_steps", 0) \
+            - m_before.get("avg_batch_size", 0) * m_before.get("decode_steps", 0)
+
+        return {
+            "concurrency": concurrency,
+            "requests": len(results),
+            "errors": len(results) - len(ok),
+            "elapsed_s": elapsed,
+            "requests_per_s": len(ok) / elapsed if elapsed else 0.0,
+            "tokens_per_s": tokens / elapsed if elapsed else 0.0,
+            "latency_p50_ms": percentile(latencies, 0.5) * 1000,
+            "latency_p95_ms": percentile(latencies, 0.95) * 1000,
+            "latency_mean_ms": statistics.mean(latencies) * 1000 if latencies else 0.0,
+            "ttft_p50_ms": percentile(ttfts, 0.5) * 1000 if ttfts else None,
+            "avg_batch_size": step_tokens / steps if steps else 0.0,
+        }
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Lasttest für den Inferenz-Server")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--model", default="original")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32",
+                        help="Concurrency-Stufen, kommagetrennt")
+    parser.add_argument("--requests", type=int, default=100,
+                        help="Anfragen pro Stufe")
+    parser.add_argument("--max-tokens", type=int, default=16)
+    parser.add_argument("--temperature", type=float, default=0.8)
+    parser.add_argument("--stream", action="store_true",
+                        help="Streaming-Antworten (misst Time-to-First-Token)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Ergebnisse als JSON speichern")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    tester = LoadTester(args.url, args.model, args.max_tokens, args.temperature, args.stream)
+
+    try:
+        models = [m["id"] for m in tester.get_json("/v1/models")["data"]]
+    except OSError as e:
+        print(f"Server nicht erreichbar ({args.url}): {e}")
+        print("Zuerst starten: python src/server_app.py")
+        return 2
+    if args.model not in models:
+        print(f"Modell '{args.model}' nicht verfügbar. Verfügbar: {', '.join(models)}")
+        return 2
+
+    # Modell laden lassen, damit die erste Stufe nicht die Ladezeit misst
+    tester.one_request(DEFAULT_PROMPTS[0])
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    print(f"Lasttest: {args.url}, Modell: {args.model}, {args.requests} Anfragen/Stufe, "
+          f"max_tokens={args.max_tokens}{', Streaming' if args.stream else ''}\n")
+    header = (f"{'Concurrency':>11} {'Anfr./s':>9} {'Tokens/s':>9} {'p50 (ms)':>9} "
+              f"{'p95 (ms)':>9} {'TTFT p50':>9} {'Ø Batch':>8} {'Fehler':>7}")
+    print(header)
+    print("-" * len(header))
+
+    rows = []
+    for concurrency in levels:
+        row = tester.run_level(concurrency, args.requests, DEFAULT_PROMPTS)
+        rows.append(row)
+        ttft = f"{row['ttft_p50_ms']:.1f}" if row["ttft_p50_ms"] is not None else "-"
+        print(f"{concurrency:>11} {row['requests_per_s']:>9.1f} {row['tokens_per_s']:>9.1f} "
+              f"{row['latency_p50_ms']:>9.1f} {row['latency_p95_ms']:>9.1f} {ttft:>9} "
+              f"{row['avg_batch_size']:>8.2f} {row['errors']:>7}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"url": args.url, "model": args.model, "max_tokens": args.max_tokens,
+                       "stream": args.stream, "levels": rows}, f, indent=2)
+        print(f"\nErgebnisse gespeichert: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Benchmark-Runner für das languageModel-Paket
+============================================
+
+Misst Tokenizer, Datasets, Forward/Training, Generierung, LoRA,
+Checkpoints und Modell-Discovery auf synthetischen Korpora (S/M/L/XL)
+und vergleicht die Ergebnisse mit einer gespeicherten JSON-Baseline.
+
+Verwendung:
+    python benchmarks/run_benchmarks.py                      # S + M messen
+    python benchmarks/run_benchmarks.py --sizes S,M,L,XL     # alle Größen
+    python benchmarks/run_benchmarks.py --filter generate    # nur passende Namen
+    python benchmarks/run_benchmarks.py --save-baseline      # Baseline schreiben
+    python benchmarks/run_benchmarks.py --compare            # gegen Baseline prüfen
+    python benchmarks/run_benchmarks.py --compare --threshold 0.3
+
+Exit-Code 1, wenn mit --compare mindestens eine Messung um mehr als
+die Schwelle langsamer ist als die Baseline.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+RESULTS_DIR = BENCH_DIR / "results"
+DEFAULT_BASELINE = RESULTS_DIR / "baseline.json"
+
+sys.path.insert(0, str(SRC_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+import torch  # noqa: E402
+
+from harness import (  # noqa: E402
+    DEFAULT_THRESHOLD, compare, format_time, load_results, run_benchmark,
+    save_results, select_benchmarks,
+)
+import bench_language_model  # noqa: E402,F401  (registriert die Benchmarks)
+from corpora import CORPUS_SIZES  # noqa: E402
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmarks für das languageModel-Paket")
+    parser.add_argument("--sizes", default="S,M",
+                        help="Korpusgrößen, kommagetrennt (S,M,L,XL). Standard: S,M")
+    parser.add_argument("--filter", default=None,
+                        help="Nur Benchmarks, deren Name diesen Text enthält")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help=f"Pfad der Baseline (Standard: {DEFAULT_BASELINE.relative_to(BENCH_DIR.parent)})")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument("--compare", action="store_true",
+                        help="Mit der Baseline vergleichen, Exit-Code 1 bei Regression")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Erlaubte Verlangsamung als Anteil (Standard: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Ergebnisse zusätzlich als JSON speichern")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="torch-Threads (Standard: 1, für stabile Messungen)")
+    parser.add_argument("--list", action="store_true",
+                        help="Nur die verfügbaren Benchmarks auflisten")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    torch.set_num_threads(args.threads)
+
+    sizes = [s.strip().upper() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in CORPUS_SIZES]
+    if unknown:
+        print(f"Unbekannte Größe(n): {', '.join(unknown)} (erlaubt: {', '.join(CORPUS_SIZES)})")
+        return 2
+
+    selected = select_benchmarks(sizes, args.filter)
+    if args.list:
+        for bench, size in selected:
+            print(f"{bench.name}[{size}]")
+        return 0
+    if not selected:
+        print("Keine Benchmarks ausgewählt.")
+        return 2
+
+    baseline = None
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"Baseline nicht gefunden: {args.baseline}")
+            print("Zuerst mit --save-baseline erzeugen.")
+            return 2
+        baseline = load_results(args.baseline)
+
+    print(f"{len(selected)} Benchmarks, Größen: {', '.join(sizes)}, Threads: {args.threads}\n")
+    measurements = []
+    for i, (bench, size) in enumerate(selected, 1):
+        m = run_benchmark(bench, size)
+        measurements.append(m)
+        print(f"[{i:>3}/{len(selected)}] {m.key:<45} {format_time(m.median):>12}"
+              f"  ± {format_time(m.stdev):<10} (n={m.number}×{m.repeat})")
+
+    if args.output:
+        save_results(measurements, args.output)
+        print(f"\nErgebnisse gespeichert: {args.output}")
+
+    if args.save_baseline:
+        save_results(measurements, args.baseline)
+        print(f"\nBaseline gespeichert: {args.baseline}")
+
+    if baseline is None:
+        return 0
+
+    rows = compare(measurements, baseline, args.threshold)
+    print(f"\nVergleich mit Baseline ({baseline['meta'].get('created', '?')}), "
+          f"Schwelle: +{args.threshold:.0%}\n")
+    print(f"{'Benchmark':<45} {'Baseline':>12} {'Aktuell':>12} {'Faktor':>8}  Status")
+    print("-" * 90)
+    for m, base_median, ratio, status in rows:
+        base_str = format_time(base_median) if base_median is not None else "-"
+        ratio_str = f"{ratio:.2f}x" if ratio is not None else "-"
+        print(f"{m.key:<45} {base_str:>12} {format_time(m.median):>12} {ratio_str:>8}  {status}")
+
+    regressions = [row for row in rows if row[3] == "regression"]
+    if regressions:
+        print(f"\n❌ {len(regressions)} Regression(en) über +{args.threshold:.0%}")
+        return 1
+    print("\n✅ Keine Regressionen")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
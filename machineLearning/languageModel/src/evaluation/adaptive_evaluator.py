@@ -0,0 +1,329 @@
+"""
+Adaptive evaluation with confidence-interval early stopping
+===========================================================
+
+One sample per prompt at a fixed seed gives a noisy ranking; sampling
+every model N times multiplies the judge cost by N. This evaluator
+spends samples where they change the ranking:
+
+1. Every round draws one more sample per prompt for each *active* model
+   (seed = GENERATION_SEED + sample number, so samples are reproducible
+   and served from the generation and judge caches on a rerun).
+2. All samples of a round are judged concurrently (JudgeDispatcher).
+3. After ADAPTIVE_MIN_SAMPLES rounds, a model stays active only while the
+   confidence interval (Student's t, ADAPTIVE_CONFIDENCE) of its overall
+   score overlaps the interval of another model. Clearly separated
+   models stop early; ADAPTIVE_MAX_SAMPLES caps the budget.
+
+The report lists mean, interval, samples and judge calls per model.
+
+Usage:
+    python src/main.py   # Option 9, "adaptiv"
+"""
+
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from evaluation.judge_config import (
+    ADAPTIVE_CONFIDENCE,
+    ADAPTIVE_MAX_SAMPLES,
+    ADAPTIVE_MIN_SAMPLES,
+    DEFAULT_TEST_PROMPTS,
+    GENERATION_MAX_LENGTH,
+    GENERATION_SEED,
+    GENERATION_TEMPERATURE,
+    GeneratedOutput,
+    ModelEvaluationResult,
+)
+
+# Two-sided Student's t quantiles per confidence level (df 1..30)
+_T_TABLES = {
+    0.90: [
+        6.314, 2.920, 2.353, 2.132, 2.015, 1.943, 1.895, 1.860, 1.833, 1.812,
+        1.796, 1.782, 1.771, 1.761, 1.753, 1.746, 1.740, 1.734, 1.729, 1.725,
+        1.721, 1.717, 1.714, 1.711, 1.708, 1.706, 1.703, 1.701, 1.699, 1.697,
+    ],
+    0.95: [
+        12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+    ],
+    0.99: [
+        63.657, 9.925, 5.841, 4.604, 4.032, 3.707, 3.499, 3.355, 3.250, 3.169,
+        3.106, 3.055, 3.012, 2.977, 2.947, 2.921, 2.898, 2.878, 2.861, 2.845,
+        2.831, 2.819, 2.807, 2.797, 2.787, 2.779, 2.771, 2.763, 2.756, 2.750,
+    ],
+}
+_Z = {0.90: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+
+
+def _t_quantile(df: int, confidence: float) -> float:
+    """Two-sided Student's t quantile; only the confidences in _T_TABLES are supported."""
+    if confidence not in _T_TABLES:
+        raise ValueError(
+            f"Unsupported confidence {confidence}, expected one of {sorted(_T_TABLES)}"
+        )
+    if df < 1:
+        return float("inf")
+    table = _T_TABLES[confidence]
+    if df <= len(table):
+        return table[df - 1]
+    # Beyond the table: Cornish-Fisher expansion around the normal quantile
+    # (four terms, error below 0.001 from df 30 on)
+    z = _Z[confidence]
+    return (z
+            + (z ** 3 + z) / (4 * df)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3)
+            + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z)
+            / (92160 * df ** 4))
+
+
+def confidence_interval(values: list[float], confidence: float = ADAPTIVE_CONFIDENCE):
+    """Return (mean, low, high); the interval is infinite with fewer than 2 values."""
+    n = len(values)
+    if n == 0:
+        return 0.0, float("-inf"), float("inf")
+    mean = sum(values) / n
+    if n < 2:
+        return mean, float("-inf"), float("inf")
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    half = _t_quantile(n - 1, confidence) * math.sqrt(variance / n)
+    return mean, mean - half, mean + half
+
+
+@dataclass
+class ModelSampling:
+    """Sampling state of one model."""
+    model_key: str
+    label: str
+    outputs: list = field(default_factory=list)   # GeneratedOutput, all samples
+    samples: int = 0          # samples drawn per prompt
+    judge_calls: int = 0      # outputs sent to the judge (cache hits excluded)
+    cache_hits: int = 0
+    prefiltered: int = 0      # scored locally by the pre-filter
+    active: bool = True
+    stop_reason: str = ""
+
+    @property
+    def scores(self) -> list[float]:
+        return [o.score.gesamt_score for o in self.outputs if o.score]
+
+    def interval(self, confidence: float = ADAPTIVE_CONFIDENCE):
+        return confidence_interval(self.scores, confidence)
+
+    def stats(self) -> dict:
+        mean, low, high = self.interval()
+        return {
+            "label": self.label,
+            "mean": round(mean, 2),
+            "low": round(low, 2),
+            "high": round(high, 2),
+            "samples": self.samples,
+            "scored": len(self.scores),
+            "judge_calls": self.judge_calls,
+            "cache_hits": self.cache_hits,
+            "prefiltered": self.prefiltered,
+            "stop_reason": self.stop_reason,
+        }
+
+
+def _overlaps(a, b) -> bool:
+    _, a_low, a_high = a
+    _, b_low, b_high = b
+    return a_low <= b_high and b_low <= a_high
+
+
+class AdaptiveEvaluator:
+    """Round-based sampling and judging until the ranking is resolved."""
+
+    def __init__(self, dispatcher, generation_cache, base_dir, prompts=DEFAULT_TEST_PROMPTS,
+                 min_samples: int = ADAPTIVE_MIN_SAMPLES,
+                 max_samples: int = ADAPTIVE_MAX_SAMPLES,
+                 confidence: float = ADAPTIVE_CONFIDENCE,
+                 log=print):
+        self.dispatcher = dispatcher
+        self.generation_cache = generation_cache
+        self.base_dir = base_dir
+        self.prompts = list(prompts)
+        self.min_samples = max(2, int(min_samples))
+        self.max_samples = max(self.min_samples, int(max_samples))
+        _t_quantile(1, confidence)  # Fail early on an unsupported confidence
+        self.confidence = confidence
+        self.log = log or (lambda msg: None)
+
+    def _generate(self, state: ModelSampling, model, tokenizer) -> list[tuple[str, str]]:
+        from inference.inference_finetuned import generate_text
+
+        seed = GENERATION_SEED + state.samples
+        return [
+            (prompt, self.generation_cache.generate(
+                state.model_key, model, tokenizer, prompt, generate_text, seed,
+                max_length=GENERATION_MAX_LENGTH,
+                temperature=GENERATION_TEMPERATURE,
+            ))
+            for prompt in self.prompts
+        ]
+
+    def _update_active(self, states: list[ModelSampling]):
+        intervals = {s.model_key: s.interval(self.confidence) for s in states}
+        for state in states:
+            if state.samples >= self.max_samples:
+                state.active, state.stop_reason = False, "Budget erschöpft"
+            elif state.samples < self.min_samples:
+                state.active = True
+            else:
+                overlapping = any(
+                    _overlaps(intervals[state.model_key], intervals[other.model_key])
+                    for other in states if other is not state
+                )
+                state.active = overlapping
+                state.stop_reason = "" if overlapping else "getrennt"
+
+    def run(self, models: dict) -> tuple[list[ModelEvaluationResult], dict]:
+        """
+        Evaluate `models` (name -> discovered model info).
+
+        Returns:
+            (results, adaptive_stats) - one ModelEvaluationResult per loaded
+            model with all samples, and per-model interval/budget stats.
+        """
+        from evaluation.evaluation_pipeline import load_evaluation_model
+
+        loaded, states = {}, []
+        for model_key, info in models.items():
+            try:
+                self.log(f"\n   [{model_key}] Lade {info['label']}...")
+                loaded[model_key] = load_evaluation_model(info, self.base_dir)
+            except Exception as e:
+                self.log(f"   [{model_key}] Fehler beim Laden: {e}")
+                continue
+            states.append(ModelSampling(model_key=model_key, label=info["label"]))
+
+        round_no = 0
+        while any(s.active for s in states):
+            round_no += 1
+            active = [s for s in states if s.active]
+            self.log(f"\n   Runde {round_no}: {len(active)} aktive(s) Modell(e)")
+
+            # Generate all active models first, then judge everything at once
+            submitted = []
+            for state in active:
+                generations = self._generate(state, *loaded[state.model_key])
+                hits_before = self.dispatcher.cache_hits
+                prefiltered_before = self.dispatcher.prefiltered
+                futures = self.dispatcher.submit_many(generations)
+                hits = self.dispatcher.cache_hits - hits_before
+                prefiltered = self.dispatcher.prefiltered - prefiltered_before
+                state.cache_hits += hits
+                state.prefiltered += prefiltered
+                state.judge_calls += len(generations) - hits - prefiltered
+                state.samples += 1
+                submitted.append((state, generations, futures))
+
+            for state, generations, futures in submitted:
+                for (prompt, generated), future in zip(generations, futures):
+                    state.outputs.append(GeneratedOutput(
+                        model_name=state.model_key,
+                        prompt=prompt,
+                        generated_text=generated,
+                        score=future.result(),
+                    ))
+
+            self._update_active(states)
+            for state in sorted(states, key=lambda s: s.interval()[0], reverse=True):
+                mean, low, high = state.interval(self.confidence)
+                status = "aktiv" if state.active else f"gestoppt ({state.stop_reason})"
+                self.log(f"   {state.label:<28} {mean:5.2f} [{low:5.2f}, {high:5.2f}] "
+                         f"n={len(state.scores):<3} {status}")
+
+        results = [
+            ModelEvaluationResult(model_name=s.model_key, label=s.label, outputs=s.outputs)
+            for s in states
+        ]
+        return results, {s.model_key: s.stats() for s in states}
+
+
+# =============================================================================
+# MAIN WORKFLOW
+# =============================================================================
+
+def main(dataset: str = "l"):
+    """Adaptive LLM-as-a-Judge evaluation of all trained models."""
+    from evaluation.contamination_index import annotate_contamination
+    from evaluation.evaluation_report import generate_evaluation_report
+    from evaluation.evaluation_runner import (
+        discover_evaluation_models,
+        load_contamination_index,
+        print_results_table,
+    )
+    from evaluation.judge_cache import get_judge_cache
+    from evaluation.judge_dispatcher import JudgeDispatcher
+    from evaluation.prefilter import get_prefilter
+    from evaluation.llm_client import (
+        format_usage_stats, get_model_name, get_usage_stats, reset_usage_stats, test_connection,
+    )
+    from inference.generation_cache import get_generation_cache
+
+    base_dir = Path(__file__).parent.parent.parent / "dist"
+    cache_dir = base_dir / "evaluation_results"
+
+    print("=" * 70)
+    print("LLM-AS-A-JUDGE: Adaptive Bewertung (Konfidenzintervalle)")
+    print("=" * 70)
+
+    available = discover_evaluation_models(base_dir)
+    if len(available) < 2:
+        print("\n   [X] Adaptive Bewertung braucht mindestens zwei Modelle.")
+        print(f"   Gefunden in {base_dir}: {len(available)}")
+        return
+
+    print(f"\n   Judge-Modell: {get_model_name()}")
+    print(f"   {len(available)} Modelle, {len(DEFAULT_TEST_PROMPTS)} Prompts, "
+          f"{ADAPTIVE_MIN_SAMPLES}-{ADAPTIVE_MAX_SAMPLES} Samples pro Prompt, "
+          f"{ADAPTIVE_CONFIDENCE:.0%}-Intervalle")
+    print("   Prüfe LLM-Verbindung...")
+    if not test_connection():
+        print("\n   [X] Kein LLM-Provider erreichbar!")
+        print("   Bitte Ollama oder LM Studio starten und ein Modell laden.")
+        return
+
+    reset_usage_stats()
+    judge_cache = get_judge_cache()
+    prefilter = get_prefilter(base_dir)
+    with JudgeDispatcher(cache=judge_cache, prefilter=prefilter) as dispatcher:
+        evaluator = AdaptiveEvaluator(
+            dispatcher, get_generation_cache(base_dir / "generation_cache.sqlite3"), base_dir,
+        )
+        results, adaptive_stats = evaluator.run(available)
+
+    usage = get_usage_stats()
+    judge_stats = {
+        **dispatcher.stats(),
+        "prompt_tokens": usage["prompt_tokens"],
+        "completion_tokens": usage["completion_tokens"],
+    }
+    full_budget = len(results) * ADAPTIVE_MAX_SAMPLES * len(DEFAULT_TEST_PROMPTS)
+    spent = sum(s["judge_calls"] + s["cache_hits"] + s["prefiltered"]
+                for s in adaptive_stats.values())
+    print(f"\n   Bewertungen: {spent} statt {full_budget} bei vollem Budget")
+    print(f"   {judge_cache.format_stats()}")
+    if prefilter:
+        print(f"   {prefilter.format_stats()}")
+    print(f"   {format_usage_stats()}")
+
+    annotate_contamination(results, load_contamination_index(dataset, cache_dir))
+    print_results_table(results)
+
+    print(f"\n   Generiere Report...")
+    generate_evaluation_report(results, cache_dir, judge_stats=judge_stats,
+                               adaptive_stats=adaptive_stats)
+
+    print("\n" + "=" * 70)
+    print("Adaptive Bewertung abgeschlossen!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Training-data contamination index
+=================================
+
+The evaluation used to flag an output only if its normalized text was
+exactly one training sentence. Near-copies ("die katze sitzt auf dem
+sofa" vs. "... stuhl") and outputs that continue a copied sentence went
+unnoticed, and the lookup set was rebuilt from the data modules on
+every run.
+
+This index is built once per corpus and stored in SQLite. It answers,
+per generated text:
+
+- longest_overlap: longest run of consecutive words shared with any
+  training sentence. Every word n-gram (n <= MAX_NGRAM) of the corpus
+  is stored as a 64-bit hash; the overlap is found by extending n-grams
+  from each start position while they are still in the set.
+- jaccard: highest Jaccard similarity of word bigrams with a training
+  sentence. Candidates come from MinHash-LSH (NUM_PERM permutations,
+  LSH_BANDS bands), so only a handful of sentences are compared exactly.
+- exact: the normalized text is a training sentence.
+
+The index file is keyed by a hash of the corpus; a changed corpus is
+rebuilt automatically.
+
+File: dist/evaluation_results/contamination_<dataset>.sqlite3
+"""
+
+import hashlib
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+MAX_NGRAM = 16          # longer overlaps are reported as MAX_NGRAM
+NUM_PERM = 64           # MinHash signature length
+LSH_BANDS = 16          # 16 bands x 4 rows: candidates from Jaccard ~0.5 upwards
+MINHASH_SEED = 1
+_PRIME = (1 << 31) - 1
+
+SPECIAL_TOKENS = ("<eos>", "<bos>", "<pad>", "<unk>")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key    TEXT PRIMARY KEY,
+    value  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id     INTEGER PRIMARY KEY,
+    text       TEXT NOT NULL,
+    signature  BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ngrams (
+    hash  INTEGER PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+
+# =============================================================================
+# TEXT FEATURES
+# =============================================================================
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip special tokens, collapse whitespace."""
+    clean = text.lower().strip()
+    for tok in SPECIAL_TOKENS:
+        clean = clean.replace(tok, "")
+    return " ".join(clean.split())
+
+
+def _hash64(words) -> int:
+    """Stable signed 64-bit hash of a word sequence (fits an SQLite INTEGER)."""
+    digest = hashlib.blake2b("\x1f".join(words).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def _shingles(words: list[str]) -> set[str]:
+    """Word bigrams (a single word is its own shingle)."""
+    if len(words) < 2:
+        return set(words)
+    return {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _permutations():
+    rng = np.random.default_rng(MINHASH_SEED)
+    a = rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+    b = rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+    return a, b
+
+
+_PERM_A, _PERM_B = _permutations()
+
+
+def minhash_signature(shingles: set[str]) -> np.ndarray:
+    """NUM_PERM minimum hash values over (a * h + b) mod p."""
+    if not shingles:
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint32)
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+         for s in shingles),
+        dtype=np.uint64, count=len(shingles),
+    ) % _PRIME
+    values = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _PRIME
+    return values.min(axis=1).astype(np.uint32)
+
+
+def corpus_hash(texts) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{MAX_NGRAM}:{NUM_PERM}:{LSH_BANDS}:{MINHASH_SEED}".encode())
+    for text in texts:
+        digest.update(normalize_text(text).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+@dataclass(frozen=True)
+class ContaminationMatch:
+    """Overlap of one generated text with the training corpus."""
+    exact: bool
+    longest_overlap: int        # consecutive words shared with a training sentence
+    jaccard: float              # best word-bigram Jaccard among LSH candidates
+    nearest: str | None         # training sentence with that Jaccard
+
+
+class ContaminationIndex:
+    """In-memory n-gram set + MinHash-LSH buckets, persisted in SQLite."""
+
+    def __init__(self, texts: list[str], signatures: np.ndarray, ngrams: set[int]):
+        self.texts = texts
+        self.signatures = signatures
+        self.ngrams = ngrams
+        self._exact = set(texts)
+        self._shingle_cache = {}
+        self._rows = NUM_PERM // LSH_BANDS
+        self._buckets = [{} for _ in range(LSH_BANDS)]
+        for doc_id, signature in enumerate(signatures):
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, []).append(doc_id)
+
+    # -------------------------------------------------------------------------
+    # Build / persist
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, texts) -> "ContaminationIndex":
+        docs = list(dict.fromkeys(t for t in map(normalize_text, texts) if t))
+        ngrams = set()
+        signatures = np.empty((len(docs), NUM_PERM), dtype=np.uint32)
+        for doc_id, text in enumerate(docs):
+            words = text.split()
+            for start in range(len(words)):
+                for end in range(start + 1, min(len(words), start + MAX_NGRAM) + 1):
+                    ngrams.add(_hash64(words[start:end]))
+            signatures[doc_id] = minhash_signature(_shingles(words))
+        return cls(docs, signatures, ngrams)
+
+    def save(self, path, corpus_key: str):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.unlink(missing_ok=True)
+        conn = sqlite3.connect(str(tmp))
+        with conn:
+            conn.executescript(_SCHEMA)
+            conn.execute("INSERT INTO meta VALUES ('corpus_hash', ?)", (corpus_key,))
+            conn.executemany(
+                "INSERT INTO docs VALUES (?, ?, ?)",
+                ((i, text, sig.tobytes()) for i, (text, sig) in enumerate(zip(self.texts, self.signatures))),
+            )
+            conn.executemany("INSERT INTO ngrams VALUES (?)", ((h,) for h in self.ngrams))
+        conn.close()
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path, corpus_key: str) -> "ContaminationIndex | None":
+        """Load the index, or None if the file is missing or built from another corpus."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        conn = sqlite3.connect(str(path))
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'corpus_hash'").fetchone()
+            if row is None or row[0] != corpus_key:
+                return None
+            docs = conn.execute("SELECT text, signature FROM docs ORDER BY doc_id").fetchall()
+            ngrams = {h for (h,) in conn.execute("SELECT hash FROM ngrams")}
+        except sqlite3.DatabaseError:
+            return None
+        finally:
+            conn.close()
+        signatures = np.frombuffer(b"".join(sig for _, sig in docs), dtype=np.uint32)
+        return cls([text for text, _ in docs], signatures.reshape(len(docs), NUM_PERM), ngrams)
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def _band_keys(self, signature):
+        rows = self._rows
+        return [signature[b * rows:(b + 1) * rows].tobytes() for b in range(LSH_BANDS)]
+
+    def _doc_shingles(self, doc_id: int) -> set[str]:
+        shingles = self._shingle_cache.get(doc_id)
+        if shingles is None:
+            shingles = self._shingle_cache[doc_id] = _shingles(self.texts[doc_id].split())
+        return shingles
+
+    def longest_overlap(self, words: list[str]) -> int:
+        """Longest run of consecutive words that also occurs in the corpus."""
+        best = 0
+        for start in range(len(words)):
+            length = best  # only longer runs are interesting
+            if start + length >= len(words) or _hash64(words[start:start + length + 1]) not in self.ngrams:
+                continue
+            length += 1
+            while (start + length < len(words) and length < MAX_NGRAM
+                   and _hash64(words[start:start + length + 1]) in self.ngrams):
+                length += 1
+            best = length
+        return best
+
+    def query(self, text: str) -> ContaminationMatch:
+        normalized = normalize_text(text)
+        words = normalized.split()
+        shingles = _shingles(words)
+
+        candidates = set()
+        for band, key in enumerate(self._band_keys(minhash_signature(shingles))):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        best, nearest = 0.0, None
+        for doc_id in candidates:
+            similarity = _jaccard(shingles, self._doc_shingles(doc_id))
+            if similarity > best:
+                best, nearest = similarity, self.texts[doc_id]
+
+        return ContaminationMatch(
+            exact=normalized in self._exact,
+            longest_overlap=self.longest_overlap(words),
+            jaccard=round(best, 3),
+            nearest=nearest,
+        )
+
+    def __len__(self):
+        return len(self.texts)
+
+
+def get_contamination_index(texts, path) -> ContaminationIndex:
+    """Load the index for this corpus from `path`, building and saving it if needed."""
+    texts = list(texts)
+    key = corpus_hash(texts)
+    index = ContaminationIndex.load(path, key)
+    if index is None:
+        index = ContaminationIndex.build(texts)
+        index.save(path, key)
+    return index
+
+
+def annotate_contamination(results, index: ContaminationIndex):
+    """Set in_training_data, longest_overlap and jaccard on every output of `results`."""
+    for result in results:
+        for output in result.outputs:
+            match = index.query(output.generated_text)
+            output.in_training_data = match.exact
+            output.longest_overlap = match.longest_overlap
+            output.jaccard = match.jaccard
@@ -0,0 +1,213 @@
+"""
+Pipelined evaluation: generation and judging overlap
+====================================================
+
+The runner used to load a model, generate its outputs, wait for the
+judge, then move on to the next model. Generation is CPU-bound and
+judging is network-bound, so one of them was always idle.
+
+    producer thread     load model -> generate -> put chunk ─┐
+                                                             │ bounded queue
+    consumer (caller)   get chunk -> JudgeDispatcher.submit_many ◄┘
+                        verdicts -> EvaluationStore (as they arrive)
+
+- The producer generates chunks of `dispatcher.batch_size` outputs, so
+  one chunk becomes one judge request.
+- The queue holds at most PIPELINE_QUEUE_SIZE chunks, and at most
+  `dispatcher.max_concurrency` chunks are being judged at a time. A slow
+  judge therefore pauses generation instead of piling up outputs.
+- Results are aggregated per model in prompt order, independent of the
+  order in which the judge answers.
+
+Wall time approaches max(generation, judging) instead of their sum.
+
+Usage:
+    pipeline = EvaluationPipeline(dispatcher, store, generation_cache, prompts, base_dir)
+    results = pipeline.run(models)   # name -> info incl. run_id, done
+"""
+
+import queue
+import threading
+import time
+from functools import partial
+
+from evaluation.judge_config import (
+    GENERATION_MAX_LENGTH,
+    GENERATION_SEED,
+    GENERATION_TEMPERATURE,
+    PIPELINE_QUEUE_SIZE,
+    GeneratedOutput,
+    ModelEvaluationResult,
+)
+
+_DONE = object()
+
+
+def load_evaluation_model(info: dict, base_dir):
+    """Load a discovered model (Transformer variants or LSTM)."""
+    if info["type"] == "lstm":
+        from training.training_lstm import load_model as load_lstm
+        return load_lstm(str(info["path"]))
+    from inference.inference_finetuned import load_model_by_type
+    return load_model_by_type(info, base_dir)
+
+
+class EvaluationPipeline:
+    """Producer/consumer evaluation over several models."""
+
+    def __init__(self, dispatcher, store, generation_cache, prompts, base_dir,
+                 queue_size: int = PIPELINE_QUEUE_SIZE, log=print):
+        self.dispatcher = dispatcher
+        self.store = store
+        self.generation_cache = generation_cache
+        self.prompts = list(prompts)
+        self.base_dir = base_dir
+        self.queue_size = max(1, int(queue_size))
+        self.log = log or (lambda msg: None)
+        self._lock = threading.Lock()
+        # Signalled when the last submitted output is recorded. Future.wait()
+        # returns before done-callbacks (_on_scored) have run.
+        self._recorded = threading.Condition(self._lock)
+        self._pending = 0
+        self._slots = threading.Semaphore(dispatcher.max_concurrency)
+        self._outputs = {}
+        self.loaded = []                 # model keys that loaded successfully
+        self.generation_seconds = 0.0    # producer time spent loading + generating
+        self.wall_seconds = 0.0
+
+    # -------------------------------------------------------------------------
+    # Producer
+    # -------------------------------------------------------------------------
+
+    def _produce(self, models: dict, chunks: queue.Queue):
+        from inference.inference_finetuned import generate_text
+
+        try:
+            for model_key, info in models.items():
+                pending = [i for i in range(len(self.prompts)) if i not in info["done"]]
+                start = time.perf_counter()
+                try:
+                    self.log(f"\n   [{model_key}] Lade {info['label']}...")
+                    model, tokenizer = load_evaluation_model(info, self.base_dir)
+                except Exception as e:
+                    self.log(f"   [{model_key}] Fehler beim Laden: {e}")
+                    continue
+                self.loaded.append(model_key)
+
+                chunk = []
+                for index in pending:
+                    prompt = self.prompts[index]
+                    generated = self.generation_cache.generate(
+                        model_key, model, tokenizer, prompt, generate_text, GENERATION_SEED,
+                        max_length=GENERATION_MAX_LENGTH,
+                        temperature=GENERATION_TEMPERATURE,
+                    )
+                    self.log(f"   [{info['label']}] '{prompt}' -> '{generated}'")
+                    chunk.append((index, prompt, generated))
+                    if len(chunk) == self.dispatcher.batch_size:
+                        self.generation_seconds += time.perf_counter() - start
+                        chunks.put((model_key, info["run_id"], chunk))  # blocks when full
+                        start = time.perf_counter()
+                        chunk = []
+                if chunk:
+                    chunks.put((model_key, info["run_id"], chunk))
+
+                self.generation_seconds += time.perf_counter() - start
+                del model, tokenizer
+        except BaseException as e:
+            chunks.put(e)
+        finally:
+            chunks.put(_DONE)
+
+    # -------------------------------------------------------------------------
+    # Consumer
+    # -------------------------------------------------------------------------
+
+    def _on_scored(self, model_key, run_id, index, prompt, generated, remaining, future):
+        output = GeneratedOutput(model_name=model_key, prompt=prompt, generated_text=generated)
+        try:
+            try:
+                output.score = future.result()
+            except Exception as e:
+                # Dispatcher errors count as a failed evaluation (score None)
+                self.log(f"   [{model_key}] '{prompt}' -> Fehler bei der Bewertung: {e}")
+            self.store.record(run_id, index, output)
+        finally:
+            # Always free the slot, otherwise the consumer loop would block
+            with self._lock:
+                self._outputs[model_key][index] = output
+                remaining[0] -= 1
+                chunk_done = remaining[0] == 0
+                self._pending -= 1
+                if self._pending == 0:
+                    self._recorded.notify_all()
+            if chunk_done:
+                self._slots.release()
+
+        score = output.score
+        if score:
+            self.log(
+                f"   [{model_key}] '{prompt}' -> G:{score.grammatik_score} "
+                f"K:{score.kohaerenz_score} R:{score.relevanz_score} = {score.gesamt_score:.2f}"
+            )
+        else:
+            self.log(f"   [{model_key}] '{prompt}' -> Bewertung fehlgeschlagen")
+
+    def run(self, models: dict) -> dict[str, ModelEvaluationResult]:
+        """
+        Generate and judge all missing outputs of `models`.
+
+        Args:
+            models: name -> model info with "run_id" and "done"
+                (outputs already scored in the store, by prompt index).
+
+        Returns:
+            name -> ModelEvaluationResult in the order of `models`
+            (models that failed to load are left out).
+        """
+        start = time.perf_counter()
+        self._outputs = {name: dict(info["done"]) for name, info in models.items()}
+        chunks = queue.Queue(maxsize=self.queue_size)
+        producer = threading.Thread(
+            target=self._produce, args=(models, chunks), name="generate", daemon=True,
+        )
+        producer.start()
+
+        self._pending = 0
+        while True:
+            item = chunks.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            model_key, run_id, chunk = item
+            self._slots.acquire()
+            chunk_futures = self.dispatcher.submit_many(
+                [(prompt, generated) for _, prompt, generated in chunk]
+            )
+            remaining = [len(chunk_futures)]
+            with self._lock:
+                self._pending += len(chunk_futures)
+            for (index, prompt, generated), future in zip(chunk, chunk_futures):
+                future.add_done_callback(partial(
+                    self._on_scored, model_key, run_id, index, prompt, generated, remaining,
+                ))
+
+        producer.join()
+        with self._recorded:
+            self._recorded.wait_for(lambda: self._pending == 0)
+        self.wall_seconds = time.perf_counter() - start
+
+        return {
+            name: ModelEvaluationResult(
+                model_name=name,
+                label=models[name]["label"],
+                outputs=[self._outputs[name][i] for i in sorted(self._outputs[name])],
+            )
+            for name in models
+            if name in self.loaded
+        }
+
+    def format_stats(self) -> str:
+        return (f"Pipeline: Wall {self.wall_seconds:.1f} s, davon Laden + Generieren "
+                f"{self.generation_seconds:.1f} s (parallel zum Judge)")
@@ -9,16 +9,27 @@ Saves to dist/evaluation_results/EVALUATION_REPORT.md
 """
 
 from pathlib import Path
-from evaluation.judge_config import ModelEvaluationResult
+from evaluation.judge_config import (
+    MEMORIZATION_JACCARD,
+    MEMORIZATION_MIN_OVERLAP,
+    ModelEvaluationResult,
+)
 
 
-def generate_evaluation_report(results: list[ModelEvaluationResult], save_dir: Path) -> str:
+def generate_evaluation_report(
+    results: list[ModelEvaluationResult], save_dir: Path, judge_stats: dict | None = None,
+    adaptive_stats: dict | None = None,
+) -> str:
     """
     Build a Markdown report and write it to disk.
 
     Args:
         results: List of ModelEvaluationResult (one entry per model).
         save_dir: Target directory (e.g. dist/evaluation_results/).
+        judge_stats: Optional judge cost summary of this run
+            (JudgeDispatcher.stats() plus prompt/completion tokens).
+        adaptive_stats: Optional per-model confidence intervals and judge
+            calls of an adaptive run (AdaptiveEvaluator.run()).
 
     Returns:
         The report as a string.
@@ -31,8 +42,13 @@ def generate_evaluation_report(results: list[ModelEvaluationResult], save_dir: P
 
     report = _build_header()
     report += _build_ranking_table(ranked)
+    if adaptive_stats:
+        report += _build_adaptive_section(adaptive_stats)
     report += _build_criteria_table(ranked)
+    report += _build_memorization_section(ranked)
     report += _build_detail_section(ranked)
+    if judge_stats and judge_stats.get("outputs"):
+        report += _build_judge_cost_section(judge_stats)
     report += _build_footer()
 
     report_path = save_dir / "EVALUATION_REPORT.md"
@@ -79,6 +95,23 @@ def _build_ranking_table(ranked: list[ModelEvaluationResult]) -> str:
     return "\n".join(lines) + "\n"
 
 
+def _build_adaptive_section(stats: dict) -> str:
+    lines = ["## Konfidenzintervalle (adaptive Bewertung)\n"]
+    lines.append(
+        "Modelle wurden so lange neu gesampelt, bis sich ihr Intervall mit keinem "
+        "anderen mehr überschnitt (oder das Budget erschöpft war).\n"
+    )
+    lines.append("| Modell | Gesamt | Intervall | Samples/Prompt | Bewertungen | Judge-Aufrufe | Abbruch |")
+    lines.append("|--------|--------|-----------|----------------|-------------|---------------|---------|")
+    for s in sorted(stats.values(), key=lambda s: s["mean"], reverse=True):
+        lines.append(
+            f"| {s['label']} | {s['mean']:.2f} | [{s['low']:.2f}, {s['high']:.2f}] "
+            f"| {s['samples']} | {s['scored']} | {s['judge_calls']} | {s['stop_reason'] or '-'} |"
+        )
+    lines.append("")
+    return "\n".join(lines) + "\n"
+
+
 def _build_criteria_table(ranked: list[ModelEvaluationResult]) -> str:
     lines = ["## Detailvergleich pro Kriterium\n"]
 
@@ -98,6 +131,25 @@ def _build_criteria_table(ranked: list[ModelEvaluationResult]) -> str:
     return "\n".join(lines) + "\n"
 
 
+def _build_memorization_section(ranked: list[ModelEvaluationResult]) -> str:
+    lines = ["## Memorisierung (Abgleich mit Trainingsdaten)\n"]
+    lines.append(
+        f"Als memoriert gilt eine Ausgabe, die exakt einem Trainingssatz entspricht, "
+        f"ihm mit Jaccard ≥ {MEMORIZATION_JACCARD} (Wort-Bigramme) ähnelt oder "
+        f"≥ {MEMORIZATION_MIN_OVERLAP} aufeinanderfolgende Wörter daraus übernimmt.\n"
+    )
+    lines.append("| Modell | Memoriert | Exakt | Ø längste Überlappung (Wörter) | Ø Jaccard |")
+    lines.append("|--------|-----------|-------|-------------------------------|-----------|")
+    for r in ranked:
+        avg_jaccard = sum(o.jaccard for o in r.outputs) / len(r.outputs) if r.outputs else 0.0
+        lines.append(
+            f"| {r.label} | {r.memorization_rate:.0%} | {r.exact_match_rate:.0%} "
+            f"| {r.avg_longest_overlap:.1f} | {avg_jaccard:.2f} |"
+        )
+    lines.append("")
+    return "\n".join(lines) + "\n"
+
+
 def _build_detail_section(ranked: list[ModelEvaluationResult]) -> str:
     lines = ["## Einzelergebnisse\n"]
 
@@ -105,14 +157,19 @@ def _build_detail_section(ranked: list[ModelEvaluationResult]) -> str:
         lines.append(f"### {r.label}\n")
 
         lines.append(
-            "| Prompt | Generierter Text | In Daten? | Gram. | Koh. | Rel. | Gesamt | Begründung |"
+            "| Prompt | Generierter Text | Überlappung | Gram. | Koh. | Rel. | Gesamt | Begründung |"
         )
         lines.append(
-            "|--------|-----------------|-----------|-------|------|------|--------|------------|"
+            "|--------|-----------------|-------------|-------|------|------|--------|------------|"
         )
 
         for o in r.outputs:
-            match_icon = "Ja" if o.in_training_data else "Nein"
+            if o.in_training_data:
+                match_icon = "Exakt"
+            else:
+                match_icon = f"{o.longest_overlap} W., J={o.jaccard:.2f}"
+                if o.memorized:
+                    match_icon = f"**{match_icon}**"
             if o.score:
                 lines.append(
                     f"| {o.prompt} | {o.generated_text} | {match_icon} "
@@ -131,6 +188,26 @@ def _build_detail_section(ranked: list[ModelEvaluationResult]) -> str:
     return "\n".join(lines) + "\n"
 
 
+def _build_judge_cost_section(stats: dict) -> str:
+    outputs = stats["outputs"]
+    tokens = stats.get("prompt_tokens", 0) + stats.get("completion_tokens", 0)
+    lines = ["## Judge-Kosten (dieser Lauf)\n"]
+    lines.append("| Kennzahl | Wert |")
+    lines.append("|----------|------|")
+    lines.append(f"| Bewertete Ausgaben | {outputs} |")
+    lines.append(f"| Davon aus Judge-Cache | {stats.get('cache_hits', 0)} |")
+    lines.append(f"| Davon per Vorfilter (ohne Judge) | {stats.get('prefiltered', 0)} |")
+    lines.append(f"| Ausgaben pro Anfrage (Batch) | {stats.get('batch_size', 1)} |")
+    lines.append(f"| Judge-Anfragen | {stats['requests']} |")
+    lines.append(f"| Anfragen pro Ausgabe | {stats['requests'] / outputs:.2f} |")
+    lines.append(f"| Einzel-Nachbewertungen | {stats.get('fallbacks', 0)} |")
+    lines.append(f"| Prompt-Tokens | {stats.get('prompt_tokens', 0)} |")
+    lines.append(f"| Antwort-Tokens | {stats.get('completion_tokens', 0)} |")
+    lines.append(f"| Tokens pro Ausgabe | {tokens / outputs:.0f} |")
+    lines.append("")
+    return "\n".join(lines) + "\n"
+
+
 def _build_footer() -> str:
     return """---
 
@@ -5,12 +5,21 @@ Evaluation Runner: LLM-as-a-Judge orchestration
 Workflow:
 1. Test LLM connection
 2. Discover models (Transformer + LSTM)
-3. Check cache — skip models whose weights haven't changed
-4. Load only uncached models, generate + evaluate
-5. Update cache, print results, generate Markdown report
-
-Cache: dist/evaluation_results/cache.json
-       Keyed by model name + model.pt modification timestamp.
+3. Check the evaluation store — skip models whose checkpoint has
+   already been fully scored, resume partially scored ones
+4. Load only those models and generate the missing outputs while the
+   judge scores earlier ones concurrently (EvaluationPipeline +
+   JudgeDispatcher); clear failures are scored locally (prefilter.py),
+   every verdict is appended to the store as it arrives
+5. Print results, generate Markdown report
+
+Store: dist/evaluation_results/evaluation_store.sqlite3 (evaluation_store.py)
+       Keyed by checkpoint content hash + evaluation config.
+       Individual verdicts are cached by content in
+       dist/evaluation_results/judge_cache.sqlite3 (judge_cache.py), so a
+       retrained model only sends its new texts to the judge.
+       Generations are seeded (GENERATION_SEED) and cached separately in
+       dist/generation_cache.sqlite3, keyed by a hash of the weights.
 
 Usage:
     python src/main.py   # Option 9
@@ -22,23 +31,36 @@ from evaluation.judge_config import (
     DEFAULT_TEST_PROMPTS,
     GENERATION_TEMPERATURE,
     GENERATION_MAX_LENGTH,
-    GeneratedOutput,
+    GENERATION_SEED,
+    JUDGE_BATCH_SIZE,
+    JUDGE_MAX_CONCURRENCY,
     ModelEvaluationResult,
 )
-from evaluation.llm_client import test_connection, get_model_name
-from evaluation.judge import evaluate_single_output
-from evaluation.evaluation_report import generate_evaluation_report
-from evaluation.evaluation_cache import (
-    load_cache,
-    save_cache,
-    get_cached_result,
-    update_cache,
+from evaluation.llm_client import (
+    test_connection,
+    get_model_name,
+    format_usage_stats,
+    get_usage_stats,
+    reset_usage_stats,
 )
-from inference.inference_finetuned import (
-    discover_models,
-    load_model_by_type,
-    generate_text,
+from evaluation.judge_cache import get_judge_cache
+from evaluation.judge_dispatcher import JudgeDispatcher
+from evaluation.contamination_index import (
+    ContaminationIndex,
+    annotate_contamination,
+    get_contamination_index,
 )
+from evaluation.evaluation_pipeline import EvaluationPipeline
+from evaluation.prefilter import get_prefilter
+from evaluation.evaluation_report import generate_evaluation_report
+from evaluation.evaluation_store import (
+    DB_FILENAME as STORE_FILENAME,
+    checkpoint_hash,
+    evaluation_config,
+    get_evaluation_store,
+)
+from inference.inference_finetuned import discover_models
+from inference.generation_cache import get_generation_cache
 from training.data import TRAINING_DATA, TRAINING_DATA_M, TRAINING_DATA_L
 
 
@@ -54,13 +76,15 @@ def print_results_table(results: list[ModelEvaluationResult]):
     print("BEWERTUNGSERGEBNISSE (LLM-as-a-Judge)")
     print("=" * 80)
 
-    print(f"\n   {'Rang':<6} {'Modell':<28} {'Gesamt':>8} {'Gram.':>8} {'Koh.':>8} {'Rel.':>8}")
-    print("   " + "-" * 72)
+    print(f"\n   {'Rang':<6} {'Modell':<28} {'Gesamt':>8} {'Gram.':>8} {'Koh.':>8} {'Rel.':>8} "
+          f"{'Memo.':>6}")
+    print("   " + "-" * 79)
 
     for i, r in enumerate(ranked, 1):
         print(
             f"   {i:<6} {r.label:<28} {r.avg_gesamt:>8.2f} "
-            f"{r.avg_grammatik:>8.2f} {r.avg_kohaerenz:>8.2f} {r.avg_relevanz:>8.2f}"
+            f"{r.avg_grammatik:>8.2f} {r.avg_kohaerenz:>8.2f} {r.avg_relevanz:>8.2f} "
+            f"{r.memorization_rate:>6.0%}"
         )
 
     print()
@@ -69,7 +93,12 @@ def print_results_table(results: list[ModelEvaluationResult]):
     for r in ranked:
         print(f"\n   --- {r.label} ---")
         for o in r.outputs:
-            match_tag = "[IN DATEN]" if o.in_training_data else "[NEU]"
+            if o.in_training_data:
+                match_tag = "[IN DATEN]"
+            elif o.memorized:
+                match_tag = f"[MEMORIERT: {o.longest_overlap} W., J={o.jaccard:.2f}]"
+            else:
+                match_tag = "[NEU]"
             if o.score:
                 print(
                     f"   Prompt: '{o.prompt}' -> '{o.generated_text}' "
@@ -89,22 +118,25 @@ def print_results_table(results: list[ModelEvaluationResult]):
 # MAIN WORKFLOW
 # =============================================================================
 
-def _load_training_set(dataset: str) -> set[str]:
-    """Load training data as a set of normalized sentences for lookup."""
-    datasets = {"s": TRAINING_DATA, "m": TRAINING_DATA_M, "l": TRAINING_DATA_L}
-    texts = datasets.get(dataset, TRAINING_DATA)
-    return {t.lower().strip() for t in texts}
+def discover_evaluation_models(base_dir: Path) -> dict:
+    """All evaluable models: Transformer variants plus the LSTM, if trained."""
+    available = discover_models(base_dir)
 
+    lstm_dir = base_dir / "lstm_model"
+    if (lstm_dir / "model.pt").exists():
+        available["lstm"] = {
+            "path": lstm_dir,
+            "type": "lstm",
+            "label": "LSTM (Basis-Training)",
+        }
+    return available
 
-def _refresh_in_training_data(results: list, training_set: set[str]):
-    """Recalculate in_training_data for all outputs against current training data."""
-    for result in results:
-        for output in result.outputs:
-            clean = output.generated_text.lower().strip()
-            for tok in ("<eos>", "<bos>", "<pad>", "<unk>"):
-                clean = clean.replace(tok, "")
-            clean = " ".join(clean.split())
-            output.in_training_data = clean in training_set
+
+def load_contamination_index(dataset: str, cache_dir: Path) -> ContaminationIndex:
+    """Load (or build once) the contamination index of a training dataset."""
+    datasets = {"s": TRAINING_DATA, "m": TRAINING_DATA_M, "l": TRAINING_DATA_L}
+    texts = datasets.get(dataset, TRAINING_DATA)
+    return get_contamination_index(texts, cache_dir / f"contamination_{dataset}.sqlite3")
 
 
 def main(dataset: str = "l"):
@@ -117,7 +149,7 @@ def main(dataset: str = "l"):
     base_dir = script_dir.parent.parent / "dist"
     cache_dir = base_dir / "evaluation_results"
 
-    training_set = _load_training_set(dataset)
+    contamination_index = load_contamination_index(dataset, cache_dir)
     dataset_labels = {"s": "S (22)", "m": "M (200)", "l": "L (2000)"}
 
     print("=" * 70)
@@ -126,15 +158,7 @@ def main(dataset: str = "l"):
     print(f"\n   Trainingsdaten-Abgleich: {dataset_labels.get(dataset, dataset)} Saetze")
 
     # 1. Discover models (before LLM connection — fast)
-    available = discover_models(base_dir)
-
-    lstm_dir = base_dir / "lstm_model"
-    if (lstm_dir / "model.pt").exists():
-        available["lstm"] = {
-            "path": lstm_dir,
-            "type": "lstm",
-            "label": "LSTM (Basis-Training)",
-        }
+    available = discover_evaluation_models(base_dir)
 
     if not available:
         print("\n   [X] Keine Modelle gefunden!")
@@ -146,23 +170,33 @@ def main(dataset: str = "l"):
     for name, info in available.items():
         print(f"   - {name:<20} {info['label']}")
 
-    # 2. Check cache — determine which models need evaluation
-    cache = load_cache(cache_dir)
+    # 2. Check store — determine which models (or prompts) need evaluation
+    prompts = DEFAULT_TEST_PROMPTS
+    store = get_evaluation_store(cache_dir / STORE_FILENAME)
+    prefilter = get_prefilter(base_dir)
+    config = evaluation_config(
+        prompts, max_length=GENERATION_MAX_LENGTH,
+        temperature=GENERATION_TEMPERATURE, seed=GENERATION_SEED,
+        prefilter=prefilter.settings() if prefilter else None,
+    )
     cached_results = {}
     models_to_evaluate = {}
 
     for name, info in available.items():
-        cached = get_cached_result(cache, name, info["path"])
-        if cached:
-            cached_results[name] = cached
+        run_id = store.open_run(name, info["label"], checkpoint_hash(info, base_dir), config)
+        done = store.scored_outputs(run_id)
+        if len(done) == len(prompts):
+            cached_results[name] = store.load_result(run_id, info["label"])
             print(f"   [{name}] Cache-Treffer (unverändert)")
         else:
-            models_to_evaluate[name] = info
+            if done:
+                print(f"   [{name}] Setze fort: {len(done)}/{len(prompts)} bereits bewertet")
+            models_to_evaluate[name] = {**info, "run_id": run_id, "done": done}
 
     if not models_to_evaluate:
         print("\n   Alle Modelle im Cache — keine Neubewertung nötig.")
         results = list(cached_results.values())
-        _refresh_in_training_data(results, training_set)
+        annotate_contamination(results, contamination_index)
         print_results_table(results)
         print(f"\n   Generiere Report...")
         generate_evaluation_report(results, cache_dir)
@@ -186,76 +220,47 @@ def main(dataset: str = "l"):
     print("   [OK] LLM-Verbindung erfolgreich.")
 
     # 4. Load + evaluate only uncached models
-    prompts = DEFAULT_TEST_PROMPTS
-    print(f"\n   Temperature: {GENERATION_TEMPERATURE}, Max. Länge: {GENERATION_MAX_LENGTH}")
-
-    new_results = {}
-
-    for model_key, info in models_to_evaluate.items():
-        # Load model
-        try:
-            print(f"\n   [{model_key}] Lade {info['label']}...")
-            if info["type"] == "lstm":
-                from training.training_lstm import load_model as load_lstm
-                model, tokenizer = load_lstm(str(info["path"]))
-            else:
-                model, tokenizer = load_model_by_type(info, base_dir)
-        except Exception as e:
-            print(f"   [{model_key}] Fehler beim Laden: {e}")
-            continue
-
-        # Evaluate
-        model_result = ModelEvaluationResult(model_name=model_key, label=info["label"])
-
-        for prompt in prompts:
-            generated = generate_text(
-                model, tokenizer, prompt,
-                max_length=GENERATION_MAX_LENGTH,
-                temperature=GENERATION_TEMPERATURE,
-            )
-
-            print(f"\n   [{info['label']}] '{prompt}' -> '{generated}'")
-            print(f"   Bewerte...")
-            score = evaluate_single_output(prompt, generated)
-
-            # Strip special tokens before comparing to training data
-            clean = generated.lower().strip()
-            for tok in ("<eos>", "<bos>", "<pad>", "<unk>"):
-                clean = clean.replace(tok, "")
-            clean = " ".join(clean.split())  # collapse whitespace
-            in_data = clean in training_set
-
-            output = GeneratedOutput(
-                model_name=model_key,
-                prompt=prompt,
-                generated_text=generated,
-                score=score,
-                in_training_data=in_data,
-            )
-            model_result.outputs.append(output)
-
-            if score:
-                print(
-                    f"   -> G:{score.grammatik_score} K:{score.kohaerenz_score} "
-                    f"R:{score.relevanz_score} = {score.gesamt_score:.2f}"
-                )
-            else:
-                print("   -> Bewertung fehlgeschlagen")
-
-        new_results[model_key] = model_result
-        update_cache(cache, model_key, info["path"], model_result)
-
-    # 5. Save cache
-    save_cache(cache_dir, cache)
-    print(f"\n   Cache aktualisiert ({len(new_results)} Modell(e) neu gespeichert).")
-
-    # 6. Combine cached + new results, recalculate in_training_data
+    print(f"\n   Temperature: {GENERATION_TEMPERATURE}, Max. Länge: {GENERATION_MAX_LENGTH}, "
+          f"Seed: {GENERATION_SEED}")
+    print(f"   Judge-Parallelität: {JUDGE_MAX_CONCURRENCY}, Ausgaben pro Anfrage: {JUDGE_BATCH_SIZE}")
+
+    reset_usage_stats()  # count only the judge calls of this run
+    generation_cache = get_generation_cache(base_dir / "generation_cache.sqlite3")
+    judge_cache = get_judge_cache()
+    dispatcher = JudgeDispatcher(cache=judge_cache, prefilter=prefilter)
+
+    # Generation (producer thread) and judging overlap; verdicts are
+    # appended to the store as they arrive
+    pipeline = EvaluationPipeline(dispatcher, store, generation_cache, prompts, base_dir)
+    new_results = pipeline.run(models_to_evaluate)
+
+    dispatcher.close()
+    usage = get_usage_stats()
+    judge_stats = {
+        **dispatcher.stats(),
+        "prompt_tokens": usage["prompt_tokens"],
+        "completion_tokens": usage["completion_tokens"],
+    }
+    print(f"\n   {pipeline.format_stats()}")
+    print(f"   {generation_cache.format_stats()}")
+    print(f"   {judge_cache.format_stats()}")
+    if prefilter:
+        print(f"   {prefilter.format_stats()}")
+    print(f"   Judge-Anfragen: {judge_stats['requests']} für {judge_stats['outputs']} Ausgaben "
+          f"({judge_stats['requests_per_output']:.2f} pro Ausgabe, "
+          f"{judge_stats['fallbacks']} Einzel-Nachbewertungen, "
+          f"{judge_stats['retries']} Wiederholungen, {judge_stats['failures']} fehlgeschlagen)")
+    print(f"   {format_usage_stats()}")
+
+    print(f"\n   Ergebnisse gespeichert: {store.path} ({len(new_results)} Modell(e) bewertet).")
+
+    # 5. Combine cached + new results, check them against the training data
     results = list(cached_results.values()) + list(new_results.values())
-    _refresh_in_training_data(results, training_set)
+    annotate_contamination(results, contamination_index)
     print_results_table(results)
 
     print(f"\n   Generiere Report...")
-    generate_evaluation_report(results, cache_dir)
+    generate_evaluation_report(results, cache_dir, judge_stats=judge_stats)
 
     print("\n" + "=" * 70)
     print("Bewertung abgeschlossen!")
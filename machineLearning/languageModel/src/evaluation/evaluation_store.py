@@ -0,0 +1,251 @@
+"""
+Append-only evaluation store
+============================
+
+Replaces the JSON cache file (cache.json), which was rewritten in full
+after every run, keyed models by file mtime and only cached complete
+models — an interrupted run lost all of its judge calls.
+
+Every scored output is appended to SQLite the moment its verdict
+arrives. Nothing is rewritten or updated:
+
+    runs    one row per (model name, checkpoint hash, evaluation config)
+    scores  one row per scored prompt of a run (run_id, prompt_index)
+
+Checkpoint hash: SHA-256 over the checkpoint files (*.pt, *.json), for
+LoRA adapters including the base model. Touching a file does not
+invalidate anything; retraining does.
+
+Evaluation config: prompts, generation parameters, seed, judge model and
+judge prompt version. Changing any of them starts a new run.
+
+Resume: a run whose scores are incomplete is picked up again and only
+the missing prompts are generated and judged. Failed verdicts are not
+stored and are retried on the next run.
+
+Leaderboard queries aggregate in SQL; results are not loaded into memory.
+
+File: dist/evaluation_results/evaluation_store.sqlite3
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from evaluation.judge_config import (
+    EvaluationScore,
+    GeneratedOutput,
+    ModelEvaluationResult,
+)
+
+DB_FILENAME = "evaluation_store.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    model_name   TEXT NOT NULL,
+    label        TEXT NOT NULL,
+    checkpoint   TEXT NOT NULL,
+    config_hash  TEXT NOT NULL,
+    config       TEXT NOT NULL,
+    n_prompts    INTEGER NOT NULL,
+    created_at   TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (model_name, checkpoint, config_hash)
+);
+CREATE TABLE IF NOT EXISTS scores (
+    run_id          INTEGER NOT NULL REFERENCES runs (run_id),
+    prompt_index    INTEGER NOT NULL,
+    prompt          TEXT NOT NULL,
+    generated_text  TEXT NOT NULL,
+    grammatik       INTEGER NOT NULL,
+    kohaerenz       INTEGER NOT NULL,
+    relevanz        INTEGER NOT NULL,
+    gesamt          REAL NOT NULL,
+    begruendung     TEXT NOT NULL,
+    created_at      TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, prompt_index)
+);
+"""
+
+CHECKPOINT_SUFFIXES = (".pt", ".json")
+
+
+# =============================================================================
+# FINGERPRINTS
+# =============================================================================
+
+def _hash_dir(digest, model_dir: Path):
+    for path in sorted(Path(model_dir).iterdir()):
+        if path.is_file() and path.suffix in CHECKPOINT_SUFFIXES:
+            digest.update(path.name.encode())
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+
+
+def checkpoint_hash(model_info: dict, base_dir: Path) -> str:
+    """
+    Content hash of a model checkpoint (weights, config, tokenizer).
+
+    LoRA adapters include the base model they are applied to, so
+    retraining the base invalidates the adapter's results as well.
+    """
+    digest = hashlib.sha256()
+    _hash_dir(digest, model_info["path"])
+    if model_info["type"] == "lora_adapter":
+        digest.update(b"\0base\0")
+        _hash_dir(digest, Path(base_dir) / "transformer_model")
+    return digest.hexdigest()
+
+
+def evaluation_config(prompts: list[str], **params) -> dict:
+    """Everything besides the checkpoint that determines the scores of a run."""
+    from evaluation.judge import JUDGE_PROMPT_VERSION
+    from evaluation.llm_client import get_model_name
+
+    return {
+        "prompts": list(prompts),
+        "params": params,
+        "judge_model": get_model_name(),
+        "judge_prompt_version": JUDGE_PROMPT_VERSION,
+    }
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+class EvaluationStore:
+    """Thread-safe, append-only SQLite store for evaluation scores."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def open_run(self, model_name: str, label: str, checkpoint: str, config: dict) -> int:
+        """Return the run for this checkpoint and config, creating it if new."""
+        config_json = json.dumps(config, sort_keys=True, ensure_ascii=False)
+        config_hash = hashlib.sha256(config_json.encode("utf-8")).hexdigest()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs "
+                "(model_name, label, checkpoint, config_hash, config, n_prompts) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (model_name, label, checkpoint, config_hash, config_json,
+                 len(config["prompts"])),
+            )
+            return self._conn.execute(
+                "SELECT run_id FROM runs "
+                "WHERE model_name = ? AND checkpoint = ? AND config_hash = ?",
+                (model_name, checkpoint, config_hash),
+            ).fetchone()[0]
+
+    def record(self, run_id: int, prompt_index: int, output: GeneratedOutput):
+        """Append one scored output (outputs without a score are not stored)."""
+        score = output.score
+        if score is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO scores "
+                "(run_id, prompt_index, prompt, generated_text, grammatik, kohaerenz, "
+                " relevanz, gesamt, begruendung) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, prompt_index, output.prompt, output.generated_text,
+                 score.grammatik_score, score.kohaerenz_score, score.relevanz_score,
+                 score.gesamt_score, score.begruendung),
+            )
+
+    def scored_outputs(self, run_id: int) -> dict[int, GeneratedOutput]:
+        """Outputs already scored in this run, keyed by prompt index."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.prompt_index, r.model_name, s.prompt, s.generated_text, "
+                "       s.grammatik, s.kohaerenz, s.relevanz, s.begruendung "
+                "FROM scores s JOIN runs r USING (run_id) WHERE run_id = ?",
+                (run_id,),
+            ).fetchall()
+        return {
+            index: GeneratedOutput(
+                model_name=model_name,
+                prompt=prompt,
+                generated_text=text,
+                score=EvaluationScore.from_dict({
+                    "grammatik_score": grammatik,
+                    "kohaerenz_score": kohaerenz,
+                    "relevanz_score": relevanz,
+                    "begruendung": begruendung,
+                }),
+            )
+            for index, model_name, prompt, text, grammatik, kohaerenz, relevanz, begruendung
+            in rows
+        }
+
+    def load_result(self, run_id: int, label: str) -> ModelEvaluationResult:
+        """Assemble the scored outputs of a run in prompt order."""
+        outputs = self.scored_outputs(run_id)
+        model_name = next(iter(outputs.values())).model_name if outputs else ""
+        return ModelEvaluationResult(
+            model_name=model_name,
+            label=label,
+            outputs=[outputs[i] for i in sorted(outputs)],
+        )
+
+    def leaderboard(self, run_ids: list[int] | None = None) -> list[dict]:
+        """
+        Average scores per run, best first.
+
+        Without run_ids: the latest run of every model name.
+        """
+        if run_ids is None:
+            where = "r.run_id IN (SELECT MAX(run_id) FROM runs GROUP BY model_name)"
+            args = ()
+        else:
+            if not run_ids:
+                return []
+            where = f"r.run_id IN ({','.join('?' * len(run_ids))})"
+            args = tuple(run_ids)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.run_id, r.model_name, r.label, COUNT(s.prompt_index), r.n_prompts, "
+                "       AVG(s.gesamt), AVG(s.grammatik), AVG(s.kohaerenz), AVG(s.relevanz) "
+                f"FROM runs r JOIN scores s USING (run_id) WHERE {where} "
+                "GROUP BY r.run_id ORDER BY AVG(s.gesamt) DESC",
+                args,
+            ).fetchall()
+        return [
+            {
+                "run_id": run_id,
+                "model_name": model_name,
+                "label": label,
+                "scored": scored,
+                "n_prompts": n_prompts,
+                "avg_gesamt": round(gesamt, 2),
+                "avg_grammatik": round(grammatik, 2),
+                "avg_kohaerenz": round(kohaerenz, 2),
+                "avg_relevanz": round(relevanz, 2),
+            }
+            for run_id, model_name, label, scored, n_prompts, gesamt, grammatik, kohaerenz, relevanz
+            in rows
+        ]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_evaluation_store(path) -> EvaluationStore:
+    """Shared store instance per file."""
+    path = Path(path)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = EvaluationStore(path)
+        return _stores[path]
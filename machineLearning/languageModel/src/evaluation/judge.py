@@ -9,17 +9,24 @@ Evaluates generated texts from a MiniGPT model on three criteria:
 
 The judge LLM (e.g. Qwen3 via Ollama/LM Studio) returns a JSON response
 containing scores and a reasoning string.
+
+Batch mode packs several outputs into one request (JUDGE_BATCH_SIZE), so
+the long system prompt is sent once per batch instead of once per output.
+Items missing from or malformed in the batch answer are re-scored
+individually.
 """
 
-from evaluation.judge_config import EvaluationScore
-from evaluation.llm_client import call_judge_llm
+import hashlib
+
+from evaluation.judge_config import EvaluationScore, JUDGE_BATCH_SIZE
+from evaluation.llm_client import acall_judge_llm, call_judge_llm
 
 
 # =============================================================================
 # JUDGE PROMPTS
 # =============================================================================
 
-JUDGE_SYSTEM_PROMPT = """\
+_JUDGE_CRITERIA = """\
 Du bist ein Bewertungs-Assistent fuer maschinell generierte deutsche Texte.
 
 KONTEXT: Die Texte stammen von einem sehr kleinen Sprachmodell (MiniGPT, ~100k Parameter),
@@ -49,6 +56,9 @@ Bewerte jeden Text auf drei Kriterien (je 1-5):
    4 = Groesstenteils relevant zum Prompt
    5 = Direkt relevant, sinnvolle Fortsetzung
 
+"""
+
+JUDGE_SYSTEM_PROMPT = _JUDGE_CRITERIA + """\
 Antworte NUR mit einem JSON-Objekt in genau diesem Format:
 {
     "grammatik_score": <1-5>,
@@ -65,11 +75,70 @@ Bewerte den folgenden generierten Text:
 **Generierter Text:** {generated_text}
 """
 
+JUDGE_BATCH_SYSTEM_PROMPT = _JUDGE_CRITERIA + """\
+Du erhaeltst mehrere nummerierte Texte. Bewerte JEDEN Text einzeln und
+unabhaengig von den anderen.
+
+Antworte NUR mit einem JSON-Objekt in genau diesem Format:
+{
+    "bewertungen": [
+        {
+            "id": <Nummer des Textes>,
+            "grammatik_score": <1-5>,
+            "kohaerenz_score": <1-5>,
+            "relevanz_score": <1-5>,
+            "begruendung": "<kurze Begruendung auf Deutsch>"
+        }
+    ]
+}
+Gib fuer jede Nummer genau einen Eintrag zurueck.
+"""
+
+JUDGE_BATCH_ITEM_TEMPLATE = """\
+[{id}]
+**Prompt (Eingabe):** {prompt}
+**Generierter Text:** {generated_text}
+"""
+
+# Changes whenever any judge prompt is edited (part of the judge cache key)
+JUDGE_PROMPT_VERSION = hashlib.sha256(
+    (JUDGE_SYSTEM_PROMPT + JUDGE_USER_PROMPT_TEMPLATE
+     + JUDGE_BATCH_SYSTEM_PROMPT + JUDGE_BATCH_ITEM_TEMPLATE).encode("utf-8")
+).hexdigest()[:12]
+
 
 # =============================================================================
 # EVALUATION
 # =============================================================================
 
+def judge_output(prompt: str, generated_text: str, timeout: float | None = None) -> EvaluationScore:
+    """
+    Score one generated text with a single judge call (no retry).
+
+    Raises on connection errors, timeouts and unparseable responses;
+    callers decide how to retry (see judge_dispatcher.py). The LLM client
+    does not retry either, so every attempt is one HTTP request.
+    """
+    user_prompt = JUDGE_USER_PROMPT_TEMPLATE.format(
+        prompt=prompt,
+        generated_text=generated_text,
+    )
+    result = call_judge_llm(JUDGE_SYSTEM_PROMPT, user_prompt, timeout=timeout, retries=0)
+    return EvaluationScore.from_dict(result)
+
+
+async def ajudge_output(prompt: str, generated_text: str,
+                        timeout: float | None = None) -> EvaluationScore:
+    """Async variant of judge_output (shares the pooled async client)."""
+    user_prompt = JUDGE_USER_PROMPT_TEMPLATE.format(
+        prompt=prompt,
+        generated_text=generated_text,
+    )
+    result = await acall_judge_llm(JUDGE_SYSTEM_PROMPT, user_prompt, timeout=timeout,
+                                   retries=0)
+    return EvaluationScore.from_dict(result)
+
+
 def evaluate_single_output(prompt: str, generated_text: str) -> EvaluationScore | None:
     """
     Evaluate a single generated text using the judge LLM.
@@ -81,22 +150,94 @@ def evaluate_single_output(prompt: str, generated_text: str) -> EvaluationScore
     Returns:
         EvaluationScore on success, None on failure.
     """
-    user_prompt = JUDGE_USER_PROMPT_TEMPLATE.format(
-        prompt=prompt,
-        generated_text=generated_text,
-    )
-
     # First attempt
     try:
-        result = call_judge_llm(JUDGE_SYSTEM_PROMPT, user_prompt)
-        return EvaluationScore.from_dict(result)
+        return judge_output(prompt, generated_text)
     except Exception as e:
         print(f"   [!] First attempt failed: {e}")
 
     # Retry
     try:
-        result = call_judge_llm(JUDGE_SYSTEM_PROMPT, user_prompt)
-        return EvaluationScore.from_dict(result)
+        return judge_output(prompt, generated_text)
     except Exception as e:
         print(f"   [X] Evaluation failed after retry: {e}")
         return None
+
+
+# =============================================================================
+# BATCH EVALUATION
+# =============================================================================
+
+_SCORE_KEYS = ("grammatik_score", "kohaerenz_score", "relevanz_score")
+
+
+def _validated_score(data) -> EvaluationScore | None:
+    """Return a score only if all three criteria are integers in 1..5."""
+    if not isinstance(data, dict):
+        return None
+    for key in _SCORE_KEYS:
+        try:
+            value = int(data[key])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not 1 <= value <= 5:
+            return None
+    return EvaluationScore.from_dict(data)
+
+
+def judge_batch(items: list[tuple[str, str]], timeout: float | None = None) -> list:
+    """
+    Score several (prompt, generated_text) pairs with one judge request.
+
+    Returns a list aligned with `items`; entries the judge skipped,
+    duplicated or returned malformed are None. Raises if the request
+    fails or the response contains no usable JSON at all (no retry, like
+    judge_output).
+    """
+    user_prompt = "Bewerte die folgenden generierten Texte:\n\n" + "\n".join(
+        JUDGE_BATCH_ITEM_TEMPLATE.format(id=i, prompt=prompt, generated_text=text)
+        for i, (prompt, text) in enumerate(items, 1)
+    )
+    result = call_judge_llm(JUDGE_BATCH_SYSTEM_PROMPT, user_prompt, timeout=timeout, retries=0)
+
+    entries = result.get("bewertungen") if isinstance(result, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError("Batch response has no 'bewertungen' list")
+
+    by_id = {}
+    for entry in entries:
+        try:
+            item_id = int(entry.get("id"))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        # Duplicate ids are ambiguous -> re-score that item individually
+        by_id[item_id] = None if item_id in by_id else _validated_score(entry)
+
+    return [by_id.get(i) for i in range(1, len(items) + 1)]
+
+
+def evaluate_batch(items: list[tuple[str, str]], batch_size: int = JUDGE_BATCH_SIZE) -> list:
+    """
+    Evaluate many outputs sequentially in batches of `batch_size`.
+
+    Items missing from a batch answer (or whole failed batches) fall back
+    to evaluate_single_output. See judge_dispatcher.py for the concurrent
+    variant.
+
+    Returns:
+        List of EvaluationScore | None, aligned with `items`.
+    """
+    scores = []
+    for start in range(0, len(items), max(1, batch_size)):
+        chunk = items[start:start + max(1, batch_size)]
+        if len(chunk) == 1:
+            scores.append(evaluate_single_output(*chunk[0]))
+            continue
+        try:
+            chunk_scores = judge_batch(chunk)
+        except Exception as e:
+            print(f"   [!] Batch evaluation failed ({e}), scoring individually")
+            chunk_scores = [None] * len(chunk)
+        for (prompt, text), score in zip(chunk, chunk_scores):
+            scores.append(score if score is not None else evaluate_single_output(prompt, text))
+    return scores
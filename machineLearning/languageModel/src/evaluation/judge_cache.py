@@ -0,0 +1,154 @@
+"""
+Content-addressed judge score cache
+===================================
+
+The evaluation store (evaluation_store.py) starts a new run whenever a
+checkpoint changes. After a small retrain most generated texts are the
+same as before and would all be judged again.
+
+This cache stores individual verdicts in SQLite, keyed by
+
+    sha256(judge model, prompt version, prompt, generated text)
+
+so a text the judge has already scored is never sent again, no matter
+which model or checkpoint produced it. The prompt version is a hash of
+the judge prompts: editing them invalidates all entries automatically.
+
+The file is shared by the CLI runner, the web evaluation tab and the
+langfuse judge example (langfuse/03_evaluation/llm_as_judge.py), which
+stores raw verdicts in the same table. Location:
+
+    JUDGE_CACHE_PATH  (default: dist/evaluation_results/judge_cache.sqlite3)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from evaluation.judge import JUDGE_PROMPT_VERSION
+from evaluation.judge_config import EvaluationScore
+from evaluation.llm_client import get_model_name
+
+DB_FILENAME = "judge_cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS judge_scores (
+    key             TEXT PRIMARY KEY,
+    judge_model     TEXT NOT NULL,
+    prompt_version  TEXT NOT NULL,
+    prompt          TEXT NOT NULL,
+    generated_text  TEXT NOT NULL,
+    result          TEXT NOT NULL,
+    created_at      TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def judge_cache_key(judge_model: str, prompt_version: str, prompt: str, generated_text: str) -> str:
+    """SHA-256 over the four key parts (NUL-separated, so parts cannot run together)."""
+    payload = "\0".join((judge_model, prompt_version, prompt, generated_text))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def default_judge_cache_path() -> Path:
+    env_path = os.environ.get("JUDGE_CACHE_PATH")
+    if env_path:
+        return Path(env_path)
+    return Path(__file__).parent.parent.parent / "dist" / "evaluation_results" / DB_FILENAME
+
+
+class JudgeCache:
+    """Thread-safe SQLite store for judge verdicts."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _key(self, prompt, generated_text, judge_model, prompt_version):
+        return judge_cache_key(
+            judge_model or get_model_name(),
+            prompt_version or JUDGE_PROMPT_VERSION,
+            prompt,
+            generated_text,
+        )
+
+    def get(self, prompt: str, generated_text: str,
+            judge_model: str | None = None, prompt_version: str | None = None) -> EvaluationScore | None:
+        """Return the cached score for this text, or None (counted as a miss)."""
+        key = self._key(prompt, generated_text, judge_model, prompt_version)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM judge_scores WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return EvaluationScore.from_dict(json.loads(row[0]))
+
+    def put(self, prompt: str, generated_text: str, score: EvaluationScore,
+            judge_model: str | None = None, prompt_version: str | None = None):
+        """Store a successful verdict (failed judgements are never cached)."""
+        judge_model = judge_model or get_model_name()
+        prompt_version = prompt_version or JUDGE_PROMPT_VERSION
+        key = judge_cache_key(judge_model, prompt_version, prompt, generated_text)
+        result = json.dumps({
+            "grammatik_score": score.grammatik_score,
+            "kohaerenz_score": score.kohaerenz_score,
+            "relevanz_score": score.relevanz_score,
+            "begruendung": score.begruendung,
+        }, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO judge_scores "
+                "(key, judge_model, prompt_version, prompt, generated_text, result) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, judge_model, prompt_version, prompt, generated_text, result),
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM judge_scores")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM judge_scores").fetchone()[0]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+        }
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (f"Judge-Cache: {s['hits']}/{s['hits'] + s['misses']} Treffer "
+                f"({s['hit_rate']:.0%}), {s['entries']} Einträge")
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_judge_cache(path=None) -> JudgeCache:
+    """Shared cache instance per file (default: JUDGE_CACHE_PATH or dist/)."""
+    path = Path(path) if path else default_judge_cache_path()
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = JudgeCache(path)
+        return _caches[path]
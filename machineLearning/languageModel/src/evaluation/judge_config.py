@@ -6,6 +6,7 @@ Defines evaluation criteria, scores and test prompts
 for automated quality assessment of MiniGPT outputs.
 """
 
+import os
 from dataclasses import dataclass, field
 from typing import Optional
 
@@ -47,6 +48,17 @@ class GeneratedOutput:
     generated_text: str
     score: Optional[EvaluationScore] = None
     in_training_data: bool = False
+    longest_overlap: int = 0     # consecutive words shared with the training data
+    jaccard: float = 0.0         # best word-bigram Jaccard with a training sentence
+
+    @property
+    def memorized(self) -> bool:
+        """Exact or near copy of training data (see contamination_index.py)."""
+        return (
+            self.in_training_data
+            or self.jaccard >= MEMORIZATION_JACCARD
+            or self.longest_overlap >= MEMORIZATION_MIN_OVERLAP
+        )
 
 
 @dataclass
@@ -76,6 +88,24 @@ class ModelEvaluationResult:
         scored = [o.score.gesamt_score for o in self.outputs if o.score]
         return round(sum(scored) / len(scored), 2) if scored else 0.0
 
+    @property
+    def exact_match_rate(self) -> float:
+        if not self.outputs:
+            return 0.0
+        return round(sum(o.in_training_data for o in self.outputs) / len(self.outputs), 2)
+
+    @property
+    def memorization_rate(self) -> float:
+        if not self.outputs:
+            return 0.0
+        return round(sum(o.memorized for o in self.outputs) / len(self.outputs), 2)
+
+    @property
+    def avg_longest_overlap(self) -> float:
+        if not self.outputs:
+            return 0.0
+        return round(sum(o.longest_overlap for o in self.outputs) / len(self.outputs), 2)
+
 
 # =============================================================================
 # CONSTANTS
@@ -91,4 +121,54 @@ DEFAULT_TEST_PROMPTS = [
 
 GENERATION_TEMPERATURE = 0.5
 GENERATION_MAX_LENGTH = 12
+# Fixed sampling seed: generations are reproducible and served from
+# dist/generation_cache.sqlite3 until a checkpoint changes
+GENERATION_SEED = 42
 JUDGE_TEMPERATURE = 0.1
+
+# Concurrent judging (see judge_dispatcher.py). Local providers such as
+# Ollama serialize requests unless OLLAMA_NUM_PARALLEL > 1, so the limit
+# is configurable via JUDGE_CONCURRENCY.
+JUDGE_MAX_CONCURRENCY = int(os.environ.get("JUDGE_CONCURRENCY", "4"))
+JUDGE_TIMEOUT = 60.0          # seconds per judge request
+JUDGE_MAX_RETRIES = 2         # retries after the first attempt
+JUDGE_RETRY_BACKOFF = 1.0     # base delay in seconds, doubled per retry (+ jitter)
+
+# Outputs scored per judge request (1 = one request per output). Larger
+# batches save system-prompt tokens and round-trips; small judge models
+# drop or mix up items more often, those are re-scored individually.
+JUDGE_BATCH_SIZE = int(os.environ.get("JUDGE_BATCH_SIZE", "5"))
+
+# Pipelined evaluation (see evaluation_pipeline.py): generated chunks
+# buffered between the generation thread and the judge. Keeps the
+# generator ahead of the judge without holding every output in memory.
+PIPELINE_QUEUE_SIZE = 4
+
+# Memorization (see contamination_index.py): an output counts as memorized
+# if it equals a training sentence, reaches this word-bigram Jaccard
+# similarity to one, or copies this many consecutive words from the data.
+MEMORIZATION_JACCARD = 0.8
+MEMORIZATION_MIN_OVERLAP = 6
+
+# Adaptive evaluation (see adaptive_evaluator.py): samples per prompt are
+# drawn with seeds GENERATION_SEED, GENERATION_SEED + 1, ... A model keeps
+# being sampled while its confidence interval of the overall score still
+# overlaps another model's, between the minimum and maximum below.
+ADAPTIVE_MIN_SAMPLES = 2      # per prompt, before the first stopping check
+ADAPTIVE_MAX_SAMPLES = 8      # per prompt, hard budget
+ADAPTIVE_CONFIDENCE = 0.95    # 0.90, 0.95 or 0.99 (t tables in adaptive_evaluator.py)
+
+# Local pre-filter (see prefilter.py): outputs failing one of these checks
+# get the minimum score without a judge call. Metrics are computed on the
+# continuation (generated words after the prompt). JUDGE_PREFILTER=0
+# sends everything to the judge.
+PREFILTER_ENABLED = os.environ.get("JUDGE_PREFILTER", "1") != "0"
+PREFILTER_MIN_WORDS = 1              # empty continuation
+PREFILTER_MAX_UNK_RATIO = 0.5        # share of <UNK> tokens
+PREFILTER_REPETITION_MIN_WORDS = 4   # repetition checks need a few words
+PREFILTER_MAX_REPETITION = 0.5       # share of repeated word bigrams
+PREFILTER_MIN_DISTINCT_1 = 0.3       # unique words / words
+# Perplexity under the reference model; above the vocabulary size the
+# text is less likely than uniform guessing. None disables the check.
+PREFILTER_MAX_PERPLEXITY = 1000.0
+PREFILTER_REFERENCE_MODEL = "transformer_model"   # relative to dist/
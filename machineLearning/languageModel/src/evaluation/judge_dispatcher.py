@@ -0,0 +1,265 @@
+"""
+Concurrent judge dispatcher
+===========================
+
+Judging is network-bound: the CPU idles while the judge LLM answers.
+The dispatcher runs several judge requests at once on a thread pool:
+
+- bounded parallelism (JUDGE_MAX_CONCURRENCY worker threads)
+- per-request timeout, passed to the OpenAI client
+- retries with exponential backoff and full jitter, so parallel
+  requests that failed together do not retry in lockstep
+- results are returned in submission order, regardless of the
+  order in which the judge answers
+- optional batch mode (JUDGE_BATCH_SIZE): K outputs per request,
+  items missing from a batch answer are re-scored individually
+- optional JudgeCache: texts judged before are answered from SQLite,
+  only new texts are sent to the judge
+- optional Prefilter: clear failures (empty, <UNK> floods, repetition)
+  get the minimum score locally, before the cache is asked
+
+Usage:
+    with JudgeDispatcher() as dispatcher:
+        scores = dispatcher.score_all([(prompt, text), ...])
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from evaluation.judge import judge_batch, judge_output
+from evaluation.judge_config import (
+    JUDGE_BATCH_SIZE,
+    JUDGE_MAX_CONCURRENCY,
+    JUDGE_MAX_RETRIES,
+    JUDGE_RETRY_BACKOFF,
+    JUDGE_TIMEOUT,
+    EvaluationScore,
+)
+
+# Upper bound for a single backoff sleep
+MAX_BACKOFF = 30.0
+
+
+def backoff_delay(attempt: int, base: float, cap: float = MAX_BACKOFF) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+class JudgeDispatcher:
+    """Thread pool that scores (prompt, generated_text) pairs concurrently."""
+
+    def __init__(
+        self,
+        max_concurrency: int = JUDGE_MAX_CONCURRENCY,
+        timeout: float | None = JUDGE_TIMEOUT,
+        max_retries: int = JUDGE_MAX_RETRIES,
+        backoff: float = JUDGE_RETRY_BACKOFF,
+        batch_size: int = JUDGE_BATCH_SIZE,
+        judge_fn=judge_output,
+        batch_judge_fn=judge_batch,
+        cache=None,
+        prefilter=None,
+        log=print,
+    ):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.batch_size = max(1, int(batch_size))
+        self.judge_fn = judge_fn
+        self.batch_judge_fn = batch_judge_fn
+        self.cache = cache
+        self.prefilter = prefilter
+        self.log = log
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="judge",
+        )
+        self._lock = threading.Lock()
+        self.outputs = 0            # outputs submitted for scoring
+        self.cache_hits = 0
+        self.prefiltered = 0        # scored locally, no judge call
+        self.requests = 0           # judge requests sent (single + batch)
+        self.batch_requests = 0
+        self.fallbacks = 0          # batch items re-scored individually
+        self.retries = 0
+        self.failures = 0
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------------------------------------------------------------
+    # Scoring
+    # -------------------------------------------------------------------------
+
+    def _score_with_retry(self, prompt: str, generated_text: str) -> EvaluationScore | None:
+        for attempt in range(self.max_retries + 1):
+            with self._lock:
+                self.requests += 1
+            try:
+                return self.judge_fn(prompt, generated_text, timeout=self.timeout)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    with self._lock:
+                        self.failures += 1
+                    if self.log:
+                        self.log(f"   [X] Evaluation failed after {attempt + 1} attempt(s): {e}")
+                    return None
+                with self._lock:
+                    self.retries += 1
+                if self.log:
+                    self.log(f"   [!] Attempt {attempt + 1} failed ({e}), retrying...")
+                time.sleep(backoff_delay(attempt, self.backoff))
+        return None
+
+    def _score_batch_with_retry(self, chunk) -> list:
+        for attempt in range(self.max_retries + 1):
+            with self._lock:
+                self.requests += 1
+                self.batch_requests += 1
+            try:
+                return self.batch_judge_fn(chunk, timeout=self.timeout)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    if self.log:
+                        self.log(f"   [!] Batch of {len(chunk)} failed ({e}), scoring individually")
+                    return [None] * len(chunk)
+                with self._lock:
+                    self.retries += 1
+                time.sleep(backoff_delay(attempt, self.backoff))
+        return [None] * len(chunk)
+
+    def _score_chunk(self, chunk, targets):
+        try:
+            scores = self._score_batch_with_retry(chunk)
+            for (prompt, text), score, target in zip(chunk, scores, targets):
+                if score is None:
+                    with self._lock:
+                        self.fallbacks += 1
+                    score = self._score_with_retry(prompt, text)
+                target.set_result(score)
+        except Exception as e:
+            for target in targets:
+                if not target.done():
+                    target.set_exception(e)
+
+    def _remember(self, prompt, generated_text, future):
+        """Store a finished verdict in the cache (failed ones are not cached)."""
+        def store(done):
+            if not done.cancelled() and done.exception() is None and done.result() is not None:
+                self.cache.put(prompt, generated_text, done.result())
+        future.add_done_callback(store)
+        return future
+
+    def _cached(self, prompt, generated_text):
+        """Completed Future for a pre-filtered or cached verdict, else None."""
+        score = self.prefilter.check(prompt, generated_text) if self.prefilter else None
+        if score is not None:
+            with self._lock:
+                self.prefiltered += 1
+        elif self.cache is not None:
+            score = self.cache.get(prompt, generated_text)
+            if score is None:
+                return None
+            with self._lock:
+                self.cache_hits += 1
+        else:
+            return None
+        future = Future()
+        future.set_result(score)
+        return future
+
+    def submit(self, prompt: str, generated_text: str):
+        """Queue one judge request; returns a Future[EvaluationScore | None]."""
+        with self._lock:
+            self.outputs += 1
+        cached = self._cached(prompt, generated_text)
+        if cached is not None:
+            return cached
+        future = self._executor.submit(self._score_with_retry, prompt, generated_text)
+        return self._remember(prompt, generated_text, future) if self.cache is not None else future
+
+    def submit_many(self, items) -> list:
+        """
+        Queue many (prompt, generated_text) pairs, packed into batches of
+        `batch_size` per judge request. Pre-filtered and cached verdicts
+        are returned without a request.
+
+        Returns:
+            One Future[EvaluationScore | None] per item, in item order.
+        """
+        items = list(items)
+        if self.batch_size == 1:
+            return [self.submit(prompt, text) for prompt, text in items]
+
+        with self._lock:
+            self.outputs += len(items)
+        results = [self._cached(prompt, text) for prompt, text in items]
+        pending = [i for i, future in enumerate(results) if future is None]
+        for i in pending:
+            results[i] = Future()
+            if self.cache is not None:
+                self._remember(*items[i], results[i])
+
+        items = [items[i] for i in pending]
+        futures = [results[i] for i in pending]
+        for start in range(0, len(items), self.batch_size):
+            chunk = items[start:start + self.batch_size]
+            targets = futures[start:start + len(chunk)]
+            if len(chunk) == 1:
+                # A single leftover item does not need the batch prompt
+                self._executor.submit(self._score_chunk_single, chunk[0], targets[0])
+            else:
+                self._executor.submit(self._score_chunk, chunk, targets)
+        return results
+
+    def _score_chunk_single(self, item, target):
+        try:
+            target.set_result(self._score_with_retry(*item))
+        except Exception as e:
+            target.set_exception(e)
+
+    def score_all(self, items, on_result=None) -> list:
+        """
+        Score all (prompt, generated_text) pairs concurrently.
+
+        Args:
+            items: Iterable of (prompt, generated_text) tuples.
+            on_result: Optional callback(index, score), called in completion order.
+
+        Returns:
+            List of EvaluationScore | None in the order of `items`.
+        """
+        futures = self.submit_many(items)
+        if on_result:
+            index_of = {future: i for i, future in enumerate(futures)}
+            for future in as_completed(futures):
+                on_result(index_of[future], future.result())
+        return [future.result() for future in futures]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "batch_size": self.batch_size,
+                "outputs": self.outputs,
+                "cache_hits": self.cache_hits,
+                "prefiltered": self.prefiltered,
+                "requests": self.requests,
+                "batch_requests": self.batch_requests,
+                "fallbacks": self.fallbacks,
+                "retries": self.retries,
+                "failures": self.failures,
+                "requests_per_output": self.requests / self.outputs if self.outputs else 0.0,
+            }
@@ -5,28 +5,139 @@ LLM client for Ollama / LM Studio
 Thin wrapper around the OpenAI library. Both Ollama and LM Studio
 expose an OpenAI-compatible API, so this client works with either.
 
+One pooled client is shared by the whole process (sync and async):
+HTTP keep-alive and a bounded connection pool avoid a new TCP
+connection and client setup per judge call. Transient errors (429,
+5xx, connection errors, timeouts) are retried with jittered backoff,
+and every call is accounted in the usage stats (tokens, latency).
+
 Environment variables:
     LLM_PROVIDER_URL  - API base URL (default: http://localhost:1234/v1)
     LLM_MODEL         - Model name  (default: qwen3:8b)
     LLM_API_KEY       - Optional API key for authentication
 """
 
+import asyncio
 import os
+import random
 import re
 import json
+import threading
+import time
+import weakref
 
-from openai import OpenAI
+import httpx
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    AsyncOpenAI,
+    OpenAI,
+    RateLimitError,
+)
 
 
 # =============================================================================
 # CLIENT CONFIGURATION
 # =============================================================================
 
-def get_llm_client() -> OpenAI:
-    """Create an OpenAI client pointing at the local LLM provider."""
+MAX_CONNECTIONS = 32          # Upper bound for parallel judge requests
+MAX_KEEPALIVE_CONNECTIONS = 16
+KEEPALIVE_EXPIRY = 30.0       # seconds an idle connection is kept open
+DEFAULT_TIMEOUT = 120.0       # seconds, overridable per call
+MAX_RETRIES = 3               # retries on 429 / 5xx / connection errors
+RETRY_BACKOFF = 0.5           # base delay in seconds, doubled per retry (+ jitter)
+MAX_RETRY_DELAY = 20.0
+
+_client_lock = threading.Lock()
+_sync_client = None           # (settings, OpenAI)
+_async_clients = weakref.WeakKeyDictionary()   # event loop -> (settings, AsyncOpenAI)
+
+
+def _settings() -> tuple[str, str]:
     base_url = os.environ.get("LLM_PROVIDER_URL", "http://localhost:1234/v1")
     api_key = os.environ.get("LLM_API_KEY", "not-needed")
-    return OpenAI(base_url=base_url, api_key=api_key)
+    return base_url, api_key
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def get_llm_client() -> OpenAI:
+    """
+    Return the process-wide pooled OpenAI client.
+
+    The client is rebuilt only if LLM_PROVIDER_URL / LLM_API_KEY change.
+    Built-in retries are disabled; retries are handled by this module.
+    """
+    global _sync_client
+    settings = _settings()
+    with _client_lock:
+        if _sync_client is None or _sync_client[0] != settings:
+            if _sync_client is not None:
+                _sync_client[1].close()
+            base_url, api_key = settings
+            client = OpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                max_retries=0,
+                timeout=DEFAULT_TIMEOUT,
+                http_client=httpx.Client(limits=_limits(), timeout=DEFAULT_TIMEOUT),
+            )
+            _sync_client = (settings, client)
+        return _sync_client[1]
+
+
+def get_async_llm_client() -> AsyncOpenAI:
+    """
+    Return the pooled AsyncOpenAI client of the running event loop.
+
+    Close it with `await aclose_llm_client()` before the loop ends;
+    dropping the loop alone does not close the connection pool.
+    """
+    loop = asyncio.get_running_loop()
+    settings = _settings()
+    with _client_lock:
+        entry = _async_clients.get(loop)
+        if entry is None or entry[0] != settings:
+            if entry is not None:
+                loop.create_task(entry[1].close())
+            base_url, api_key = settings
+            client = AsyncOpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                max_retries=0,
+                timeout=DEFAULT_TIMEOUT,
+                http_client=httpx.AsyncClient(limits=_limits(), timeout=DEFAULT_TIMEOUT),
+            )
+            entry = (settings, client)
+            _async_clients[loop] = entry
+        return entry[1]
+
+
+def close_llm_clients():
+    """Close the pooled sync client (async clients: see aclose_llm_client)."""
+    global _sync_client
+    with _client_lock:
+        if _sync_client is not None:
+            _sync_client[1].close()
+            _sync_client = None
+
+
+async def aclose_llm_client():
+    """Close the AsyncOpenAI client of the running event loop, if any.
+
+    Await this at the end of an async entry point (before asyncio.run
+    returns); the client's httpx pool is not closed otherwise.
+    """
+    with _client_lock:
+        entry = _async_clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[1].close()
 
 
 def get_model_name() -> str:
@@ -35,29 +146,149 @@ def get_model_name() -> str:
 
 
 # =============================================================================
-# LLM CALL
+# USAGE ACCOUNTING
 # =============================================================================
 
-def call_judge_llm(system_prompt: str, user_prompt: str) -> dict:
-    """
-    Call the judge LLM and return the JSON response as a dict.
+class LLMUsageStats:
+    """Thread-safe counters for judge calls, tokens and latency."""
 
-    Uses response_format=json_object for structured output.
-    Falls back to regex-based JSON extraction on parse errors.
-    """
-    client = get_llm_client()
-    model = get_model_name()
-
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=0.1,
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def record(self, latency: float, usage=None, failed: bool = False):
+        with self._lock:
+            self.calls += 1
+            self.failures += int(failed)
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            if usage is not None:
+                self.prompt_tokens += usage.prompt_tokens or 0
+                self.completion_tokens += usage.completion_tokens or 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "failures": self.failures,
+                "retries": self.retries,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "avg_latency": self.total_latency / self.calls if self.calls else 0.0,
+                "max_latency": self.max_latency,
+            }
+
+
+_usage = LLMUsageStats()
+
+
+def get_usage_stats() -> dict:
+    """Return accumulated judge usage (calls, tokens, latency) of this process."""
+    return _usage.snapshot()
+
+
+def reset_usage_stats():
+    _usage.reset()
+
+
+def format_usage_stats() -> str:
+    s = get_usage_stats()
+    return (
+        f"LLM-Aufrufe: {s['calls']} ({s['retries']} Wiederholungen, {s['failures']} Fehler), "
+        f"Tokens: {s['prompt_tokens']} Prompt + {s['completion_tokens']} Antwort, "
+        f"Latenz: Ø {s['avg_latency'] * 1000:.0f} ms, max {s['max_latency'] * 1000:.0f} ms"
     )
 
-    content = response.choices[0].message.content.strip()
+
+# =============================================================================
+# RETRY POLICY
+# =============================================================================
+
+def _is_retryable(error: Exception) -> bool:
+    """429, 5xx, connection errors and timeouts are worth another try."""
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Honour Retry-After on 429, else full-jitter exponential backoff."""
+    response = getattr(error, "response", None)
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(MAX_RETRY_DELAY, float(retry_after))
+            except ValueError:
+                pass
+    return random.uniform(0.0, min(MAX_RETRY_DELAY, RETRY_BACKOFF * (2 ** attempt)))
+
+
+def _create_completion(messages, timeout, retries, **kwargs):
+    client = get_llm_client()
+    for attempt in range(retries + 1):
+        start = time.perf_counter()
+        try:
+            response = client.chat.completions.create(
+                model=get_model_name(), messages=messages, timeout=timeout, **kwargs,
+            )
+        except Exception as e:
+            _usage.record(time.perf_counter() - start, failed=True)
+            if attempt == retries or not _is_retryable(e):
+                raise
+            _usage.record_retry()
+            time.sleep(_retry_delay(e, attempt))
+            continue
+        _usage.record(time.perf_counter() - start, response.usage)
+        return response
+
+
+async def _acreate_completion(messages, timeout, retries, **kwargs):
+    client = get_async_llm_client()
+    for attempt in range(retries + 1):
+        start = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(
+                model=get_model_name(), messages=messages, timeout=timeout, **kwargs,
+            )
+        except Exception as e:
+            _usage.record(time.perf_counter() - start, failed=True)
+            if attempt == retries or not _is_retryable(e):
+                raise
+            _usage.record_retry()
+            await asyncio.sleep(_retry_delay(e, attempt))
+            continue
+        _usage.record(time.perf_counter() - start, response.usage)
+        return response
+
+
+# =============================================================================
+# LLM CALL
+# =============================================================================
+
+def _judge_messages(system_prompt: str, user_prompt: str) -> list[dict]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def parse_json_content(content: str) -> dict:
+    """Parse a JSON object from an LLM answer (direct, then regex fallback)."""
+    content = content.strip()
 
     # Primary: direct JSON parsing
     try:
@@ -76,15 +307,39 @@ def call_judge_llm(system_prompt: str, user_prompt: str) -> dict:
     raise ValueError(f"Could not extract valid JSON from LLM response:\n{content}")
 
 
+def call_judge_llm(system_prompt: str, user_prompt: str, timeout: float | None = None,
+                   retries: int = MAX_RETRIES) -> dict:
+    """
+    Call the judge LLM and return the JSON response as a dict.
+
+    Uses the pooled client; 429/5xx/connection errors are retried.
+    Falls back to regex-based JSON extraction on parse errors.
+
+    Args:
+        timeout: Per-request timeout in seconds (None = client default).
+        retries: Retries for transient HTTP errors.
+    """
+    response = _create_completion(
+        _judge_messages(system_prompt, user_prompt), timeout, retries, temperature=0.1,
+    )
+    return parse_json_content(response.choices[0].message.content)
+
+
+async def acall_judge_llm(system_prompt: str, user_prompt: str, timeout: float | None = None,
+                          retries: int = MAX_RETRIES) -> dict:
+    """Async variant of call_judge_llm (pooled AsyncOpenAI client)."""
+    response = await _acreate_completion(
+        _judge_messages(system_prompt, user_prompt), timeout, retries, temperature=0.1,
+    )
+    return parse_json_content(response.choices[0].message.content)
+
+
 def test_connection() -> bool:
-    """Check whether the LLM provider is reachable."""
+    """Check whether the LLM provider is reachable (no retries)."""
     try:
-        client = get_llm_client()
-        model = get_model_name()
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": "Antworte nur mit: ok"}],
-            max_tokens=5,
+        response = _create_completion(
+            [{"role": "user", "content": "Antworte nur mit: ok"}],
+            timeout=None, retries=0, max_tokens=5,
         )
         return bool(response.choices[0].message.content)
     except Exception as e:
@@ -0,0 +1,219 @@
+"""
+Local pre-filter before LLM judging
+===================================
+
+Every generated output used to go to the judge, including obvious
+garbage: empty continuations, "<UNK> <UNK> <UNK>", "katze katze katze".
+The judge reliably gives those the minimum score, so the request is
+wasted.
+
+The pre-filter computes cheap metrics on the CPU for the continuation
+(the generated text without the prompt):
+
+- length:       number of words
+- unk_ratio:    share of <UNK> tokens
+- distinct_1/2: unique words / bigrams divided by their count
+- repetition:   1 - distinct_2 (share of repeated bigrams)
+- perplexity:   under a reference model (dist/transformer_model), if present
+
+An output that fails a threshold (PREFILTER_* in judge_config.py) gets
+the minimum score 1/1/1 without a judge call; everything else is judged
+as before. The JudgeDispatcher applies the filter before its cache and
+counts the skipped calls.
+
+Usage:
+    prefilter = get_prefilter(base_dir)
+    with JudgeDispatcher(prefilter=prefilter) as dispatcher: ...
+    print(prefilter.format_stats())
+"""
+
+import math
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from evaluation.judge_config import (
+    PREFILTER_ENABLED,
+    PREFILTER_MAX_PERPLEXITY,
+    PREFILTER_MAX_REPETITION,
+    PREFILTER_MAX_UNK_RATIO,
+    PREFILTER_MIN_DISTINCT_1,
+    PREFILTER_MIN_WORDS,
+    PREFILTER_REFERENCE_MODEL,
+    PREFILTER_REPETITION_MIN_WORDS,
+    EvaluationScore,
+)
+
+UNK_TOKEN = "<unk>"
+# End/padding markers are not part of the text
+_IGNORED_TOKENS = {"<eos>", "<bos>", "<pad>"}
+
+
+@dataclass(frozen=True)
+class LocalMetrics:
+    """Cheap quality metrics of one continuation."""
+    length: int
+    unk_ratio: float
+    distinct_1: float
+    distinct_2: float
+    repetition: float
+    perplexity: float | None = None
+
+
+def continuation_words(prompt: str, generated_text: str) -> list[str]:
+    """Lowercased words the model generated after the prompt."""
+    words = [w for w in generated_text.lower().split() if w not in _IGNORED_TOKENS]
+    prompt_words = prompt.lower().split()
+    if words[:len(prompt_words)] == prompt_words:
+        words = words[len(prompt_words):]
+    return words
+
+
+def _distinct(items: list) -> float:
+    return len(set(items)) / len(items) if items else 1.0
+
+
+def reference_perplexity(model, tokenizer, prompt: str, words: list[str]) -> float | None:
+    """
+    Perplexity of `words` after `prompt` under a reference MiniGPT.
+
+    Only the continuation tokens are scored; the prompt is context.
+    Words the reference does not know are skipped as targets (models
+    trained on a larger corpus would otherwise always fail).
+    """
+    import torch
+    import torch.nn.functional as F
+
+    context = tokenizer.encode(prompt)
+    continuation = tokenizer.encode(" ".join(words))
+    if not context or not continuation:
+        return None
+    max_len = model.pos_encoding.pe.size(1)
+    ids = (context + continuation)[-max_len:]
+    scored = min(len(continuation), len(ids) - 1)
+    if scored <= 0:
+        return None
+
+    device = next(model.parameters()).device
+    unk_id = tokenizer.word_to_idx.get("<UNK>", 1)
+    targets = torch.tensor(ids[-scored:], device=device)
+    known = targets != unk_id
+    if not known.any():
+        return None
+    with torch.no_grad():
+        logits = model(torch.tensor(ids, device=device).unsqueeze(0))[0]
+        log_probs = F.log_softmax(logits[-scored - 1:-1], dim=-1)
+        nll = -log_probs.gather(1, targets.unsqueeze(1)).squeeze(1)[known].mean().item()
+    return math.exp(min(nll, 50.0))
+
+
+class Prefilter:
+    """Assigns minimum scores to clear failures so they skip the judge."""
+
+    def __init__(self, reference=None,
+                 min_words: int = PREFILTER_MIN_WORDS,
+                 max_unk_ratio: float = PREFILTER_MAX_UNK_RATIO,
+                 max_repetition: float = PREFILTER_MAX_REPETITION,
+                 min_distinct_1: float = PREFILTER_MIN_DISTINCT_1,
+                 repetition_min_words: int = PREFILTER_REPETITION_MIN_WORDS,
+                 max_perplexity: float | None = PREFILTER_MAX_PERPLEXITY):
+        self.reference = reference          # (model, tokenizer) or None
+        self.min_words = min_words
+        self.max_unk_ratio = max_unk_ratio
+        self.max_repetition = max_repetition
+        self.min_distinct_1 = min_distinct_1
+        self.repetition_min_words = repetition_min_words
+        self.max_perplexity = max_perplexity
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.skipped = Counter()            # reason -> outputs scored locally
+
+    def metrics(self, prompt: str, generated_text: str) -> LocalMetrics:
+        words = continuation_words(prompt, generated_text)
+        bigrams = list(zip(words, words[1:]))
+        distinct_2 = _distinct(bigrams)
+        perplexity = None
+        if self.reference is not None and words:
+            perplexity = reference_perplexity(*self.reference, prompt, words)
+        return LocalMetrics(
+            length=len(words),
+            unk_ratio=sum(w == UNK_TOKEN for w in words) / len(words) if words else 0.0,
+            distinct_1=_distinct(words),
+            distinct_2=distinct_2,
+            repetition=1.0 - distinct_2,
+            perplexity=perplexity,
+        )
+
+    def failure(self, metrics: LocalMetrics) -> str | None:
+        """Reason why the output is a clear failure, or None."""
+        if metrics.length < self.min_words:
+            return "zu kurz"
+        if metrics.unk_ratio > self.max_unk_ratio:
+            return "<UNK>-Anteil"
+        if metrics.length >= self.repetition_min_words and (
+            metrics.repetition > self.max_repetition or metrics.distinct_1 < self.min_distinct_1
+        ):
+            return "Wiederholung"
+        if (self.max_perplexity is not None and metrics.perplexity is not None
+                and metrics.perplexity > self.max_perplexity):
+            return "Perplexität"
+        return None
+
+    def check(self, prompt: str, generated_text: str) -> EvaluationScore | None:
+        """Minimum score for a clear failure, None if the judge is needed."""
+        metrics = self.metrics(prompt, generated_text)
+        reason = self.failure(metrics)
+        with self._lock:
+            self.checked += 1
+            if reason:
+                self.skipped[reason] += 1
+        if reason is None:
+            return None
+        return EvaluationScore.from_dict({
+            "grammatik_score": 1,
+            "kohaerenz_score": 1,
+            "relevanz_score": 1,
+            "begruendung": f"Vorfilter ({reason}): ohne Judge mit Minimum bewertet",
+        })
+
+    def settings(self) -> dict:
+        """Thresholds that influence scores (part of the evaluation config)."""
+        return {
+            "min_words": self.min_words,
+            "max_unk_ratio": self.max_unk_ratio,
+            "max_repetition": self.max_repetition,
+            "min_distinct_1": self.min_distinct_1,
+            "repetition_min_words": self.repetition_min_words,
+            "max_perplexity": self.max_perplexity if self.reference is not None else None,
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "skipped": sum(self.skipped.values()),
+                "reasons": dict(self.skipped),
+            }
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        reasons = ", ".join(f"{reason}: {n}" for reason, n in sorted(s["reasons"].items()))
+        return (f"Vorfilter: {s['skipped']}/{s['checked']} Ausgaben ohne Judge bewertet"
+                + (f" ({reasons})" if reasons else ""))
+
+
+def load_reference_model(base_dir):
+    """Reference MiniGPT for perplexity (None if it has not been trained)."""
+    path = Path(base_dir) / PREFILTER_REFERENCE_MODEL
+    if not (path / "model.pt").exists():
+        return None
+    from training.training_transformer import load_transformer_model
+    return load_transformer_model(str(path))
+
+
+def get_prefilter(base_dir) -> Prefilter | None:
+    """Pre-filter with the reference model from `base_dir`, None if disabled."""
+    if not PREFILTER_ENABLED:
+        return None
+    return Prefilter(reference=load_reference_model(base_dir))
@@ -0,0 +1,219 @@
+"""
+Persistenter Cache für Generierungsergebnisse
+=============================================
+
+Mit festem Seed ist die Ausgabe von generate_text eine reine Funktion von
+
+    (Generierungsfunktion, Modellgewichte + Vokabular, Prompt,
+     Sampling-Parameter, Seed, Device-Typ)
+
+Die Evaluation und der Modellvergleich (CLI + Web) erzeugen dieselben
+Kombinationen immer wieder. Dieser Cache legt die Ergebnisse in einer
+SQLite-Datei ab (dist/generation_cache.sqlite3):
+
+    key          SHA-256 über das Tupel oben
+    model_name   z.B. "original", "lora_adapter"
+    fingerprint  Hash über state_dict + Vokabular
+
+Invalidierung: Der Fingerprint wird aus dem Inhalt der Gewichte berechnet.
+Ein neu trainierter Checkpoint ergibt automatisch neue Schlüssel; alte
+Einträge desselben Modellnamens werden beim ersten Zugriff gelöscht.
+
+Ohne Seed (seed=None) wird nicht gecacht - das Ergebnis wäre zufällig.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+
+import torch
+
+DB_FILENAME = "generation_cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    key         TEXT PRIMARY KEY,
+    model_name  TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    prompt      TEXT NOT NULL,
+    params      TEXT NOT NULL,
+    seed        INTEGER NOT NULL,
+    output      TEXT NOT NULL,
+    created_at  TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_generations_model ON generations (model_name, fingerprint);
+"""
+
+
+# =============================================================================
+# FINGERPRINT
+# =============================================================================
+
+# Fingerprint pro Modellobjekt, neu berechnet nur bei Gewichtsänderungen
+_fingerprints = weakref.WeakKeyDictionary()
+
+
+def _weights_version(model):
+    return tuple((id(p), p._version) for p in model.parameters())
+
+
+def model_fingerprint(model, tokenizer) -> str:
+    """
+    SHA-256 über alle Gewichte (state_dict inkl. Buffer) und das Vokabular.
+
+    Das Hashen kostet einen Durchlauf über alle Tensoren und wird deshalb
+    pro Modellobjekt gemerkt, solange sich kein Parameter ändert.
+    """
+    version = _weights_version(model)
+    entry = _fingerprints.get(model)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    digest = hashlib.sha256()
+    digest.update(type(model).__name__.encode())
+    for name, tensor in sorted(model.state_dict().items()):
+        data = tensor.detach().cpu().contiguous()
+        digest.update(f"{name}:{data.dtype}:{tuple(data.shape)}".encode())
+        digest.update(data.reshape(-1).view(torch.uint8).numpy().tobytes())
+    vocab = sorted(tokenizer.word_to_idx.items())
+    digest.update(json.dumps(vocab, ensure_ascii=False).encode("utf-8"))
+
+    fingerprint = digest.hexdigest()
+    _fingerprints[model] = (version, fingerprint)
+    return fingerprint
+
+
+def generator_name(generate_fn) -> str:
+    """Vollständiger Name der Generierungsfunktion (Modul + qualname) für den Cache-Schlüssel."""
+    return f"{generate_fn.__module__}.{generate_fn.__qualname__}"
+
+
+def cache_key(fingerprint, prompt, params, seed, device_type, generator="") -> str:
+    """
+    Schlüssel für eine Generierung (Parameter werden sortiert serialisiert).
+
+    generator trennt verschiedene generate_fn für dasselbe Modell: z.B.
+    erzeugen inference_lstm.generate_text_interactive und
+    inference_finetuned.generate_text für "lstm" unterschiedliche Texte.
+    """
+    payload = json.dumps(
+        {"generator": generator, "model": fingerprint, "prompt": prompt, "params": params,
+         "seed": int(seed), "device": device_type},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# =============================================================================
+# SQLITE-CACHE
+# =============================================================================
+
+class GenerationCache:
+    """Generierungsergebnisse in SQLite (thread-sicher, für Web-UI und CLI)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._checked = {}           # model_name -> zuletzt gesehener Fingerprint
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output FROM generations WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, model_name, fingerprint, prompt, params, seed, output):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO generations "
+                "(key, model_name, fingerprint, prompt, params, seed, output) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model_name, fingerprint, prompt,
+                 json.dumps(params, sort_keys=True), int(seed), output),
+            )
+
+    def invalidate_stale(self, model_name, fingerprint) -> int:
+        """Löscht Einträge eines Modellnamens mit altem Checkpoint-Fingerprint."""
+        if self._checked.get(model_name) == fingerprint:
+            return 0
+        with self._lock, self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM generations WHERE model_name = ? AND fingerprint != ?",
+                (model_name, fingerprint),
+            ).rowcount
+        self._checked[model_name] = fingerprint
+        return deleted
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM generations")
+        self._checked.clear()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM generations").fetchone()[0]
+
+    def format_stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"Generierungs-Cache: {self.hits}/{total} Treffer ({rate:.0%}), {len(self)} Einträge"
+
+    def generate(self, model_name, model, tokenizer, prompt, generate_fn, seed, **params):
+        """
+        Gibt das gecachte Ergebnis zurück oder ruft generate_fn auf.
+
+        Args:
+            model_name: Name des Modells (für die Invalidierung alter Checkpoints)
+            generate_fn: generate_text-Variante, wird mit
+                         (model, tokenizer, prompt, seed=seed, **params) aufgerufen
+            seed: Seed der Generierung; None = nicht cachen
+            **params: Sampling-Parameter (max_length, temperature, top_p, ...)
+        """
+        if seed is None:
+            return generate_fn(model, tokenizer, prompt, **params)
+
+        fingerprint = model_fingerprint(model, tokenizer)
+        self.invalidate_stale(model_name, fingerprint)
+        device_type = next(model.parameters()).device.type
+        key = cache_key(fingerprint, prompt, params, seed, device_type,
+                        generator_name(generate_fn))
+
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        output = generate_fn(model, tokenizer, prompt, seed=seed, **params)
+        self.put(key, model_name, fingerprint, prompt, params, seed, output)
+        return output
+
+
+_default_caches = {}
+_default_lock = threading.Lock()
+
+
+def default_cache_path():
+    return Path(__file__).parent.parent.parent / "dist" / DB_FILENAME
+
+
+def get_generation_cache(path=None) -> GenerationCache:
+    """Gemeinsame Cache-Instanz pro Datei (Standard: dist/generation_cache.sqlite3)."""
+    path = Path(path) if path else default_cache_path()
+    with _default_lock:
+        if path not in _default_caches:
+            _default_caches[path] = GenerationCache(path)
+        return _default_caches[path]
@@ -26,6 +26,8 @@ from training.training_transformer import (
 from training.finetuning_transformer import apply_lora
 from training.finetuning_fact_correction import apply_lora_v_only
 from inference import get_device, print_device_info
+from inference.prefix_cache import next_token_logits
+from inference.sampling import make_generator
 
 
 # =============================================================================
@@ -120,23 +122,21 @@ def show_top_predictions(models, prompt, top_k=5):
         print(f"   {name:<25} {'  '.join(f'{p:<14}' for p in preds)}")
 
 
-def generate_text(model, tokenizer, start_text, max_length=6, temperature=0.8):
-    """Generiert Text mit einem Modell."""
+def generate_text(model, tokenizer, start_text, max_length=6, temperature=0.8,
+                  use_prefix_cache=False, seed=None):
+    """Generiert Text mit einem Modell (MiniGPT optional mit Prefix-KV-Cache, seed = reproduzierbar)."""
     model.eval()
+    generator = make_generator(seed, next(model.parameters()).device)
     tokens = tokenizer.encode(start_text)
     if not tokens:
         return start_text
 
-    device = next(model.parameters()).device
-
     for _ in range(max_length):
         with torch.no_grad():
             context = tokens[-10:] if len(tokens) > 10 else tokens
-            inp = torch.tensor(context, device=device).unsqueeze(0)
-            logits = model(inp)
-            last_logits = logits[0, -1] / temperature
+            last_logits = next_token_logits(model, context, use_cache=use_prefix_cache) / temperature
             probs = F.softmax(last_logits, dim=-1)
-            next_token = torch.multinomial(probs, 1).item()
+            next_token = torch.multinomial(probs, 1, generator=generator).item()
             tokens.append(next_token)
 
     return tokenizer.decode(tokens)
@@ -30,6 +30,12 @@ from training.training_transformer import (
 )
 from training.finetuning_transformer import LoRALinear, apply_lora
 from inference import get_device, print_device_info
+from inference.prefix_cache import next_token_logits
+from inference.sampling import make_generator
+from inference.generation_cache import get_generation_cache
+
+# Fester Seed für Vergleiche: reproduzierbar und aus dem Generierungs-Cache
+COMPARE_SEED = 42
 
 
 # =============================================================================
@@ -176,22 +182,24 @@ def load_model_by_type(model_info, base_dir):
 # =============================================================================
 
 def generate_text(model, tokenizer, start_text, max_length=10,
-                  temperature=1.0, top_p=1.0, show_steps=False):
-    """Generiert Text mit einem Modell."""
+                  temperature=1.0, top_p=1.0, show_steps=False,
+                  use_prefix_cache=False, seed=None):
+    """
+    Generiert Text mit einem Modell (MiniGPT optional mit Prefix-KV-Cache).
+
+    Mit seed ist das Ergebnis reproduzierbar (eigener torch.Generator).
+    """
     model.eval()
+    generator = make_generator(seed, next(model.parameters()).device)
     tokens = tokenizer.encode(start_text)
 
     if not tokens:
         return start_text
 
-    device = next(model.parameters()).device
-
     for step in range(max_length):
         with torch.no_grad():
             context = tokens[-10:] if len(tokens) > 10 else tokens
-            inp = torch.tensor(context, device=device).unsqueeze(0)
-            logits = model(inp)
-            last_logits = logits[0, -1] / temperature
+            last_logits = next_token_logits(model, context, use_cache=use_prefix_cache) / temperature
 
             probs = F.softmax(last_logits, dim=-1)
 
@@ -204,7 +212,7 @@ def generate_text(model, tokenizer, start_text, max_length=10,
                 probs[sorted_indices[mask]] = 0.0
                 probs = probs / probs.sum()
 
-            next_token = torch.multinomial(probs, 1).item()
+            next_token = torch.multinomial(probs, 1, generator=generator).item()
             tokens.append(next_token)
 
             if show_steps:
@@ -222,10 +230,14 @@ def generate_text(model, tokenizer, start_text, max_length=10,
 # VERGLEICHSMODUS
 # =============================================================================
 
-def compare_models(loaded_models, prompts, temperature=0.8):
+def compare_models(loaded_models, prompts, temperature=0.8, seed=COMPARE_SEED):
     """
     Vergleicht alle geladenen Modelle auf denselben Prompts.
 
+    Mit seed sind die Ergebnisse reproduzierbar und werden im
+    Generierungs-Cache (dist/generation_cache.sqlite3) abgelegt; seed=None
+    sampelt jedes Mal neu.
+
     LERNEFFEKT:
     ===========
     Hier sieht man direkt, wie sich die verschiedenen Fine-Tuning-Methoden
@@ -237,16 +249,19 @@ def compare_models(loaded_models, prompts, temperature=0.8):
     print("\n" + "=" * 70)
     print("MODELL-VERGLEICH")
     print("=" * 70)
-    print(f"   Temperature: {temperature}")
+    print(f"   Temperature: {temperature}, Seed: {seed if seed is not None else 'zufällig'}")
     print(f"   Prompts: {prompts}")
 
+    generation_cache = get_generation_cache()
     for prompt in prompts:
         print(f"\n   --- Prompt: '{prompt}' ---")
         for name, (model, tokenizer) in loaded_models.items():
-            result = generate_text(model, tokenizer, prompt,
-                                   max_length=6, temperature=temperature)
+            result = generation_cache.generate(name, model, tokenizer, prompt, generate_text, seed,
+                                               max_length=6, temperature=temperature)
             print(f"   {name:<25} -> '{result}'")
 
+    print(f"\n   {generation_cache.format_stats()}")
+
 
 def show_top_predictions(loaded_models, prompt, top_k=5):
     """Zeigt die Top-K Vorhersagen aller Modelle für ein Prompt."""
@@ -288,6 +303,7 @@ def interactive_mode(loaded_models):
     temperature = 0.8
     max_length = 10
     show_steps = False
+    seed = COMPARE_SEED
 
     print("\n" + "=" * 70)
     print("FINE-TUNED MODELL INFERENZ - Interaktiver Modus")
@@ -303,6 +319,7 @@ def interactive_mode(loaded_models):
       /temp <wert>          - Temperature setzen (aktuell: {temperature})
       /length <wert>        - Max. Länge setzen (aktuell: {max_length})
       /steps                - Toggle Schritt-Anzeige
+      /seed <wert|aus>      - Seed für /compare (aktuell: {seed})
       /quit                 - Beenden
 
     Aktives Modell: {current_model_name}
@@ -350,12 +367,12 @@ def interactive_mode(loaded_models):
                 elif cmd == "/compare":
                     if arg:
                         prompts = [p.strip() for p in arg.split(",")]
-                        compare_models(loaded_models, prompts, temperature)
+                        compare_models(loaded_models, prompts, temperature, seed)
                     else:
                         # Standard-Prompts: Mix aus alt und neu
                         compare_models(loaded_models,
                                        ["die katze", "der wind", "die suppe", "der hund"],
-                                       temperature)
+                                       temperature, seed)
 
                 elif cmd == "/top":
                     if arg:
@@ -393,6 +410,17 @@ def interactive_mode(loaded_models):
                     show_steps = not show_steps
                     print(f"   Schritt-Anzeige: {'AN' if show_steps else 'AUS'}")
 
+                elif cmd == "/seed":
+                    if arg.lower() in ("aus", "off", "none"):
+                        seed = None
+                        print("   Seed: aus (zufällig, kein Cache)")
+                    else:
+                        try:
+                            seed = int(arg)
+                            print(f"   Seed: {seed}")
+                        except ValueError:
+                            print("   Beispiel: /seed 42 oder /seed aus")
+
                 else:
                     print(f"   Unbekannter Befehl: {cmd}")
 
@@ -24,12 +24,13 @@ from pathlib import Path
 # Importiere die Modell-Klassen
 from training.training_lstm import SimpleLanguageModel, Tokenizer, load_model, visualize_logits
 from inference import get_device, print_device_info
+from inference.sampling import make_generator
 
 
 def generate_text_interactive(model, tokenizer, start_text: str,
                               max_length: int = 10, temperature: float = 1.0,
                               show_logits: bool = False, top_p: float = 0.9,
-                              top_k: int = 5):
+                              top_k: int = 5, seed: int = None):
     """
     Generiert Text mit dem Modell.
 
@@ -40,8 +41,10 @@ def generate_text_interactive(model, tokenizer, start_text: str,
         show_logits: Zeige Logits für jeden Schritt
         top_p: Nucleus Sampling (1.0 = aus, 0.9 = nur Top 90% Wahrscheinlichkeit)
         top_k: Top-K Sampling (0 = aus, 5 = nur Top 5 Wörter)
+        seed: Seed für reproduzierbares Sampling (None = globaler Zufallszustand)
     """
     model.eval()
+    generator = make_generator(seed, next(model.parameters()).device)
 
     # Start-Tokens
     tokens = tokenizer.encode(start_text)
@@ -107,7 +110,7 @@ def generate_text_interactive(model, tokenizer, start_text: str,
                 probs = probs / probs.sum()  # Renormalisieren
 
             # Nächstes Token samplen
-            next_token = torch.multinomial(probs, 1).item()
+            next_token = torch.multinomial(probs, 1, generator=generator).item()
 
             # Zum generierten Text hinzufügen
             generated.append(next_token)
@@ -20,15 +20,26 @@ from training.training_transformer import (
     analyze_logits_detailed, visualize_attention
 )
 from inference import get_device, print_device_info
+from inference.prefix_cache import next_token_logits
+from inference.sampling import make_generator
 
 
 def generate_text(model, tokenizer, start_text: str,
                   max_length: int = 10, temperature: float = 1.0,
-                  show_steps: bool = False, top_p: float = 1.0):
+                  show_steps: bool = False, top_p: float = 1.0,
+                  use_prefix_cache: bool = False, seed: int = None):
     """
     Generiert Text mit dem Transformer-Modell.
+
+    use_prefix_cache: Keys/Values bereits gesehener Präfixe wiederverwenden
+                      (siehe inference/prefix_cache.py). Aus, weil das
+                      Nachschlagen bei den kleinen Modellen mehr kostet,
+                      als es an Rechenzeit spart.
+    seed: Eigener Zufallsgenerator pro Aufruf -> reproduzierbare Ausgabe
+          (None = globaler Zufallszustand)
     """
     model.eval()
+    generator = make_generator(seed, next(model.parameters()).device)
 
     tokens = tokenizer.encode(start_text)
     if not tokens:
@@ -40,16 +51,11 @@ def generate_text(model, tokenizer, start_text: str,
     print(f"   Temperature: {temperature}")
     print("-" * 50)
 
-    device = next(model.parameters()).device
-
     for step in range(max_length):
         with torch.no_grad():
             # Maximal letzte 10 Tokens als Kontext
             context = tokens[-10:] if len(tokens) > 10 else tokens
-            inp = torch.tensor(context, device=device).unsqueeze(0)
-
-            logits = model(inp)
-            last_logits = logits[0, -1] / temperature
+            last_logits = next_token_logits(model, context, use_cache=use_prefix_cache) / temperature
 
             # Softmax
             probs = F.softmax(last_logits, dim=-1)
@@ -65,7 +71,7 @@ def generate_text(model, tokenizer, start_text: str,
                 probs = probs / probs.sum()
 
             # Sample
-            next_token = torch.multinomial(probs, 1).item()
+            next_token = torch.multinomial(probs, 1, generator=generator).item()
             tokens.append(next_token)
 
             next_word = tokenizer.idx_to_word.get(next_token, "<UNK>")
@@ -0,0 +1,277 @@
+"""
+Prefix-KV-Cache für MiniGPT
+===========================
+
+Viele Prompts beginnen gleich ("die katze ...", "der hund ..."). Ohne
+Cache berechnet jeder Aufruf die Keys/Values (K/V) dieser Tokens neu.
+
+Der Cache speichert K/V in einem Radix-Baum über Token-IDs:
+
+    (root)
+     ├── [die, katze] ── [sitzt, auf]
+     │                └─ [schläft]
+     └── [der, hund]
+
+Jede Kante trägt eine Token-Folge und den passenden K/V-Block
+[layers, 2, heads, len, head_dim]. Ein neuer Kontext sucht den längsten
+gespeicherten Präfix, übernimmt dessen K/V und rechnet nur den Rest.
+Bei Überschreitung des Speicherbudgets werden die am längsten nicht
+genutzten Blätter verworfen (LRU).
+
+Die Generatoren geben dem Modell immer ein Fenster ab Position 0
+(die letzten 10 Tokens). Deshalb ist jeder Fensterinhalt ein eigener
+Präfix ab Position 0 und K/V bleiben gültig, solange sich die Gewichte
+nicht ändern. Gewichtsänderungen (Training, LoRA) werden über die
+Versionszähler der Parameter erkannt und leeren den Cache.
+"""
+
+import itertools
+import weakref
+
+import torch
+
+# Speicherbudget pro Modell (K/V-Bytes)
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class _RadixNode:
+    __slots__ = ("tokens", "kv", "children", "parent", "last_access")
+
+    def __init__(self, tokens=(), kv=None, parent=None):
+        self.tokens = tuple(tokens)
+        self.kv = kv                # [layers, 2, heads, len(tokens), head_dim]
+        self.children = {}          # erstes Token -> Kind-Knoten
+        self.parent = parent
+        self.last_access = 0
+
+    @property
+    def nbytes(self):
+        return self.kv.numel() * self.kv.element_size() if self.kv is not None else 0
+
+
+def _common_prefix_length(a, b):
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+class PrefixKVCache:
+    """Radix-Baum über Token-IDs mit K/V-Blöcken und LRU-Verdrängung."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._clock = itertools.count(1)
+        self.reset_stats()
+        self.clear()
+
+    def clear(self):
+        """Leert den Cache (Statistiken bleiben erhalten)."""
+        self.root = _RadixNode()
+        self.bytes_used = 0
+        self.nodes = 0
+
+    def reset_stats(self):
+        self.lookups = 0
+        self.hits = 0
+        self.prefill_tokens = 0      # Tokens, die ohne Cache berechnet werden müssten
+        self.saved_tokens = 0        # davon aus dem Cache übernommen
+        self.evictions = 0
+
+    # -------------------------------------------------------------------------
+    # Suchen / Einfügen
+    # -------------------------------------------------------------------------
+
+    def match(self, token_ids, max_length=None):
+        """
+        Sucht den längsten gespeicherten Präfix.
+
+        Args:
+            token_ids: Kontext (Liste von Token-IDs)
+            max_length: Höchstens so viele Tokens übernehmen (z.B. len - 1,
+                        damit für das letzte Token noch Logits berechnet werden)
+
+        Returns:
+            (Anzahl übernommener Tokens, past_kv) - past_kv ist eine Liste
+            mit (K, V) pro Layer in der Form [1, heads, n, head_dim] oder
+            None bei keinem Treffer.
+        """
+        limit = len(token_ids) if max_length is None else min(max_length, len(token_ids))
+        self.lookups += 1
+        self.prefill_tokens += len(token_ids)
+
+        node, pos, blocks = self.root, 0, []
+        now = next(self._clock)
+        while pos < limit:
+            child = node.children.get(token_ids[pos])
+            if child is None:
+                break
+            common = _common_prefix_length(child.tokens, token_ids[pos:limit])
+            if common == 0:
+                break
+            child.last_access = now
+            blocks.append(child.kv[:, :, :, :common])
+            pos += common
+            if common < len(child.tokens):
+                break
+            node = child
+
+        if pos == 0:
+            return 0, None
+
+        self.hits += 1
+        self.saved_tokens += pos
+        kv = torch.cat(blocks, dim=3) if len(blocks) > 1 else blocks[0]
+        past_kv = [(kv[layer, 0].unsqueeze(0), kv[layer, 1].unsqueeze(0)) for layer in range(kv.size(0))]
+        return pos, past_kv
+
+    def insert(self, token_ids, present_kv):
+        """
+        Speichert K/V eines Kontexts.
+
+        Args:
+            token_ids: Kontext (Liste von Token-IDs)
+            present_kv: Liste mit (K, V) pro Layer [1, heads, len(token_ids), head_dim]
+        """
+        if not token_ids:
+            return
+        kv = torch.stack([torch.stack([k[0], v[0]]) for k, v in present_kv]).detach()
+
+        node, pos = self.root, 0
+        now = next(self._clock)
+        while pos < len(token_ids):
+            child = node.children.get(token_ids[pos])
+            if child is None:
+                # Neuer Ast für den Rest (clone: kein View auf den großen Tensor)
+                new_node = _RadixNode(token_ids[pos:], kv[:, :, :, pos:].clone(), parent=node)
+                new_node.last_access = now
+                node.children[token_ids[pos]] = new_node
+                self.bytes_used += new_node.nbytes
+                self.nodes += 1
+                break
+
+            common = _common_prefix_length(child.tokens, token_ids[pos:])
+            if common < len(child.tokens):
+                child = self._split(child, common)
+            child.last_access = now
+            node = child
+            pos += common
+
+        self._evict()
+
+    def _split(self, node, at):
+        """Teilt eine Kante: node behält die ersten `at` Tokens, der Rest wird Kind."""
+        tail = _RadixNode(node.tokens[at:], node.kv[:, :, :, at:].clone(), parent=node)
+        tail.children = node.children
+        tail.last_access = node.last_access
+        for grandchild in tail.children.values():
+            grandchild.parent = tail
+
+        node.tokens = node.tokens[:at]
+        node.kv = node.kv[:, :, :, :at].clone()
+        node.children = {tail.tokens[0]: tail}
+        self.nodes += 1
+        # Byte-Summe bleibt gleich (gleiche Tokens, nur anders aufgeteilt)
+        return node
+
+    def _leaves(self):
+        stack = list(self.root.children.values())
+        while stack:
+            node = stack.pop()
+            if node.children:
+                stack.extend(node.children.values())
+            else:
+                yield node
+
+    def _evict(self):
+        while self.bytes_used > self.max_bytes and self.root.children:
+            victim = min(self._leaves(), key=lambda n: n.last_access)
+            del victim.parent.children[victim.tokens[0]]
+            self.bytes_used -= victim.nbytes
+            self.nodes -= 1
+            self.evictions += 1
+
+    # -------------------------------------------------------------------------
+    # Statistiken
+    # -------------------------------------------------------------------------
+
+    def stats(self):
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "prefill_tokens": self.prefill_tokens,
+            "saved_prefill_tokens": self.saved_tokens,
+            "saved_ratio": self.saved_tokens / self.prefill_tokens if self.prefill_tokens else 0.0,
+            "bytes_used": self.bytes_used,
+            "max_bytes": self.max_bytes,
+            "nodes": self.nodes,
+            "evictions": self.evictions,
+        }
+
+    def format_stats(self):
+        s = self.stats()
+        return (f"Prefix-Cache: {s['hits']}/{s['lookups']} Treffer ({s['hit_rate']:.0%}), "
+                f"{s['saved_prefill_tokens']}/{s['prefill_tokens']} Prefill-Tokens gespart "
+                f"({s['saved_ratio']:.0%}), {s['bytes_used'] / 1024:.0f} KB belegt")
+
+
+# =============================================================================
+# EIN CACHE PRO MODELL
+# =============================================================================
+
+_model_caches = weakref.WeakKeyDictionary()
+
+
+def supports_kv_cache(model):
+    """Nur MiniGPT (mit blocks + KV-fähigem forward) nutzt den Cache."""
+    from training.training_transformer import MiniGPT
+    return isinstance(model, MiniGPT)
+
+
+def _weights_version(model):
+    # Ändert sich bei jedem In-Place-Update (optimizer.step, merge) und
+    # beim Austauschen von Schichten (apply_lora)
+    return tuple((id(p), p._version) for p in model.parameters())
+
+
+def get_prefix_cache(model, max_bytes: int = DEFAULT_MAX_BYTES):
+    """Gibt den Prefix-Cache eines Modells zurück (leert ihn nach Gewichtsänderungen)."""
+    entry = _model_caches.get(model)
+    version = _weights_version(model)
+    if entry is None:
+        entry = [PrefixKVCache(max_bytes), version]
+        _model_caches[model] = entry
+    elif entry[1] != version:
+        entry[0].clear()
+        entry[1] = version
+    return entry[0]
+
+
+def next_token_logits(model, context, use_cache=True, cache=None):
+    """
+    Logits für das nächste Token nach `context` (Liste von Token-IDs).
+
+    Nutzt den Prefix-Cache, wenn das Modell ihn unterstützt und im
+    eval-Modus ist; sonst ein normaler Forward-Pass. Für LSTM-Modelle
+    wird das (logits, hidden)-Tupel entpackt.
+
+    Returns:
+        [vocab_size] Logits der letzten Position
+    """
+    device = next(model.parameters()).device
+
+    if not (use_cache and not model.training and supports_kv_cache(model)):
+        output = model(torch.tensor(context, device=device).unsqueeze(0))
+        logits = output[0] if isinstance(output, tuple) else output
+        return logits[0, -1]
+
+    cache = cache if cache is not None else get_prefix_cache(model)
+    # Mindestens das letzte Token rechnen, um dessen Logits zu erhalten
+    matched, past_kv = cache.match(context, max_length=len(context) - 1)
+    inp = torch.tensor(context[matched:], device=device).unsqueeze(0)
+    logits, present_kv = model(inp, past_kv=past_kv, use_cache=True)
+    cache.insert(context, present_kv)
+    return logits[0, -1]
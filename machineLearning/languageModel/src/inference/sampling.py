@@ -0,0 +1,67 @@
+"""Batched next-token sampling shared by the inference server and generators.
+
+Every row of a batch can use its own temperature and top-p value, so
+requests with different sampling settings can be decoded together.
+"""
+
+import torch
+import torch.nn.functional as F
+
+
+def top_p_filter(probs, top_p):
+    """Zero out tokens outside the nucleus and renormalize.
+
+    Args:
+        probs: [batch, vocab] probabilities
+        top_p: [batch] nucleus thresholds (1.0 = no filtering)
+    """
+    sorted_probs, sorted_indices = torch.sort(probs, dim=-1, descending=True)
+    cumsum = torch.cumsum(sorted_probs, dim=-1)
+    remove = cumsum > top_p.unsqueeze(-1)
+    # Always keep the token that crosses the threshold
+    remove[:, 1:] = remove[:, :-1].clone()
+    remove[:, 0] = False
+    remove = remove.scatter(-1, sorted_indices, remove)
+    probs = probs.masked_fill(remove, 0.0)
+    return probs / probs.sum(dim=-1, keepdim=True)
+
+
+def sample_next_tokens(logits, temperature, top_p, generator=None):
+    """Sample one token per row.
+
+    Args:
+        logits: [batch, vocab] logits of the last position
+        temperature: [batch] temperatures; 0 means greedy decoding
+        top_p: [batch] nucleus thresholds
+        generator: optional torch.Generator for reproducible sampling
+
+    Returns:
+        [batch] tensor of token ids
+    """
+    temperature = temperature.to(logits.device, logits.dtype)
+    top_p = top_p.to(logits.device, logits.dtype)
+    greedy = temperature <= 0
+
+    safe_temperature = torch.where(greedy, torch.ones_like(temperature), temperature)
+    probs = F.softmax(logits / safe_temperature.unsqueeze(-1), dim=-1)
+    if bool((top_p < 1.0).any()):
+        probs = top_p_filter(probs, top_p)
+
+    sampled = torch.multinomial(probs, 1, generator=generator).squeeze(-1)
+    if bool(greedy.any()):
+        sampled = torch.where(greedy, logits.argmax(dim=-1), sampled)
+    return sampled
+
+
+def make_generator(seed, device="cpu"):
+    """Return a seeded torch.Generator on `device`, or None for the global RNG.
+
+    A fresh generator per request makes the sampled tokens a pure function of
+    (weights, prompt, sampling parameters, seed), independent of any other
+    sampling happening in the same process.
+    """
+    if seed is None:
+        return None
+    generator = torch.Generator(device=device)
+    generator.manual_seed(int(seed))
+    return generator
@@ -92,16 +92,21 @@ def main():
     9. Modellqualität bewerten (LLM-as-a-Judge)
        - Großes LLM bewertet MiniGPT-Outputs (Grammatik, Kohärenz, Relevanz)
        - Benötigt Ollama oder LM Studio mit geladenem Modell
+       - Optional adaptiv: mehrere Samples, Stopp bei getrennten Konfidenzintervallen
        {'   [OK] Ergebnisse vorhanden' if evaluation_results_exist else '   [ ] Noch nicht durchgeführt'}
 
     === WEB ===
     10. Weboberflaeche starten (Gradio)
         - Alle Funktionen im Browser (http://localhost:7860)
 
+    11. Inferenz-Server starten (OpenAI-kompatible API)
+        - /v1/completions, /v1/chat/completions mit Continuous Batching
+        - Für Next.js-Apps und andere Clients (http://localhost:8000)
+
     0. Beenden
     """)
 
-    choice = input("    Auswahl (0-10): ").strip()
+    choice = input("    Auswahl (0-11): ").strip()
 
     if choice == "1":
         dataset = _ask_dataset()
@@ -181,11 +186,16 @@ def main():
 
     elif choice == "9":
         dataset = _ask_dataset()
+        adaptive = input("    Adaptiv bewerten (mehrere Samples, Konfidenzintervalle)? [j/N]: ")
         print("\n" + "=" * 60)
         print("Starte LLM-as-a-Judge Bewertung...")
         print("=" * 60 + "\n")
-        from evaluation.evaluation_runner import main as run_evaluation
-        run_evaluation(dataset=dataset)
+        if adaptive.strip().lower() == "j":
+            from evaluation.adaptive_evaluator import main as run_adaptive_evaluation
+            run_adaptive_evaluation(dataset=dataset)
+        else:
+            from evaluation.evaluation_runner import main as run_evaluation
+            run_evaluation(dataset=dataset)
 
     elif choice == "10":
         print("\n" + "=" * 60)
@@ -196,6 +206,13 @@ def main():
         app = create_app()
         app.queue().launch(server_port=7860, theme=gr.themes.Soft())
 
+    elif choice == "11":
+        print("\n" + "=" * 60)
+        print("Starte Inferenz-Server...")
+        print("=" * 60 + "\n")
+        from server_app import main as run_server
+        run_server([])
+
     elif choice == "0":
         print("\nAuf Wiedersehen!")
         sys.exit(0)
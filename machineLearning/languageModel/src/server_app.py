@@ -0,0 +1,76 @@
+"""
+Entry point for the OpenAI-compatible inference server.
+
+Usage:
+    python src/server_app.py
+    python src/server_app.py --port 8000 --max-batch-size 32
+    python src/server_app.py --preload original lstm
+
+Example request:
+    curl http://localhost:8000/v1/completions \
+        -H "Content-Type: application/json" \
+        -d '{"model": "original", "prompt": "die katze", "max_tokens": 8}'
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Ensure src/ is on the path so cross-package imports
+# (e.g. "from training.xxx import ...") work correctly.
+src_dir = Path(__file__).parent
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+
+from inference import device_info_string
+from serving.model_registry import ModelRegistry
+from serving.scheduler import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_QUEUE
+from serving.server import DEFAULT_HOST, DEFAULT_PORT, InferenceServer
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="OpenAI-kompatibler Inferenz-Server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--models-dir", default=None,
+                        help="Modellverzeichnis (Standard: languageModel/dist)")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="Maximale Anzahl gleichzeitig dekodierter Sequenzen pro Modell")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help="Maximale Warteschlange pro Modell (danach HTTP 429)")
+    parser.add_argument("--default-model", default=None,
+                        help="Modell für Anfragen ohne 'model'-Feld")
+    parser.add_argument("--preload", nargs="*", default=[],
+                        help="Modelle, die beim Start geladen werden")
+    return parser.parse_args(argv)
+
+
+async def run_server(args):
+    registry = ModelRegistry(args.models_dir)
+    server = InferenceServer(
+        registry,
+        max_batch_size=args.max_batch_size,
+        max_queue=args.max_queue,
+        default_model=args.default_model,
+    )
+    for name in args.preload:
+        await server.get_scheduler(name)
+
+    print(f"   Device: {device_info_string(registry.device)}")
+    print(f"   Modelle: {', '.join(registry.names()) or '(keine - bitte erst trainieren)'}")
+    print(f"   Server läuft auf http://{args.host}:{args.port}")
+    print("   Endpunkte: /v1/models, /v1/completions, /v1/chat/completions, /metrics")
+    await server.serve_forever(args.host, args.port)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    try:
+        asyncio.run(run_server(args))
+    except KeyboardInterrupt:
+        print("\nServer beendet.")
+
+
+if __name__ == "__main__":
+    main()
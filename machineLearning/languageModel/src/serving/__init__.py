@@ -0,0 +1 @@
+# Inference server: OpenAI-compatible HTTP API with continuous batching
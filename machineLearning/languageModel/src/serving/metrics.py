@@ -0,0 +1,168 @@
+"""Server metrics: counters, gauges and latency percentiles (Prometheus text format)."""
+
+import threading
+import time
+from collections import deque
+
+# Number of recent observations kept per latency series
+LATENCY_WINDOW = 2000
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class LatencySeries:
+    """Sliding window of latency observations in seconds."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.values = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.values.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q):
+        if not self.values:
+            return 0.0
+        ordered = sorted(self.values)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+class ServerMetrics:
+    """Thread-safe metrics shared by the HTTP layer and the schedulers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests_total = {}          # (model, status) -> count
+        self.tokens_generated = {}        # model -> count
+        self.prompt_tokens = {}           # model -> count
+        self.decode_steps = {}            # model -> count
+        self.batch_size_sum = {}          # model -> sum of batch sizes per step
+        self.queue_depth = {}             # model -> waiting requests
+        self.active_sequences = {}        # model -> sequences in the decode batch
+        self.time_to_first_token = {}     # model -> LatencySeries
+        self.request_latency = {}         # model -> LatencySeries
+        self.queue_wait = {}              # model -> LatencySeries
+        self.prefix_cache = {}            # model -> PrefixKVCache.stats()
+
+    def _series(self, table, model):
+        if model not in table:
+            table[model] = LatencySeries()
+        return table[model]
+
+    def record_request(self, model, status):
+        with self._lock:
+            key = (model, status)
+            self.requests_total[key] = self.requests_total.get(key, 0) + 1
+
+    def record_step(self, model, batch_size, queue_depth):
+        with self._lock:
+            self.decode_steps[model] = self.decode_steps.get(model, 0) + 1
+            self.batch_size_sum[model] = self.batch_size_sum.get(model, 0) + batch_size
+            self.tokens_generated[model] = self.tokens_generated.get(model, 0) + batch_size
+            self.active_sequences[model] = batch_size
+            self.queue_depth[model] = queue_depth
+
+    def set_queue_state(self, model, queue_depth, active):
+        with self._lock:
+            self.queue_depth[model] = queue_depth
+            self.active_sequences[model] = active
+
+    def set_prefix_cache_stats(self, model, stats):
+        with self._lock:
+            self.prefix_cache[model] = stats
+
+    def record_admission(self, model, prompt_tokens, wait_seconds):
+        with self._lock:
+            self.prompt_tokens[model] = self.prompt_tokens.get(model, 0) + prompt_tokens
+            self._series(self.queue_wait, model).observe(wait_seconds)
+
+    def record_first_token(self, model, seconds):
+        with self._lock:
+            self._series(self.time_to_first_token, model).observe(seconds)
+
+    def record_completion(self, model, seconds):
+        with self._lock:
+            self._series(self.request_latency, model).observe(seconds)
+
+    def snapshot(self):
+        """Return a JSON-serialisable summary (used by /metrics?format=json)."""
+        with self._lock:
+            models = set(self.decode_steps) | set(self.queue_depth) | set(self.request_latency)
+            summary = {"uptime_seconds": time.time() - self.started, "models": {}}
+            for model in sorted(models):
+                steps = self.decode_steps.get(model, 0)
+                latency = self.request_latency.get(model, LatencySeries())
+                ttft = self.time_to_first_token.get(model, LatencySeries())
+                summary["models"][model] = {
+                    "queue_depth": self.queue_depth.get(model, 0),
+                    "active_sequences": self.active_sequences.get(model, 0),
+                    "decode_steps": steps,
+                    "avg_batch_size": self.batch_size_sum.get(model, 0) / steps if steps else 0.0,
+                    "tokens_generated": self.tokens_generated.get(model, 0),
+                    "requests_completed": latency.count,
+                    "latency_p50": latency.quantile(0.5),
+                    "latency_p99": latency.quantile(0.99),
+                    "ttft_p50": ttft.quantile(0.5),
+                    "ttft_p99": ttft.quantile(0.99),
+                    "prefix_cache": self.prefix_cache.get(model),
+                }
+            return summary
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def emit(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+
+        def emit_summary(name, help_text, table):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for model, series in sorted(table.items()):
+                for q in QUANTILES:
+                    lines.append(f'{name}{{model="{model}",quantile="{q}"}} {series.quantile(q):.6f}')
+                lines.append(f'{name}_sum{{model="{model}"}} {series.total:.6f}')
+                lines.append(f'{name}_count{{model="{model}"}} {series.count}')
+
+        with self._lock:
+            emit("lm_server_uptime_seconds", "gauge", "Seconds since server start",
+                 [({}, f"{time.time() - self.started:.1f}")])
+            emit("lm_server_requests_total", "counter", "Finished HTTP generation requests",
+                 [({"model": m, "status": s}, n) for (m, s), n in sorted(self.requests_total.items())])
+            emit("lm_server_queue_depth", "gauge", "Requests waiting for a decode slot",
+                 [({"model": m}, n) for m, n in sorted(self.queue_depth.items())])
+            emit("lm_server_active_sequences", "gauge", "Sequences in the running decode batch",
+                 [({"model": m}, n) for m, n in sorted(self.active_sequences.items())])
+            emit("lm_server_decode_steps_total", "counter", "Batched decode steps",
+                 [({"model": m}, n) for m, n in sorted(self.decode_steps.items())])
+            emit("lm_server_generated_tokens_total", "counter", "Generated tokens",
+                 [({"model": m}, n) for m, n in sorted(self.tokens_generated.items())])
+            emit("lm_server_prompt_tokens_total", "counter", "Prompt tokens admitted",
+                 [({"model": m}, n) for m, n in sorted(self.prompt_tokens.items())])
+            cache = sorted(self.prefix_cache.items())
+            emit("lm_server_prefix_cache_lookups_total", "counter", "Prefix KV cache lookups",
+                 [({"model": m}, st["lookups"]) for m, st in cache])
+            emit("lm_server_prefix_cache_hits_total", "counter", "Prefix KV cache hits",
+                 [({"model": m}, st["hits"]) for m, st in cache])
+            emit("lm_server_prefix_cache_saved_tokens_total", "counter",
+                 "Prefill tokens taken from the prefix KV cache",
+                 [({"model": m}, st["saved_prefill_tokens"]) for m, st in cache])
+            emit("lm_server_prefix_cache_bytes", "gauge", "Memory used by the prefix KV cache",
+                 [({"model": m}, st["bytes_used"]) for m, st in cache])
+            emit_summary("lm_server_queue_wait_seconds", "Time from arrival to admission",
+                         self.queue_wait)
+            emit_summary("lm_server_time_to_first_token_seconds", "Time from arrival to first token",
+                         self.time_to_first_token)
+            emit_summary("lm_server_request_latency_seconds", "Time from arrival to completion",
+                         self.request_latency)
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,122 @@
+"""Model discovery and lazy loading for the inference server."""
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from inference import get_device
+
+
+@dataclass
+class ModelHandle:
+    """A loaded model together with everything needed to decode it."""
+    name: str
+    label: str
+    kind: str            # "transformer" or "lstm"
+    model: object
+    tokenizer: object
+    context_window: int  # tokens fed per decode step (same as the CLI generators)
+    device: object
+
+    @property
+    def eos_id(self):
+        return self.tokenizer.word_to_idx.get("<EOS>")
+
+    @property
+    def pad_id(self):
+        return self.tokenizer.word_to_idx.get("<PAD>", 0)
+
+
+def default_models_dir():
+    """Return the dist/ directory where training stores its models."""
+    return Path(__file__).parent.parent.parent / "dist"
+
+
+def discover_all_models(base_dir):
+    """Find every servable model: transformer variants, LSTM and fact-correction adapters.
+
+    Returns:
+        dict of {name: {path, type, label, ...}}
+    """
+    from inference.inference_finetuned import discover_models
+
+    base_dir = Path(base_dir)
+    models = discover_models(base_dir)
+
+    lstm_dir = base_dir / "lstm_model"
+    if (lstm_dir / "model.pt").exists():
+        models["lstm"] = {
+            "path": lstm_dir,
+            "type": "lstm",
+            "label": "LSTM (Basis-Training)",
+        }
+
+    fc_dir = base_dir / "finetuning_results" / "fact_correction"
+    for variant in ["v_only", "all"]:
+        adapter_dir = fc_dir / variant / "lora_adapter"
+        if (adapter_dir / "lora_weights.pt").exists():
+            models[f"fc_{variant}"] = {
+                "path": adapter_dir,
+                "type": "fact_correction",
+                "target": variant,
+                "label": f"Faktenkorrektur ({variant})",
+            }
+
+    return models
+
+
+class ModelRegistry:
+    """Discovers models once and loads each one on first use."""
+
+    def __init__(self, base_dir=None, device=None):
+        self.base_dir = Path(base_dir) if base_dir else default_models_dir()
+        self.device = device or get_device()
+        self._lock = threading.Lock()
+        self._handles = {}
+        self.refresh()
+
+    def refresh(self):
+        """Re-scan the models directory (already loaded models stay loaded)."""
+        self.available = discover_all_models(self.base_dir)
+        return self.available
+
+    def names(self):
+        return list(self.available)
+
+    def get(self, name):
+        """Return the loaded ModelHandle for a model name (KeyError if unknown)."""
+        with self._lock:
+            if name in self._handles:
+                return self._handles[name]
+            info = self.available[name]
+            handle = self._load(name, info)
+            self._handles[name] = handle
+            return handle
+
+    def _load(self, name, info):
+        if info["type"] == "lstm":
+            from training.training_lstm import load_model as load_lstm
+            model, tokenizer = load_lstm(str(info["path"]))
+            kind, context_window = "lstm", 5
+        elif info["type"] == "fact_correction":
+            from inference.inference_fact_correction import load_fact_correction_adapter
+            model, tokenizer = load_fact_correction_adapter(
+                str(self.base_dir / "transformer_model"), str(info["path"]),
+                target=info.get("target", "v_only"),
+            )
+            kind, context_window = "transformer", 10
+        else:
+            from inference.inference_finetuned import load_model_by_type
+            model, tokenizer = load_model_by_type(info, self.base_dir)
+            kind, context_window = "transformer", 10
+
+        model = model.to(self.device).eval()
+        return ModelHandle(
+            name=name,
+            label=info["label"],
+            kind=kind,
+            model=model,
+            tokenizer=tokenizer,
+            context_window=context_window,
+            device=self.device,
+        )
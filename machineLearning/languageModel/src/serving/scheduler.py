@@ -0,0 +1,265 @@
+"""Continuous-batching scheduler: one decode loop per model.
+
+Instead of finishing a whole batch before starting the next one, the
+scheduler re-forms the batch at every decode step:
+
+    1. admit waiting requests while there are free slots
+    2. run ONE batched forward pass over all active sequences
+    3. sample one token per sequence, stream it to its client
+    4. evict sequences that hit EOS or max_tokens
+
+A new request therefore waits at most one decode step before it is
+decoded together with the requests that are already running.
+
+The models only look at a short context window (10 tokens for MiniGPT,
+5 for the LSTM, like the CLI generators), so every step feeds each
+sequence's window right-padded to the longest one. Both architectures
+are causal, so padding behind the last real token does not change its
+logits.
+
+Newly admitted MiniGPT requests are prefilled through the shared prefix
+KV cache (inference/prefix_cache.py): prompts that start like earlier
+ones only compute their new tokens.
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import torch
+
+from inference.prefix_cache import get_prefix_cache, next_token_logits, supports_kv_cache
+from inference.sampling import sample_next_tokens
+
+DEFAULT_MAX_BATCH_SIZE = 16
+DEFAULT_MAX_QUEUE = 256
+
+
+class QueueFullError(Exception):
+    """Raised when a model's waiting queue is full."""
+
+
+@dataclass
+class GenerationRequest:
+    prompt_ids: list
+    max_tokens: int = 16
+    temperature: float = 1.0
+    top_p: float = 1.0
+    stop_at_eos: bool = True
+
+
+class Sequence:
+    """State of one request inside the scheduler."""
+
+    def __init__(self, request: GenerationRequest):
+        self.request = request
+        self.tokens = list(request.prompt_ids)
+        self.generated = []
+        self.finish_reason = None
+        self.error = None
+        self.cancelled = False
+        self.arrival = time.perf_counter()
+        self.admitted_at = None
+        self.first_token_at = None
+        self.finished_at = None
+        self._events = asyncio.Queue()
+
+    @property
+    def finished(self):
+        return self.finish_reason is not None or self.error is not None
+
+    def cancel(self):
+        """Mark the sequence as abandoned (client went away); evicted at the next step."""
+        self.cancelled = True
+
+    def _push_token(self, token_id):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.generated.append(token_id)
+        self.tokens.append(token_id)
+        self._events.put_nowait(("token", token_id))
+
+    def _finish(self, reason):
+        self.finish_reason = reason
+        self.finished_at = time.perf_counter()
+        self._events.put_nowait(("done", reason))
+
+    def _fail(self, error):
+        self.error = error
+        self.finished_at = time.perf_counter()
+        self._events.put_nowait(("error", error))
+
+    async def stream(self):
+        """Yield generated token ids as they are decoded."""
+        while True:
+            kind, value = await self._events.get()
+            if kind == "token":
+                yield value
+            elif kind == "error":
+                raise value
+            else:
+                return
+
+    async def wait(self):
+        """Wait until the sequence is finished and return the generated ids."""
+        async for _ in self.stream():
+            pass
+        return self.generated
+
+
+class ContinuousBatchScheduler:
+    """Decode loop for a single model handle."""
+
+    def __init__(self, handle, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_queue=DEFAULT_MAX_QUEUE, metrics=None):
+        self.handle = handle
+        self.max_batch_size = max_batch_size
+        self.max_queue = max_queue
+        self.metrics = metrics
+        self._waiting = deque()
+        self._active = []
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.uses_prefix_cache = supports_kv_cache(handle.model)
+        # One thread per model: torch work must not block the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"decode-{handle.name}")
+
+    @property
+    def queue_depth(self):
+        return len(self._waiting)
+
+    @property
+    def active_count(self):
+        return len(self._active)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    def submit(self, request: GenerationRequest) -> Sequence:
+        """Queue a request; it joins the decode batch at the next step."""
+        if len(self._waiting) >= self.max_queue:
+            raise QueueFullError(f"Warteschlange für '{self.handle.name}' ist voll ({self.max_queue})")
+        seq = Sequence(request)
+        if request.max_tokens <= 0:
+            seq._finish("length")
+            return seq
+        self._waiting.append(seq)
+        self._update_queue_metrics()
+        self._wakeup.set()
+        return seq
+
+    def _update_queue_metrics(self):
+        if self.metrics:
+            self.metrics.set_queue_state(self.handle.name, len(self._waiting), len(self._active))
+
+    def _admit(self):
+        now = time.perf_counter()
+        while self._waiting and len(self._active) < self.max_batch_size:
+            seq = self._waiting.popleft()
+            if seq.cancelled:
+                continue
+            seq.admitted_at = now
+            self._active.append(seq)
+            if self.metrics:
+                self.metrics.record_admission(self.handle.name, len(seq.request.prompt_ids),
+                                              now - seq.arrival)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._active and not self._waiting:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            self._admit()
+            self._active = [seq for seq in self._active if not seq.cancelled]
+            if not self._active:
+                self._update_queue_metrics()
+                continue
+
+            batch = list(self._active)
+            try:
+                next_tokens = await loop.run_in_executor(self._executor, self._decode_step, batch)
+            except Exception as e:
+                for seq in batch:
+                    seq._fail(e)
+                self._active = []
+                self._update_queue_metrics()
+                continue
+
+            for seq, token_id in zip(batch, next_tokens):
+                self._advance(seq, token_id)
+            self._active = [seq for seq in self._active if not seq.finished]
+
+            if self.metrics:
+                self.metrics.record_step(self.handle.name, len(batch), len(self._waiting))
+                self._update_queue_metrics()
+                if self.uses_prefix_cache:
+                    self.metrics.set_prefix_cache_stats(
+                        self.handle.name, get_prefix_cache(self.handle.model).stats())
+
+    def _advance(self, seq, token_id):
+        request = seq.request
+        if request.stop_at_eos and token_id == self.handle.eos_id:
+            seq._finish("stop")
+        else:
+            seq._push_token(token_id)
+            if self.metrics and len(seq.generated) == 1:
+                self.metrics.record_first_token(self.handle.name, seq.first_token_at - seq.arrival)
+            if len(seq.generated) >= request.max_tokens:
+                seq._finish("length")
+
+        if seq.finished and self.metrics:
+            self.metrics.record_completion(self.handle.name, seq.finished_at - seq.arrival)
+
+    def _decode_step(self, batch):
+        """One decode step + sampling for the whole batch (runs in the executor thread)."""
+        window = self.handle.context_window
+        last = [None] * len(batch)
+        running = []
+
+        with torch.no_grad():
+            for i, seq in enumerate(batch):
+                if self.uses_prefix_cache and not seq.generated:
+                    # Prefill: reuse K/V of prompt prefixes seen before
+                    last[i] = next_token_logits(self.handle.model, seq.tokens[-window:])
+                else:
+                    running.append(i)
+
+            if running:
+                batch_logits = self._batched_last_logits([batch[i].tokens[-window:] for i in running])
+                for row, i in enumerate(running):
+                    last[i] = batch_logits[row]
+
+            temperature = torch.tensor([seq.request.temperature for seq in batch])
+            top_p = torch.tensor([seq.request.top_p for seq in batch])
+            next_tokens = sample_next_tokens(torch.stack(last), temperature, top_p)
+
+        return next_tokens.tolist()
+
+    def _batched_last_logits(self, contexts):
+        """Right-padded forward pass; returns the logits of each context's last token."""
+        handle = self.handle
+        lengths = torch.tensor([len(c) for c in contexts])
+        x = torch.full((len(contexts), int(lengths.max())), handle.pad_id, dtype=torch.long)
+        for i, context in enumerate(contexts):
+            x[i, :len(context)] = torch.tensor(context)
+        x = x.to(handle.device)
+
+        output = handle.model(x)
+        logits = output[0] if isinstance(output, tuple) else output
+        rows = torch.arange(len(contexts), device=logits.device)
+        return logits[rows, (lengths - 1).to(logits.device)]
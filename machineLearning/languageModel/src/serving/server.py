@@ -0,0 +1,437 @@
+"""OpenAI-compatible HTTP inference server (asyncio, no extra dependencies).
+
+Endpoints:
+    GET  /v1/models             list servable models
+    POST /v1/completions        text completion (optionally streamed via SSE)
+    POST /v1/chat/completions   chat completion (last user message is the prompt)
+    GET  /metrics               Prometheus metrics (?format=json for a JSON summary)
+    GET  /health                liveness check
+
+The models are continuation models: the prompt is encoded with the
+model's word tokenizer and the reply contains only the newly generated
+words.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from serving.metrics import ServerMetrics
+from serving.scheduler import (
+    DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_QUEUE,
+    ContinuousBatchScheduler, GenerationRequest, QueueFullError,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+
+# Upper bound for max_tokens per request
+MAX_TOKENS_LIMIT = 256
+DEFAULT_MAX_TOKENS = 16
+
+MAX_BODY_BYTES = 1024 * 1024
+
+# How often a non-streaming request checks whether the client is still there
+DISCONNECT_POLL_SECONDS = 0.05
+
+
+class HTTPError(Exception):
+    """Error that is returned to the client as an OpenAI-style error object."""
+
+    def __init__(self, status, message, error_type="invalid_request_error"):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.error_type = error_type
+
+
+class InferenceServer:
+    """Routes HTTP requests to one continuous-batching scheduler per model."""
+
+    def __init__(self, registry, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_queue=DEFAULT_MAX_QUEUE, default_model=None):
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self.max_queue = max_queue
+        self.metrics = ServerMetrics()
+        self.default_model = default_model
+        self._schedulers = {}
+        self._scheduler_locks = {}
+        self._server = None
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for scheduler in self._schedulers.values():
+            await scheduler.stop()
+        self._schedulers.clear()
+
+    async def get_scheduler(self, name):
+        """Return the scheduler for a model, loading the model on first use."""
+        if name in self._schedulers:
+            return self._schedulers[name]
+        if name not in self.registry.available:
+            raise HTTPError(404, f"Modell '{name}' nicht gefunden", "model_not_found")
+
+        lock = self._scheduler_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            if name not in self._schedulers:
+                loop = asyncio.get_running_loop()
+                handle = await loop.run_in_executor(None, self.registry.get, name)
+                scheduler = ContinuousBatchScheduler(
+                    handle, max_batch_size=self.max_batch_size,
+                    max_queue=self.max_queue, metrics=self.metrics,
+                )
+                scheduler.start()
+                self._schedulers[name] = scheduler
+        return self._schedulers[name]
+
+    def _resolve_model_name(self, body):
+        name = body.get("model") or self.default_model
+        if not name:
+            names = self.registry.names()
+            if not names:
+                raise HTTPError(503, "Keine Modelle verfügbar - bitte erst trainieren", "server_error")
+            name = "original" if "original" in names else names[0]
+        return name
+
+    # -------------------------------------------------------------------------
+    # HTTP plumbing
+    # -------------------------------------------------------------------------
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    keep_alive = await self._dispatch(method, target, body, reader, writer,
+                                                      keep_alive)
+                except HTTPError as e:
+                    await self._send_error(writer, e, keep_alive)
+                except Exception as e:
+                    await self._send_error(writer, HTTPError(500, str(e), "server_error"), keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as e:
+            try:
+                await self._send_error(writer, e, keep_alive=False)
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Ungültige Anfragezeile")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "Ungültiger Content-Length-Header")
+        if length < 0:
+            raise HTTPError(400, "Ungültiger Content-Length-Header")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Anfrage zu groß")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def _headers(status, content_type, extra=None):
+        phrase = HTTPStatus(status).phrase
+        lines = [
+            f"HTTP/1.1 {status} {phrase}",
+            f"Content-Type: {content_type}",
+            "Access-Control-Allow-Origin: *",
+            "Access-Control-Allow-Headers: Content-Type, Authorization",
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+        ]
+        lines.extend(extra or [])
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send(self, writer, status, payload, content_type, keep_alive):
+        data = payload.encode("utf-8") if isinstance(payload, str) else payload
+        writer.write(self._headers(status, content_type, [
+            f"Content-Length: {len(data)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]) + data)
+        await writer.drain()
+
+    async def _send_json(self, writer, status, obj, keep_alive):
+        await self._send(writer, status, json.dumps(obj, ensure_ascii=False),
+                         "application/json; charset=utf-8", keep_alive)
+
+    async def _send_error(self, writer, error, keep_alive):
+        await self._send_json(writer, error.status, {
+            "error": {"message": error.message, "type": error.error_type, "param": None, "code": None},
+        }, keep_alive)
+
+    # -------------------------------------------------------------------------
+    # Routing
+    # -------------------------------------------------------------------------
+
+    async def _dispatch(self, method, target, body, reader, writer, keep_alive):
+        """Handle one request; returns whether the connection stays open."""
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+
+        if method == "OPTIONS":
+            writer.write(self._headers(204, "text/plain", ["Content-Length: 0"]))
+            await writer.drain()
+            return keep_alive
+
+        if method == "GET" and path == "/health":
+            await self._send_json(writer, 200, {"status": "ok"}, keep_alive)
+        elif method == "GET" and path == "/v1/models":
+            await self._send_json(writer, 200, self._list_models(), keep_alive)
+        elif method == "GET" and path == "/metrics":
+            if parse_qs(url.query).get("format") == ["json"]:
+                await self._send_json(writer, 200, self.metrics.snapshot(), keep_alive)
+            else:
+                await self._send(writer, 200, self.metrics.render_prometheus(),
+                                 "text/plain; version=0.0.4", keep_alive)
+        elif method == "POST" and path == "/v1/completions":
+            return await self._completion(self._parse_json(body), reader, writer, keep_alive,
+                                          chat=False)
+        elif method == "POST" and path == "/v1/chat/completions":
+            return await self._completion(self._parse_json(body), reader, writer, keep_alive,
+                                          chat=True)
+        else:
+            raise HTTPError(404, f"Unbekannter Endpunkt: {method} {path}", "not_found")
+        return keep_alive
+
+    @staticmethod
+    def _parse_json(body):
+        try:
+            data = json.loads(body or b"{}")
+        except json.JSONDecodeError as e:
+            raise HTTPError(400, f"Ungültiges JSON: {e}")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "JSON-Objekt erwartet")
+        return data
+
+    def _list_models(self):
+        created = int(self.metrics.started)
+        return {
+            "object": "list",
+            "data": [
+                {"id": name, "object": "model", "created": created,
+                 "owned_by": "local", "label": info["label"]}
+                for name, info in self.registry.available.items()
+            ],
+        }
+
+    # -------------------------------------------------------------------------
+    # Completions
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _prompt_from_body(body, chat):
+        if not chat:
+            prompt = body.get("prompt", "")
+            if isinstance(prompt, list):
+                if len(prompt) != 1 or not isinstance(prompt[0], str):
+                    raise HTTPError(400, "Nur ein Prompt (String) pro Anfrage unterstützt", "invalid_request_error")
+                prompt = prompt[0]
+            if not isinstance(prompt, str):
+                raise HTTPError(400, "'prompt' muss ein String sein")
+            return prompt
+
+        messages = body.get("messages")
+        if not isinstance(messages, list) or not messages:
+            raise HTTPError(400, "'messages' muss eine nicht-leere Liste sein")
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                content = message.get("content", "")
+                if isinstance(content, list):
+                    content = " ".join(part.get("text", "") for part in content
+                                       if isinstance(part, dict) and part.get("type") == "text")
+                return str(content)
+        raise HTTPError(400, "Keine Nachricht mit role='user' gefunden")
+
+    @staticmethod
+    def _sampling_params(body):
+        try:
+            max_tokens = int(body.get("max_tokens") or body.get("max_completion_tokens") or DEFAULT_MAX_TOKENS)
+            temperature = float(body.get("temperature", 1.0))
+            top_p = float(body.get("top_p", 1.0))
+        except (TypeError, ValueError):
+            raise HTTPError(400, "max_tokens, temperature und top_p müssen Zahlen sein")
+        if not 0 < top_p <= 1:
+            raise HTTPError(400, "top_p muss in (0, 1] liegen")
+        if temperature < 0:
+            raise HTTPError(400, "temperature darf nicht negativ sein")
+        return min(max(max_tokens, 0), MAX_TOKENS_LIMIT), temperature, top_p
+
+    async def _completion(self, body, reader, writer, keep_alive, chat):
+        name = self._resolve_model_name(body)
+        prompt = self._prompt_from_body(body, chat)
+        max_tokens, temperature, top_p = self._sampling_params(body)
+
+        scheduler = await self.get_scheduler(name)
+        tokenizer = scheduler.handle.tokenizer
+        prompt_ids = tokenizer.encode(prompt)
+        if not prompt_ids:
+            raise HTTPError(400, "Prompt enthält keine Wörter")
+
+        try:
+            seq = scheduler.submit(GenerationRequest(
+                prompt_ids=prompt_ids, max_tokens=max_tokens,
+                temperature=temperature, top_p=top_p,
+            ))
+        except QueueFullError as e:
+            self.metrics.record_request(name, "rejected")
+            raise HTTPError(429, str(e), "server_overloaded")
+
+        completion_id = ("chatcmpl-" if chat else "cmpl-") + uuid.uuid4().hex[:24]
+        created = int(time.time())
+
+        def word(token_id):
+            return tokenizer.idx_to_word.get(token_id, "<UNK>")
+
+        if body.get("stream"):
+            return await self._stream_completion(seq, writer, name, completion_id, created, chat, word)
+
+        try:
+            generated = await self._wait_unless_disconnected(seq, reader)
+        except ConnectionError:
+            self.metrics.record_request(name, "cancelled")
+            return False
+        except Exception as e:
+            self.metrics.record_request(name, "error")
+            raise HTTPError(500, f"Generierung fehlgeschlagen: {e}", "server_error")
+
+        text = " ".join(word(t) for t in generated)
+        usage = {
+            "prompt_tokens": len(prompt_ids),
+            "completion_tokens": len(generated),
+            "total_tokens": len(prompt_ids) + len(generated),
+        }
+        if chat:
+            choice = {"index": 0, "message": {"role": "assistant", "content": text},
+                      "finish_reason": seq.finish_reason}
+        else:
+            choice = {"index": 0, "text": (" " + text) if text else "", "logprobs": None,
+                      "finish_reason": seq.finish_reason}
+
+        self.metrics.record_request(name, "ok")
+        await self._send_json(writer, 200, {
+            "id": completion_id,
+            "object": "chat.completion" if chat else "text_completion",
+            "created": created,
+            "model": name,
+            "choices": [choice],
+            "usage": usage,
+        }, keep_alive)
+        return keep_alive
+
+    @staticmethod
+    async def _wait_unless_disconnected(seq, reader):
+        """Wait for a non-streamed sequence; cancel it if the client closes the connection.
+
+        The reader is only checked for EOF (no data is consumed), so a
+        pipelined next request stays in the buffer.
+        """
+        task = asyncio.ensure_future(seq.wait())
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+                if done:
+                    return task.result()
+                if reader.at_eof():
+                    raise ConnectionResetError("Client hat die Verbindung geschlossen")
+        finally:
+            if not task.done():
+                task.cancel()
+                seq.cancel()
+
+    async def _stream_completion(self, seq, writer, name, completion_id, created, chat, word):
+        """Send tokens as Server-Sent Events; the connection is closed afterwards."""
+        object_type = "chat.completion.chunk" if chat else "text_completion"
+
+        def chunk(delta_text=None, finish_reason=None, role=False):
+            if chat:
+                delta = {}
+                if role:
+                    delta["role"] = "assistant"
+                if delta_text is not None:
+                    delta["content"] = delta_text
+                choice = {"index": 0, "delta": delta, "finish_reason": finish_reason}
+            else:
+                choice = {"index": 0, "text": delta_text or "", "logprobs": None,
+                          "finish_reason": finish_reason}
+            payload = {"id": completion_id, "object": object_type, "created": created,
+                       "model": name, "choices": [choice]}
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+
+        writer.write(self._headers(200, "text/event-stream; charset=utf-8", [
+            "Cache-Control: no-cache",
+            "Connection: close",
+        ]))
+        try:
+            if chat:
+                writer.write(chunk(role=True))
+            first = True
+            async for token_id in seq.stream():
+                text = word(token_id)
+                if not (chat and first):
+                    text = " " + text
+                first = False
+                writer.write(chunk(text))
+                await writer.drain()
+            writer.write(chunk(finish_reason=seq.finish_reason))
+            writer.write(b"data: [DONE]\n\n")
+            await writer.drain()
+            self.metrics.record_request(name, "ok")
+        except ConnectionError:
+            seq.cancel()
+            self.metrics.record_request(name, "cancelled")
+        except Exception as e:
+            self.metrics.record_request(name, "error")
+            error = {"error": {"message": f"Generierung fehlgeschlagen: {e}", "type": "server_error"}}
+            writer.write(f"data: {json.dumps(error, ensure_ascii=False)}\n\n".encode("utf-8"))
+            await writer.drain()
+        return False
@@ -0,0 +1,502 @@
+"""
+Model Profiler
+==============
+
+Misst, wohin die Rechenzeit eines Modells tatsächlich fließt.
+
+Statt Parameter nur zu zählen, werden echte Forward-Pässe (optional auch
+Backward-Pässe) mit repräsentativen Batch-/Sequenz-Formen ausgeführt und
+pro Modul erfasst:
+
+- Wall-Time (Forward-Hooks, exklusive Zeit der Kind-Module)
+- FLOPs (torch.utils.flop_counter)
+- Aktivierungs-Speicher (Größe der Modul-Ausgaben)
+- Anzahl Tensor-Allokationen (TorchDispatchMode, Views zählen nicht)
+
+Die Ergebnisse werden von model_report.py als Tabellen in
+MODEL_REPORT.md und FINETUNING_REPORT.md eingebettet.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from torch.utils._python_dispatch import TorchDispatchMode
+from torch.utils.flop_counter import FlopCounterMode
+
+from .training_config import (
+    BATCH_SIZE_LSTM, SEQ_LENGTH,
+    BATCH_SIZE_TRANSFORMER, SEQ_LENGTH_TRANSFORMER,
+)
+
+# Kontextfenster bei der Generierung (siehe inference_transformer/inference_lstm)
+GENERATION_CONTEXT_TRANSFORMER = 10
+GENERATION_CONTEXT_LSTM = 5
+
+# Messwiederholungen (nach Warmup) - Mittelwert wird berichtet
+PROFILE_WARMUP = 2
+PROFILE_REPEATS = 10
+
+# Reihenfolge der Bereiche in der Zusammenfassung
+CATEGORY_ORDER = ["Embedding", "Attention", "Feed-Forward", "LayerNorm",
+                  "LSTM", "LoRA", "Output (lm_head)", "Sonstiges"]
+
+
+@dataclass
+class ModuleProfile:
+    """Messwerte eines einzelnen Moduls (exklusive Kind-Module)."""
+    name: str
+    type: str
+    category: str
+    time_ms: float = 0.0
+    flops: int = 0
+    activation_bytes: int = 0
+    allocations: int = 0
+    flops_estimated: bool = False
+
+
+@dataclass
+class ProfileResult:
+    """Profil eines Modells für eine Eingabeform."""
+    label: str
+    batch_size: int
+    seq_len: int
+    forward_ms: float
+    backward_ms: float = None
+    forward_flops: int = 0
+    backward_flops: int = None
+    device: str = "cpu"
+    modules: list = field(default_factory=list)
+
+    def by_category(self) -> dict:
+        """Summiert die Modul-Messwerte pro Bereich (Attention, FF, ...)."""
+        totals = {}
+        for mod in self.modules:
+            entry = totals.setdefault(mod.category, ModuleProfile(
+                name=mod.category, type="", category=mod.category))
+            entry.time_ms += mod.time_ms
+            entry.flops += mod.flops
+            entry.activation_bytes += mod.activation_bytes
+            entry.allocations += mod.allocations
+            entry.flops_estimated |= mod.flops_estimated
+        return {cat: totals[cat] for cat in CATEGORY_ORDER if cat in totals}
+
+
+def module_category(name: str, module: nn.Module) -> str:
+    """Ordnet ein Modul einem Bereich der Architektur zu."""
+    leaf = name.rsplit(".", 1)[-1]
+    if ".lora_" in f".{leaf}" or type(module).__name__ == "LoRALinear":
+        return "LoRA"
+    if isinstance(module, nn.LSTM):
+        return "LSTM"
+    if isinstance(module, nn.Embedding) or leaf == "pos_encoding":
+        return "Embedding"
+    if ".attention" in f".{name}":
+        return "Attention"
+    if ".ff" in f".{name}":
+        return "Feed-Forward"
+    if isinstance(module, nn.LayerNorm):
+        return "LayerNorm"
+    if leaf in ("lm_head", "fc"):
+        return "Output (lm_head)"
+    return "Sonstiges"
+
+
+def default_profile_shapes(model: nn.Module) -> list:
+    """
+    Repräsentative Eingabeformen für ein Modell.
+
+    Returns:
+        Liste von (label, batch_size, seq_len, mit_backward)
+    """
+    if hasattr(model, "lstm"):
+        return [
+            ("Training", BATCH_SIZE_LSTM, SEQ_LENGTH, True),
+            ("Generierung", 1, GENERATION_CONTEXT_LSTM, False),
+        ]
+    return [
+        ("Training", BATCH_SIZE_TRANSFORMER, SEQ_LENGTH_TRANSFORMER, True),
+        ("Generierung", 1, GENERATION_CONTEXT_TRANSFORMER, False),
+    ]
+
+
+def _tensor_bytes(output) -> int:
+    """Summiert die Größe aller Tensoren in einer Modul-Ausgabe."""
+    if isinstance(output, torch.Tensor):
+        return output.numel() * output.element_size()
+    if isinstance(output, (tuple, list)):
+        return sum(_tensor_bytes(o) for o in output)
+    return 0
+
+
+def _vocab_size(model: nn.Module) -> int:
+    if hasattr(model, "vocab_size"):
+        return model.vocab_size
+    for module in model.modules():
+        if isinstance(module, nn.Embedding):
+            return module.num_embeddings
+    raise ValueError("Vokabulargröße des Modells nicht ermittelbar")
+
+
+def _logits(output) -> torch.Tensor:
+    # LSTM liefert (logits, hidden), MiniGPT nur logits
+    return output[0] if isinstance(output, tuple) else output
+
+
+def _estimate_lstm_flops(lstm: nn.LSTM, batch_size: int, seq_len: int) -> int:
+    """
+    Schätzt die FLOPs eines nn.LSTM (der fused Kernel wird vom
+    FlopCounter nicht erfasst): 4 Gates × (Input + Hidden) × Hidden
+    Multiply-Adds pro Token und Layer.
+    """
+    hidden = lstm.hidden_size
+    directions = 2 if lstm.bidirectional else 1
+    flops = 0
+    input_size = lstm.input_size
+    for _ in range(lstm.num_layers):
+        flops += 2 * 4 * hidden * (input_size + hidden) * directions
+        input_size = hidden * directions
+    return flops * batch_size * seq_len
+
+
+class _ModuleTracker:
+    """
+    Forward-Hooks, die Zeit, Aktivierungen und den aktuell aktiven
+    Modul-Stack mitschreiben. Die Zeit eines Moduls ist exklusiv, d.h.
+    ohne die Zeit seiner Kind-Module.
+    """
+
+    def __init__(self, model: nn.Module, synchronize):
+        self.model = model
+        self.synchronize = synchronize
+        self.stack = []
+        self.time = {}
+        self.activations = {}
+        self.allocations = {}
+        self.recording = False
+        self._handles = []
+
+    def __enter__(self):
+        for name, module in self.model.named_modules():
+            name = name or "(root)"
+            self._handles.append(module.register_forward_pre_hook(self._make_pre_hook(name)))
+            self._handles.append(module.register_forward_hook(self._make_post_hook(name)))
+        return self
+
+    def __exit__(self, *exc):
+        for handle in self._handles:
+            handle.remove()
+        self._handles.clear()
+        return False
+
+    def current(self) -> str:
+        return self.stack[-1][0] if self.stack else None
+
+    def _make_pre_hook(self, name):
+        def hook(module, inputs):
+            self.synchronize()
+            # [name, startzeit, zeit der kinder]
+            self.stack.append([name, time.perf_counter(), 0.0])
+        return hook
+
+    def _make_post_hook(self, name):
+        def hook(module, inputs, output):
+            self.synchronize()
+            _, start, child_time = self.stack.pop()
+            inclusive = time.perf_counter() - start
+            if self.stack:
+                self.stack[-1][2] += inclusive
+            if self.recording:
+                self.time[name] = self.time.get(name, 0.0) + inclusive - child_time
+                self.activations[name] = _tensor_bytes(output)
+        return hook
+
+
+class _AllocationCounter(TorchDispatchMode):
+    """Zählt neu erzeugte Ausgabe-Tensoren pro aktivem Modul."""
+
+    def __init__(self, tracker: _ModuleTracker):
+        super().__init__()
+        self.tracker = tracker
+
+    def __torch_dispatch__(self, func, types, args=(), kwargs=None):
+        out = func(*args, **(kwargs or {}))
+        name = self.tracker.current()
+        if name is not None:
+            new_tensors = sum(
+                1 for ret in func._schema.returns
+                if ret.alias_info is None and "Tensor" in str(ret.type)
+            )
+            self.tracker.allocations[name] = self.tracker.allocations.get(name, 0) + new_tensors
+        return out
+
+
+def _split_self_flops(flop_counts: dict, root_name: str) -> dict:
+    """
+    FlopCounterMode liefert inklusive Werte ("MiniGPT.blocks.0" enthält
+    die FLOPs aller Kinder). Rechnet auf exklusive Werte pro Modul um.
+    """
+    inclusive = {}
+    for key, ops in flop_counts.items():
+        if key == "Global":
+            continue
+        name = key[len(root_name) + 1:] if key != root_name else "(root)"
+        inclusive[name] = sum(ops.values())
+
+    exclusive = dict(inclusive)
+    for name, flops in inclusive.items():
+        if name == "(root)":
+            continue
+        parent = name.rsplit(".", 1)[0] if "." in name else "(root)"
+        # Nächsten gemessenen Vorfahren suchen (nicht jedes Modul hat FLOPs)
+        while parent not in inclusive and parent != "(root)":
+            parent = parent.rsplit(".", 1)[0] if "." in parent else "(root)"
+        if parent in exclusive:
+            exclusive[parent] -= flops
+    return exclusive
+
+
+def profile_model(
+    model: nn.Module,
+    batch_size: int,
+    seq_len: int,
+    label: str = "",
+    backward: bool = False,
+    repeats: int = PROFILE_REPEATS,
+    warmup: int = PROFILE_WARMUP,
+) -> ProfileResult:
+    """
+    Führt echte Forward- (und optional Backward-) Pässe aus und misst
+    Laufzeit, FLOPs, Aktivierungen und Allokationen pro Modul.
+
+    Das Modell wird während der Messung in den eval-Modus versetzt (kein
+    Dropout) und danach in seinen vorherigen Modus zurückgesetzt.
+    Gradienten aus dem Backward-Pass werden wieder verworfen.
+
+    Args:
+        model: MiniGPT, SimpleLanguageModel oder ein anderes Token-Modell
+        batch_size: Batch-Größe der Eingabe
+        seq_len: Sequenzlänge der Eingabe
+        label: Bezeichnung für den Report (z.B. "Training")
+        backward: Zusätzlich einen Backward-Pass messen
+        repeats: Anzahl gemessener Durchläufe
+        warmup: Anzahl ungemessener Durchläufe vorab
+
+    Returns:
+        ProfileResult mit Gesamt- und Modul-Messwerten
+    """
+    device = next(model.parameters()).device
+    was_training = model.training
+    root_name = type(model).__name__
+
+    if device.type == "cuda":
+        synchronize = torch.cuda.synchronize
+    else:
+        def synchronize():
+            pass
+
+    generator = torch.Generator().manual_seed(0)
+    vocab_size = _vocab_size(model)
+    x = torch.randint(0, vocab_size, (batch_size, seq_len), generator=generator).to(device)
+    y = torch.randint(0, vocab_size, (batch_size, seq_len), generator=generator).to(device)
+
+    model.eval()
+    try:
+        with _ModuleTracker(model, synchronize) as tracker:
+            # Warmup + Zeitmessung Forward
+            with torch.no_grad():
+                for _ in range(warmup):
+                    model(x)
+                tracker.recording = True
+                synchronize()
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    model(x)
+                synchronize()
+                forward_ms = (time.perf_counter() - start) * 1000 / repeats
+                tracker.recording = False
+
+            # Allokationen (ein einzelner Durchlauf)
+            with torch.no_grad(), _AllocationCounter(tracker):
+                model(x)
+
+        # FLOPs pro Modul (ein einzelner Durchlauf)
+        flop_counter = FlopCounterMode(display=False)
+        with torch.no_grad(), flop_counter:
+            model(x)
+        self_flops = _split_self_flops(flop_counter.get_flop_counts(), root_name)
+        forward_flops = flop_counter.get_total_flops()
+
+        # Backward (nur wenn es trainierbare Parameter gibt)
+        backward_ms = None
+        backward_flops = None
+        params = [p for p in model.parameters() if p.requires_grad]
+        if backward and params:
+            saved_grads = [p.grad for p in params]
+
+            def train_step():
+                logits = _logits(model(x))
+                loss = F.cross_entropy(logits.reshape(-1, vocab_size), y.reshape(-1))
+                synchronize()
+                step_start = time.perf_counter()
+                loss.backward()
+                synchronize()
+                return time.perf_counter() - step_start
+
+            for _ in range(warmup):
+                train_step()
+            backward_ms = sum(train_step() for _ in range(repeats)) * 1000 / repeats
+
+            backward_counter = FlopCounterMode(display=False)
+            with backward_counter:
+                logits = _logits(model(x))
+                loss = F.cross_entropy(logits.reshape(-1, vocab_size), y.reshape(-1))
+                forward_only = backward_counter.get_total_flops()
+                loss.backward()
+            backward_flops = backward_counter.get_total_flops() - forward_only
+
+            for p, grad in zip(params, saved_grads):
+                p.grad = grad
+    finally:
+        model.train(was_training)
+
+    modules = []
+    estimated_any = False
+    for name, module in model.named_modules():
+        name = name or "(root)"
+        if name not in tracker.time:
+            continue
+        flops = self_flops.get(name, 0)
+        estimated = False
+        if isinstance(module, nn.LSTM) and flops == 0:
+            flops = _estimate_lstm_flops(module, batch_size, seq_len)
+            forward_flops += flops
+            estimated = estimated_any = True
+        modules.append(ModuleProfile(
+            name=name,
+            type=type(module).__name__,
+            category=module_category(name, module),
+            time_ms=tracker.time[name] * 1000 / repeats,
+            flops=flops,
+            activation_bytes=tracker.activations.get(name, 0),
+            allocations=tracker.allocations.get(name, 0),
+            flops_estimated=estimated,
+        ))
+
+    if estimated_any:
+        # Der Backward-Pass des fused Kernels ist ebenfalls nicht erfasst
+        backward_flops = None
+
+    return ProfileResult(
+        label=label,
+        batch_size=batch_size,
+        seq_len=seq_len,
+        forward_ms=forward_ms,
+        backward_ms=backward_ms,
+        forward_flops=forward_flops,
+        backward_flops=backward_flops,
+        device=str(device),
+        modules=modules,
+    )
+
+
+def profile_model_shapes(model: nn.Module, shapes: list = None) -> list:
+    """Profiliert ein Modell für mehrere Eingabeformen (Standard: Training + Generierung)."""
+    shapes = shapes or default_profile_shapes(model)
+    return [
+        profile_model(model, batch_size, seq_len, label=label, backward=backward)
+        for label, batch_size, seq_len, backward in shapes
+    ]
+
+
+def _format_flops(flops: int) -> str:
+    if flops >= 1e9:
+        return f"{flops / 1e9:.2f} G"
+    if flops >= 1e6:
+        return f"{flops / 1e6:.2f} M"
+    if flops >= 1e3:
+        return f"{flops / 1e3:.1f} k"
+    return str(flops)
+
+
+def _format_bytes(num_bytes: int) -> str:
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes / 1024 / 1024:.2f} MB"
+    if num_bytes >= 1024:
+        return f"{num_bytes / 1024:.1f} KB"
+    return f"{num_bytes} B"
+
+
+def format_profile_markdown(results: list, max_modules: int = 12) -> str:
+    """
+    Formatiert Profil-Ergebnisse als Markdown-Abschnitt für die Reports.
+
+    Args:
+        results: Liste von ProfileResult
+        max_modules: Anzahl der teuersten Module in der Detail-Tabelle
+    """
+    if not results:
+        return ""
+
+    md = f"""## Laufzeit-Profil (gemessen)
+
+Echte Forward-Pässe auf `{results[0].device}` (Mittel über {PROFILE_REPEATS} Durchläufe,
+eval-Modus). Zeiten sind exklusiv, d.h. ohne Kind-Module. Aktivierungen =
+Größe der Modul-Ausgaben, Allokationen = neu erzeugte Tensoren (ohne Views).
+"""
+
+    for result in results:
+        total_time = sum(m.time_ms for m in result.modules) or 1.0
+        total_flops = result.forward_flops or 1
+
+        md += f"\n### {result.label} (Batch {result.batch_size} × Sequenz {result.seq_len})\n\n"
+        md += "| Messung | Wert |\n|---------|------|\n"
+        md += f"| **Forward** | {result.forward_ms:.3f} ms |\n"
+        if result.backward_ms is not None:
+            md += f"| **Backward** | {result.backward_ms:.3f} ms |\n"
+        md += f"| **FLOPs (Forward)** | {_format_flops(result.forward_flops)} |\n"
+        if result.backward_flops is not None:
+            md += f"| **FLOPs (Backward)** | {_format_flops(result.backward_flops)} |\n"
+        md += "\n"
+
+        md += "| Bereich | Zeit (ms) | Anteil Zeit | FLOPs | Anteil FLOPs | Aktivierungen | Allokationen |\n"
+        md += "|---------|-----------|-------------|-------|--------------|---------------|--------------|\n"
+        for category, entry in result.by_category().items():
+            flops_str = _format_flops(entry.flops) + (" *" if entry.flops_estimated else "")
+            md += (
+                f"| {category} | {entry.time_ms:.3f} | {entry.time_ms / total_time * 100:.1f}% "
+                f"| {flops_str} | {entry.flops / total_flops * 100:.1f}% "
+                f"| {_format_bytes(entry.activation_bytes)} | {entry.allocations} |\n"
+            )
+
+        top = sorted(result.modules, key=lambda m: m.time_ms, reverse=True)[:max_modules]
+        md += f"\n**Teuerste Module ({len(top)} von {len(result.modules)}):**\n\n"
+        md += "| Modul | Typ | Zeit (ms) | FLOPs | Aktivierungen | Allokationen |\n"
+        md += "|-------|-----|-----------|-------|---------------|--------------|\n"
+        for mod in top:
+            flops_str = _format_flops(mod.flops) + (" *" if mod.flops_estimated else "")
+            md += (
+                f"| `{mod.name}` | {mod.type} | {mod.time_ms:.3f} | {flops_str} "
+                f"| {_format_bytes(mod.activation_bytes)} | {mod.allocations} |\n"
+            )
+
+    if any(m.flops_estimated for r in results for m in r.modules):
+        md += "\n\\* geschätzt (fused LSTM-Kernel wird vom FLOP-Counter nicht erfasst)\n"
+
+    return md + "\n"
+
+
+def build_profile_section(model: nn.Module, shapes: list = None) -> str:
+    """
+    Profiliert ein Modell und liefert den Markdown-Abschnitt für die Reports.
+
+    Fehler beim Profiling brechen das Speichern des Modells nicht ab,
+    sondern werden als Hinweis im Report vermerkt.
+    """
+    try:
+        return format_profile_markdown(profile_model_shapes(model, shapes))
+    except Exception as e:
+        print(f"   ⚠️ Profiling fehlgeschlagen: {e}")
+        return f"## Laufzeit-Profil (gemessen)\n\nProfiling fehlgeschlagen: `{e}`\n\n"
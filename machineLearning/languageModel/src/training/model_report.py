@@ -9,6 +9,8 @@ Unterstützt LSTM und Transformer Architekturen.
 from pathlib import Path
 import torch.nn as nn
 
+from .model_profiler import build_profile_section
+
 
 def count_parameters(model: nn.Module) -> int:
     """Zählt alle trainierbaren Parameter eines Modells."""
@@ -30,7 +32,8 @@ def get_layer_params(model: nn.Module) -> dict:
     return layer_params
 
 
-def generate_model_report(model: nn.Module, save_path: Path, model_name: str = None) -> str:
+def generate_model_report(model: nn.Module, save_path: Path, model_name: str = None,
+                          profile: bool = True) -> str:
     """
     Erstellt einen detaillierten Modell-Report als Markdown-Datei.
 
@@ -42,6 +45,7 @@ def generate_model_report(model: nn.Module, save_path: Path, model_name: str = N
         model: Das PyTorch-Modell
         save_path: Pfad zum Speichern des Reports
         model_name: Optional - Name des Modells für den Report
+        profile: Laufzeit-Profil (Zeit, FLOPs, Aktivierungen pro Modul) messen
 
     Returns:
         Der generierte Report als String
@@ -68,6 +72,9 @@ def generate_model_report(model: nn.Module, save_path: Path, model_name: str = N
     else:
         report = _generate_generic_report(model, total_params, memory_str, gpt2_factor, gpt3_factor)
 
+    if profile:
+        report = _insert_before_files(report, build_profile_section(model))
+
     # Datei speichern
     report_path = save_path / "MODEL_REPORT.md"
     with open(report_path, "w", encoding="utf-8") as f:
@@ -77,6 +84,14 @@ def generate_model_report(model: nn.Module, save_path: Path, model_name: str = N
     return report
 
 
+def _insert_before_files(report: str, section: str) -> str:
+    """Fügt einen Abschnitt vor "## Modell-Dateien" ein (sonst am Ende)."""
+    marker = "## Modell-Dateien"
+    if marker not in report:
+        return report + "\n" + section
+    return report.replace(marker, section + marker, 1)
+
+
 def _generate_lstm_report(model, total_params, memory_str, gpt2_factor, gpt3_factor) -> str:
     """Generiert Report für LSTM-Modell."""
     vocab_size = model.vocab_size
@@ -241,6 +256,7 @@ def generate_finetuning_report(
     lora_target_modules: list = None,
     frozen_layers: list = None,
     trainable_layers: list = None,
+    profile: bool = True,
 ) -> str:
     """
     Erstellt einen detaillierten Report für ein fine-getuntes Modell.
@@ -263,6 +279,7 @@ def generate_finetuning_report(
         lora_target_modules: LoRA-Zielschichten (nur für LoRA)
         frozen_layers: Eingefrorene Schichten (nur für Layer Freezing)
         trainable_layers: Trainierte Schichten (nur für Layer Freezing)
+        profile: Laufzeit-Profil (Zeit, FLOPs, Aktivierungen pro Modul) messen
     """
     save_path = Path(save_path)
     frozen_params = total_params - trainable_params
@@ -476,6 +493,10 @@ wie ein regulär fine-getuntes Modell.
             report += f"{i}. _{sentence}_\n"
         report += "\n"
 
+    # --- Laufzeit-Profil ---
+    if profile:
+        report += build_profile_section(model)
+
     # --- Dateien ---
     report += "## Modell-Dateien\n\n"
 
@@ -68,9 +68,13 @@ class PositionalEncoding(nn.Module):
         # Als Buffer registrieren (nicht trainierbar)
         self.register_buffer('pe', pe.unsqueeze(0))
 
-    def forward(self, x):
-        """Addiert Positional Encoding zu den Embeddings."""
-        return x + self.pe[:, :x.size(1)]
+    def forward(self, x, offset: int = 0):
+        """
+        Addiert Positional Encoding zu den Embeddings.
+
+        offset: Position des ersten Tokens (> 0 beim Weiterrechnen mit KV-Cache)
+        """
+        return x + self.pe[:, offset:offset + x.size(1)]
 
 
 # =============================================================================
@@ -108,14 +112,19 @@ class SelfAttention(nn.Module):
         # Speichert Attention Weights für Visualisierung
         self.attention_weights = None
 
-    def forward(self, x, mask=None):
+    def forward(self, x, mask=None, past_kv=None, use_cache=False):
         """
         Args:
             x: [batch_size, seq_len, embed_dim]
             mask: Optional, verhindert Attention auf zukünftige Tokens
+            past_kv: Optional, (K, V) bereits berechneter Tokens
+                     [batch, heads, past_len, head_dim] - diese werden
+                     nicht erneut berechnet (KV-Cache)
+            use_cache: Zusätzlich (K, V) aller Tokens zurückgeben
 
         Returns:
             output: [batch_size, seq_len, embed_dim]
+            (bei use_cache: (output, (K, V)))
         """
         batch_size, seq_len, _ = x.shape
 
@@ -130,6 +139,11 @@ class SelfAttention(nn.Module):
         K = K.view(batch_size, seq_len, self.num_heads, self.head_dim).transpose(1, 2)
         V = V.view(batch_size, seq_len, self.num_heads, self.head_dim).transpose(1, 2)
 
+        # KV-Cache: Keys/Values der vorherigen Tokens voranstellen
+        if past_kv is not None:
+            K = torch.cat([past_kv[0], K], dim=2)
+            V = torch.cat([past_kv[1], V], dim=2)
+
         # Attention Scores berechnen: QK^T / √d_k
         # [batch, heads, seq, head_dim] @ [batch, heads, head_dim, seq]
         # -> [batch, heads, seq, seq]
@@ -155,6 +169,8 @@ class SelfAttention(nn.Module):
         # Finale Projektion
         output = self.out_proj(attended)
 
+        if use_cache:
+            return output, (K, V)
         return output
 
 
@@ -188,15 +204,20 @@ class TransformerBlock(nn.Module):
 
         self.dropout = nn.Dropout(dropout)
 
-    def forward(self, x, mask=None):
+    def forward(self, x, mask=None, past_kv=None, use_cache=False):
         # Self-Attention + Residual
-        attended = self.attention(x, mask)
+        if use_cache:
+            attended, present_kv = self.attention(x, mask, past_kv=past_kv, use_cache=True)
+        else:
+            attended = self.attention(x, mask, past_kv=past_kv)
         x = self.norm1(x + self.dropout(attended))
 
         # Feed-Forward + Residual
         ff_out = self.ff(x)
         x = self.norm2(x + ff_out)
 
+        if use_cache:
+            return x, present_kv
         return x
 
 
@@ -258,33 +279,48 @@ class MiniGPT(nn.Module):
         print(f"   - Transformer Layers: {num_layers}")
         print(f"   - Weight Tying: {'Ja' if weight_tying else 'Nein'}")
 
-    def forward(self, x):
+    def forward(self, x, past_kv=None, use_cache=False):
         """
         Forward Pass.
 
         Args:
             x: Token IDs [batch_size, seq_len]
+            past_kv: Optional, Liste mit (K, V) pro Layer für die Tokens
+                     VOR x (siehe inference/prefix_cache.py). x enthält
+                     dann nur die neuen Tokens.
+            use_cache: Zusätzlich die (K, V) aller Tokens pro Layer zurückgeben
 
         Returns:
             logits: [batch_size, seq_len, vocab_size]
+            (bei use_cache: (logits, [(K, V), ...]))
         """
         batch_size, seq_len = x.shape
+        past_len = past_kv[0][0].size(2) if past_kv else 0
 
         # Token Embedding + Positional Encoding
         x = self.token_embedding(x)
-        x = self.pos_encoding(x)
+        x = self.pos_encoding(x, offset=past_len)
 
         # Causal Mask für diese Sequenzlänge
-        mask = self.causal_mask[:, :, :seq_len, :seq_len]
+        # (neue Tokens sehen alle vorherigen + sich selbst)
+        mask = self.causal_mask[:, :, past_len:past_len + seq_len, :past_len + seq_len]
 
         # Durch alle Transformer Blocks
-        for block in self.blocks:
-            x = block(x, mask)
+        present_kv = []
+        for i, block in enumerate(self.blocks):
+            layer_past = past_kv[i] if past_kv else None
+            if use_cache:
+                x, layer_kv = block(x, mask, past_kv=layer_past, use_cache=True)
+                present_kv.append(layer_kv)
+            else:
+                x = block(x, mask, past_kv=layer_past)
 
         # Finale Normalisierung und Projektion auf Vokabular
         x = self.ln_final(x)
         logits = self.lm_head(x)
 
+        if use_cache:
+            return logits, present_kv
         return logits
 
     def get_attention_weights(self):
@@ -30,23 +30,26 @@ def run_evaluation(dataset_choice):
 
     log_lines = []
     results = []
+    store = None
+    run_ids = []
 
     def log(msg):
         log_lines.append(msg)
 
     def make_df():
-        if not results:
+        # Aggregated in SQL; includes partially scored runs while judging
+        if store is None:
             return pd.DataFrame()
-        ranked = sorted(results, key=lambda r: r.avg_gesamt, reverse=True)
         rows = []
-        for i, r in enumerate(ranked, 1):
+        for i, r in enumerate(store.leaderboard(run_ids), 1):
             rows.append({
                 "Rang": i,
-                "Modell": r.label,
-                "Gesamt": f"{r.avg_gesamt:.2f}",
-                "Grammatik": f"{r.avg_grammatik:.2f}",
-                "Kohaerenz": f"{r.avg_kohaerenz:.2f}",
-                "Relevanz": f"{r.avg_relevanz:.2f}",
+                "Modell": r["label"],
+                "Gesamt": f"{r['avg_gesamt']:.2f}",
+                "Grammatik": f"{r['avg_grammatik']:.2f}",
+                "Kohaerenz": f"{r['avg_kohaerenz']:.2f}",
+                "Relevanz": f"{r['avg_relevanz']:.2f}",
+                "Bewertet": f"{r['scored']}/{r['n_prompts']}",
             })
         return pd.DataFrame(rows)
 
@@ -54,9 +57,7 @@ def run_evaluation(dataset_choice):
     log("Suche verfuegbare Modelle...")
     yield "\n".join(log_lines), make_df()
 
-    from inference.inference_finetuned import (
-        discover_models, load_model_by_type, generate_text,
-    )
+    from inference.inference_finetuned import discover_models
 
     available = discover_models(base_dir)
 
@@ -78,23 +79,42 @@ def run_evaluation(dataset_choice):
         log(f"  - {name}: {info['label']}")
     yield "\n".join(log_lines), make_df()
 
-    # ---- 2. Check cache ----
-    from evaluation.evaluation_cache import (
-        load_cache, save_cache, get_cached_result, update_cache,
+    # ---- 2. Check evaluation store ----
+    from evaluation.evaluation_store import (
+        DB_FILENAME, checkpoint_hash, evaluation_config, get_evaluation_store,
     )
+    from evaluation.judge_config import (
+        DEFAULT_TEST_PROMPTS,
+        GENERATION_TEMPERATURE,
+        GENERATION_MAX_LENGTH,
+        GENERATION_SEED,
+    )
+
+    from evaluation.prefilter import get_prefilter
 
-    cache = load_cache(cache_dir)
+    store = get_evaluation_store(cache_dir / DB_FILENAME)
+    prefilter = get_prefilter(base_dir)
+    config = evaluation_config(
+        DEFAULT_TEST_PROMPTS, max_length=GENERATION_MAX_LENGTH,
+        temperature=GENERATION_TEMPERATURE, seed=GENERATION_SEED,
+        prefilter=prefilter.settings() if prefilter else None,
+    )
     cached_results = {}
     models_to_evaluate = {}
 
     for name, info in available.items():
-        cached = get_cached_result(cache, name, info["path"])
-        if cached:
+        run_id = store.open_run(name, info["label"], checkpoint_hash(info, base_dir), config)
+        run_ids.append(run_id)
+        done = store.scored_outputs(run_id)
+        if len(done) == len(DEFAULT_TEST_PROMPTS):
+            cached = store.load_result(run_id, info["label"])
             cached_results[name] = cached
             results.append(cached)
             log(f"  [{name}] Cache-Treffer")
         else:
-            models_to_evaluate[name] = info
+            if done:
+                log(f"  [{name}] Setze fort: {len(done)}/{len(DEFAULT_TEST_PROMPTS)} bereits bewertet")
+            models_to_evaluate[name] = {**info, "run_id": run_id, "done": done}
 
     yield "\n".join(log_lines), make_df()
 
@@ -124,79 +144,52 @@ def run_evaluation(dataset_choice):
     yield "\n".join(log_lines), make_df()
 
     # ---- 4. Evaluate uncached models ----
-    from evaluation.judge_config import (
-        DEFAULT_TEST_PROMPTS,
-        GENERATION_TEMPERATURE,
-        GENERATION_MAX_LENGTH,
-        GeneratedOutput,
-        ModelEvaluationResult,
-    )
-    from evaluation.judge import evaluate_single_output
+    from concurrent.futures import ThreadPoolExecutor, wait
+    from evaluation.contamination_index import annotate_contamination, get_contamination_index
+    from evaluation.evaluation_pipeline import EvaluationPipeline
+    from evaluation.judge_cache import get_judge_cache
+    from evaluation.judge_dispatcher import JudgeDispatcher
+    from inference.generation_cache import get_generation_cache
     from training.data import TRAINING_DATA, TRAINING_DATA_M, TRAINING_DATA_L
 
     datasets_map = {
         "s": TRAINING_DATA, "m": TRAINING_DATA_M, "l": TRAINING_DATA_L,
     }
-    training_set = {t.lower().strip() for t in datasets_map.get(ds, TRAINING_DATA)}
-
-    for model_key, info in models_to_evaluate.items():
-        try:
-            log(f"\n[{model_key}] Lade {info['label']}...")
-            yield "\n".join(log_lines), make_df()
-
-            if info["type"] == "lstm":
-                from training.training_lstm import load_model as load_lstm
-                model, tokenizer = load_lstm(str(info["path"]))
-            else:
-                model, tokenizer = load_model_by_type(info, base_dir)
-        except Exception as e:
-            log(f"[{model_key}] Fehler beim Laden: {e}")
-            yield "\n".join(log_lines), make_df()
-            continue
-
-        model_result = ModelEvaluationResult(
-            model_name=model_key, label=info["label"],
-        )
-
-        for prompt_text in DEFAULT_TEST_PROMPTS:
-            generated = generate_text(
-                model, tokenizer, prompt_text,
-                max_length=GENERATION_MAX_LENGTH,
-                temperature=GENERATION_TEMPERATURE,
-            )
+    contamination_index = get_contamination_index(
+        datasets_map.get(ds, TRAINING_DATA), cache_dir / f"contamination_{ds}.sqlite3",
+    )
 
-            log(f"  [{info['label']}] '{prompt_text}' -> '{generated}'")
-            log("  Bewerte...")
-            yield "\n".join(log_lines), make_df()
+    judge_cache = get_judge_cache()
+    dispatcher = JudgeDispatcher(log=log, cache=judge_cache, prefilter=prefilter)
+    pipeline = EvaluationPipeline(
+        dispatcher, store, get_generation_cache(base_dir / "generation_cache.sqlite3"),
+        DEFAULT_TEST_PROMPTS, base_dir, log=log,
+    )
+    log(f"\nGenerierung und Bewertung laufen ueberlappend "
+        f"({dispatcher.max_concurrency} parallel, {dispatcher.batch_size} pro Anfrage)...")
+    yield "\n".join(log_lines), make_df()
 
-            score = evaluate_single_output(prompt_text, generated)
-            in_data = generated.lower().strip() in training_set
-
-            output = GeneratedOutput(
-                model_name=model_key,
-                prompt=prompt_text,
-                generated_text=generated,
-                score=score,
-                in_training_data=in_data,
-            )
-            model_result.outputs.append(output)
-
-            if score:
-                log(
-                    f"  -> G:{score.grammatik_score} K:{score.kohaerenz_score} "
-                    f"R:{score.relevanz_score} = {score.gesamt_score:.2f}"
-                )
-            else:
-                log("  -> Bewertung fehlgeschlagen")
+    # Pipeline runs in the background; stream log + live leaderboard meanwhile
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        run = executor.submit(pipeline.run, models_to_evaluate)
+        while not wait([run], timeout=0.5).done:
             yield "\n".join(log_lines), make_df()
+        new_results = run.result()
 
-        results.append(model_result)
-        update_cache(cache, model_key, info["path"], model_result)
-        yield "\n".join(log_lines), make_df()
+    results.extend(new_results.values())
+    annotate_contamination(results, contamination_index)
+    for r in results:
+        log(f"  [{r.model_name}] Memoriert: {r.memorization_rate:.0%} "
+            f"(exakt {r.exact_match_rate:.0%}, Ø Ueberlappung {r.avg_longest_overlap:.1f} Woerter)")
+    yield "\n".join(log_lines), make_df()
 
-    # ---- 5. Save cache + generate report ----
-    save_cache(cache_dir, cache)
+    dispatcher.close()
+    log(f"\n{pipeline.format_stats()}")
+    log(judge_cache.format_stats())
+    if prefilter:
+        log(prefilter.format_stats())
 
+    # ---- 5. Generate report ----
     try:
         from evaluation.evaluation_report import generate_evaluation_report
         generate_evaluation_report(results, cache_dir)
@@ -89,25 +89,35 @@ def _load_model(name, info):
     return model, tokenizer
 
 
-def _generate(info, model, tokenizer, prompt, temperature, max_length, top_k, top_p):
-    """Generate text using the appropriate function for the model type."""
+def _parse_seed(seed):
+    """Seed from the UI: empty field means unseeded (random, not cached)."""
+    if seed is None or seed == "":
+        return None
+    return int(seed)
+
+
+def _generate(name, info, model, tokenizer, prompt, temperature, max_length, top_k, top_p,
+              seed=None):
+    """Generate text using the appropriate function for the model type.
+
+    Seeded generations go through the persistent generation cache.
+    """
+    from inference.generation_cache import get_generation_cache
+
     if info["type"] == "lstm":
-        from inference.inference_lstm import generate_text_interactive
-        return generate_text_interactive(
-            model, tokenizer, prompt,
-            max_length=int(max_length), temperature=temperature,
-            top_p=top_p, top_k=int(top_k),
-        )
+        from inference.inference_lstm import generate_text_interactive as generate_fn
+        params = dict(max_length=int(max_length), temperature=temperature,
+                      top_p=top_p, top_k=int(top_k))
     else:
-        from inference.inference_finetuned import generate_text
-        return generate_text(
-            model, tokenizer, prompt,
-            max_length=int(max_length), temperature=temperature,
-            top_p=top_p,
-        )
+        from inference.inference_finetuned import generate_text as generate_fn
+        params = dict(max_length=int(max_length), temperature=temperature, top_p=top_p)
+
+    return get_generation_cache(_get_base_dir() / "generation_cache.sqlite3").generate(
+        name, model, tokenizer, prompt, generate_fn, seed, **params,
+    )
 
 
-def generate_single(model_selection, prompt, temperature, max_length, top_k, top_p):
+def generate_single(model_selection, prompt, temperature, max_length, top_k, top_p, seed=None):
     """Generate text with a single selected model."""
     if not model_selection:
         return "Kein Modell ausgewaehlt."
@@ -123,13 +133,17 @@ def generate_single(model_selection, prompt, temperature, max_length, top_k, top
     info = models[name]
     model, tokenizer = _load_model(name, info)
     return _generate(
-        info, model, tokenizer, prompt.strip(),
-        temperature, max_length, top_k, top_p,
+        name, info, model, tokenizer, prompt.strip(),
+        temperature, max_length, top_k, top_p, _parse_seed(seed),
     )
 
 
-def compare_all_models(prompt, temperature, max_length, top_k, top_p):
-    """Generate text with all models and return a comparison DataFrame."""
+def compare_all_models(prompt, temperature, max_length, top_k, top_p, seed=None):
+    """Generate text with all models and return a comparison DataFrame.
+
+    With a seed the table is reproducible and repeated comparisons are
+    answered from the generation cache.
+    """
     if not prompt.strip():
         return pd.DataFrame({"Fehler": ["Bitte einen Prompt eingeben."]})
 
@@ -142,8 +156,8 @@ def compare_all_models(prompt, temperature, max_length, top_k, top_p):
         try:
             model, tokenizer = _load_model(name, info)
             result = _generate(
-                info, model, tokenizer, prompt.strip(),
-                temperature, max_length, top_k, top_p,
+                name, info, model, tokenizer, prompt.strip(),
+                temperature, max_length, top_k, top_p, _parse_seed(seed),
             )
             rows.append({"Modell": info["label"], "Generierter Text": result})
         except Exception as e:
@@ -183,6 +197,9 @@ def build_inference_tab():
             )
             top_k = gr.Slider(1, 50, value=5, step=1, label="Top-K")
             top_p = gr.Slider(0.1, 1.0, value=0.9, step=0.05, label="Top-P")
+            seed = gr.Number(
+                value=42, precision=0, label="Seed (leer = zufaellig)",
+            )
 
         with gr.Row():
             gen_btn = gr.Button("Text generieren", variant="primary")
@@ -195,13 +212,13 @@ def build_inference_tab():
 
         gen_btn.click(
             fn=generate_single,
-            inputs=[model_selection, prompt, temperature, max_length, top_k, top_p],
+            inputs=[model_selection, prompt, temperature, max_length, top_k, top_p, seed],
             outputs=[output_text],
         )
 
         compare_btn.click(
             fn=compare_all_models,
-            inputs=[prompt, temperature, max_length, top_k, top_p],
+            inputs=[prompt, temperature, max_length, top_k, top_p, seed],
             outputs=[comparison_table],
         )
 
@@ -0,0 +1,58 @@
+"""
+Regression test: EvaluationPipeline.run returns every output.
+
+Future.wait() returns before the done-callbacks (_on_scored) have run, so
+results built right after waiting on the futures missed outputs that
+were still being recorded. The judge here is a stub; no model is loaded.
+
+Usage:
+    python -m pytest test/
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import evaluation.evaluation_pipeline as evaluation_pipeline  # noqa: E402
+from evaluation.evaluation_store import EvaluationStore  # noqa: E402
+from evaluation.judge_config import EvaluationScore  # noqa: E402
+from evaluation.judge_dispatcher import JudgeDispatcher  # noqa: E402
+
+PROMPTS = [f"Prompt {i}" for i in range(10)]
+RUNS = 50
+
+
+class _EchoGenerationCache:
+    def generate(self, model_name, model, tokenizer, prompt, generate_fn, seed, **params):
+        return f"{prompt} weiter"
+
+
+def _stub_judge(prompt, generated_text, timeout=None):
+    time.sleep(random.random() * 0.002)
+    return EvaluationScore.from_dict({
+        "grammatik_score": 3, "kohaerenz_score": 4, "relevanz_score": 5, "begruendung": "",
+    })
+
+
+def test_run_returns_all_outputs(tmp_path, monkeypatch):
+    monkeypatch.setattr(evaluation_pipeline, "load_evaluation_model",
+                        lambda info, base_dir: (object(), object()))
+
+    for run in range(RUNS):
+        store = EvaluationStore(tmp_path / f"store_{run}.sqlite3")
+        run_id = store.open_run("m", "Modell", "checkpoint", {"prompts": PROMPTS})
+        with JudgeDispatcher(batch_size=1, max_concurrency=4, judge_fn=_stub_judge,
+                             log=None) as dispatcher:
+            pipeline = evaluation_pipeline.EvaluationPipeline(
+                dispatcher, store, _EchoGenerationCache(), PROMPTS, tmp_path, log=None,
+            )
+            results = pipeline.run({"m": {"label": "Modell", "run_id": run_id, "done": {}}})
+
+        outputs = results["m"].outputs
+        assert len(outputs) == len(PROMPTS)
+        assert [o.prompt for o in outputs] == PROMPTS
+        assert len(store.scored_outputs(run_id)) == len(PROMPTS)
+        store.close()
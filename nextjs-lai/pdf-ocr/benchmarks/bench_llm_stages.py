@@ -0,0 +1,149 @@
+"""Benchmark the LLM stages of the OCR pipeline against the local LLM stub.
+
+Runs synthetic A4 page images through the PagePipeline (vision OCR,
+combination with the Tesseract text, cleanup) at several per-stage LLM
+concurrency levels. Rendering and Tesseract are replaced by fixed
+results, so the numbers show client-side throughput and how much
+concurrency the LLM stages achieve.
+
+By default the shared stub (llm-stub/llm_stub.py in the repo root) is
+started in-process; --url points the benchmark at a running server
+instead (stub or real LM Studio).
+
+Usage:
+    python benchmarks/bench_llm_stages.py
+    python benchmarks/bench_llm_stages.py --pages 16 --concurrency 1,4,8 --latency lognormal:0.3,0.4
+    python benchmarks/bench_llm_stages.py --tokens-per-second 40 --errors 429:0.05
+    python benchmarks/bench_llm_stages.py --url http://localhost:1234/v1 --model google/gemma-3-12b
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+sys.path.insert(0, str(PROJECT_DIR.parents[1] / "llm-stub"))
+
+from ocr_processor import OCRProcessor  # noqa: E402
+from page_pipeline import PagePipeline  # noqa: E402
+from text_cleanup import TextCleanup  # noqa: E402
+
+TESSERACT_TEXT = "Dies ist ein Beispieltext mit einigen Feh1ern aus Tesseract. " * 20
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark the OCR LLM stages against a stub")
+    parser.add_argument("--pages", type=int, default=8, help="Synthetic pages per level")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--dpi", type=int, default=300, help="Resolution of the page images")
+    parser.add_argument("--latency", default="0.1",
+                        help='Stub time to first token, e.g. "0.2" or "uniform:0.1,0.3"')
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Stub generation speed (0 = instant)")
+    parser.add_argument("--errors", default="", help='Stub error rates, e.g. "429:0.05,500:0.02"')
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="Use a running server instead of the in-process stub")
+    parser.add_argument("--model", default="stub")
+    return parser.parse_args()
+
+
+def create_pages(count: int, dpi: int) -> list:
+    """A4 page images with some text lines."""
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    images = []
+    for i in range(count):
+        image = Image.new("RGB", (width, height), "white")
+        draw = ImageDraw.Draw(image)
+        for line in range(40):
+            draw.text((dpi // 2, dpi // 2 + line * dpi // 4),
+                      f"Seite {i + 1}, Zeile {line + 1}: Beispieltext für die OCR.", fill="black")
+        images.append(image)
+    return images
+
+
+class SyntheticExtractor:
+    """Stands in for PDFExtractor: every page needs OCR, images are pre-rendered."""
+
+    def __init__(self, images: list):
+        self.images = images
+
+    def needs_ocr(self, page_data: dict) -> bool:
+        return True
+
+    def iter_page_images(self, pdf_path, page_numbers):
+        for page_num in sorted(page_numbers):
+            yield page_num, self.images[page_num - 1]
+
+
+class StubTesseractOCR(OCRProcessor):
+    """OCRProcessor with a fixed Tesseract result (the binary is not needed)."""
+
+    def extract_text_tesseract(self, image, page_key=None) -> str:
+        return TESSERACT_TEXT
+
+
+def main():
+    args = parse_arguments()
+    server = None
+    url = args.url
+    if url is None:
+        from llm_stub import start_stub
+
+        server, url = start_stub(latency=args.latency, tokens_per_second=args.tokens_per_second,
+                                 errors=args.errors, seed=args.seed)
+
+    ocr = StubTesseractOCR(use_llm_vision=True, llm_api_base=url, llm_model=args.model,
+                           llm_api_key="not-needed")
+    cleanup = TextCleanup(use_llm=True, llm_api_base=url, llm_model=args.model,
+                          llm_api_key="not-needed")
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    images = create_pages(args.pages, args.dpi)
+    extractor = SyntheticExtractor(images)
+    pages_data = [{"page": n, "text": "", "has_text": False} for n in range(1, args.pages + 1)]
+    print(f"LLM server: {url}, {args.pages} pages at {args.dpi} DPI, 3 LLM calls per page")
+    if server:
+        print(f"Stub: latency {server.latency.spec} s, "
+              f"{args.tokens_per_second or 'instant'} tokens/s, errors: {args.errors or 'none'}")
+    print()
+    header = (f"{'LLM conc.':>9} {'Wall (s)':>9} {'Pages/s':>8} {'Speedup':>8} "
+              f"{'Requests':>9} {'Max parallel':>13} {'Image KB/page':>14}")
+    print(header)
+    print("-" * len(header))
+
+    baseline = None
+    for workers in levels:
+        if server:
+            server.reset_stats()
+        pipeline = PagePipeline(
+            extractor, ocr, cleanup,
+            ocr_workers=workers,
+            vision_concurrency=workers,
+            combine_concurrency=workers,
+            cleanup_concurrency=workers,
+            max_pages_in_flight=2 * workers,
+            show_progress=False
+        )
+        start = time.perf_counter()
+        pipeline.run(Path("synthetic.pdf"), pages_data)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        if server:
+            stats = server.stats()
+            requests, parallel = stats["requests"], stats["max_in_flight"]
+            image_kb = stats["image_bytes"] / len(pages_data) / 1024
+        else:
+            requests, parallel, image_kb = "-", "-", 0
+        print(f"{workers:>9} {elapsed:>9.2f} {len(pages_data) / elapsed:>8.2f} "
+              f"{baseline / elapsed:>7.1f}x {requests:>9} {parallel:>13} {image_kb:>14.0f}")
+
+    if server:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
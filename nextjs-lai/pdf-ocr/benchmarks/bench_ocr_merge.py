@@ -0,0 +1,176 @@
+"""Accuracy and LLM savings of the local OCR merge on a synthetic test set.
+
+Each test page is a German ground-truth paragraph with two simulated
+transcripts: a Tesseract one with typical character confusions (l/1,
+O/0, rn/m, lost umlauts, split words, stray marks, wrong letters) and a
+vision one with rarer word-level mistakes (swapped articles, dropped
+words, missing punctuation). The transcripts are merged with
+TranscriptMerger and compared to the ground truth by word accuracy.
+
+Columns:
+    Tesseract / Vision: accuracy of the raw transcripts
+    Merge: local merge, undecided spans keep the vision reading
+    Merge + oracle: undecided spans resolved perfectly (what the short
+        LLM conflict request can reach at best)
+    No LLM: pages merged without any LLM request
+    Words to LLM: share of words in undecided spans
+
+Usage:
+    python benchmarks/bench_ocr_merge.py
+    python benchmarks/bench_ocr_merge.py --seeds 20 --tesseract-noise 2.0
+"""
+import argparse
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from spellchecker import SpellChecker
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+from ocr_merge import TranscriptMerger  # noqa: E402
+
+GROUND_TRUTH = [
+    "Die Abschlussprüfung besteht aus einem schriftlichen und einem mündlichen Teil. "
+    "Im schriftlichen Teil sind drei Aufgaben in insgesamt 270 Minuten zu bearbeiten.",
+    "Der Ausbildungsbetrieb meldet den Auszubildenden spätestens zum 1. Februar bei der "
+    "Industrie- und Handelskammer an. Die Anmeldung muss vollständig ausgefüllt sein.",
+    "Während der Ausbildung ist ein Ausbildungsnachweis zu führen. Er wird regelmäßig vom "
+    "Ausbilder geprüft und unterschrieben und ist Zulassungsvoraussetzung für die Prüfung.",
+    "Die Vergütung beträgt im ersten Ausbildungsjahr 1.020 Euro und steigt in jedem weiteren "
+    "Jahr. Sie wird spätestens am letzten Arbeitstag des Monats gezahlt.",
+    "Ein Prüfling, der die Prüfung nicht bestanden hat, kann sie zweimal wiederholen. "
+    "Auf Antrag werden bereits bestandene Prüfungsbereiche nicht erneut geprüft.",
+    "Die Projektarbeit umfasst höchstens 80 Stunden. Der Projektantrag ist vor Beginn der "
+    "Durchführung beim Prüfungsausschuss einzureichen und muss genehmigt werden.",
+    "Kündigt der Auszubildende nach der Probezeit, muss er eine Frist von vier Wochen "
+    "einhalten und die Kündigung schriftlich unter Angabe der Gründe erklären.",
+    "Im Fachgespräch erläutert der Prüfling seine Vorgehensweise, begründet die getroffenen "
+    "Entscheidungen und beantwortet Fragen zu den fachlichen Hintergründen.",
+]
+
+# Word-level mistakes of a vision model: plausible but wrong words
+VISION_SWAPS = {"die": "der", "der": "die", "den": "dem", "einem": "einen", "und": "oder",
+                "nicht": "nun", "vier": "vierzehn", "drei": "zwei", "ist": "wird"}
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark the local OCR merge")
+    parser.add_argument("--seeds", type=int, default=10, help="Noisy variants per paragraph")
+    parser.add_argument("--tesseract-noise", type=float, default=1.0,
+                        help="Scale of the Tesseract error rates")
+    parser.add_argument("--vision-noise", type=float, default=1.0,
+                        help="Scale of the vision error rates")
+    return parser.parse_args()
+
+
+def tesseract_noise(text: str, rng: random.Random, scale: float) -> str:
+    """Character-level OCR errors and hard line breaks."""
+    words = []
+    for word in text.split():
+        roll = rng.random() / scale
+        if roll < 0.04 and ("l" in word or "i" in word):
+            word = word.replace("l", "1", 1) if "l" in word else word.replace("i", "1", 1)
+        elif roll < 0.06 and ("o" in word or "O" in word or "0" in word):
+            word = word.replace("o", "0", 1).replace("O", "0", 1) if "0" not in word \
+                else word.replace("0", "O", 1)
+        elif roll < 0.09 and any(c in word for c in "äöü"):
+            word = word.translate(str.maketrans("äöü", "aou"))
+        elif roll < 0.10 and "m" in word:
+            word = word.replace("m", "rn", 1)
+        elif roll < 0.115 and len(word) > 8:
+            cut = rng.randint(3, len(word) - 3)
+            word = f"{word[:cut]} {word[cut:]}"
+        elif roll < 0.125:
+            word = f"{word} |"
+        elif roll < 0.14 and len(word) > 3:
+            pos = rng.randint(1, len(word) - 2)
+            word = word[:pos] + rng.choice("cenrvu") + word[pos + 1:]
+        words.append(word)
+    lines = [" ".join(words[i:i + 9]) for i in range(0, len(words), 9)]
+    return "\n".join(lines)
+
+
+def vision_noise(text: str, rng: random.Random, scale: float) -> str:
+    """Rarer word-level errors of a vision model."""
+    words = []
+    for word in text.split():
+        roll = rng.random() / scale
+        if roll < 0.015 and word in VISION_SWAPS:
+            word = VISION_SWAPS[word]
+        elif roll < 0.022:
+            continue
+        elif roll < 0.03 and word[-1] in ".,":
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+def word_accuracy(truth: str, text: str) -> float:
+    """1 - word error rate."""
+    truth_words, words = truth.split(), text.split()
+    matcher = SequenceMatcher(None, truth_words, words, autojunk=False)
+    errors = sum(max(i2 - i1, j2 - j1)
+                 for op, i1, i2, j1, j2 in matcher.get_opcodes() if op != "equal")
+    return max(0.0, 1 - errors / len(truth_words))
+
+
+def resolve_with_oracle(result, truth: str) -> str:
+    """Pick, conflict by conflict, the reading that matches the ground truth best."""
+    for conflict in result.conflicts:
+        best = max(
+            (conflict.vision, conflict.tesseract),
+            key=lambda choice: (setattr(conflict, "choice", choice),
+                                word_accuracy(truth, result.text()))[1]
+        )
+        conflict.choice = best
+    return result.text()
+
+
+def main():
+    args = parse_arguments()
+    merger = TranscriptMerger(SpellChecker(language="de"))
+    totals = {"tesseract": 0.0, "vision": 0.0, "merge": 0.0, "oracle": 0.0}
+    pages = no_llm = 0
+    words = words_to_llm = 0
+    merge_seconds = 0.0
+
+    for seed in range(args.seeds):
+        for index, truth in enumerate(GROUND_TRUTH):
+            rng = random.Random(seed * 1000 + index)
+            tesseract = tesseract_noise(truth, rng, args.tesseract_noise)
+            vision = vision_noise(truth, rng, args.vision_noise)
+
+            start = time.perf_counter()
+            result = merger.merge(tesseract, vision)
+            merged = result.text()
+            merge_seconds += time.perf_counter() - start
+
+            pages += 1
+            no_llm += not result.conflicts
+            words += result.words
+            words_to_llm += sum(conflict.words for conflict in result.conflicts)
+            totals["tesseract"] += word_accuracy(truth, tesseract)
+            totals["vision"] += word_accuracy(truth, vision)
+            totals["merge"] += word_accuracy(truth, merged)
+            totals["oracle"] += word_accuracy(truth, resolve_with_oracle(result, truth))
+
+    print(f"{pages} test pages ({len(GROUND_TRUTH)} paragraphs x {args.seeds} seeds), "
+          f"noise x{args.tesseract_noise} Tesseract, x{args.vision_noise} vision")
+    print()
+    header = (f"{'Tesseract':>10} {'Vision':>8} {'Merge':>8} {'Merge + oracle':>15} "
+              f"{'No LLM':>8} {'Words to LLM':>13} {'ms/page':>8}")
+    print(header)
+    print("-" * len(header))
+    print(f"{totals['tesseract'] / pages:>10.1%} {totals['vision'] / pages:>8.1%} "
+          f"{totals['merge'] / pages:>8.1%} {totals['oracle'] / pages:>15.1%} "
+          f"{no_llm / pages:>8.0%} {words_to_llm / words:>13.1%} "
+          f"{1000 * merge_seconds / pages:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
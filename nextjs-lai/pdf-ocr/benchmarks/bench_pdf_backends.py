@@ -0,0 +1,332 @@
+"""Compare the PDF text backends on locally generated PDFs.
+
+Builds a corpus of German test documents with PyPDF2's writer, with the
+text layouts real PDFs use: running text, words placed one by one
+(web and office exports), kerned TJ arrays (typesetting), text in form
+XObjects (templates), Type0 fonts with a ToUnicode map (Word/LibreOffice),
+vertical margin notes, sparse pages and image-only scans. Each backend
+then extracts the corpus through PDFExtractor.iter_text.
+
+Columns:
+    pages/s: extraction speed through PDFExtractor (text + fingerprint)
+    text only: speed of the backend alone
+    Coverage: share of the ground-truth words found in the extracted text
+    To OCR: pages PDFExtractor.needs_ocr sends to OCR
+    Needless: of those, pages that have enough real text (>= 50 chars)
+
+Usage:
+    python benchmarks/bench_pdf_backends.py
+    python benchmarks/bench_pdf_backends.py --documents 10 --pages 60
+    python benchmarks/bench_pdf_backends.py --files pdf-input/*.pdf
+"""
+import argparse
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import (ArrayObject, DecodedStreamObject, DictionaryObject, NameObject,
+                            NumberObject, TextStringObject)
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+from pdf_backends import TEXT_BACKENDS, get_backend  # noqa: E402
+from pdf_extractor import PDFExtractor  # noqa: E402
+
+SENTENCES = [
+    "Die Abschlussprüfung besteht aus einem schriftlichen und einem mündlichen Teil.",
+    "Der Ausbildungsbetrieb meldet den Auszubildenden fristgerecht bei der Kammer an.",
+    "Während der Ausbildung ist ein Ausbildungsnachweis regelmäßig zu führen.",
+    "Die Vergütung steigt in jedem weiteren Ausbildungsjahr.",
+    "Ein Prüfling kann eine nicht bestandene Prüfung zweimal wiederholen.",
+    "Die Projektarbeit umfasst höchstens achtzig Stunden einschließlich Dokumentation.",
+    "Kündigt der Auszubildende nach der Probezeit, gilt eine Frist von vier Wochen.",
+    "Im Fachgespräch erläutert der Prüfling seine Vorgehensweise und Entscheidungen.",
+    "Über die Zulassung zur Prüfung entscheidet die zuständige Stelle.",
+    "Größere Änderungen des Projektantrags müssen vorher genehmigt werden.",
+]
+LAYOUTS = ("prose", "words", "kerned", "form", "cid", "rotated", "sparse", "scan")
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+MIN_TEXT_CHARS = 50  # Same threshold as PDFExtractor.needs_ocr
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF text backends")
+    parser.add_argument("--documents", type=int, default=4, help="Generated documents")
+    parser.add_argument("--pages", type=int, default=40, help="Pages per generated document")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--backends", default=",".join(TEXT_BACKENDS),
+                        help="Comma-separated backends (not installed ones are skipped)")
+    parser.add_argument("--files", nargs="+", type=Path,
+                        help="Benchmark these PDFs instead (speed and OCR counts only)")
+    return parser.parse_args()
+
+
+def literal(text: str) -> bytes:
+    """PDF string literal in WinAnsi (cp1252) encoding."""
+    data = text.encode("cp1252")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def stream(data: bytes, entries: dict = None) -> DecodedStreamObject:
+    obj = DecodedStreamObject()
+    obj.set_data(data)
+    obj.update({NameObject(key): value for key, value in (entries or {}).items()})
+    return obj
+
+
+def helvetica() -> DictionaryObject:
+    return DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+        NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+    })
+
+
+def cid_font(writer: PdfWriter, characters) -> tuple:
+    """Type0 font with Identity-H codes and a ToUnicode map, and its code table."""
+    codes = {char: index + 3 for index, char in enumerate(sorted(set(characters)))}
+    cmap = [
+        "/CIDInit /ProcSet findresource begin 12 dict begin begincmap",
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+        "/CMapName /Adobe-Identity-UCS def /CMapType 2 def",
+        "1 begincodespacerange <0000> <FFFF> endcodespacerange",
+        f"{len(codes)} beginbfchar",
+        *(f"<{code:04X}> <{ord(char):04X}>" for char, code in codes.items()),
+        "endbfchar endcmap CMapName currentdict /CMap defineresource pop end end",
+    ]
+    descendant = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/CIDFontType2"),
+        NameObject("/BaseFont"): NameObject("/ArialMT"),
+        NameObject("/CIDSystemInfo"): DictionaryObject({
+            NameObject("/Registry"): TextStringObject("Adobe"),
+            NameObject("/Ordering"): TextStringObject("Identity"),
+            NameObject("/Supplement"): NumberObject(0),
+        }),
+        NameObject("/DW"): NumberObject(500),
+    })
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type0"),
+        NameObject("/BaseFont"): NameObject("/ArialMT"),
+        NameObject("/Encoding"): NameObject("/Identity-H"),
+        NameObject("/DescendantFonts"): ArrayObject([writer._add_object(descendant)]),
+        NameObject("/ToUnicode"): writer._add_object(stream("\n".join(cmap).encode())),
+    })
+    return font, codes
+
+
+def text_lines(rng: random.Random, count: int, width: int = 85) -> list:
+    """Running text wrapped into lines of about width characters."""
+    words = " ".join(rng.choice(SENTENCES) for _ in range(count * width // 60)).split()
+    lines, line = [], []
+    for word in words:
+        if line and len(" ".join(line + [word])) > width:
+            lines.append(" ".join(line))
+            line = []
+            if len(lines) == count:
+                break
+        line.append(word)
+    return lines or [" ".join(line)]
+
+
+def add_page(writer: PdfWriter, layout: str, rng: random.Random) -> str:
+    """Append one page in the given layout and return its ground-truth text."""
+    page = PageObject.create_blank_page(None, PAGE_WIDTH, PAGE_HEIGHT)
+    fonts = {"/F1": writer._add_object(helvetica())}
+    xobjects = {}
+    lines = text_lines(rng, 48)
+    truth = "\n".join(lines)
+
+    if layout == "prose":
+        content = b"BT /F1 10 Tf 14 TL 50 790 Td " + b" ".join(
+            literal(line) + b" '" for line in lines
+        ) + b" ET"
+    elif layout == "words":
+        parts = [b"BT /F1 10 Tf"]
+        for row, line in enumerate(lines):
+            x = 50.0
+            for word in line.split():
+                parts.append(b"1 0 0 1 %.1f %d Tm " % (x, 790 - 14 * row) + literal(word) + b" Tj")
+                x += len(word) * 5.6 + 2.8
+        content = b"\n".join(parts + [b"ET"])
+    elif layout == "kerned":
+        parts = [b"BT /F1 10 Tf 14 TL 50 790 Td"]
+        for line in lines:
+            items = [b"-250" if char == " " else literal(char) + b" -8" for char in line]
+            parts.append(b"[" + b" ".join(items) + b"] TJ T*")
+        content = b"\n".join(parts + [b"ET"])
+    elif layout == "form":
+        form_content = b"BT /F1 10 Tf 14 TL 50 790 Td " + b" ".join(
+            literal(line) + b" '" for line in lines
+        ) + b" ET"
+        xobjects["/Fm1"] = writer._add_object(stream(form_content, {
+            "/Type": NameObject("/XObject"),
+            "/Subtype": NameObject("/Form"),
+            "/BBox": ArrayObject([NumberObject(0), NumberObject(0),
+                                  NumberObject(PAGE_WIDTH), NumberObject(PAGE_HEIGHT)]),
+            "/Resources": DictionaryObject({NameObject("/Font"): DictionaryObject(
+                {NameObject("/F1"): fonts["/F1"]}
+            )}),
+        }))
+        content = b"q /Fm1 Do Q"
+    elif layout == "cid":
+        font, codes = cid_font(writer, truth.replace("\n", ""))
+        fonts["/F2"] = writer._add_object(font)
+        content = b"BT /F2 10 Tf 14 TL 50 790 Td " + b" ".join(
+            b"<" + "".join(f"{codes[char]:04X}" for char in line).encode() + b"> '"
+            for line in lines
+        ) + b" ET"
+    elif layout == "rotated":
+        note = rng.choice(SENTENCES)
+        lines = lines[:40]
+        truth = "\n".join([note] + lines)
+        content = (b"BT /F1 8 Tf 0 1 -1 0 30 120 Tm " + literal(note) + b" Tj ET\n"
+                   b"BT /F1 10 Tf 14 TL 50 790 Td "
+                   + b" ".join(literal(line) + b" '" for line in lines) + b" ET")
+    elif layout == "sparse":
+        truth = f"Anlage {rng.randint(1, 9)}"
+        content = b"BT /F1 16 Tf 250 420 Td " + literal(truth) + b" Tj ET"
+    else:  # scan: grayscale image without a text layer
+        truth = ""
+        width, height = 120, 170
+        xobjects["/Im1"] = writer._add_object(stream(rng.randbytes(width * height), {
+            "/Type": NameObject("/XObject"),
+            "/Subtype": NameObject("/Image"),
+            "/Width": NumberObject(width),
+            "/Height": NumberObject(height),
+            "/ColorSpace": NameObject("/DeviceGray"),
+            "/BitsPerComponent": NumberObject(8),
+        }))
+        content = b"q %d 0 0 %d 0 0 cm /Im1 Do Q" % (PAGE_WIDTH, PAGE_HEIGHT)
+
+    resources = {NameObject("/Font"): DictionaryObject(
+        {NameObject(name): ref for name, ref in fonts.items()}
+    )}
+    if xobjects:
+        resources[NameObject("/XObject")] = DictionaryObject(
+            {NameObject(name): ref for name, ref in xobjects.items()}
+        )
+    page[NameObject("/Resources")] = DictionaryObject(resources)
+    page[NameObject("/Contents")] = writer._add_object(stream(content))
+    writer.add_page(page)
+    return truth
+
+
+def build_corpus(directory: Path, documents: int, pages: int, seed: int) -> dict:
+    """Write the test PDFs; returns {path: [(layout, truth) per page]}."""
+    rng = random.Random(seed)
+    corpus = {}
+    for number in range(1, documents + 1):
+        writer = PdfWriter()
+        truths = []
+        for _ in range(pages):
+            layout = rng.choice(LAYOUTS)
+            truths.append((layout, add_page(writer, layout, rng)))
+        path = directory / f"corpus_{number:02d}.pdf"
+        with open(path, "wb") as file:
+            writer.write(file)
+        corpus[path] = truths
+    return corpus
+
+
+def words(text: str) -> Counter:
+    return Counter(re.sub(r"^\W+|\W+$", "", word) for word in text.split())
+
+
+def coverage(truth: str, text: str) -> float:
+    """Share of the ground-truth words (with repeats) found in the text."""
+    expected = words(truth)
+    found = words(text)
+    return sum(min(count, found[word]) for word, count in expected.items()) / sum(expected.values())
+
+
+def measure(name: str, corpus: dict) -> dict:
+    """Extract the corpus with one backend and collect speed, coverage and OCR counts."""
+    extractor = PDFExtractor(text_backend=name)
+    backend = get_backend(name)
+    result = {"pages": 0, "to_ocr": 0, "needless": 0, "coverage": defaultdict(list)}
+
+    start = time.perf_counter()
+    for path in corpus:
+        for _ in backend.iter_text(path):
+            pass
+    result["text_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    extracted = {path: list(extractor.iter_text(path)) for path in corpus}
+    result["seconds"] = time.perf_counter() - start
+
+    for path, pages in extracted.items():
+        truths = corpus[path]
+        for index, page_data in enumerate(pages):
+            result["pages"] += 1
+            to_ocr = extractor.needs_ocr(page_data)
+            result["to_ocr"] += to_ocr
+            if truths is None:
+                continue
+            layout, truth = truths[index]
+            if to_ocr and len(truth) >= MIN_TEXT_CHARS:
+                result["needless"] += 1
+            if truth:
+                result["coverage"][layout].append(coverage(truth, page_data["text"]))
+    return result
+
+
+def main():
+    args = parse_arguments()
+    backends = []
+    for name in args.backends.split(","):
+        try:
+            get_backend(name)
+            backends.append(name)
+        except ImportError as e:
+            print(f"Skipping {name}: {e}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.files:
+            corpus = {path: None for path in args.files}
+            print(f"{len(corpus)} PDFs")
+        else:
+            corpus = build_corpus(Path(tmp), args.documents, args.pages, args.seed)
+            layouts = Counter(layout for pages in corpus.values() for layout, _ in pages)
+            print(f"{args.documents} generated PDFs x {args.pages} pages: "
+                  + ", ".join(f"{layouts[layout]} {layout}" for layout in LAYOUTS))
+        results = {name: measure(name, corpus) for name in backends}
+
+    print()
+    header = (f"{'Backend':<10} {'pages/s':>8} {'text only':>10} {'Coverage':>9} "
+              f"{'To OCR':>7} {'Needless':>9}")
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        scores = [score for values in r["coverage"].values() for score in values]
+        mean = f"{sum(scores) / len(scores):.1%}" if scores else "-"
+        needless = r["needless"] if not args.files else "-"
+        print(f"{name:<10} {r['pages'] / r['seconds']:>8.0f} {r['pages'] / r['text_seconds']:>10.0f} "
+              f"{mean:>9} {r['to_ocr']:>7} {needless:>9}")
+
+    if not args.files:
+        print()
+        print("Coverage by layout")
+        print(f"{'Backend':<10} " + " ".join(f"{layout:>8}" for layout in LAYOUTS if layout != "scan"))
+        for name, r in results.items():
+            cells = []
+            for layout in LAYOUTS:
+                if layout == "scan":
+                    continue
+                values = r["coverage"][layout]
+                cells.append(f"{sum(values) / len(values):>8.0%}" if values else f"{'-':>8}")
+            print(f"{name:<10} " + " ".join(cells))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
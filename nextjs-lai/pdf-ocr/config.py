@@ -24,9 +24,45 @@ LLM_API_KEY = os.getenv("LLM_API_KEY", "not-needed")
 # OCR Configuration
 TESSERACT_LANG = "deu"  # German language for OCR
 MIN_TEXT_LENGTH = 3  # Minimum text length to keep
-MIN_CONFIDENCE = 30  # Minimum OCR confidence score
+MIN_CONFIDENCE = 30  # Tesseract word confidence below which a word is unreliable
 
 # Processing Configuration
 DPI = 300  # DPI for PDF to image conversion
+RENDER_BATCH_SIZE = 16  # Max pages rendered per poppler call (bounds memory)
+RENDER_THREAD_COUNT = min(4, os.cpu_count() or 1)  # pdftoppm processes per batch
+RENDER_MAX_GAP = 2  # Render up to this many unneeded pages to merge two page ranges
+PDF_TEXT_BACKEND = os.getenv("PDF_TEXT_BACKEND", "pypdf2")  # Embedded text: "pypdf2", "pypdfium2" or "pdfminer"
 USE_LLM_VISION = True  # Use 3-stage OCR: Tesseract + LLM Vision + LLM Combination
+VISION_MAX_SIDE = 1536  # Longest image side sent to the vision model (match its input resolution)
+VISION_IMAGE_FORMAT = "JPEG"  # Grayscale JPEG instead of full-resolution PNG ("WEBP" if the server supports it)
+VISION_IMAGE_QUALITY = 75  # JPEG/WebP quality for the vision model
 USE_LLM_CLEANUP = True  # Use LLM for post-processing cleanup
+SELECTIVE_CLEANUP = True  # Only paragraphs with unknown words or OCR noise go to the LLM (False: whole pages)
+MAX_UNKNOWN_RATE = 0.1  # Share of unknown lowercase words above which a paragraph is cleaned by the LLM
+CLEANUP_BATCH_CHARS = 3000  # Max characters of dirty paragraphs per cleanup request
+
+# Pipeline Configuration (pages run concurrently, results are reassembled in page order)
+OCR_WORKERS = os.cpu_count() or 1  # Concurrent Tesseract processes
+LLM_VISION_CONCURRENCY = 4  # Concurrent LLM vision requests
+LLM_COMBINE_CONCURRENCY = 4  # Concurrent LLM combination requests
+LLM_CLEANUP_CONCURRENCY = 4  # Concurrent LLM cleanup requests
+MAX_PAGES_IN_FLIGHT = 16  # Pages being processed at once over all documents (bounds rendered images in memory)
+
+# Escalation Configuration (OCR pages only go to LLM vision where Tesseract looks unreliable)
+OCR_ESCALATION = True  # False: LLM vision and combination for every OCR page
+ACCEPT_CONFIDENCE = 80  # Mean Tesseract word confidence at which a page is accepted
+MIN_DICTIONARY_RATE = 0.85  # Share of lowercase words in the dictionary to accept a page
+MAX_ESCALATION_REGIONS = 2  # Low-confidence regions read separately before the whole page is escalated
+LOCAL_MERGE = True  # Merge Tesseract and vision text by word alignment, LLM only for undecided spans
+MAX_UNRESOLVED_SHARE = 0.2  # Share of undecided words above which the LLM combines the whole page
+
+# Output Configuration
+STREAM_OUTPUT = True  # Append pages to output/<name>.md.partial as they finish, renamed when complete
+
+# Job Configuration (documents converted concurrently, sharing the pipeline limits above)
+MAX_DOCUMENTS = 4  # Documents processed at once
+SCHEDULING = "shortest"  # "shortest" (fewest pages first), "fair" (even page share) or "fifo"
+
+# Cache Configuration (stage results keyed by page content, settings and model)
+CACHE_ENABLED = os.getenv("PDF_OCR_CACHE", "1") != "0"
+CACHE_PATH = Path(os.getenv("PDF_OCR_CACHE_PATH", PROJECT_DIR / "cache" / "page_cache.sqlite3"))
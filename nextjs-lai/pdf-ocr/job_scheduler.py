@@ -0,0 +1,187 @@
+"""Concurrent document queue for batch conversions."""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from tqdm import tqdm
+
+logger = logging.getLogger(__name__)
+
+SCHEDULING_POLICIES = ("shortest", "fair", "fifo")
+
+
+@dataclass
+class DocumentJob:
+    """Status and timing of one document in the queue."""
+
+    path: Path
+    pages: int = 0
+    status: str = "queued"  # queued, running, done, empty or failed
+    output_path: Optional[Path] = None
+    error: Optional[str] = None
+    queued_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def wait_seconds(self) -> float:
+        """Time between queueing and start."""
+        if self.started_at is None:
+            return 0.0
+        return self.started_at - self.queued_at
+
+    @property
+    def run_seconds(self) -> float:
+        """Time from start to finish."""
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+class DocumentScheduler:
+    """Convert several documents concurrently, each written as soon as it finishes.
+
+    The scheduler only decides which documents run and when. CPU, LLM
+    and memory limits are enforced by the shared PagePipeline, so pages
+    of all running documents compete for the same Tesseract workers,
+    LLM requests and page slots.
+
+    Policies:
+        shortest: start documents with the fewest pages first, so one huge
+            document does not hold back the small ones
+        fair: keep the given order; the pipeline shares page slots evenly
+            between running documents
+        fifo: keep the given order
+    """
+
+    def __init__(
+        self,
+        convert: Callable[[Path], Optional[Path]],
+        max_documents: int = 1,
+        policy: str = "shortest",
+        page_count: Optional[Callable[[Path], int]] = None,
+        show_progress: bool = True
+    ):
+        """Initialize scheduler.
+
+        Args:
+            convert: Converts and saves one document, returns the output path
+                (None if no content was extracted)
+            max_documents: Documents processed at once
+            policy: One of SCHEDULING_POLICIES
+            page_count: Returns the pages to process of a document (for
+                ordering and the status table)
+            show_progress: Whether to show a document progress bar
+        """
+        if policy not in SCHEDULING_POLICIES:
+            raise ValueError(
+                f"Unknown scheduling policy {policy!r}, expected one of {SCHEDULING_POLICIES}"
+            )
+        self.convert = convert
+        self.max_documents = max(1, int(max_documents))
+        self.policy = policy
+        self.page_count = page_count
+        self.show_progress = show_progress
+        self._lock = threading.Lock()
+        self._finished = 0
+
+    def plan(self, pdf_paths: List[Path]) -> List[DocumentJob]:
+        """Create jobs in the order they will be started.
+
+        Args:
+            pdf_paths: Documents to convert
+
+        Returns:
+            Queued jobs
+        """
+        jobs = [DocumentJob(Path(path), pages=self._count_pages(path)) for path in pdf_paths]
+        if self.policy == "shortest":
+            # Stable sort: documents of equal length keep their given order
+            jobs.sort(key=lambda job: job.pages)
+        return jobs
+
+    def run(self, pdf_paths: List[Path]) -> List[DocumentJob]:
+        """Convert all documents and return their jobs in start order.
+
+        Args:
+            pdf_paths: Documents to convert
+
+        Returns:
+            Finished jobs with status and timing
+        """
+        jobs = self.plan(pdf_paths)
+        self._finished = 0
+        now = time.perf_counter()
+        for job in jobs:
+            job.queued_at = now
+
+        logger.info(f"Converting {len(jobs)} documents, {self.max_documents} at a time "
+                    f"({self.policy} scheduling)")
+        with tqdm(total=len(jobs), desc="documents", unit="doc",
+                  disable=not self.show_progress) as progress:
+            with ThreadPoolExecutor(max_workers=self.max_documents) as executor:
+                # Workers take jobs in submission order, so the plan order is the start order
+                futures = [executor.submit(self._run_job, job, len(jobs)) for job in jobs]
+                for future in futures:
+                    future.add_done_callback(lambda _: progress.update(1))
+                for future in futures:
+                    future.result()
+
+        for line in format_summary(jobs).splitlines():
+            logger.info(line)
+        return jobs
+
+    def _count_pages(self, path: Path) -> int:
+        if self.page_count is None:
+            return 0
+        try:
+            return int(self.page_count(Path(path)))
+        except Exception as e:
+            logger.warning(f"Could not count pages of {path}: {e}")
+            return 0
+
+    def _run_job(self, job: DocumentJob, total: int):
+        """Convert one document and record its status (errors do not stop the queue)."""
+        job.status = "running"
+        job.started_at = time.perf_counter()
+        logger.info(f"Started {job.path.name} ({job.pages} pages, "
+                    f"waited {job.wait_seconds:.1f}s)")
+        try:
+            job.output_path = self.convert(job.path)
+            job.status = "done" if job.output_path else "empty"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"Error processing {job.path.name}: {e}", exc_info=True)
+        finally:
+            job.finished_at = time.perf_counter()
+
+        with self._lock:
+            self._finished += 1
+            finished = self._finished
+        logger.info(f"[{finished}/{total}] {job.path.name}: {job.status} "
+                    f"in {job.run_seconds:.1f}s")
+
+
+def format_summary(jobs: List[DocumentJob]) -> str:
+    """Per-document status table for the log.
+
+    Args:
+        jobs: Jobs from DocumentScheduler.run
+
+    Returns:
+        Table with one row per document and a total line
+    """
+    width = max([len("Document")] + [len(job.path.name) for job in jobs])
+    lines = [f"{'Document':<{width}}  {'Pages':>5}  {'Status':<7}  {'Wait':>7}  {'Time':>7}"]
+    for job in jobs:
+        lines.append(f"{job.path.name:<{width}}  {job.pages:>5}  {job.status:<7}  "
+                     f"{job.wait_seconds:>6.1f}s  {job.run_seconds:>6.1f}s")
+    done = sum(job.status == "done" for job in jobs)
+    failed = sum(job.status == "failed" for job in jobs)
+    lines.append(f"{done}/{len(jobs)} documents converted, {failed} failed")
+    return "\n".join(lines)
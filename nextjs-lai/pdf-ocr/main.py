@@ -5,14 +5,18 @@ import logging
 import shutil
 import signal
 import sys
+from itertools import islice
 from pathlib import Path
 from typing import List, Optional
-from tqdm import tqdm
 
 import config
 from pdf_extractor import PDFExtractor
 from ocr_processor import OCRProcessor
 from text_cleanup import TextCleanup
+from page_pipeline import PagePipeline
+from page_cache import PageCache
+from job_scheduler import DocumentScheduler, SCHEDULING_POLICIES
+from markdown_writer import MarkdownWriter
 
 # Configure logging
 logging.basicConfig(
@@ -52,26 +56,75 @@ signal.signal(signal.SIGTERM, signal_handler)
 class PDF2MarkdownConverter:
     """Convert PDF files to clean Markdown documents."""
     
-    def __init__(self, max_pages: Optional[int] = None):
+    def __init__(
+        self,
+        max_pages: Optional[int] = None,
+        use_cache: bool = True,
+        max_documents: Optional[int] = None,
+        scheduling: Optional[str] = None,
+        stream: Optional[bool] = None
+    ):
         """Initialize the converter.
         
         Args:
             max_pages: Maximum number of pages to process per PDF (None for all)
+            use_cache: Whether to reuse stage results from config.CACHE_PATH
+            max_documents: Documents converted at once (None for config.MAX_DOCUMENTS)
+            scheduling: Document order policy (None for config.SCHEDULING)
+            stream: Write pages to the output file as they finish (None for config.STREAM_OUTPUT)
         """
-        self.pdf_extractor = PDFExtractor(dpi=config.DPI)
+        self.max_documents = max_documents or config.MAX_DOCUMENTS
+        self.scheduling = scheduling or config.SCHEDULING
+        self.stream = config.STREAM_OUTPUT if stream is None else stream
+        self.cache = PageCache(config.CACHE_PATH) if use_cache and config.CACHE_ENABLED else None
+        self.pdf_extractor = PDFExtractor(
+            dpi=config.DPI,
+            render_batch_size=config.RENDER_BATCH_SIZE,
+            render_thread_count=config.RENDER_THREAD_COUNT,
+            render_max_gap=config.RENDER_MAX_GAP,
+            text_backend=config.PDF_TEXT_BACKEND
+        )
         self.ocr_processor = OCRProcessor(
             tesseract_lang=config.TESSERACT_LANG,
             use_llm_vision=config.USE_LLM_VISION,
             llm_api_base=config.LLM_API_BASE,
             llm_model=config.LLM_MODEL,
-            llm_api_key=config.LLM_API_KEY
+            llm_api_key=config.LLM_API_KEY,
+            vision_max_side=config.VISION_MAX_SIDE,
+            vision_image_format=config.VISION_IMAGE_FORMAT,
+            vision_image_quality=config.VISION_IMAGE_QUALITY,
+            cache=self.cache,
+            escalation=config.OCR_ESCALATION,
+            min_confidence=config.MIN_CONFIDENCE,
+            accept_confidence=config.ACCEPT_CONFIDENCE,
+            min_dictionary_rate=config.MIN_DICTIONARY_RATE,
+            max_escalation_regions=config.MAX_ESCALATION_REGIONS,
+            local_merge=config.LOCAL_MERGE,
+            max_unresolved_share=config.MAX_UNRESOLVED_SHARE
         )
         self.text_cleanup = TextCleanup(
             use_llm=config.USE_LLM_CLEANUP,
             llm_api_base=config.LLM_API_BASE,
             llm_model=config.LLM_MODEL,
             llm_api_key=config.LLM_API_KEY,
-            min_text_length=config.MIN_TEXT_LENGTH
+            min_text_length=config.MIN_TEXT_LENGTH,
+            cache=self.cache,
+            selective=config.SELECTIVE_CLEANUP,
+            max_unknown_rate=config.MAX_UNKNOWN_RATE,
+            batch_chars=config.CLEANUP_BATCH_CHARS
+        )
+        self.page_pipeline = PagePipeline(
+            self.pdf_extractor,
+            self.ocr_processor,
+            self.text_cleanup,
+            ocr_workers=config.OCR_WORKERS,
+            vision_concurrency=config.LLM_VISION_CONCURRENCY,
+            combine_concurrency=config.LLM_COMBINE_CONCURRENCY,
+            cleanup_concurrency=config.LLM_CLEANUP_CONCURRENCY,
+            max_pages_in_flight=config.MAX_PAGES_IN_FLIGHT,
+            # Stage progress bars of concurrent documents would overwrite each other
+            show_progress=self.max_documents == 1,
+            fair_share=self.scheduling == "fair"
         )
         self.max_pages = max_pages
     
@@ -95,72 +148,12 @@ class PDF2MarkdownConverter:
             return ""
         
         # Step 2: Process pages
-        page_texts = []
-        temp_dir = config.TEMP_DIR / pdf_path.stem
-        
         # Limit pages if in test mode
         if self.max_pages:
             pages_data = pages_data[:self.max_pages]
             logger.info(f"Test mode: Processing only first {len(pages_data)} pages")
         
-        try:
-            for page_data in tqdm(pages_data, desc="Processing pages"):
-                page_num = page_data['page']
-                extracted_text = page_data['text']
-                
-                # Check if page needs OCR
-                if self.pdf_extractor.needs_ocr(page_data):
-                    logger.info(f"Page {page_num} needs OCR")
-                    
-                    # Convert page to image
-                    temp_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    # Convert single page
-                    single_page_dir = temp_dir / f"page_{page_num}"
-                    single_page_dir.mkdir(exist_ok=True)
-                    
-                    # Extract just this page
-                    from pdf2image import convert_from_path
-                    images = convert_from_path(
-                        pdf_path,
-                        dpi=config.DPI,
-                        first_page=page_num,
-                        last_page=page_num,
-                        output_folder=single_page_dir
-                    )
-                    
-                    if images:
-                        image_path = single_page_dir / f"page_{page_num}.png"
-                        images[0].save(image_path, 'PNG')
-                        
-                        # Perform OCR
-                        ocr_text = self.ocr_processor.extract_text(image_path)
-                        
-                        # Combine with any extracted text
-                        if extracted_text:
-                            combined_text = f"{extracted_text}\n\n{ocr_text}"
-                        else:
-                            combined_text = ocr_text
-                    else:
-                        combined_text = extracted_text
-                else:
-                    combined_text = extracted_text
-                
-                # Clean up the text
-                if combined_text:
-                    cleaned_text = self.text_cleanup.process_text(
-                        combined_text,
-                        context=pdf_path.stem,
-                        page_num=page_num
-                    )
-                    
-                    if cleaned_text:
-                        page_texts.append(f"## Seite {page_num}\n\n{cleaned_text}")
-        
-        finally:
-            # Clean up temporary files
-            if temp_dir.exists():
-                shutil.rmtree(temp_dir)
+        page_texts = self.page_pipeline.run(pdf_path, pages_data, context=pdf_path.stem)
         
         # Step 3: Merge all pages
         logger.info("Step 3: Merging pages...")
@@ -199,6 +192,73 @@ class PDF2MarkdownConverter:
             f.write(markdown)
         logger.info(f"Saved to {output_path}")
     
+    def stream_pdf(self, pdf_path: Path, output_path: Path) -> Optional[Path]:
+        """Process a PDF page by page, appending finished pages to the output.
+        
+        Pages are extracted lazily and go through the pipeline in chunks of
+        the render batch size, so memory does not grow with the page count.
+        Sections are written in page order to `<output>.partial`, which is
+        renamed to the output path at the end.
+        
+        Args:
+            pdf_path: Path to PDF file
+            output_path: Markdown output path
+            
+        Returns:
+            Output path, or None if no content was extracted
+        """
+        logger.info(f"Processing {pdf_path.name} (streaming to {output_path.name})...")
+        pages = self.pdf_extractor.iter_text(pdf_path)
+        if self.max_pages:
+            pages = islice(pages, self.max_pages)
+            logger.info(f"Test mode: Processing only first {self.max_pages} pages")
+        
+        with MarkdownWriter(output_path, pdf_path.stem) as writer:
+            for section in self.page_pipeline.iter_sections(
+                pdf_path, pages, context=pdf_path.stem,
+                chunk_pages=self.pdf_extractor.render_batch_size
+            ):
+                writer.write_section(section)
+            return writer.commit()
+    
+    def convert_document(self, pdf_path: Path) -> Optional[Path]:
+        """Convert one PDF and save its Markdown right away.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Output path, or None if no content was extracted
+        """
+        output_path = config.OUTPUT_DIR / f"{pdf_path.stem}.md"
+        if self.stream:
+            saved = self.stream_pdf(pdf_path, output_path)
+            if saved is None:
+                logger.warning(f"No content extracted from {pdf_path.name}")
+            return saved
+        
+        markdown = self.process_pdf(pdf_path)
+        if not markdown:
+            logger.warning(f"No content extracted from {pdf_path.name}")
+            return None
+        
+        self.save_markdown(markdown, output_path)
+        return output_path
+    
+    def pages_to_process(self, pdf_path: Path) -> int:
+        """Number of pages that will be processed (for scheduling).
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Page count, limited to max_pages
+        """
+        pages = self.pdf_extractor.page_count(pdf_path)
+        if self.max_pages:
+            pages = min(pages, self.max_pages)
+        return pages
+    
     def convert_pdfs(self, pdf_paths: Optional[List[Path]] = None):
         """Convert PDFs from the PDF directory or from a list of files.
         
@@ -222,19 +282,20 @@ class PDF2MarkdownConverter:
         
         logger.info(f"Found {len(pdf_files)} PDF files to process")
         
-        for pdf_file in pdf_files:
-            try:
-                markdown = self.process_pdf(pdf_file)
-                
-                if markdown:
-                    output_path = config.OUTPUT_DIR / f"{pdf_file.stem}.md"
-                    self.save_markdown(markdown, output_path)
-                else:
-                    logger.warning(f"No content extracted from {pdf_file.name}")
-            
-            except Exception as e:
-                logger.error(f"Error processing {pdf_file.name}: {e}", exc_info=True)
+        # Documents run concurrently; each is saved as soon as it finishes
+        scheduler = DocumentScheduler(
+            self.convert_document,
+            max_documents=self.max_documents,
+            policy=self.scheduling,
+            page_count=self.pages_to_process,
+            show_progress=self.max_documents > 1
+        )
+        scheduler.run(pdf_files)
         
+        if self.text_cleanup.use_llm:
+            logger.info(self.text_cleanup.format_stats())
+        if self.cache is not None:
+            logger.info(self.cache.format_stats())
         logger.info("Conversion complete!")
 
 
@@ -256,6 +317,15 @@ Examples:
   
   # Test mode with specific files
   python main.py --test --files document.pdf
+  
+  # Ignore cached stage results (re-run every page)
+  python main.py --no-cache
+  
+  # Convert 8 documents at once, sharing pages evenly between them
+  python main.py --jobs 8 --schedule fair
+  
+  # Write each document only when it is complete
+  python main.py --no-stream
         """
     )
     
@@ -278,6 +348,32 @@ Examples:
         help='Maximum number of pages to process per PDF'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the page result cache'
+    )
+    
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        help=f'Documents converted at once (default: {config.MAX_DOCUMENTS})'
+    )
+    
+    parser.add_argument(
+        '--schedule',
+        choices=SCHEDULING_POLICIES,
+        help=f'Document order: shortest first, fair page share or fifo '
+             f'(default: {config.SCHEDULING})'
+    )
+    
+    parser.add_argument(
+        '--no-stream',
+        action='store_true',
+        help='Collect each document in memory and write it at the end '
+             '(default: append pages to <name>.md.partial as they finish)'
+    )
+    
     return parser.parse_args()
 
 
@@ -313,7 +409,13 @@ def main():
     print()
     
     # Create converter and process
-    converter = PDF2MarkdownConverter(max_pages=max_pages)
+    converter = PDF2MarkdownConverter(
+        max_pages=max_pages,
+        use_cache=not args.no_cache,
+        max_documents=args.jobs,
+        scheduling=args.schedule,
+        stream=False if args.no_stream else None
+    )
     converter.convert_pdfs(pdf_paths=pdf_files)
     
     print()
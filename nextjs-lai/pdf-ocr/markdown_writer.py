@@ -0,0 +1,75 @@
+"""Incremental Markdown output with an atomic rename at the end."""
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PAGE_SEPARATOR = "\n\n---\n\n"  # Same as TextCleanup.merge_page_texts
+
+
+class MarkdownWriter:
+    """Append page sections to `<output>.partial` and rename it when done.
+
+    The file is flushed after every section, so a long conversion can be
+    followed while it runs. The final file only appears, through
+    os.replace, once every page is written. The result is the same as
+    create_markdown over merge_page_texts. If the conversion fails, the
+    partial file is kept for inspection.
+    """
+
+    def __init__(self, output_path: Path, title: str):
+        """Initialize writer.
+
+        Args:
+            output_path: Final Markdown path
+            title: Document title (first heading)
+        """
+        self.output_path = Path(output_path)
+        self.partial_path = self.output_path.with_name(self.output_path.name + ".partial")
+        self.title = title
+        self.sections = 0
+        self._file = None
+
+    def __enter__(self) -> "MarkdownWriter":
+        self._file = open(self.partial_path, 'w', encoding='utf-8')
+        self._file.write(f"# {self.title}\n\n")
+        self._file.flush()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if exc_type is not None:
+                logger.warning(f"Conversion failed, partial output kept at {self.partial_path}")
+        return False
+
+    def write_section(self, section: str):
+        """Append one page section and flush it to disk.
+
+        Args:
+            section: "## Seite N" section of a page
+        """
+        if self.sections:
+            self._file.write(PAGE_SEPARATOR)
+        self._file.write(section)
+        self._file.flush()
+        self.sections += 1
+
+    def commit(self) -> Optional[Path]:
+        """Finish the file and move it to the output path.
+
+        Returns:
+            Output path, or None if no section was written (partial file removed)
+        """
+        self._file.write("\n")
+        self._file.close()
+        self._file = None
+        if not self.sections:
+            self.partial_path.unlink()
+            return None
+        os.replace(self.partial_path, self.output_path)
+        logger.info(f"Saved to {self.output_path}")
+        return self.output_path
@@ -0,0 +1,215 @@
+"""Local word-level merge of Tesseract and vision transcripts."""
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import List, Optional, Tuple, Union
+
+from ocr_quality import dictionary_word
+
+# Typical OCR character confusions, folded before two words are compared
+_CONFUSIONS = (("rn", "m"), ("1", "l"), ("|", "l"), ("i", "l"), ("!", "l"), ("0", "o"),
+               ("5", "s"), ("8", "b"), ("ä", "a"), ("ö", "o"), ("ü", "u"), ("ß", "ss"))
+_TOKEN_PATTERN = re.compile(r"(\S+)(\s*)")
+_EDGE_PUNCTUATION = re.compile(r"^\W+|\W+$")
+_CONTEXT_WORDS = 5
+
+Token = Tuple[str, str]  # word and the whitespace after it
+
+
+def tokenize(text: str) -> List[Token]:
+    """Split text into words, keeping the whitespace after each word."""
+    return [(match.group(1), match.group(2)) for match in _TOKEN_PATTERN.finditer(text)]
+
+
+def fold(word: str) -> str:
+    """Comparison key of a word: case, edge punctuation and OCR confusions folded.
+
+    "Feh1er", "fehler" and "Fehler," share a key; "Fehler" and "Fahrer" do not.
+    """
+    word = _EDGE_PUNCTUATION.sub("", word.lower()) or word
+    for source, target in _CONFUSIONS:
+        word = word.replace(source, target)
+    return word
+
+
+def _is_noise(word: str) -> bool:
+    return not any(char.isalnum() for char in word)
+
+
+def _joined(span: List[Token]) -> str:
+    return "".join(fold(word) for word, _ in span if not _is_noise(word))
+
+
+def _consistent_shape(word: str) -> bool:
+    """Only letters in one case pattern (lower, Title, UPPER) or only digits."""
+    core = _EDGE_PUNCTUATION.sub("", word)
+    if core.isalpha():
+        return core.islower() or core.istitle() or core.isupper()
+    return bool(re.fullmatch(r"[\d.,:/-]+", core))
+
+
+@dataclass
+class Conflict:
+    """A span the rules could not decide, with its context for the LLM."""
+
+    tesseract: str
+    vision: str
+    before: str
+    after: str
+    whitespace: str = " "  # After the span in the merged text
+    choice: Optional[str] = None  # Set by the LLM; None means the vision reading
+
+    @property
+    def words(self) -> int:
+        return max(len(self.tesseract.split()), len(self.vision.split()))
+
+    @property
+    def text(self) -> str:
+        return self.vision if self.choice is None else self.choice
+
+
+@dataclass
+class MergeResult:
+    """Merged transcript: agreed and resolved text with the open conflicts in place."""
+
+    parts: List[Union[str, Conflict]] = field(default_factory=list)
+    words: int = 0  # Words of the longer transcript
+    agreed: int = 0  # Words both transcripts read identically
+    resolved: int = 0  # Differing words decided by the rules
+
+    @property
+    def conflicts(self) -> List[Conflict]:
+        return [part for part in self.parts if isinstance(part, Conflict)]
+
+    @property
+    def unresolved_share(self) -> float:
+        """Share of words left to the LLM."""
+        if not self.words:
+            return 0.0
+        return sum(conflict.words for conflict in self.conflicts) / self.words
+
+    def text(self) -> str:
+        """Merged text (conflicts use the LLM choice, else the vision reading)."""
+        pieces = []
+        for part in self.parts:
+            if isinstance(part, Conflict):
+                if part.text:
+                    pieces.append(part.text + part.whitespace)
+            else:
+                pieces.append(part)
+        return "".join(pieces).strip()
+
+
+class TranscriptMerger:
+    """Align two OCR transcripts word by word and decide differences by rules.
+
+    The transcripts are aligned on folded words (difflib), so confusions
+    like l/1 or O/0 still line up. Agreed words are taken as is. A
+    differing pair is decided by the dictionary and by word shape (no
+    digits inside words, no letters inside numbers); split or joined
+    words and punctuation-only noise are settled as well. Everything
+    else is left as a Conflict for the LLM. Layout follows the vision
+    transcript.
+    """
+
+    def __init__(self, spell_checker=None):
+        """Initialize merger.
+
+        Args:
+            spell_checker: pyspellchecker SpellChecker (None: word shape rules only)
+        """
+        self.spell_checker = spell_checker
+
+    def merge(self, tesseract_text: str, vision_text: str) -> MergeResult:
+        """Merge two transcripts of the same page.
+
+        Args:
+            tesseract_text: Tesseract transcript
+            vision_text: LLM vision transcript
+
+        Returns:
+            MergeResult with agreed, resolved and conflicting spans
+        """
+        tesseract = tokenize(tesseract_text)
+        vision = tokenize(vision_text)
+        result = MergeResult(words=max(len(tesseract), len(vision)))
+        matcher = SequenceMatcher(
+            None, [fold(word) for word, _ in tesseract], [fold(word) for word, _ in vision],
+            autojunk=False
+        )
+
+        for op, i1, i2, j1, j2 in matcher.get_opcodes():
+            t_span, v_span = tesseract[i1:i2], vision[j1:j2]
+            if op == "equal":
+                for (t_word, _), (v_word, space) in zip(t_span, v_span):
+                    if t_word == v_word:
+                        result.agreed += 1
+                        result.parts.append(v_word + space)
+                    else:
+                        result.resolved += 1
+                        result.parts.append(self.choose(t_word, v_word) + space)
+            elif not self._resolve_span(result, t_span, v_span):
+                result.parts.append(Conflict(
+                    tesseract=" ".join(word for word, _ in t_span),
+                    vision=" ".join(word for word, _ in v_span),
+                    before=" ".join(word for word, _ in vision[max(0, j1 - _CONTEXT_WORDS):j1]),
+                    after=" ".join(word for word, _ in vision[j2:j2 + _CONTEXT_WORDS]),
+                    whitespace=v_span[-1][1] if v_span else " "
+                ))
+        return result
+
+    def _resolve_span(
+        self, result: MergeResult, t_span: List[Token], v_span: List[Token]
+    ) -> bool:
+        """Append the decided text of a differing span; False if it stays open."""
+        if all(_is_noise(word) for word, _ in t_span + v_span):
+            # Stray marks (|, —, ·) on either side: keep the vision layout
+            result.resolved += len(t_span) + len(v_span)
+            result.parts.extend(word + space for word, space in v_span)
+            return True
+
+        if t_span and v_span and _joined(t_span) == _joined(v_span):
+            # Split or joined words ("Aus bildung" / "Ausbildung"), stray marks ignored
+            result.resolved += max(len(t_span), len(v_span))
+            result.parts.extend(word + space for word, space in v_span)
+            return True
+
+        if len(t_span) != len(v_span):
+            return False
+
+        choices = [self._choose_known(t_word, v_word) for (t_word, _), (v_word, _) in
+                   zip(t_span, v_span)]
+        if None in choices:
+            return False
+        result.resolved += len(choices)
+        result.parts.extend(word + space for word, (_, space) in zip(choices, v_span))
+        return True
+
+    def known(self, word: str) -> bool:
+        """Whether a word is in the dictionary (capitalized words looked up in lowercase)."""
+        if self.spell_checker is None:
+            return False
+        normalized = dictionary_word(word.lower())
+        return bool(normalized) and normalized in self.spell_checker.known([normalized])
+
+    def choose(self, tesseract_word: str, vision_word: str) -> str:
+        """Pick between two readings of the same word (same folded key).
+
+        Dictionary words win, then words with a consistent shape (letters
+        in one case pattern, or only digits), then the vision reading.
+        """
+        def score(word: str, is_vision: bool) -> float:
+            return 2 * self.known(word) + _consistent_shape(word) + 0.5 * is_vision
+
+        if score(tesseract_word, False) > score(vision_word, True):
+            return tesseract_word
+        return vision_word
+
+    def _choose_known(self, tesseract_word: str, vision_word: str) -> Optional[str]:
+        """Decide different words by the dictionary alone (None if it cannot)."""
+        if fold(tesseract_word) == fold(vision_word):
+            return self.choose(tesseract_word, vision_word)
+        tesseract_known, vision_known = self.known(tesseract_word), self.known(vision_word)
+        if tesseract_known == vision_known:
+            return None
+        return tesseract_word if tesseract_known else vision_word
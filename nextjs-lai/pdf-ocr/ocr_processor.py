@@ -1,14 +1,106 @@
 """OCR module using Tesseract and LLM vision."""
+import io
+import json
 import logging
 import base64
+import re
 from pathlib import Path
-from typing import List, Optional
+from typing import BinaryIO, List, Optional, Tuple, Union
 import pytesseract
 from PIL import Image
 import openai
+from spellchecker import SpellChecker
+
+from page_cache import PageCache, cache_key, image_fingerprint, request_key
+from ocr_merge import MergeResult, TranscriptMerger
+from ocr_quality import (
+    ESCALATE_NONE, ESCALATE_PAGE, ESCALATE_REGIONS, MAX_REGION_LINE_SHARE, OCRLine, PageQuality,
+    assess_page, group_regions, join_lines, parse_tesseract_data, region_box
+)
 
 logger = logging.getLogger(__name__)
 
+# Anything OCRProcessor accepts as a page image
+ImageSource = Union[Image.Image, Path, str, bytes, BinaryIO]
+
+VISION_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+TESSERACT_CONFIG = '--psm 6'  # Assume uniform block of text
+
+VISION_PROMPT = (
+    "Extrahiere bitte den gesamten Text aus diesem Bild. "
+    "Gib nur den erkannten Text zurück, ohne zusätzliche Kommentare. "
+    "Achte auf korrekte deutsche Rechtschreibung und Formatierung."
+)
+
+CONFLICT_PROMPT = (
+    "Zwei OCR-Ergebnisse derselben Seite weichen an den folgenden Stellen voneinander ab. "
+    "Entscheide für jede Stelle anhand des Kontexts, was auf der Seite steht. "
+    "Antworte mit genau einer Zeile pro Stelle im Format \"Nummer: Text\" "
+    "(leer nach dem Doppelpunkt, wenn dort kein Text steht), ohne weitere Kommentare."
+)
+
+VISION_REGION_PROMPT = (
+    "Extrahiere bitte den Text aus diesem Ausschnitt einer Seite. "
+    "Gib nur den erkannten Text zurück, ohne zusätzliche Kommentare, "
+    "und behalte die Zeilenumbrüche bei."
+)
+
+
+def load_image(source: ImageSource) -> Image.Image:
+    """Open a page image from a PIL image, a path, raw bytes or a buffer.
+    
+    Args:
+        source: PIL image (returned as is), file path, encoded bytes or binary file object
+        
+    Returns:
+        PIL image
+    """
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return Image.open(source)
+
+
+def encode_for_vision(
+    image: Image.Image,
+    max_side: int = 1536,
+    image_format: str = "JPEG",
+    quality: int = 75,
+    grayscale: bool = True
+) -> Tuple[bytes, str]:
+    """Encode a page image compactly for a vision model.
+    
+    The page is converted to grayscale, downscaled so its longest side is
+    at most `max_side` (never upscaled) and compressed. A 300 DPI A4 scan
+    as PNG is several MB; the model resizes it to its input resolution
+    anyway.
+    
+    Args:
+        image: Page image
+        max_side: Longest side in pixels sent to the model
+        image_format: "JPEG", "WEBP" or "PNG"
+        quality: Compression quality for JPEG/WebP
+        grayscale: Whether to drop color information
+        
+    Returns:
+        (encoded bytes, MIME type)
+    """
+    image_format = image_format.upper()
+    image = image.convert("L" if grayscale else "RGB")
+    if max(image.size) > max_side:
+        scale = max_side / max(image.size)
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.LANCZOS)
+    
+    buffer = io.BytesIO()
+    if image_format == "PNG":
+        image.save(buffer, format="PNG", optimize=True)
+    else:
+        image.save(buffer, format=image_format, quality=quality)
+    return buffer.getvalue(), VISION_MIME_TYPES[image_format]
+
 
 class OCRProcessor:
     """Process images with OCR using Tesseract and optionally LLM vision."""
@@ -19,7 +111,18 @@ class OCRProcessor:
         use_llm_vision: bool = False,
         llm_api_base: str = None,
         llm_model: str = None,
-        llm_api_key: str = None
+        llm_api_key: str = None,
+        vision_max_side: int = 1536,
+        vision_image_format: str = "JPEG",
+        vision_image_quality: int = 75,
+        cache: Optional[PageCache] = None,
+        escalation: bool = False,
+        min_confidence: float = 30,
+        accept_confidence: float = 80,
+        min_dictionary_rate: float = 0.85,
+        max_escalation_regions: int = 2,
+        local_merge: bool = False,
+        max_unresolved_share: float = 0.2
     ):
         """Initialize OCR processor.
         
@@ -29,9 +132,39 @@ class OCRProcessor:
             llm_api_base: LLM API base URL
             llm_model: LLM model name
             llm_api_key: LLM API key
+            vision_max_side: Longest image side sent to the vision model
+            vision_image_format: Image format for the vision model ("JPEG", "WEBP", "PNG")
+            vision_image_quality: JPEG/WebP quality for the vision model
+            cache: Optional cache for Tesseract, vision and combination results
+            escalation: Only send unreliable pages or regions to LLM vision
+                (needs use_llm_vision)
+            min_confidence: Tesseract word confidence below which a word is unreliable
+            accept_confidence: Mean word confidence at which Tesseract output is accepted
+            min_dictionary_rate: Share of checked words in the dictionary to accept it
+            max_escalation_regions: Low-confidence regions read separately before
+                the whole page is escalated
+            local_merge: Merge Tesseract and vision text locally, asking the LLM
+                only about spans the rules cannot decide
+            max_unresolved_share: Share of undecided words above which the full
+                LLM combination is used instead
         """
         self.tesseract_lang = tesseract_lang
         self.use_llm_vision = use_llm_vision
+        self.vision_max_side = vision_max_side
+        self.vision_image_format = vision_image_format
+        self.vision_image_quality = vision_image_quality
+        self.cache = cache
+        self.escalation = escalation and use_llm_vision
+        self.min_confidence = min_confidence
+        self.accept_confidence = accept_confidence
+        self.min_dictionary_rate = min_dictionary_rate
+        self.max_escalation_regions = max_escalation_regions
+        self.local_merge = local_merge and use_llm_vision
+        self.max_unresolved_share = max_unresolved_share
+        self.spell_checker = (
+            SpellChecker(language='de') if self.escalation or self.local_merge else None
+        )
+        self.merger = TranscriptMerger(self.spell_checker)
         
         if use_llm_vision:
             self.llm_client = openai.OpenAI(
@@ -40,76 +173,291 @@ class OCRProcessor:
             )
             self.llm_model = llm_model
     
-    def extract_text_tesseract(self, image_path: Path) -> str:
+    def page_stage_key(self, stage: str, page_key: str) -> str:
+        """Cache key of a page-level stage ("tesseract" or "vision").
+        
+        Args:
+            stage: Stage name ("tesseract", "tesseract-data", "vision" or "vision-region")
+            page_key: Fingerprint of the page (content and DPI, or rendered image)
+            
+        Returns:
+            Cache key covering the page and all settings of the stage
+        """
+        if stage.startswith("tesseract"):
+            settings = (self.tesseract_lang, TESSERACT_CONFIG)
+        else:
+            prompt = VISION_REGION_PROMPT if stage == "vision-region" else VISION_PROMPT
+            settings = (self.llm_model, prompt, self.vision_max_side,
+                        self.vision_image_format, self.vision_image_quality)
+        return cache_key(stage, page_key, *settings)
+    
+    def is_cached(self, stage: str, page_key: Optional[str]) -> bool:
+        """Whether a page-level stage result is cached (no hit/miss counted)."""
+        if self.cache is None or page_key is None:
+            return False
+        return self.cache.contains(self.page_stage_key(stage, page_key))
+    
+    def _lookup(self, stage: str, image: ImageSource, page_key: Optional[str]):
+        """Return (cache key, cached result, image) for a page-level stage."""
+        if self.cache is None:
+            return None, None, image
+        if page_key is None:
+            image = load_image(image)
+            page_key = image_fingerprint(image)
+        key = self.page_stage_key(stage, page_key)
+        return key, self.cache.get(stage.split("-")[0], key), image
+    
+    def escalation_cached(self, page_key: Optional[str]) -> bool:
+        """Whether escalated OCR of a page runs from the cache alone, without its image.
+        
+        Args:
+            page_key: Page fingerprint
+            
+        Returns:
+            True if the Tesseract result and every vision result its tier needs are cached
+        """
+        if self.cache is None or page_key is None:
+            return False
+        cached = self.cache.peek(self.page_stage_key("tesseract-data", page_key))
+        if cached is None:
+            return False
+        tier, regions = self.plan_escalation(
+            [OCRLine.from_dict(line) for line in json.loads(cached)]
+        )
+        if tier == ESCALATE_PAGE:
+            return self.is_cached("vision", page_key)
+        return all(
+            self.cache.contains(self.page_stage_key("vision-region", cache_key(page_key, *region)))
+            for region in regions
+        )
+    
+    def tesseract_lines(
+        self, image: ImageSource, page_key: Optional[str] = None
+    ) -> List[OCRLine]:
+        """Run Tesseract with word confidences and bounding boxes.
+        
+        Args:
+            image: PIL image, image path, encoded bytes or buffer
+                (may be None if the result is cached under page_key)
+            page_key: Page fingerprint for the cache (default: hash of the image)
+            
+        Returns:
+            Recognized lines (empty on error)
+        """
+        try:
+            key, cached, image = self._lookup("tesseract-data", image, page_key)
+            if cached is not None:
+                return [OCRLine.from_dict(line) for line in json.loads(cached)]
+            
+            data = pytesseract.image_to_data(
+                load_image(image),
+                lang=self.tesseract_lang,
+                config=TESSERACT_CONFIG,
+                output_type=pytesseract.Output.DICT
+            )
+            lines = parse_tesseract_data(data)
+            if key and lines:
+                self.cache.put("tesseract", key, json.dumps([line.to_dict() for line in lines]))
+            return lines
+            
+        except Exception as e:
+            logger.error(f"Tesseract OCR error: {e}")
+            return []
+    
+    def assess(self, lines: List[OCRLine]) -> PageQuality:
+        """Word confidence and dictionary rating of Tesseract lines."""
+        return assess_page(lines, self.spell_checker, self.min_confidence, self.accept_confidence)
+    
+    def _acceptable(self, quality: PageQuality) -> bool:
+        return (quality.confidence >= self.accept_confidence
+                and (quality.dictionary_rate is None
+                     or quality.dictionary_rate >= self.min_dictionary_rate))
+    
+    def plan_escalation(self, lines: List[OCRLine]) -> Tuple[str, List[Tuple[int, int]]]:
+        """Decide how much of a Tesseract page goes to LLM vision.
+        
+        Reliable pages are accepted as is. If only a few lines are unreliable
+        and the rest of the page would be accepted, just those lines are
+        cropped and read by the vision model. Everything else (including
+        pages Tesseract found no text on) is escalated as a whole.
+        
+        Args:
+            lines: Lines from tesseract_lines
+            
+        Returns:
+            (tier, regions): ESCALATE_NONE, ESCALATE_REGIONS or ESCALATE_PAGE and,
+            for ESCALATE_REGIONS, the (first, last) line ranges to read again
+        """
+        if not lines:
+            return ESCALATE_PAGE, []
+        
+        quality = self.assess(lines)
+        if not quality.low_lines:
+            return (ESCALATE_NONE if self._acceptable(quality) else ESCALATE_PAGE), []
+        
+        regions = group_regions(quality.low_lines)
+        if (len(quality.low_lines) <= MAX_REGION_LINE_SHARE * len(lines)
+                and len(regions) <= self.max_escalation_regions):
+            low = set(quality.low_lines)
+            rest = [line for index, line in enumerate(lines) if index not in low]
+            if self._acceptable(self.assess(rest)):
+                return ESCALATE_REGIONS, regions
+        return ESCALATE_PAGE, []
+    
+    def correct_regions(
+        self,
+        image: ImageSource,
+        lines: List[OCRLine],
+        regions: List[Tuple[int, int]],
+        page_key: Optional[str] = None
+    ) -> str:
+        """Read low-confidence regions with LLM vision and splice them into the Tesseract text.
+        
+        Args:
+            image: PIL image, image path, encoded bytes or buffer
+                (may be None if all regions are cached under page_key)
+            lines: Lines from tesseract_lines
+            regions: (first, last) line ranges from plan_escalation
+            page_key: Page fingerprint for the cache (default: hash of the image)
+            
+        Returns:
+            Page text; regions the vision model could not read keep the Tesseract lines
+        """
+        if self.cache is not None and page_key is None:
+            image = load_image(image)
+            page_key = image_fingerprint(image)
+        
+        corrected = list(lines)
+        # Replace from the end so earlier line indexes stay valid
+        for first, last in sorted(regions, reverse=True):
+            text = self._read_region(image, lines, (first, last), page_key)
+            if text:
+                corrected[first:last + 1] = [
+                    OCRLine([(text, 100.0)], lines[first].box, lines[first].paragraph)
+                ]
+        return join_lines(corrected)
+    
+    def _read_region(
+        self,
+        image: ImageSource,
+        lines: List[OCRLine],
+        region: Tuple[int, int],
+        page_key: Optional[str]
+    ) -> str:
+        """Vision text of one line range (cached per page and range)."""
+        key = None
+        if self.cache is not None:
+            key = self.page_stage_key("vision-region", cache_key(page_key, *region))
+            cached = self.cache.get("vision", key)
+            if cached is not None:
+                return cached
+        
+        try:
+            image = load_image(image)
+            crop = image.crop(region_box(lines, region, image.size))
+            text = self._vision_request(crop, VISION_REGION_PROMPT)
+        except Exception as e:
+            logger.error(f"LLM vision error: {e}")
+            return ""
+        
+        logger.info(f"LLM vision read lines {region[0] + 1}-{region[1] + 1}: {len(text)} characters")
+        if key and text:
+            self.cache.put("vision", key, text)
+        return text
+    
+    def extract_text_tesseract(self, image: ImageSource, page_key: Optional[str] = None) -> str:
         """Extract text from image using Tesseract OCR.
         
         Args:
-            image_path: Path to image file
+            image: PIL image, image path, encoded bytes or buffer
+                (may be None if the result is cached under page_key)
+            page_key: Page fingerprint for the cache (default: hash of the image)
             
         Returns:
             Extracted text
         """
         try:
-            image = Image.open(image_path)
+            key, cached, image = self._lookup("tesseract", image, page_key)
+            if cached is not None:
+                return cached
+            
+            image = load_image(image)
             text = pytesseract.image_to_string(
                 image,
                 lang=self.tesseract_lang,
-                config='--psm 6'  # Assume uniform block of text
-            )
-            return text.strip()
+                config=TESSERACT_CONFIG
+            ).strip()
+            if key and text:
+                self.cache.put("tesseract", key, text)
+            return text
             
         except Exception as e:
-            logger.error(f"Tesseract OCR error for {image_path}: {e}")
+            logger.error(f"Tesseract OCR error: {e}")
             return ""
     
-    def extract_text_llm_vision(self, image_path: Path) -> str:
+    def extract_text_llm_vision(self, image: ImageSource, page_key: Optional[str] = None) -> str:
         """Extract text from image using LLM vision capabilities.
         
         Args:
-            image_path: Path to image file
+            image: PIL image, image path, encoded bytes or buffer
+                (may be None if the result is cached under page_key)
+            page_key: Page fingerprint for the cache (default: hash of the image)
             
         Returns:
             Extracted text
         """
         try:
-            # Read and encode image
-            with open(image_path, 'rb') as img_file:
-                image_data = base64.b64encode(img_file.read()).decode('utf-8')
-            
-            # Call LLM vision API
-            response = self.llm_client.chat.completions.create(
-                model=self.llm_model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "Extrahiere bitte den gesamten Text aus diesem Bild. "
-                                        "Gib nur den erkannten Text zurück, ohne zusätzliche Kommentare. "
-                                        "Achte auf korrekte deutsche Rechtschreibung und Formatierung."
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/png;base64,{image_data}"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=2000,
-                temperature=0.1
-            )
+            key, cached, image = self._lookup("vision", image, page_key)
+            if cached is not None:
+                return cached
             
-            text = response.choices[0].message.content.strip()
+            text = self._vision_request(load_image(image), VISION_PROMPT)
             logger.info(f"LLM vision extracted {len(text)} characters")
+            if key and text:
+                self.cache.put("vision", key, text)
             return text
             
         except Exception as e:
-            logger.error(f"LLM vision error for {image_path}: {e}")
+            logger.error(f"LLM vision error: {e}")
             return ""
     
+    def _vision_request(self, image: Image.Image, prompt: str) -> str:
+        """Send an image with a prompt to the vision model and return its text."""
+        # Downscale and compress before encoding
+        payload, mime_type = encode_for_vision(
+            image,
+            max_side=self.vision_max_side,
+            image_format=self.vision_image_format,
+            quality=self.vision_image_quality
+        )
+        image_data = base64.b64encode(payload).decode('utf-8')
+        logger.info(f"LLM vision payload: {len(payload) / 1024:.0f} KB {mime_type}")
+        
+        # Call LLM vision API
+        response = self.llm_client.chat.completions.create(
+            model=self.llm_model,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": prompt
+                        },
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:{mime_type};base64,{image_data}"
+                            }
+                        }
+                    ]
+                }
+            ],
+            max_tokens=2000,
+            temperature=0.1
+        )
+        return response.choices[0].message.content.strip()
+    
     def combine_ocr_results(self, tesseract_text: str, llm_text: str) -> str:
         """Use LLM to intelligently combine and validate OCR results from both methods.
         
@@ -121,8 +469,7 @@ class OCRProcessor:
             Combined and validated text
         """
         try:
-            # Call LLM to combine and validate both results
-            response = self.llm_client.chat.completions.create(
+            request = dict(
                 model=self.llm_model,
                 messages=[
                     {
@@ -157,9 +504,19 @@ Gib NUR den kombinierten, korrigierten Text zurück, ohne Meta-Kommentare oder E
                 max_tokens=3000,
                 temperature=0.2
             )
+            key = request_key("combine", request) if self.cache is not None else None
+            if key:
+                cached = self.cache.get("combine", key)
+                if cached is not None:
+                    return cached
+            
+            # Call LLM to combine and validate both results
+            response = self.llm_client.chat.completions.create(**request)
             
             combined_text = response.choices[0].message.content.strip()
             logger.info(f"LLM combined OCR results: {len(combined_text)} chars")
+            if key and combined_text:
+                self.cache.put("combine", key, combined_text)
             return combined_text
             
         except Exception as e:
@@ -167,29 +524,124 @@ Gib NUR den kombinierten, korrigierten Text zurück, ohne Meta-Kommentare oder E
             # Fallback: return the longer result
             return llm_text if len(llm_text) > len(tesseract_text) else tesseract_text
     
-    def extract_text(self, image_path: Path) -> str:
+    def merge_ocr_results(self, tesseract_text: str, llm_text: str) -> Tuple[str, int]:
+        """Merge both OCR results, locally where possible.
+        
+        With local_merge, the transcripts are aligned word by word and
+        differences decided by rules. Spans the rules cannot decide go to
+        the LLM in one short request; if too many words are undecided the
+        full combination is used.
+        
+        Args:
+            tesseract_text: Text extracted by Tesseract OCR
+            llm_text: Text extracted by LLM Vision
+            
+        Returns:
+            (merged text, number of LLM requests made: 0 or 1)
+        """
+        if not self.local_merge:
+            return self.combine_ocr_results(tesseract_text, llm_text), 1
+        
+        merge = self.merger.merge(tesseract_text, llm_text)
+        conflicts = merge.conflicts
+        if not conflicts:
+            logger.info(f"Merged OCR results locally ({merge.agreed} agreed, "
+                        f"{merge.resolved} resolved words)")
+            return merge.text(), 0
+        
+        if merge.unresolved_share > self.max_unresolved_share:
+            logger.info(f"{merge.unresolved_share:.0%} of words undecided, using LLM combination")
+            return self.combine_ocr_results(tesseract_text, llm_text), 1
+        
+        return self.resolve_conflicts(merge), 1
+    
+    def resolve_conflicts(self, merge: MergeResult) -> str:
+        """Ask the LLM about the undecided spans of a local merge.
+        
+        Args:
+            merge: Result of TranscriptMerger.merge with conflicts
+            
+        Returns:
+            Merged text (spans without an answer keep the vision reading)
+        """
+        conflicts = merge.conflicts
+        spans = "\n\n".join(
+            f"{number}. Kontext: \"{conflict.before} … {conflict.after}\"\n"
+            f"   Tesseract: \"{conflict.tesseract}\"\n"
+            f"   Vision: \"{conflict.vision}\""
+            for number, conflict in enumerate(conflicts, start=1)
+        )
+        request = dict(
+            model=self.llm_model,
+            messages=[
+                {"role": "system", "content": CONFLICT_PROMPT},
+                {"role": "user", "content": spans}
+            ],
+            max_tokens=min(3000, 100 + 40 * sum(conflict.words for conflict in conflicts)),
+            temperature=0.1
+        )
+        try:
+            key = request_key("combine", request) if self.cache is not None else None
+            answer = self.cache.get("combine", key) if key else None
+            if answer is None:
+                response = self.llm_client.chat.completions.create(**request)
+                answer = response.choices[0].message.content.strip()
+                if key and answer:
+                    self.cache.put("combine", key, answer)
+        except Exception as e:
+            logger.error(f"Error resolving OCR conflicts with LLM: {e}")
+            return merge.text()
+        
+        for line in answer.splitlines():
+            match = re.match(r"\s*(\d+)\s*[:.)]\s*(.*)$", line)
+            if match and 1 <= int(match.group(1)) <= len(conflicts):
+                conflicts[int(match.group(1)) - 1].choice = match.group(2).strip().strip('"„“')
+        logger.info(f"LLM resolved {len(conflicts)} OCR conflicts")
+        return merge.text()
+    
+    def extract_text(self, image: ImageSource) -> str:
         """Extract text from image combining Tesseract and optionally LLM vision.
         
         Args:
-            image_path: Path to image file
+            image: PIL image, image path, encoded bytes or buffer
             
         Returns:
             Extracted text (combined from both methods if LLM vision is enabled)
         """
+        # Decode once for both methods
+        try:
+            image = load_image(image)
+        except Exception as e:
+            logger.error(f"Could not open image: {e}")
+            return ""
+        
+        # Fingerprint once for both cache lookups
+        page_key = image_fingerprint(image) if self.cache is not None else None
+        
         # Always run Tesseract OCR as baseline
-        tesseract_text = self.extract_text_tesseract(image_path)
+        if self.escalation:
+            # Reliable pages and regions stop here, without LLM calls
+            lines = self.tesseract_lines(image, page_key)
+            tier, regions = self.plan_escalation(lines)
+            if tier == ESCALATE_NONE:
+                return join_lines(lines)
+            if tier == ESCALATE_REGIONS:
+                return self.correct_regions(image, lines, regions, page_key)
+            tesseract_text = join_lines(lines)
+        else:
+            tesseract_text = self.extract_text_tesseract(image, page_key)
         
         # If LLM vision is enabled, run it additionally and combine results
         if self.use_llm_vision:
-            llm_text = self.extract_text_llm_vision(image_path)
+            llm_text = self.extract_text_llm_vision(image, page_key)
             
             if llm_text:
                 # If we have both results, use LLM to combine them intelligently
                 if tesseract_text and llm_text:
                     logger.info(f"Tesseract: {len(tesseract_text)} chars, LLM Vision: {len(llm_text)} chars")
                     
-                    # Use LLM to validate and combine both results
-                    combined_text = self.combine_ocr_results(tesseract_text, llm_text)
+                    # Merge locally, the LLM only sees what the rules cannot decide
+                    combined_text, _ = self.merge_ocr_results(tesseract_text, llm_text)
                     return combined_text
                 elif llm_text:
                     # Only LLM vision has content
@@ -205,19 +657,19 @@ Gib NUR den kombinierten, korrigierten Text zurück, ohne Meta-Kommentare oder E
         # Return Tesseract result (either as fallback or as only method)
         return tesseract_text
     
-    def process_images(self, image_paths: List[Path]) -> List[str]:
+    def process_images(self, images: List[ImageSource]) -> List[str]:
         """Process multiple images and extract text.
         
         Args:
-            image_paths: List of image paths
+            images: List of PIL images, image paths, bytes or buffers
             
         Returns:
             List of extracted texts
         """
         texts = []
-        for image_path in image_paths:
-            logger.info(f"Processing {image_path.name}...")
-            text = self.extract_text(image_path)
+        for i, image in enumerate(images, start=1):
+            logger.info(f"Processing image {i}/{len(images)}...")
+            text = self.extract_text(image)
             texts.append(text)
         
         return texts
@@ -0,0 +1,186 @@
+"""Word confidences and dictionary checks for deciding when to escalate OCR."""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Escalation tiers of an OCR page
+ESCALATE_NONE = "none"  # Tesseract text accepted as is
+ESCALATE_REGIONS = "regions"  # Low-confidence lines cropped and read by the vision model
+ESCALATE_PAGE = "page"  # Whole page read by vision and combined with Tesseract
+
+# Pages with more low-confidence lines than this are escalated as a whole
+MAX_REGION_LINE_SHARE = 0.25
+
+_WORD_PATTERN = re.compile(r"^[^\W\d_]{2,}$")
+_EDGE_PUNCTUATION = re.compile(r"^\W+|\W+$")
+
+
+@dataclass
+class OCRLine:
+    """One Tesseract text line with its word confidences and bounding box."""
+
+    words: List[Tuple[str, float]]
+    box: Tuple[int, int, int, int]  # left, top, right, bottom
+    paragraph: Tuple[int, int]  # block and paragraph number
+
+    @property
+    def text(self) -> str:
+        return " ".join(word for word, _ in self.words)
+
+    def to_dict(self) -> dict:
+        return {"words": self.words, "box": self.box, "paragraph": self.paragraph}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "OCRLine":
+        return cls(
+            words=[(word, conf) for word, conf in data["words"]],
+            box=tuple(data["box"]),
+            paragraph=tuple(data["paragraph"])
+        )
+
+
+@dataclass
+class PageQuality:
+    """Confidence summary of a Tesseract page."""
+
+    confidence: float  # Mean word confidence (0-100)
+    dictionary_rate: Optional[float]  # Share of checked words in the dictionary
+    word_count: int
+    low_lines: List[int] = field(default_factory=list)  # Indexes of unreliable lines
+
+
+def parse_tesseract_data(data: Dict[str, list]) -> List[OCRLine]:
+    """Group the word table of pytesseract.image_to_data into text lines.
+
+    Args:
+        data: Output of image_to_data(..., output_type=Output.DICT)
+
+    Returns:
+        Lines in reading order (words with confidence -1 or empty text skipped)
+    """
+    lines: Dict[Tuple[int, int, int], OCRLine] = {}
+    for i, word in enumerate(data.get("text", [])):
+        word = (word or "").strip()
+        confidence = float(data["conf"][i])
+        if not word or confidence < 0:
+            continue
+        left, top = int(data["left"][i]), int(data["top"][i])
+        right, bottom = left + int(data["width"][i]), top + int(data["height"][i])
+        paragraph = (int(data["block_num"][i]), int(data["par_num"][i]))
+        line_id = paragraph + (int(data["line_num"][i]),)
+
+        line = lines.get(line_id)
+        if line is None:
+            lines[line_id] = OCRLine([(word, confidence)], (left, top, right, bottom), paragraph)
+        else:
+            line.words.append((word, confidence))
+            line.box = (min(line.box[0], left), min(line.box[1], top),
+                        max(line.box[2], right), max(line.box[3], bottom))
+    return list(lines.values())
+
+
+def join_lines(lines: List[OCRLine]) -> str:
+    """Text of the lines, one per row, with a blank line between paragraphs."""
+    parts = []
+    previous = None
+    for line in lines:
+        if previous is not None:
+            parts.append("\n\n" if line.paragraph != previous else "\n")
+        parts.append(line.text)
+        previous = line.paragraph
+    return "".join(parts)
+
+
+def dictionary_word(word: str) -> Optional[str]:
+    """Normalized form of a word worth a dictionary check, or None.
+
+    Capitalized words are skipped: the German dictionary of pyspellchecker
+    holds almost no nouns or names, but its lowercase words (verbs,
+    adjectives, function words) are where OCR errors like "dle" or "urid"
+    show up.
+    """
+    word = _EDGE_PUNCTUATION.sub("", word)
+    if not _WORD_PATTERN.match(word) or not word[0].islower():
+        return None
+    return word.lower()
+
+
+def assess_page(
+    lines: List[OCRLine],
+    spell_checker=None,
+    min_confidence: float = 30,
+    accept_confidence: float = 80
+) -> PageQuality:
+    """Rate a Tesseract page by word confidence and dictionary hits.
+
+    A word is unreliable if its confidence is below min_confidence, or if
+    it is below accept_confidence and not in the dictionary. Lines with an
+    unreliable word are reported as low lines.
+
+    Args:
+        lines: Lines from parse_tesseract_data
+        spell_checker: pyspellchecker SpellChecker (None: confidence only)
+        min_confidence: Word confidence below which a word is unreliable
+        accept_confidence: Word confidence above which dictionary misses are ignored
+
+    Returns:
+        PageQuality of the page
+    """
+    confidences = [conf for line in lines for _, conf in line.words]
+    checked = {
+        word: dictionary_word(word) for line in lines for word, _ in line.words
+    }
+    known = set()
+    if spell_checker is not None:
+        known = spell_checker.known([w for w in checked.values() if w])
+
+    low_lines = []
+    hits = total = 0
+    for index, line in enumerate(lines):
+        low = False
+        for word, conf in line.words:
+            normalized = checked[word]
+            in_dictionary = True
+            if spell_checker is not None and normalized:
+                total += 1
+                in_dictionary = normalized in known
+                hits += in_dictionary
+            if conf < min_confidence or (conf < accept_confidence and not in_dictionary):
+                low = True
+        if low:
+            low_lines.append(index)
+
+    return PageQuality(
+        confidence=sum(confidences) / len(confidences) if confidences else 0.0,
+        dictionary_rate=hits / total if total else None,
+        word_count=len(confidences),
+        low_lines=low_lines
+    )
+
+
+def group_regions(line_indexes: List[int]) -> List[Tuple[int, int]]:
+    """Merge adjacent line indexes into (first, last) ranges."""
+    regions = []
+    for index in line_indexes:
+        if regions and index == regions[-1][1] + 1:
+            regions[-1] = (regions[-1][0], index)
+        else:
+            regions.append((index, index))
+    return regions
+
+
+def region_box(
+    lines: List[OCRLine],
+    region: Tuple[int, int],
+    image_size: Tuple[int, int],
+    padding: int = 10
+) -> Tuple[int, int, int, int]:
+    """Padded bounding box of a line range, clipped to the image."""
+    boxes = [lines[i].box for i in range(region[0], region[1] + 1)]
+    width, height = image_size
+    return (
+        max(0, min(box[0] for box in boxes) - padding),
+        max(0, min(box[1] for box in boxes) - padding),
+        min(width, max(box[2] for box in boxes) + padding),
+        min(height, max(box[3] for box in boxes) + padding),
+    )
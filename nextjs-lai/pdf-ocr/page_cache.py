@@ -0,0 +1,171 @@
+"""Content-addressed cache for per-page stage results."""
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stage_results (
+    key         TEXT PRIMARY KEY,
+    stage       TEXT NOT NULL,
+    result      TEXT NOT NULL,
+    created_at  TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def cache_key(*parts) -> str:
+    """SHA-256 over the key parts (NUL-separated, so parts cannot run together).
+
+    Args:
+        parts: Strings or values converted with str()
+
+    Returns:
+        Hex digest
+    """
+    payload = "\0".join(str(part) for part in parts)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def request_key(stage: str, request: dict) -> str:
+    """Cache key over a complete chat completion request.
+
+    Args:
+        stage: Stage name
+        request: Keyword arguments of chat.completions.create (model, messages, parameters)
+
+    Returns:
+        Hex digest
+    """
+    return cache_key(stage, json.dumps(request, sort_keys=True, ensure_ascii=False))
+
+
+def image_fingerprint(image: Image.Image) -> str:
+    """Hash of a rendered page image (mode, size and pixels).
+
+    Args:
+        image: PIL image
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256(f"{image.mode}:{image.size}".encode("utf-8"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class PageCache:
+    """Thread-safe SQLite store for stage outputs (Tesseract, vision, combine, cleanup).
+
+    Keys are hashes of everything that determines a result: the page
+    content (or the text a stage received), DPI, stage settings, prompt
+    and model name. Identical pages in other documents hit the same
+    entries, and an interrupted conversion resumes where it stopped.
+    Failed calls are never stored.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize cache.
+
+        Args:
+            path: SQLite file (created with its directory if missing)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def get(self, stage: str, key: str) -> Optional[str]:
+        """Return the cached result, or None (counted as a miss).
+
+        Args:
+            stage: Stage name (for statistics)
+            key: Key from cache_key()
+
+        Returns:
+            Cached result or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM stage_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses[stage] += 1
+                return None
+            self.hits[stage] += 1
+        return row[0]
+
+    def peek(self, key: str) -> Optional[str]:
+        """Return the cached result without counting a hit or miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM stage_results WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def contains(self, key: str) -> bool:
+        """Check for an entry without counting a hit or miss."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM stage_results WHERE key = ?", (key,)
+            ).fetchone() is not None
+
+    def put(self, stage: str, key: str, result: str):
+        """Store a successful result.
+
+        Args:
+            stage: Stage name
+            key: Key from cache_key()
+            result: Stage output
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stage_results (key, stage, result) VALUES (?, ?, ?)",
+                (key, stage, result),
+            )
+
+    def clear(self):
+        """Delete all entries."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM stage_results")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM stage_results").fetchone()[0]
+
+    def stats(self) -> dict:
+        """Hits and misses per stage and the number of entries."""
+        stages = sorted(set(self.hits) | set(self.misses))
+        return {
+            "stages": {
+                stage: {"hits": self.hits[stage], "misses": self.misses[stage]}
+                for stage in stages
+            },
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "entries": len(self),
+        }
+
+    def format_stats(self) -> str:
+        """One-line summary for the log."""
+        s = self.stats()
+        per_stage = ", ".join(
+            f"{stage} {counts['hits']}/{counts['hits'] + counts['misses']}"
+            for stage, counts in s["stages"].items()
+        )
+        return (f"Page cache: {s['hits']}/{s['hits'] + s['misses']} hits"
+                + (f" ({per_stage})" if per_stage else "")
+                + f", {s['entries']} entries")
@@ -0,0 +1,536 @@
+"""Concurrent page pipeline with ordered reassembly."""
+import logging
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from PIL import Image
+from tqdm import tqdm
+
+from page_cache import cache_key
+from ocr_quality import ESCALATE_NONE, ESCALATE_PAGE, ESCALATE_REGIONS, join_lines
+
+logger = logging.getLogger(__name__)
+
+STAGE_NAMES = ("render", "tesseract", "vision", "combine", "cleanup")
+
+
+class Stage:
+    """One pipeline stage with a concurrency limit, progress bar and timing."""
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        total: Optional[int] = None,
+        position: int = 0,
+        show_progress: bool = True,
+        semaphore: Optional[threading.BoundedSemaphore] = None
+    ):
+        """Initialize stage.
+
+        Args:
+            name: Stage name (shown in the progress bar)
+            limit: Max concurrent calls in this stage
+            total: Expected number of calls (None if unknown)
+            position: Line of the progress bar
+            show_progress: Whether to show a progress bar
+            semaphore: Limit shared with other runs (default: a new one of size limit)
+        """
+        self.name = name
+        self.limit = max(1, limit)
+        self._semaphore = semaphore or threading.BoundedSemaphore(self.limit)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.busy_seconds = 0.0
+        self.progress = tqdm(
+            total=total,
+            desc=f"{name:<9}",
+            unit="page",
+            position=position,
+            disable=not show_progress
+        )
+
+    @contextmanager
+    def run(self):
+        """Run one call of this stage, waiting while the stage is at its limit."""
+        with self._semaphore:
+            with self._lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.active -= 1
+                    self.calls += 1
+                    self.busy_seconds += elapsed
+                    self.progress.update(1)
+
+    def add_total(self, count: int):
+        """Raise the expected number of calls (pages arrive in chunks)."""
+        self.progress.total = (self.progress.total or 0) + count
+        self.progress.refresh()
+
+    def close(self):
+        """Close the progress bar."""
+        self.progress.close()
+
+    def summary(self) -> str:
+        """One-line summary of calls, busy time and reached concurrency."""
+        return (f"{self.name}: {self.calls} calls, {self.busy_seconds:.1f}s busy, "
+                f"max {self.max_active}/{self.limit} parallel")
+
+
+def format_escalations(escalations: Counter) -> str:
+    """Summary of escalation tiers, local merges and LLM OCR requests saved.
+
+    Every OCR page would otherwise cost two LLM requests (vision and
+    combination).
+
+    Args:
+        escalations: Page counts per tier, "llm_requests" and "local_merges"
+
+    Returns:
+        One-line summary
+    """
+    pages = sum(escalations[tier] for tier in (ESCALATE_NONE, ESCALATE_REGIONS, ESCALATE_PAGE))
+    escalated = escalations[ESCALATE_REGIONS] + escalations[ESCALATE_PAGE]
+    baseline = 2 * pages
+    requests = escalations["llm_requests"]
+    rate = escalated / pages if pages else 0.0
+    summary = (f"{escalated}/{pages} OCR pages escalated ({rate:.0%}; "
+               f"{escalations[ESCALATE_REGIONS]} by region, {escalations[ESCALATE_PAGE]} whole page), "
+               f"{requests} LLM requests instead of {baseline} ({baseline - requests} saved)")
+    if escalations["local_merges"]:
+        summary += f", {escalations['local_merges']} combinations merged without LLM"
+    return summary
+
+
+def _chunks(items: Iterable, size: Optional[int]) -> Iterator[list]:
+    """Lists of up to size items (all items in one list if size is None)."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class PageSlots:
+    """Global limit on pages in flight, shared by all documents being processed.
+
+    Every submitted page holds a slot until it is finished, which bounds
+    the rendered images in memory across documents. With fair sharing a
+    free slot goes to the waiting document that holds the fewest slots,
+    so a large document cannot crowd out the small ones running beside it.
+    """
+
+    def __init__(self, limit: int, fair: bool = False):
+        """Initialize slots.
+
+        Args:
+            limit: Max pages in flight over all documents
+            fair: Share free slots evenly between waiting documents
+        """
+        self.limit = max(1, int(limit))
+        self.fair = fair
+        self._condition = threading.Condition()
+        self._held = Counter()
+        self._waiting = Counter()
+        self.in_use = 0
+        self.max_in_use = 0
+
+    def acquire(self, owner):
+        """Wait for a free slot and take it for owner (e.g. the PDF path)."""
+        with self._condition:
+            self._waiting[owner] += 1
+            try:
+                self._condition.wait_for(lambda: self._may_take(owner))
+            finally:
+                self._waiting[owner] -= 1
+                if self._waiting[owner] <= 0:
+                    del self._waiting[owner]
+            self._held[owner] += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def release(self, owner):
+        """Return a slot taken by owner."""
+        with self._condition:
+            self._held[owner] -= 1
+            if self._held[owner] <= 0:
+                del self._held[owner]
+            self.in_use -= 1
+            self._condition.notify_all()
+
+    def held(self, owner) -> int:
+        """Slots currently taken by owner."""
+        with self._condition:
+            return self._held[owner]
+
+    def _may_take(self, owner) -> bool:
+        if self.in_use >= self.limit:
+            return False
+        if not self.fair:
+            return True
+        return self._held[owner] <= min(self._held[other] for other in self._waiting)
+
+
+class PagePipeline:
+    """Process the pages of a PDF concurrently, stage by stage.
+
+    Pages that need OCR are rendered in batches on the calling thread and
+    handed to a pool of page workers. Each worker runs Tesseract, LLM
+    vision, LLM combination and cleanup for its page; every stage has its
+    own concurrency limit, so while one page waits for the LLM others use
+    the CPU for Tesseract. Results are reassembled in page order. Pages
+    whose Tesseract and vision results are in the OCRProcessor's cache
+    are not rendered at all.
+
+    Rendering (pdftoppm) and Tesseract run as external processes, so the
+    thread pool gives them process-level parallelism without copying page
+    images between Python processes.
+
+    The stage limits and page slots belong to the pipeline, not to a run:
+    several documents processed concurrently with the same pipeline share
+    the CPU, LLM and memory limits.
+    """
+
+    def __init__(
+        self,
+        pdf_extractor,
+        ocr_processor,
+        text_cleanup,
+        ocr_workers: int = 1,
+        vision_concurrency: int = 1,
+        combine_concurrency: int = 1,
+        cleanup_concurrency: int = 1,
+        max_pages_in_flight: int = 4,
+        show_progress: bool = True,
+        fair_share: bool = False
+    ):
+        """Initialize pipeline.
+
+        Args:
+            pdf_extractor: PDFExtractor for OCR decisions and rendering
+            ocr_processor: OCRProcessor for Tesseract and LLM vision
+            text_cleanup: TextCleanup for per-page cleanup
+            ocr_workers: Concurrent Tesseract processes
+            vision_concurrency: Concurrent LLM vision requests
+            combine_concurrency: Concurrent LLM combination requests
+            cleanup_concurrency: Concurrent cleanup calls
+            max_pages_in_flight: Pages submitted but not finished, over all runs (bounds memory)
+            show_progress: Whether to show per-stage progress bars
+            fair_share: Share page slots evenly between concurrent runs
+        """
+        self.pdf_extractor = pdf_extractor
+        self.ocr_processor = ocr_processor
+        self.text_cleanup = text_cleanup
+        limits = {
+            "render": 1,
+            "tesseract": ocr_workers,
+            "vision": vision_concurrency,
+            "combine": combine_concurrency,
+            "cleanup": cleanup_concurrency,
+        }
+        self.limits = {name: max(1, int(limit)) for name, limit in limits.items()}
+        self._semaphores = {
+            name: threading.BoundedSemaphore(limit) for name, limit in self.limits.items()
+        }
+        self.page_slots = PageSlots(max_pages_in_flight, fair=fair_share)
+        self.show_progress = show_progress
+        self.stages: Dict[str, Stage] = {}  # Stages of the most recently started run
+        self.escalations = Counter()  # Escalation counts of the most recently finished run
+        self._count_lock = threading.Lock()
+
+    def _create_stages(self) -> Dict[str, Stage]:
+        """Stages of one run; their totals grow as chunks of pages arrive."""
+        return {
+            name: Stage(name, self.limits[name], None if name == "combine" else 0, position,
+                        self.show_progress, semaphore=self._semaphores[name])
+            for position, name in enumerate(STAGE_NAMES)
+        }
+
+    def run(
+        self,
+        pdf_path: Path,
+        pages_data: List[Dict[str, any]],
+        context: str = ""
+    ) -> List[str]:
+        """Process pages and return their Markdown sections in page order.
+
+        Args:
+            pdf_path: Path to PDF file
+            pages_data: Page dicts from PDFExtractor.extract_text
+            context: Document context for the cleanup
+
+        Returns:
+            "## Seite N" sections of all pages with text, in page order
+        """
+        return list(self.iter_sections(pdf_path, pages_data, context))
+
+    def iter_sections(
+        self,
+        pdf_path: Path,
+        pages: Iterable[Dict[str, any]],
+        context: str = "",
+        chunk_pages: Optional[int] = None
+    ) -> Iterator[str]:
+        """Process pages and yield their Markdown sections in page order as they finish.
+
+        Pages are read from `pages` in chunks of chunk_pages (all at once if
+        None); OCR decisions and rendering are planned per chunk. With a
+        lazy page iterator only the pages in flight, the current chunk and
+        sections waiting for an earlier page are held in memory.
+
+        Args:
+            pdf_path: Path to PDF file
+            pages: Page dicts from PDFExtractor.extract_text or iter_text
+            context: Document context for the cleanup
+            chunk_pages: Pages read and planned at a time
+
+        Yields:
+            "## Seite N" sections of all pages with text, in page order
+        """
+        stages = self._create_stages()
+        self.stages = stages
+        escalations = Counter()  # Pages per escalation tier and LLM OCR requests
+        pending = deque()  # Futures in page order, not yet yielded
+        ocr_page_count = 0
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.page_slots.limit) as executor:
+                for chunk in _chunks(pages, chunk_pages):
+                    page_keys, ocr_pages, render_pages = self._plan_chunk(stages, chunk)
+                    ocr_page_count += len(ocr_pages)
+                    for future in self._submit_chunk(
+                        executor, stages, escalations, pdf_path, chunk,
+                        page_keys, ocr_pages, render_pages, context
+                    ):
+                        pending.append(future)
+                        # Hand out finished pages while later ones are still submitted
+                        while pending and pending[0].done():
+                            section = pending.popleft().result()
+                            if section:
+                                yield section
+
+                # Reassemble in page order
+                while pending:
+                    section = pending.popleft().result()
+                    if section:
+                        yield section
+        finally:
+            for stage in stages.values():
+                stage.close()
+
+        logger.info(f"Pipeline stages ({Path(pdf_path).name}): " + " | ".join(
+            stage.summary() for stage in stages.values() if stage.calls
+        ))
+        if ocr_page_count and self.ocr_processor.use_llm_vision:
+            logger.info(f"OCR escalation ({Path(pdf_path).name}): "
+                        + format_escalations(escalations))
+        self.escalations = escalations
+
+    def _plan_chunk(
+        self, stages: Dict[str, Stage], chunk: List[Dict[str, any]]
+    ) -> Tuple[Dict[int, Optional[str]], Set[int], Set[int]]:
+        """Cache keys, OCR pages and pages to render of a chunk; adds them to the stage totals."""
+        ocr_pages = {
+            page_data['page'] for page_data in chunk
+            if self.pdf_extractor.needs_ocr(page_data)
+        }
+        page_keys = {
+            page_data['page']: self._page_key(page_data) for page_data in chunk
+        }
+        # Pages whose OCR results are all cached are not rendered again
+        render_pages = {
+            page_num for page_num in ocr_pages if not self._ocr_cached(page_keys[page_num])
+        }
+        if len(render_pages) < len(ocr_pages):
+            logger.info(f"{len(ocr_pages) - len(render_pages)} of {len(ocr_pages)} "
+                        f"OCR pages cached, rendering {len(render_pages)}")
+        stages["render"].add_total(len(render_pages))
+        stages["tesseract"].add_total(len(ocr_pages))
+        stages["vision"].add_total(len(ocr_pages) if self.ocr_processor.use_llm_vision else 0)
+        stages["cleanup"].add_total(len(chunk))
+        return page_keys, ocr_pages, render_pages
+
+    def _submit_chunk(
+        self,
+        executor: ThreadPoolExecutor,
+        stages: Dict[str, Stage],
+        escalations: Counter,
+        pdf_path: Path,
+        chunk: List[Dict[str, any]],
+        page_keys: Dict[int, Optional[str]],
+        ocr_pages: Set[int],
+        render_pages: Set[int],
+        context: str
+    ) -> Iterator[Future]:
+        """Render the chunk's OCR pages in batches and submit every page in order."""
+        page_images = self.pdf_extractor.iter_page_images(pdf_path, render_pages)
+        rendered = None  # (page_num, image) fetched from page_images, not yet used
+        slots = self.page_slots
+
+        for page_data in chunk:
+            page_num = page_data['page']
+            image = None
+            run_ocr = page_num in ocr_pages and page_num not in render_pages
+
+            if page_num in render_pages:
+                logger.info(f"Page {page_num} needs OCR")
+                if rendered is None or rendered[0] < page_num:
+                    with stages["render"].run():
+                        rendered = next(
+                            (item for item in page_images if item[0] >= page_num), None
+                        )
+                if rendered is not None and rendered[0] == page_num:
+                    image = rendered[1]
+                    rendered = None
+                    run_ocr = True
+
+            # Wait for a free slot so rendered images do not pile up
+            slots.acquire(pdf_path)
+            future = executor.submit(
+                self._process_page, stages, escalations, page_data, run_ocr, image,
+                page_keys[page_num], context
+            )
+            future.add_done_callback(lambda _: slots.release(pdf_path))
+            yield future
+
+    def _page_key(self, page_data: Dict[str, any]) -> Optional[str]:
+        """Cache fingerprint of a page at the render DPI (None if unknown)."""
+        fingerprint = page_data.get('fingerprint')
+        if not fingerprint:
+            return None
+        return cache_key(fingerprint, self.pdf_extractor.dpi)
+
+    def _ocr_cached(self, page_key: Optional[str]) -> bool:
+        """Whether all page-level OCR results are cached, so rendering can be skipped."""
+        if self.ocr_processor.escalation:
+            return self.ocr_processor.escalation_cached(page_key)
+        if not self.ocr_processor.is_cached("tesseract", page_key):
+            return False
+        return (not self.ocr_processor.use_llm_vision
+                or self.ocr_processor.is_cached("vision", page_key))
+
+    def _process_page(
+        self,
+        stages: Dict[str, Stage],
+        escalations: Counter,
+        page_data: Dict[str, any],
+        run_ocr: bool,
+        image: Optional[Image.Image],
+        page_key: Optional[str],
+        context: str
+    ) -> Optional[str]:
+        """OCR (rendered or cached) and cleanup of one page."""
+        page_num = page_data['page']
+        extracted_text = page_data['text']
+        combined_text = extracted_text
+
+        if run_ocr:
+            # The rendered image goes to OCR in memory, no temp files
+            ocr_text = self._ocr(stages, escalations, image, page_key)
+
+            # Combine with any extracted text
+            if extracted_text:
+                combined_text = f"{extracted_text}\n\n{ocr_text}"
+            else:
+                combined_text = ocr_text
+
+        if not combined_text:
+            return None
+
+        with stages["cleanup"].run():
+            cleaned_text = self.text_cleanup.process_text(
+                combined_text,
+                context=context,
+                page_num=page_num
+            )
+
+        if not cleaned_text:
+            return None
+        return f"## Seite {page_num}\n\n{cleaned_text}"
+
+    def _ocr(
+        self,
+        stages: Dict[str, Stage],
+        escalations: Counter,
+        image: Optional[Image.Image],
+        page_key: Optional[str]
+    ) -> str:
+        """Tesseract, LLM vision and combination, each within its stage limit."""
+        if self.ocr_processor.escalation:
+            return self._escalated_ocr(stages, escalations, image, page_key)
+
+        with stages["tesseract"].run():
+            tesseract_text = self.ocr_processor.extract_text_tesseract(image, page_key)
+
+        if not self.ocr_processor.use_llm_vision:
+            return tesseract_text
+
+        self._count(escalations, ESCALATE_PAGE)
+        return self._vision_ocr(stages, escalations, image, page_key, tesseract_text)
+
+    def _count(self, escalations: Counter, key: str, n: int = 1):
+        with self._count_lock:
+            escalations[key] += n
+
+    def _escalated_ocr(
+        self,
+        stages: Dict[str, Stage],
+        escalations: Counter,
+        image: Optional[Image.Image],
+        page_key: Optional[str]
+    ) -> str:
+        """Tesseract first; only unreliable pages or regions go to LLM vision."""
+        with stages["tesseract"].run():
+            lines = self.ocr_processor.tesseract_lines(image, page_key)
+        tier, regions = self.ocr_processor.plan_escalation(lines)
+        self._count(escalations, tier)
+
+        if tier == ESCALATE_NONE:
+            return join_lines(lines)
+
+        if tier == ESCALATE_REGIONS:
+            self._count(escalations, "llm_requests", len(regions))
+            with stages["vision"].run():
+                return self.ocr_processor.correct_regions(image, lines, regions, page_key)
+
+        return self._vision_ocr(stages, escalations, image, page_key, join_lines(lines))
+
+    def _vision_ocr(
+        self,
+        stages: Dict[str, Stage],
+        escalations: Counter,
+        image: Optional[Image.Image],
+        page_key: Optional[str],
+        tesseract_text: str
+    ) -> str:
+        """LLM vision of the whole page, combined with the Tesseract text."""
+        self._count(escalations, "llm_requests")
+        with stages["vision"].run():
+            llm_text = self.ocr_processor.extract_text_llm_vision(image, page_key)
+
+        if tesseract_text and llm_text:
+            with stages["combine"].run():
+                text, requests = self.ocr_processor.merge_ocr_results(tesseract_text, llm_text)
+            self._count(escalations, "llm_requests", requests)
+            if not requests:
+                self._count(escalations, "local_merges")
+            return text
+
+        if not llm_text:
+            logger.warning("LLM vision failed, using Tesseract result")
+        return llm_text or tesseract_text
@@ -0,0 +1,129 @@
+"""Interchangeable PDF text extraction backends."""
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Type
+
+import PyPDF2
+
+# pdfium is not thread-safe; documents are extracted from several threads
+_PDFIUM_LOCK = threading.Lock()
+
+
+class TextBackend:
+    """Extracts the embedded text of a PDF page by page.
+
+    Backends only read text. Page fingerprints and rendering stay with
+    PDFExtractor, so cache keys do not depend on the backend.
+    """
+
+    name = ""
+    package = ""  # pip package providing the backend
+
+    def iter_text(self, pdf_path: Path) -> Iterator[str]:
+        """Yield the text of each page in order, only as far as the caller reads.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Yields:
+            Page text ('' for pages without text)
+        """
+        raise NotImplementedError
+
+
+class PyPDF2Backend(TextBackend):
+    """PyPDF2 (pure Python, always installed)."""
+
+    name = "pypdf2"
+    package = "PyPDF2"
+
+    def iter_text(self, pdf_path: Path) -> Iterator[str]:
+        with open(pdf_path, 'rb') as file:
+            for page in PyPDF2.PdfReader(file).pages:
+                yield page.extract_text() or ''
+
+
+class PdfiumBackend(TextBackend):
+    """pypdfium2 (bindings to the PDFium library of Chromium)."""
+
+    name = "pypdfium2"
+    package = "pypdfium2"
+
+    def __init__(self):
+        import pypdfium2
+        self._pdfium = pypdfium2
+
+    def iter_text(self, pdf_path: Path) -> Iterator[str]:
+        with _PDFIUM_LOCK:
+            pdf = self._pdfium.PdfDocument(str(pdf_path))
+            page_count = len(pdf)
+        try:
+            for index in range(page_count):
+                with _PDFIUM_LOCK:
+                    page = pdf[index]
+                    text_page = page.get_textpage()
+                    text = text_page.get_text_range()
+                    text_page.close()
+                    page.close()
+                yield text.replace('\r\n', '\n').replace('\r', '\n')
+        finally:
+            with _PDFIUM_LOCK:
+                pdf.close()
+
+
+class PdfminerBackend(TextBackend):
+    """pdfminer.six (pure Python, with layout analysis)."""
+
+    name = "pdfminer"
+    package = "pdfminer.six"
+
+    def __init__(self):
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LAParams, LTFigure, LTTextContainer
+        self._extract_pages = extract_pages
+        # Also group text inside form XObjects and vertical text into lines
+        self._laparams = LAParams(all_texts=True, detect_vertical=True)
+        self._figure = LTFigure
+        self._text_container = LTTextContainer
+
+    def iter_text(self, pdf_path: Path) -> Iterator[str]:
+        for layout in self._extract_pages(pdf_path, laparams=self._laparams):
+            yield ''.join(self._texts(layout))
+
+    def _texts(self, elements) -> Iterator[str]:
+        for element in elements:
+            if isinstance(element, self._text_container):
+                yield element.get_text()
+            elif isinstance(element, self._figure):
+                yield from self._texts(element)
+
+
+TEXT_BACKENDS: Dict[str, Type[TextBackend]] = {
+    backend.name: backend for backend in (PyPDF2Backend, PdfiumBackend, PdfminerBackend)
+}
+
+
+def get_backend(name: str) -> TextBackend:
+    """Create a text backend by name.
+
+    Args:
+        name: One of TEXT_BACKENDS
+
+    Returns:
+        Backend instance
+
+    Raises:
+        ValueError: Unknown backend name
+        ImportError: The backend's package is not installed
+    """
+    if name not in TEXT_BACKENDS:
+        raise ValueError(
+            f"Unknown PDF text backend {name!r}, expected one of {tuple(TEXT_BACKENDS)}"
+        )
+    backend = TEXT_BACKENDS[name]
+    try:
+        return backend()
+    except ImportError as e:
+        raise ImportError(
+            f"PDF text backend {name!r} needs `pip install {backend.package}` ({e})"
+        ) from e
@@ -1,24 +1,42 @@
 """PDF text extraction module."""
+import hashlib
 import logging
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import PyPDF2
 from pdf2image import convert_from_path
 from PIL import Image
 
+from pdf_backends import get_backend
+
 logger = logging.getLogger(__name__)
 
 
 class PDFExtractor:
     """Extract text and images from PDF files."""
     
-    def __init__(self, dpi: int = 300):
+    def __init__(
+        self,
+        dpi: int = 300,
+        render_batch_size: int = 16,
+        render_thread_count: int = 1,
+        render_max_gap: int = 2,
+        text_backend: str = "pypdf2"
+    ):
         """Initialize PDF extractor.
         
         Args:
             dpi: DPI for PDF to image conversion
+            render_batch_size: Max pages rendered per poppler call
+            render_thread_count: pdftoppm processes per call
+            render_max_gap: Unneeded pages rendered to join two page ranges
+            text_backend: Text extraction backend (see pdf_backends.TEXT_BACKENDS)
         """
+        self.backend = get_backend(text_backend)
         self.dpi = dpi
+        self.render_batch_size = max(1, render_batch_size)
+        self.render_thread_count = max(1, render_thread_count)
+        self.render_max_gap = max(0, render_max_gap)
     
     def extract_text(self, pdf_path: Path) -> List[Dict[str, any]]:
         """Extract text from PDF pages.
@@ -29,20 +47,8 @@ class PDFExtractor:
         Returns:
             List of dictionaries with page number and text
         """
-        pages_data = []
-        
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                for page_num, page in enumerate(pdf_reader.pages, start=1):
-                    text = page.extract_text()
-                    pages_data.append({
-                        'page': page_num,
-                        'text': text.strip() if text else '',
-                        'has_text': bool(text and text.strip())
-                    })
-                    
+            pages_data = list(self.iter_text(pdf_path))
             logger.info(f"Extracted text from {len(pages_data)} pages")
             return pages_data
             
@@ -50,6 +56,86 @@ class PDFExtractor:
             logger.error(f"Error extracting text from {pdf_path}: {e}")
             return []
     
+    def iter_text(self, pdf_path: Path) -> Iterator[Dict[str, any]]:
+        """Extract text page by page, only as far as the caller reads.
+        
+        The text comes from the configured backend. Page fingerprints are
+        always taken from the PyPDF2 page structure, so cache keys stay
+        the same when the backend changes. Both parse a page only when it
+        is accessed, so only the page being extracted is held in memory.
+        Errors are raised to the caller.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Yields:
+            Dictionaries with page number and text, as from extract_text
+        """
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            texts = self.backend.iter_text(pdf_path)
+            
+            for page_num, (page, text) in enumerate(zip(pdf_reader.pages, texts), start=1):
+                yield {
+                    'page': page_num,
+                    'text': text.strip() if text else '',
+                    'has_text': bool(text and text.strip()),
+                    'fingerprint': self.page_fingerprint(page)
+                }
+
+    def page_count(self, pdf_path: Path) -> int:
+        """Count the pages of a PDF without extracting text.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            Number of pages (0 if the PDF cannot be read)
+        """
+        try:
+            with open(pdf_path, 'rb') as file:
+                return len(PyPDF2.PdfReader(file).pages)
+        except Exception as e:
+            logger.warning(f"Could not count pages of {pdf_path}: {e}")
+            return 0
+    
+    def page_fingerprint(self, page) -> Optional[str]:
+        """Hash of what a page renders to, without rendering it.
+        
+        Covers the content streams, the raw data of the images and forms
+        the page draws, the page box and the rotation. Identical pages in
+        different documents (cover sheets, boilerplate) get the same hash.
+        
+        Args:
+            page: PyPDF2 page object
+            
+        Returns:
+            Hex digest, or None if the page structure could not be read
+        """
+        try:
+            digest = hashlib.sha256()
+            digest.update(f"{list(page.mediabox)}:{page.get('/Rotate', 0)}".encode())
+            
+            contents = page.get_contents()
+            if contents is not None:
+                digest.update(contents.get_data())
+            
+            resources = page.get('/Resources')
+            xobjects = resources.get_object().get('/XObject') if resources else None
+            if xobjects:
+                xobjects = xobjects.get_object()
+                for name in sorted(xobjects):
+                    xobject = xobjects[name].get_object()
+                    digest.update(name.encode())
+                    # Raw (still encoded) stream data: no need to decode images
+                    digest.update(getattr(xobject, '_data', b'') or b'')
+            
+            return digest.hexdigest()
+            
+        except Exception as e:
+            logger.warning(f"Could not fingerprint page: {e}")
+            return None
+    
     def convert_to_images(self, pdf_path: Path, output_dir: Path) -> List[Path]:
         """Convert PDF pages to images.
         
@@ -84,6 +170,66 @@ class PDFExtractor:
             logger.error(f"Error converting PDF to images: {e}")
             return []
     
+    def page_ranges(self, page_numbers: Iterable[int]) -> List[Tuple[int, int]]:
+        """Group page numbers into (first, last) ranges for batched rendering.
+        
+        Ranges separated by at most `render_max_gap` pages are joined (one
+        poppler call is cheaper than re-parsing the PDF), and no range is
+        longer than `render_batch_size` pages.
+        
+        Args:
+            page_numbers: 1-based page numbers to render
+            
+        Returns:
+            List of inclusive (first_page, last_page) tuples
+        """
+        ranges = []
+        for page in sorted(set(page_numbers)):
+            if ranges:
+                first, last = ranges[-1]
+                if (page - last - 1 <= self.render_max_gap
+                        and page - first < self.render_batch_size):
+                    ranges[-1] = (first, page)
+                    continue
+            ranges.append((page, page))
+        return ranges
+    
+    def iter_page_images(
+        self, pdf_path: Path, page_numbers: Iterable[int]
+    ) -> Iterator[Tuple[int, Image.Image]]:
+        """Render the given pages in batches and yield them lazily.
+        
+        Each batch is one `convert_from_path` call for a page range, split
+        across `render_thread_count` pdftoppm processes and returned in
+        memory (no files). Only one batch is held at a time. Pages of a
+        batch that fails to render are skipped.
+        
+        Args:
+            pdf_path: Path to PDF file
+            page_numbers: 1-based page numbers to render
+            
+        Yields:
+            (page_number, PIL image) in ascending page order
+        """
+        wanted = set(page_numbers)
+        for first, last in self.page_ranges(wanted):
+            try:
+                images = convert_from_path(
+                    pdf_path,
+                    dpi=self.dpi,
+                    first_page=first,
+                    last_page=last,
+                    thread_count=min(self.render_thread_count, last - first + 1)
+                )
+            except Exception as e:
+                logger.error(f"Error rendering pages {first}-{last} of {pdf_path}: {e}")
+                continue
+            
+            logger.info(f"Rendered pages {first}-{last} at {self.dpi} DPI")
+            for page_num, image in enumerate(images, start=first):
+                if page_num in wanted:
+                    yield page_num, image
+    
     def needs_ocr(self, page_data: Dict[str, any], min_text_ratio: float = 0.1) -> bool:
         """Determine if a page needs OCR.
         
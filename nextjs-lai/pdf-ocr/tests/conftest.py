@@ -15,6 +15,15 @@ def temp_dir():
         yield Path(tmpdir)
 
 
+@pytest.fixture(autouse=True)
+def isolated_page_cache(tmp_path, monkeypatch):
+    """Keep converters created in tests away from the real page cache."""
+    import main
+    from page_cache import PageCache
+    
+    monkeypatch.setattr(main, 'PageCache', lambda path: PageCache(tmp_path / "page_cache.sqlite3"))
+
+
 @pytest.fixture
 def sample_image(temp_dir):
     """Create a sample test image."""
@@ -88,3 +97,26 @@ def mock_tesseract_result():
 def mock_llm_vision_result():
     """Mock LLM Vision result."""
     return "Tesseract OCR Ergebnis mit einigen Fehlern"
+
+
+@pytest.fixture
+def tesseract_data():
+    """Build pytesseract.image_to_data output from lines of (word, confidence)."""
+    def build(lines, paragraphs=None):
+        data = {key: [] for key in (
+            'text', 'conf', 'left', 'top', 'width', 'height', 'block_num', 'par_num', 'line_num'
+        )}
+        for line_num, words in enumerate(lines, start=1):
+            par_num = paragraphs[line_num - 1] if paragraphs else 1
+            for word_num, (word, conf) in enumerate(words):
+                data['text'].append(word)
+                data['conf'].append(conf)
+                data['left'].append(10 + 60 * word_num)
+                data['top'].append(20 * line_num)
+                data['width'].append(50)
+                data['height'].append(15)
+                data['block_num'].append(1)
+                data['par_num'].append(par_num)
+                data['line_num'].append(line_num)
+        return data
+    return build
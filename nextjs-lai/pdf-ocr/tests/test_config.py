@@ -3,6 +3,8 @@ import os
 from pathlib import Path
 import pytest
 
+from pdf_backends import TEXT_BACKENDS
+
 
 def test_project_dir_exists():
     """Test that PROJECT_DIR is set correctly."""
@@ -31,14 +33,36 @@ def test_ocr_config_values():
     assert config.TESSERACT_LANG == "deu"
     assert config.MIN_TEXT_LENGTH >= 0
     assert config.MIN_CONFIDENCE >= 0
+    assert config.MIN_CONFIDENCE <= config.ACCEPT_CONFIDENCE <= 100
+    assert 0 <= config.MIN_DICTIONARY_RATE <= 1
+    assert isinstance(config.OCR_ESCALATION, bool)
+    assert isinstance(config.LOCAL_MERGE, bool)
+    assert 0 <= config.MAX_UNRESOLVED_SHARE <= 1
 
 
 def test_processing_config():
     """Test processing configuration."""
     import config
     assert config.DPI > 0
+    assert config.PDF_TEXT_BACKEND in TEXT_BACKENDS
     assert isinstance(config.USE_LLM_VISION, bool)
     assert isinstance(config.USE_LLM_CLEANUP, bool)
+    assert isinstance(config.SELECTIVE_CLEANUP, bool)
+    assert 0 <= config.MAX_UNKNOWN_RATE <= 1
+    assert config.CLEANUP_BATCH_CHARS >= 1
+    assert config.RENDER_BATCH_SIZE >= 1
+    assert config.RENDER_THREAD_COUNT >= 1
+
+
+def test_pipeline_config():
+    """Test pipeline concurrency limits."""
+    import config
+    assert config.OCR_WORKERS >= 1
+    assert config.LLM_VISION_CONCURRENCY >= 1
+    assert config.LLM_COMBINE_CONCURRENCY >= 1
+    assert config.LLM_CLEANUP_CONCURRENCY >= 1
+    assert config.MAX_PAGES_IN_FLIGHT >= 1
+    assert isinstance(config.STREAM_OUTPUT, bool)
 
 
 def test_env_override(monkeypatch, temp_dir):
@@ -0,0 +1,108 @@
+"""Tests for job_scheduler module."""
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from job_scheduler import DocumentJob, DocumentScheduler, format_summary
+
+
+class TestDocumentJob:
+    """Test suite for DocumentJob."""
+
+    def test_timing(self):
+        """Test wait and run time before and after a job ran."""
+        job = DocumentJob(Path("doc.pdf"), pages=3, queued_at=1.0)
+
+        assert job.wait_seconds == 0.0
+        assert job.run_seconds == 0.0
+
+        job.started_at = 3.0
+        job.finished_at = 7.5
+        assert job.wait_seconds == 2.0
+        assert job.run_seconds == 4.5
+
+
+class TestDocumentScheduler:
+    """Test suite for DocumentScheduler."""
+
+    def test_invalid_policy(self):
+        """Test that unknown policies are rejected."""
+        with pytest.raises(ValueError, match="largest"):
+            DocumentScheduler(lambda path: None, policy="largest")
+
+    def test_plan_shortest_first(self):
+        """Test ordering by page count, stable for equal counts."""
+        pages = {"a": 30, "b": 5, "c": 12, "d": 5}
+        scheduler = DocumentScheduler(
+            lambda path: None, policy="shortest", page_count=lambda path: pages[path.stem]
+        )
+
+        jobs = scheduler.plan([Path(f"{name}.pdf") for name in "abcd"])
+
+        assert [job.path.stem for job in jobs] == ["b", "d", "c", "a"]
+        assert [job.pages for job in jobs] == [5, 5, 12, 30]
+
+    def test_plan_keeps_order_and_survives_count_errors(self):
+        """Test fifo order and unknown page counts."""
+        def page_count(path):
+            raise OSError("unreadable")
+
+        scheduler = DocumentScheduler(lambda path: None, policy="fifo", page_count=page_count)
+
+        jobs = scheduler.plan([Path("z.pdf"), Path("a.pdf")])
+
+        assert [job.path.stem for job in jobs] == ["z", "a"]
+        assert all(job.pages == 0 for job in jobs)
+        assert DocumentScheduler(lambda path: None).plan([Path("x.pdf")])[0].pages == 0
+
+    def test_run_concurrent_with_status(self, temp_dir):
+        """Test concurrent documents, per-document status and the document limit."""
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def convert(path):
+            with lock:
+                active.append(path)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(path)
+            if path.stem == "broken":
+                raise RuntimeError("damaged")
+            if path.stem == "empty":
+                return None
+            return temp_dir / f"{path.stem}.md"
+
+        scheduler = DocumentScheduler(
+            convert, max_documents=2, policy="fair", show_progress=False
+        )
+        paths = [Path(f"{name}.pdf") for name in ("one", "broken", "empty", "two")]
+
+        jobs = scheduler.run(paths)
+
+        assert [job.status for job in jobs] == ["done", "failed", "empty", "done"]
+        assert jobs[0].output_path == temp_dir / "one.md"
+        assert jobs[1].error == "damaged"
+        assert max(peak) == 2
+        assert all(job.run_seconds > 0 for job in jobs)
+        # The last two documents waited for a free worker
+        assert jobs[3].wait_seconds > 0
+
+    def test_format_summary(self):
+        """Test the status table."""
+        jobs = [
+            DocumentJob(Path("kurz.pdf"), pages=2, status="done",
+                        queued_at=0.0, started_at=0.0, finished_at=1.25),
+            DocumentJob(Path("ein_langer_name.pdf"), pages=120, status="failed",
+                        queued_at=0.0, started_at=1.0, finished_at=2.0),
+        ]
+
+        lines = format_summary(jobs).splitlines()
+
+        assert lines[0].split() == ["Document", "Pages", "Status", "Wait", "Time"]
+        assert lines[1].split() == ["kurz.pdf", "2", "done", "0.0s", "1.2s"]
+        assert lines[2].split() == ["ein_langer_name.pdf", "120", "failed", "1.0s", "1.0s"]
+        assert lines[3] == "1/2 documents converted, 1 failed"
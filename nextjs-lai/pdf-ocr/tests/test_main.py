@@ -86,6 +86,19 @@ class TestPDF2MarkdownConverter:
         
         assert converter.max_pages == 5
     
+    @patch('main.TextCleanup')
+    @patch('main.OCRProcessor')
+    @patch('main.PDFExtractor')
+    def test_init_cache(self, mock_extractor, mock_ocr, mock_cleanup):
+        """Test that the page cache is shared by OCR and cleanup, or disabled."""
+        converter = PDF2MarkdownConverter()
+        
+        assert converter.cache is not None
+        assert mock_ocr.call_args[1]['cache'] is converter.cache
+        assert mock_cleanup.call_args[1]['cache'] is converter.cache
+        
+        assert PDF2MarkdownConverter(use_cache=False).cache is None
+    
     def test_create_markdown(self):
         """Test markdown creation."""
         with patch('main.TextCleanup'), \
@@ -122,11 +135,13 @@ class TestPDF2MarkdownConverter:
         mock_config.PDF_DIR.glob.return_value = [mock_pdf1, mock_pdf2]
         mock_config.OUTPUT_DIR = Path("/fake/output")
         mock_process.return_value = "# Markdown"
+        mock_config.MAX_DOCUMENTS = 2
+        mock_config.SCHEDULING = "shortest"
         
         with patch('main.TextCleanup'), \
              patch('main.OCRProcessor'), \
              patch('main.PDFExtractor'):
-            converter = PDF2MarkdownConverter()
+            converter = PDF2MarkdownConverter(stream=False)
             with patch.object(converter, 'save_markdown'):
                 converter.convert_pdfs()
         
@@ -158,12 +173,50 @@ class TestPDF2MarkdownConverter:
         with patch('main.TextCleanup'), \
              patch('main.OCRProcessor'), \
              patch('main.PDFExtractor'), \
-             patch('main.config'):
-            converter = PDF2MarkdownConverter()
-            with patch.object(converter, 'save_markdown'):
+             patch('main.config') as mock_config:
+            mock_config.MAX_DOCUMENTS = 1
+            mock_config.SCHEDULING = "fifo"
+            mock_config.OUTPUT_DIR = temp_dir
+            converter = PDF2MarkdownConverter(stream=False)
+            with patch.object(converter, 'save_markdown') as mock_save:
                 converter.convert_pdfs(pdf_paths=[pdf1, pdf2])
         
         assert mock_process.call_count == 2
+        assert [c[0][1] for c in mock_save.call_args_list] == [
+            temp_dir / "test1.md", temp_dir / "test2.md"
+        ]
+    
+    @patch('main.PDF2MarkdownConverter.process_pdf')
+    def test_convert_pdfs_shortest_first_and_errors(self, mock_process, temp_dir):
+        """Test that short documents start first and a failing one does not stop the others."""
+        paths = []
+        for name in ("long", "broken", "short"):
+            path = temp_dir / f"{name}.pdf"
+            path.touch()
+            paths.append(path)
+        pages = {"long": 50, "broken": 10, "short": 2}
+        
+        def process(pdf_path):
+            if pdf_path.stem == "broken":
+                raise RuntimeError("damaged")
+            return "" if pdf_path.stem == "long" else "# Markdown"
+        
+        mock_process.side_effect = process
+        
+        with patch('main.TextCleanup'), \
+             patch('main.OCRProcessor'), \
+             patch('main.PDFExtractor') as mock_extractor_class:
+            mock_extractor_class.return_value.page_count.side_effect = (
+                lambda path: pages[path.stem]
+            )
+            converter = PDF2MarkdownConverter(max_pages=20, max_documents=1, stream=False)
+            with patch.object(converter, 'save_markdown') as mock_save:
+                converter.convert_pdfs(pdf_paths=paths)
+        
+        assert [c[0][0].stem for c in mock_process.call_args_list] == [
+            "short", "broken", "long"
+        ]
+        mock_save.assert_called_once()
     
     def test_convert_pdfs_invalid_files(self, temp_dir):
         """Test converting with invalid file paths."""
@@ -177,51 +230,125 @@ class TestPDF2MarkdownConverter:
         
         # Should handle gracefully
     
-    @patch('main.shutil.rmtree')
     @patch('main.PDF2MarkdownConverter.create_markdown')
+    @patch('main.PagePipeline')
     @patch('main.TextCleanup')
     @patch('main.OCRProcessor')
     @patch('main.PDFExtractor')
     @patch('main.config')
     def test_process_pdf_with_ocr(
         self, mock_config, mock_extractor_class, mock_ocr_class,
-        mock_cleanup_class, mock_create_md, mock_rmtree, temp_dir
+        mock_cleanup_class, mock_pipeline_class, mock_create_md, temp_dir
     ):
-        """Test processing PDF that needs OCR."""
+        """Test processing PDF through the page pipeline."""
         # Setup mocks
-        mock_config.TEMP_DIR = temp_dir / "temp"
-        mock_config.DPI = 300
-        
+        pages_data = [{'page': 1, 'text': 'Short', 'has_text': True}]
         mock_extractor = MagicMock()
         mock_extractor_class.return_value = mock_extractor
-        mock_extractor.extract_text.return_value = [
-            {'page': 1, 'text': 'Short', 'has_text': True}
-        ]
-        mock_extractor.needs_ocr.return_value = True
+        mock_extractor.extract_text.return_value = pages_data
         
-        mock_ocr = MagicMock()
-        mock_ocr_class.return_value = mock_ocr
-        mock_ocr.extract_text.return_value = "OCR extracted text"
+        mock_pipeline = MagicMock()
+        mock_pipeline_class.return_value = mock_pipeline
+        mock_pipeline.run.return_value = ["## Seite 1\n\nCleaned text"]
         
         mock_cleanup = MagicMock()
         mock_cleanup_class.return_value = mock_cleanup
-        mock_cleanup.process_text.return_value = "Cleaned text"
         mock_cleanup.merge_page_texts.return_value = "Final text"
         
         mock_create_md.return_value = "# Markdown"
         
         # Test
-        with patch('pdf2image.convert_from_path') as mock_convert:
-            mock_img = MagicMock()
-            mock_convert.return_value = [mock_img]
-            
-            converter = PDF2MarkdownConverter()
-            pdf_path = temp_dir / "test.pdf"
-            pdf_path.touch()
-            result = converter.process_pdf(pdf_path)
+        converter = PDF2MarkdownConverter()
+        pdf_path = temp_dir / "test.pdf"
+        pdf_path.touch()
+        result = converter.process_pdf(pdf_path)
         
         assert result == "# Markdown"
-        mock_ocr.extract_text.assert_called_once()
+        mock_pipeline.run.assert_called_once_with(pdf_path, pages_data, context="test")
+        mock_cleanup.merge_page_texts.assert_called_once_with(["## Seite 1\n\nCleaned text"])
+        mock_create_md.assert_called_once_with("test", "Final text")
+    
+    @patch('main.PagePipeline')
+    @patch('main.TextCleanup')
+    @patch('main.OCRProcessor')
+    @patch('main.PDFExtractor')
+    @patch('main.config')
+    def test_process_pdf_max_pages(
+        self, mock_config, mock_extractor_class, mock_ocr_class,
+        mock_cleanup_class, mock_pipeline_class, temp_dir
+    ):
+        """Test that only the first max_pages pages reach the pipeline."""
+        mock_extractor = MagicMock()
+        mock_extractor_class.return_value = mock_extractor
+        mock_extractor.extract_text.return_value = [
+            {'page': n, 'text': f'Page {n}', 'has_text': True} for n in range(1, 6)
+        ]
+        mock_pipeline = MagicMock()
+        mock_pipeline_class.return_value = mock_pipeline
+        mock_pipeline.run.return_value = []
+        mock_cleanup_class.return_value.merge_page_texts.return_value = ""
+        
+        converter = PDF2MarkdownConverter(max_pages=2)
+        converter.process_pdf(temp_dir / "test.pdf")
+        
+        pages_data = mock_pipeline.run.call_args[0][1]
+        assert [page['page'] for page in pages_data] == [1, 2]
+
+    
+    def test_stream_pdf_writes_pages_as_they_finish(self, temp_dir):
+        """Test lazy extraction, limited pages and in-order appends to the partial file."""
+        pdf_path = temp_dir / "doc.pdf"
+        output_path = temp_dir / "doc.md"
+        read = []
+        
+        def iter_text(path):
+            for n in range(1, 6):
+                read.append(n)
+                yield {'page': n, 'text': f'Seite {n}', 'has_text': True}
+        
+        def iter_sections(path, pages, context, chunk_pages):
+            for page in pages:
+                # Earlier pages are already on disk when the next one is yielded
+                if page['page'] > 1:
+                    partial = output_path.with_name("doc.md.partial").read_text(encoding='utf-8')
+                    assert f"## Seite {page['page'] - 1}" in partial
+                yield f"## Seite {page['page']}\n\n{page['text']}"
+        
+        with patch('main.TextCleanup'), \
+             patch('main.OCRProcessor'), \
+             patch('main.PDFExtractor') as mock_extractor_class, \
+             patch('main.PagePipeline') as mock_pipeline_class:
+            mock_extractor_class.return_value.iter_text.side_effect = iter_text
+            mock_extractor_class.return_value.render_batch_size = 16
+            mock_pipeline_class.return_value.iter_sections.side_effect = iter_sections
+            converter = PDF2MarkdownConverter(max_pages=3, stream=True)
+            result = converter.stream_pdf(pdf_path, output_path)
+        
+        assert result == output_path
+        assert read == [1, 2, 3]
+        assert output_path.read_text(encoding='utf-8') == (
+            "# doc\n\n## Seite 1\n\nSeite 1\n\n---\n\n## Seite 2\n\nSeite 2"
+            "\n\n---\n\n## Seite 3\n\nSeite 3\n"
+        )
+        assert not (temp_dir / "doc.md.partial").exists()
+    
+    def test_convert_document_streaming(self, temp_dir):
+        """Test that the streaming path is used by default and reports empty documents."""
+        with patch('main.TextCleanup'), \
+             patch('main.OCRProcessor'), \
+             patch('main.PDFExtractor'), \
+             patch('main.config') as mock_config:
+            mock_config.OUTPUT_DIR = temp_dir
+            mock_config.STREAM_OUTPUT = True
+            converter = PDF2MarkdownConverter()
+            with patch.object(converter, 'stream_pdf', side_effect=[temp_dir / "a.md", None]) \
+                    as mock_stream, \
+                    patch.object(converter, 'process_pdf') as mock_process:
+                assert converter.convert_document(temp_dir / "a.pdf") == temp_dir / "a.md"
+                assert converter.convert_document(temp_dir / "b.pdf") is None
+        
+        mock_stream.assert_any_call(temp_dir / "a.pdf", temp_dir / "a.md")
+        mock_process.assert_not_called()
 
 
 class TestParseArguments:
@@ -250,6 +377,13 @@ class TestParseArguments:
         
         assert args.files == ['file1.pdf', 'file2.pdf']
     
+    def test_parse_arguments_no_stream(self):
+        """Test the switch back to writing whole documents."""
+        with patch('sys.argv', ['main.py']):
+            assert parse_arguments().no_stream is False
+        with patch('sys.argv', ['main.py', '--no-stream']):
+            assert parse_arguments().no_stream is True
+    
     def test_parse_arguments_max_pages(self):
         """Test max pages argument."""
         with patch('sys.argv', ['main.py', '--max-pages', '10']):
@@ -270,6 +404,10 @@ class TestMain:
         mock_args.test = False
         mock_args.max_pages = None
         mock_args.files = None
+        mock_args.no_cache = False
+        mock_args.jobs = None
+        mock_args.schedule = None
+        mock_args.no_stream = False
         mock_parse.return_value = mock_args
         
         mock_converter = MagicMock()
@@ -279,7 +417,9 @@ class TestMain:
         
         main()
         
-        mock_converter_class.assert_called_once_with(max_pages=None)
+        mock_converter_class.assert_called_once_with(
+            max_pages=None, use_cache=True, max_documents=None, scheduling=None, stream=None
+        )
         mock_converter.convert_pdfs.assert_called_once()
     
     @patch('main.PDF2MarkdownConverter')
@@ -291,6 +431,10 @@ class TestMain:
         mock_args.test = True
         mock_args.max_pages = None
         mock_args.files = None
+        mock_args.no_cache = False
+        mock_args.jobs = None
+        mock_args.schedule = None
+        mock_args.no_stream = False
         mock_parse.return_value = mock_args
         
         mock_converter = MagicMock()
@@ -300,7 +444,9 @@ class TestMain:
         
         main()
         
-        mock_converter_class.assert_called_once_with(max_pages=2)
+        mock_converter_class.assert_called_once_with(
+            max_pages=2, use_cache=True, max_documents=None, scheduling=None, stream=None
+        )
     
     @patch('main.PDF2MarkdownConverter')
     @patch('main.parse_arguments')
@@ -312,6 +458,7 @@ class TestMain:
         mock_args.test = False
         mock_args.max_pages = None
         mock_args.files = ['file1.pdf']
+        mock_args.no_cache = True
         mock_parse.return_value = mock_args
         
         mock_file_path = MagicMock(spec=Path)
@@ -0,0 +1,70 @@
+"""Tests for markdown_writer module."""
+import pytest
+
+from main import PDF2MarkdownConverter
+from markdown_writer import MarkdownWriter
+from text_cleanup import TextCleanup
+
+
+class TestMarkdownWriter:
+    """Test suite for MarkdownWriter."""
+
+    def test_sections_visible_before_commit(self, temp_dir):
+        """Test that written pages are on disk while the document is still open."""
+        output = temp_dir / "doc.md"
+
+        with MarkdownWriter(output, "doc") as writer:
+            writer.write_section("## Seite 1\n\nEins")
+            assert writer.partial_path == temp_dir / "doc.md.partial"
+            assert writer.partial_path.read_text(encoding='utf-8') == "# doc\n\n## Seite 1\n\nEins"
+            assert not output.exists()
+            writer.write_section("## Seite 2\n\nZwei")
+            assert writer.commit() == output
+
+        assert not writer.partial_path.exists()
+        assert output.read_text(encoding='utf-8').startswith("# doc\n\n## Seite 1")
+
+    def test_same_output_as_merged_document(self, temp_dir):
+        """Test that streaming writes exactly what the in-memory path would."""
+        sections = ["## Seite 1\n\nEins", "## Seite 3\n\nDrei", "## Seite 4\n\nVier"]
+        merged = TextCleanup(use_llm=False).merge_page_texts(sections)
+        expected = PDF2MarkdownConverter.create_markdown(None, "doc", merged)
+
+        with MarkdownWriter(temp_dir / "doc.md", "doc") as writer:
+            for section in sections:
+                writer.write_section(section)
+            writer.commit()
+
+        assert (temp_dir / "doc.md").read_text(encoding='utf-8') == expected
+
+    def test_empty_document_leaves_no_file(self, temp_dir):
+        """Test that a document without sections writes nothing."""
+        with MarkdownWriter(temp_dir / "doc.md", "doc") as writer:
+            assert writer.commit() is None
+
+        assert list(temp_dir.iterdir()) == []
+
+    def test_replaces_previous_output(self, temp_dir):
+        """Test that the finished file replaces an older conversion."""
+        output = temp_dir / "doc.md"
+        output.write_text("old", encoding='utf-8')
+
+        with MarkdownWriter(output, "doc") as writer:
+            writer.write_section("## Seite 1\n\nNeu")
+            assert output.read_text(encoding='utf-8') == "old"
+            writer.commit()
+
+        assert "Neu" in output.read_text(encoding='utf-8')
+
+    def test_failure_keeps_partial_and_previous_output(self, temp_dir):
+        """Test that a failed conversion leaves the old output untouched."""
+        output = temp_dir / "doc.md"
+        output.write_text("old", encoding='utf-8')
+
+        with pytest.raises(RuntimeError):
+            with MarkdownWriter(output, "doc") as writer:
+                writer.write_section("## Seite 1\n\nEins")
+                raise RuntimeError("pipeline crashed")
+
+        assert output.read_text(encoding='utf-8') == "old"
+        assert writer.partial_path.read_text(encoding='utf-8').endswith("Eins")
@@ -0,0 +1,123 @@
+"""Tests for ocr_merge module."""
+import pytest
+from spellchecker import SpellChecker
+
+from ocr_merge import Conflict, MergeResult, TranscriptMerger, fold, tokenize
+
+
+@pytest.fixture(scope="module")
+def merger():
+    return TranscriptMerger(SpellChecker(language='de'))
+
+
+class TestHelpers:
+    """Test suite for tokenizing and folding."""
+
+    def test_tokenize_keeps_whitespace(self):
+        """Test that each word keeps the whitespace after it."""
+        assert tokenize("Die  Prüfung\nbeginnt.") == [
+            ("Die", "  "), ("Prüfung", "\n"), ("beginnt.", "")
+        ]
+
+    def test_fold_confusions(self):
+        """Test that OCR confusions share a key and real differences do not."""
+        assert fold("Feh1er") == fold("Fehler,") == fold("fehIer")
+        assert fold("2O23") == fold("2023")
+        assert fold("rneldet") == fold("meldet")
+        assert fold("Prufung") == fold("Prüfung")
+        assert fold("Fehler") != fold("Fahrer")
+        assert fold("—") == "—"
+
+
+class TestTranscriptMerger:
+    """Test suite for TranscriptMerger."""
+
+    def test_identical(self, merger):
+        """Test that identical transcripts merge without conflicts."""
+        result = merger.merge("Die Prüfung beginnt.", "Die Prüfung beginnt.")
+
+        assert result.text() == "Die Prüfung beginnt."
+        assert (result.agreed, result.resolved, result.conflicts) == (3, 0, [])
+
+    def test_confusions_resolved(self, merger):
+        """Test l/1, O/0, rn/m and umlaut confusions on either side."""
+        result = merger.merge(
+            "Die Prufung wird im Jahr 2O23 schrift1ich abgelegt. Der Betrieb rneldet sie.",
+            "Die Prüfung wird im Jahr 2023 schriftlich abgelegt.\nDer Betrieb meldet sie."
+        )
+
+        assert result.text() == (
+            "Die Prüfung wird im Jahr 2023 schriftlich abgelegt.\nDer Betrieb meldet sie."
+        )
+        assert result.conflicts == []
+        assert result.resolved == 4
+
+    def test_tesseract_wins_on_dictionary_and_shape(self, merger):
+        """Test that the vision reading is not preferred when Tesseract is right."""
+        result = merger.merge("Seite 10 von 12", "Seite lO von 12")
+
+        assert result.text() == "Seite 10 von 12"
+        assert merger.choose("wird", "wlrd") == "wird"
+        assert merger.choose("wlrd", "wird") == "wird"
+
+    def test_split_words_and_noise(self, merger):
+        """Test split/joined words and punctuation-only noise."""
+        result = merger.merge(
+            "Der Aus bildungsbetrieb | zahlt — monatlich.",
+            "Der Ausbildungsbetrieb zahlt monatlich."
+        )
+
+        assert result.text() == "Der Ausbildungsbetrieb zahlt monatlich."
+        assert result.conflicts == []
+
+    def test_dictionary_decides_substitution(self, merger):
+        """Test a differing word where only one reading is a word."""
+        result = merger.merge("Er wird geprüft", "Er wlrb geprüft")
+
+        assert result.text() == "Er wird geprüft"
+        assert result.conflicts == []
+
+    def test_conflicts_left_open(self, merger):
+        """Test that real disagreements become conflicts with context."""
+        result = merger.merge(
+            "Der Betrieb zahlt die Vergütung pünktlich.",
+            "Der Betrieb zahlt eine Vergütung pünktlich. Zusatz"
+        )
+
+        assert [(c.tesseract, c.vision) for c in result.conflicts] == [
+            ("die", "eine"), ("", "Zusatz")
+        ]
+        first = result.conflicts[0]
+        assert first.before == "Der Betrieb zahlt"
+        assert first.after == "Vergütung pünktlich. Zusatz"
+        assert result.unresolved_share == pytest.approx(2 / 7)
+        # Without an answer the vision reading is used
+        assert result.text() == "Der Betrieb zahlt eine Vergütung pünktlich. Zusatz"
+
+        first.choice = "die"
+        result.conflicts[1].choice = ""
+        assert result.text() == "Der Betrieb zahlt die Vergütung pünktlich."
+
+    def test_without_dictionary(self):
+        """Test shape rules when no spell checker is available."""
+        merger = TranscriptMerger()
+
+        assert merger.known("wird") is False
+        assert merger.merge("Feh1er", "Fehler").text() == "Fehler"
+        assert merger.merge("die", "eine").conflicts
+
+
+class TestMergeResult:
+    """Test suite for MergeResult."""
+
+    def test_empty(self):
+        """Test an empty merge."""
+        assert MergeResult().unresolved_share == 0.0
+        assert MergeResult().text() == ""
+
+    def test_conflict_words(self):
+        """Test the size of a conflict."""
+        conflict = Conflict("a b", "c", "", "")
+
+        assert conflict.words == 2
+        assert conflict.text == "c"
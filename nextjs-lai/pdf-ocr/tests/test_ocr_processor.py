@@ -1,8 +1,73 @@
 """Unit tests for ocr_processor module."""
+import base64
+import io
 import pytest
 from pathlib import Path
 from unittest.mock import MagicMock, patch, mock_open
-from ocr_processor import OCRProcessor
+from PIL import Image, ImageDraw, ImageFont
+from ocr_processor import OCRProcessor, encode_for_vision, load_image
+from page_cache import PageCache, image_fingerprint
+
+
+class TestImageHelpers:
+    """Test suite for image loading and vision encoding."""
+    
+    def test_load_image_sources(self, sample_image):
+        """Test loading from PIL image, path, str, bytes and buffer."""
+        image = Image.open(sample_image)
+        data = sample_image.read_bytes()
+        
+        assert load_image(image) is image
+        assert load_image(sample_image).size == (100, 100)
+        assert load_image(str(sample_image)).size == (100, 100)
+        assert load_image(data).size == (100, 100)
+        assert load_image(io.BytesIO(data)).size == (100, 100)
+    
+    def test_encode_for_vision_downscales_grayscale_jpeg(self):
+        """Test that a large color page becomes a small grayscale JPEG."""
+        page = Image.new('RGB', (2480, 3508), color='white')
+        
+        data, mime_type = encode_for_vision(page, max_side=1024)
+        decoded = Image.open(io.BytesIO(data))
+        
+        assert mime_type == "image/jpeg"
+        assert decoded.format == "JPEG"
+        assert decoded.mode == "L"
+        assert max(decoded.size) == 1024
+        assert decoded.size[0] == round(2480 * 1024 / 3508)
+    
+    def test_encode_for_vision_no_upscaling(self):
+        """Test that small images keep their size."""
+        data, _ = encode_for_vision(Image.new('RGB', (100, 50)), max_side=1024)
+        
+        assert Image.open(io.BytesIO(data)).size == (100, 50)
+    
+    def test_encode_for_vision_formats(self):
+        """Test WebP, PNG and color output."""
+        page = Image.new('RGB', (200, 100), color='red')
+        
+        data, mime_type = encode_for_vision(page, image_format="webp")
+        assert mime_type == "image/webp"
+        assert Image.open(io.BytesIO(data)).format == "WEBP"
+        
+        data, mime_type = encode_for_vision(page, image_format="PNG", grayscale=False)
+        assert mime_type == "image/png"
+        assert Image.open(io.BytesIO(data)).mode == "RGB"
+    
+    def test_encode_for_vision_smaller_than_png(self):
+        """Test that the vision payload is far smaller than the rendered PNG."""
+        page = Image.new('RGB', (2480, 3508), color='white')
+        draw = ImageDraw.Draw(page)
+        font = ImageFont.load_default(size=36)
+        for line in range(70):
+            draw.text((150, 150 + line * 45), f"Zeile {line}: Beispieltext für die OCR 12345.",
+                      fill='black', font=font)
+        png = io.BytesIO()
+        page.save(png, 'PNG')
+        
+        data, _ = encode_for_vision(page, quality=75)
+        
+        assert len(data) < len(png.getvalue()) / 2
 
 
 class TestOCRProcessor:
@@ -44,6 +109,18 @@ class TestOCRProcessor:
         assert result == "Extracted text"
         mock_tesseract.assert_called_once()
     
+    @patch('ocr_processor.pytesseract.image_to_string')
+    def test_extract_text_tesseract_in_memory(self, mock_tesseract):
+        """Test that a PIL image is passed to Tesseract without reopening."""
+        mock_tesseract.return_value = "Text"
+        image = Image.new('RGB', (10, 10))
+        
+        processor = OCRProcessor()
+        result = processor.extract_text_tesseract(image)
+        
+        assert result == "Text"
+        assert mock_tesseract.call_args[0][0] is image
+    
     @patch('ocr_processor.pytesseract.image_to_string')
     @patch('ocr_processor.Image.open')
     def test_extract_text_tesseract_error(self, mock_img_open, mock_tesseract):
@@ -55,8 +132,7 @@ class TestOCRProcessor:
         
         assert result == ""
     
-    @patch('builtins.open', new_callable=mock_open, read_data=b'fake_image_data')
-    def test_extract_text_llm_vision_success(self, mock_file, mock_openai_client):
+    def test_extract_text_llm_vision_success(self, sample_image, mock_openai_client):
         """Test successful LLM vision extraction."""
         mock_response = MagicMock()
         mock_response.choices = [MagicMock()]
@@ -70,10 +146,30 @@ class TestOCRProcessor:
                 llm_model="test-model",
                 llm_api_key="key"
             )
-            result = processor.extract_text_llm_vision(Path("/fake/image.png"))
+            result = processor.extract_text_llm_vision(sample_image)
         
         assert result == "LLM extracted text"
     
+    def test_extract_text_llm_vision_payload(self, mock_openai_client):
+        """Test that the vision request carries a downscaled grayscale image."""
+        with patch('ocr_processor.openai.OpenAI', return_value=mock_openai_client):
+            processor = OCRProcessor(
+                use_llm_vision=True,
+                llm_api_base="http://test/v1",
+                llm_model="test-model",
+                llm_api_key="key",
+                vision_max_side=512
+            )
+            processor.extract_text_llm_vision(Image.new('RGB', (2480, 3508), 'white'))
+        
+        messages = mock_openai_client.chat.completions.create.call_args[1]['messages']
+        url = messages[0]['content'][1]['image_url']['url']
+        prefix = "data:image/jpeg;base64,"
+        assert url.startswith(prefix)
+        sent = Image.open(io.BytesIO(base64.b64decode(url[len(prefix):])))
+        assert sent.mode == "L"
+        assert max(sent.size) == 512
+    
     @patch('builtins.open', new_callable=mock_open)
     def test_extract_text_llm_vision_error(self, mock_file, mock_openai_client):
         """Test LLM vision error handling."""
@@ -130,7 +226,7 @@ class TestOCRProcessor:
         mock_tesseract.return_value = "Tesseract only"
         
         processor = OCRProcessor(use_llm_vision=False)
-        result = processor.extract_text(Path("/fake/image.png"))
+        result = processor.extract_text(Image.new('RGB', (10, 10)))
         
         assert result == "Tesseract only"
         mock_tesseract.assert_called_once()
@@ -153,7 +249,7 @@ class TestOCRProcessor:
                 llm_model="test-model",
                 llm_api_key="key"
             )
-            result = processor.extract_text(Path("/fake/image.png"))
+            result = processor.extract_text(Image.new('RGB', (10, 10)))
         
         assert result == "Combined result"
         mock_combine.assert_called_once_with("Tesseract result", "LLM result")
@@ -174,10 +270,18 @@ class TestOCRProcessor:
                 llm_model="test-model",
                 llm_api_key="key"
             )
-            result = processor.extract_text(Path("/fake/image.png"))
+            result = processor.extract_text(Image.new('RGB', (10, 10)))
         
         assert result == "Tesseract result"
     
+    @patch('ocr_processor.OCRProcessor.extract_text_tesseract')
+    def test_extract_text_unreadable_image(self, mock_tesseract):
+        """Test that an unreadable image yields empty text."""
+        processor = OCRProcessor(use_llm_vision=False)
+        
+        assert processor.extract_text(b"not an image") == ""
+        mock_tesseract.assert_not_called()
+    
     @patch('ocr_processor.OCRProcessor.extract_text')
     def test_process_images(self, mock_extract):
         """Test processing multiple images."""
@@ -190,3 +294,348 @@ class TestOCRProcessor:
         assert len(results) == 3
         assert results == ["Text 1", "Text 2", "Text 3"]
         assert mock_extract.call_count == 3
+
+
+class TestOCRProcessorCache:
+    """Test suite for cached OCR stages."""
+    
+    @pytest.fixture
+    def cache(self, temp_dir):
+        return PageCache(temp_dir / "cache.sqlite3")
+    
+    @pytest.fixture
+    def processor(self, cache, mock_openai_client):
+        with patch('ocr_processor.openai.OpenAI', return_value=mock_openai_client):
+            return OCRProcessor(
+                use_llm_vision=True,
+                llm_api_base="http://test/v1",
+                llm_model="test-model",
+                llm_api_key="key",
+                cache=cache
+            )
+    
+    @patch('ocr_processor.pytesseract.image_to_string')
+    def test_tesseract_cached_by_page_key(self, mock_tesseract, processor, cache):
+        """Test that a cached Tesseract result needs no image."""
+        mock_tesseract.return_value = "Text"
+        
+        assert processor.extract_text_tesseract(Image.new('L', (10, 10)), "page-1") == "Text"
+        assert processor.is_cached("tesseract", "page-1") is True
+        assert processor.extract_text_tesseract(None, "page-1") == "Text"
+        
+        assert mock_tesseract.call_count == 1
+        assert cache.stats()["stages"]["tesseract"] == {"hits": 1, "misses": 1}
+    
+    @patch('ocr_processor.pytesseract.image_to_string')
+    def test_tesseract_key_includes_language(self, mock_tesseract, processor):
+        """Test that another Tesseract language misses the cache."""
+        mock_tesseract.return_value = "Text"
+        processor.extract_text_tesseract(Image.new('L', (10, 10)), "page-1")
+        
+        processor.tesseract_lang = "eng"
+        assert processor.is_cached("tesseract", "page-1") is False
+    
+    @patch('ocr_processor.pytesseract.image_to_string')
+    def test_tesseract_empty_not_cached(self, mock_tesseract, processor):
+        """Test that empty results (blank page or error) are not stored."""
+        mock_tesseract.return_value = "   "
+        
+        processor.extract_text_tesseract(Image.new('L', (10, 10)), "page-1")
+        
+        assert processor.is_cached("tesseract", "page-1") is False
+    
+    @patch('ocr_processor.pytesseract.image_to_string')
+    def test_tesseract_image_fingerprint_default(self, mock_tesseract, processor):
+        """Test that identical images share a cache entry without a page key."""
+        mock_tesseract.return_value = "Text"
+        
+        processor.extract_text_tesseract(Image.new('L', (10, 10), 255))
+        processor.extract_text_tesseract(Image.new('L', (10, 10), 255))
+        
+        assert mock_tesseract.call_count == 1
+        assert processor.is_cached(
+            "tesseract", image_fingerprint(Image.new('L', (10, 10), 255))
+        )
+    
+    def test_vision_cache_and_settings(self, processor, mock_openai_client):
+        """Test vision caching and invalidation by model settings."""
+        mock_openai_client.chat.completions.create.return_value.choices[0].message.content = "Vision"
+        image = Image.new('RGB', (50, 50), 'white')
+        
+        assert processor.extract_text_llm_vision(image, "page-1") == "Vision"
+        assert processor.extract_text_llm_vision(None, "page-1") == "Vision"
+        assert mock_openai_client.chat.completions.create.call_count == 1
+        
+        processor.vision_max_side = 512
+        assert processor.is_cached("vision", "page-1") is False
+        processor.vision_max_side = 1536
+        processor.llm_model = "other-model"
+        assert processor.is_cached("vision", "page-1") is False
+    
+    def test_vision_error_not_cached(self, processor, mock_openai_client):
+        """Test that failed vision calls are retried next time."""
+        mock_openai_client.chat.completions.create.side_effect = Exception("API error")
+        
+        assert processor.extract_text_llm_vision(Image.new('RGB', (5, 5)), "page-1") == ""
+        assert processor.is_cached("vision", "page-1") is False
+    
+    def test_combine_cached_by_texts(self, processor, mock_openai_client, cache):
+        """Test that the combination is cached by its input texts."""
+        mock_openai_client.chat.completions.create.return_value.choices[0].message.content = "Both"
+        
+        assert processor.combine_ocr_results("A", "B") == "Both"
+        assert processor.combine_ocr_results("A", "B") == "Both"
+        processor.combine_ocr_results("A", "C")
+        
+        assert mock_openai_client.chat.completions.create.call_count == 2
+        assert cache.stats()["stages"]["combine"] == {"hits": 1, "misses": 2}
+    
+    def test_is_cached_without_cache_or_key(self, processor):
+        """Test is_cached without a cache or page key."""
+        assert processor.is_cached("tesseract", None) is False
+        assert OCRProcessor().is_cached("tesseract", "page-1") is False
+    
+    @patch('ocr_processor.OCRProcessor.extract_text_llm_vision')
+    @patch('ocr_processor.OCRProcessor.extract_text_tesseract')
+    def test_extract_text_fingerprints_once(self, mock_tesseract, mock_llm, processor):
+        """Test that extract_text passes one image fingerprint to both stages."""
+        mock_tesseract.return_value = ""
+        mock_llm.return_value = "Vision"
+        image = Image.new('L', (10, 10))
+        
+        processor.extract_text(image)
+        
+        key = image_fingerprint(image)
+        assert mock_tesseract.call_args[0][1] == key
+        assert mock_llm.call_args[0][1] == key
+
+
+
+class TestOCRProcessorEscalation:
+    """Test suite for confidence-gated escalation to LLM vision."""
+    
+    CLEAN = [[("Die", 96), ("Prüfung", 93), ("wird", 95)], [("schriftlich", 92)],
+             [("und", 94), ("mündlich", 91)], [("abgelegt", 90)], [("Ende", 93)]]
+    
+    @pytest.fixture
+    def cache(self, temp_dir):
+        return PageCache(temp_dir / "cache.sqlite3")
+    
+    @pytest.fixture
+    def processor(self, cache, mock_openai_client):
+        with patch('ocr_processor.openai.OpenAI', return_value=mock_openai_client):
+            return OCRProcessor(
+                use_llm_vision=True,
+                llm_model="test-model",
+                cache=cache,
+                escalation=True
+            )
+    
+    def lines(self, processor, tesseract_data, rows):
+        with patch('ocr_processor.pytesseract.image_to_data', return_value=tesseract_data(rows)):
+            return processor.tesseract_lines(Image.new('L', (400, 200), 255))
+    
+    def test_escalation_needs_vision(self):
+        """Test that escalation is off without LLM vision."""
+        processor = OCRProcessor(escalation=True)
+        
+        assert processor.escalation is False
+        assert processor.spell_checker is None
+    
+    def test_accept_reliable_page(self, processor, tesseract_data):
+        """Test that a confident page with known words needs no LLM."""
+        lines = self.lines(processor, tesseract_data, self.CLEAN)
+        
+        assert processor.plan_escalation(lines) == ("none", [])
+    
+    def test_regions_for_few_bad_lines(self, processor, tesseract_data):
+        """Test that isolated unreliable lines are escalated as regions."""
+        rows = self.CLEAN[:3] + [[("urid", 60)]] + self.CLEAN[3:]
+        lines = self.lines(processor, tesseract_data, rows)
+        
+        assert processor.plan_escalation(lines) == ("regions", [(3, 3)])
+    
+    def test_page_for_many_bad_lines_or_low_confidence(self, processor, tesseract_data):
+        """Test whole-page escalation for widespread problems and empty results."""
+        noisy = self.lines(processor, tesseract_data, [[("urid", 60)], [("dle", 50)], [("Die", 95)]])
+        unsure = self.lines(processor, tesseract_data, [[("Die", 70), ("Prüfung", 65)]])
+        
+        assert processor.plan_escalation(noisy) == ("page", [])
+        assert processor.plan_escalation(unsure) == ("page", [])
+        assert processor.plan_escalation([]) == ("page", [])
+    
+    def test_too_many_regions(self, processor, tesseract_data):
+        """Test that more regions than allowed escalate the whole page."""
+        bad = [("urid", 60)]
+        rows = [bad] + self.CLEAN + [bad] + self.CLEAN + [bad]
+        lines = self.lines(processor, tesseract_data, rows)
+        
+        assert processor.plan_escalation(lines)[0] == "page"
+        processor.max_escalation_regions = 3
+        assert processor.plan_escalation(lines) == ("regions", [(0, 0), (6, 6), (12, 12)])
+    
+    def test_tesseract_lines_cached_and_errors(self, processor, tesseract_data, cache):
+        """Test caching of line data and the error fallback."""
+        with patch('ocr_processor.pytesseract.image_to_data',
+                   return_value=tesseract_data(self.CLEAN)) as mock_data:
+            first = processor.tesseract_lines(Image.new('L', (10, 10)), "page-1")
+            second = processor.tesseract_lines(None, "page-1")
+        
+        assert first == second
+        assert mock_data.call_count == 1
+        assert cache.stats()["stages"]["tesseract"] == {"hits": 1, "misses": 1}
+        
+        with patch('ocr_processor.pytesseract.image_to_data', side_effect=Exception("boom")):
+            assert processor.tesseract_lines(Image.new('L', (10, 10)), "page-2") == []
+    
+    def test_correct_regions_crops_and_splices(
+        self, processor, tesseract_data, mock_openai_client, cache
+    ):
+        """Test that only the region crop is sent and its text replaces the lines."""
+        mock_openai_client.chat.completions.create.return_value.choices[0].message.content = "und"
+        rows = self.CLEAN[:3] + [[("urid", 60)]] + self.CLEAN[3:]
+        lines = self.lines(processor, tesseract_data, rows)
+        image = Image.new('L', (400, 200), 255)
+        
+        text = processor.correct_regions(image, lines, [(3, 3)], "page-1")
+        
+        assert text.splitlines()[3] == "und"
+        assert "urid" not in text
+        content = mock_openai_client.chat.completions.create.call_args[1]['messages'][0]['content']
+        payload = base64.b64decode(content[1]['image_url']['url'].split(",", 1)[1])
+        # Line 4 box (10, 80, 60, 95) plus padding
+        assert Image.open(io.BytesIO(payload)).size == (70, 35)
+        
+        # Cached per page and region
+        assert processor.correct_regions(None, lines, [(3, 3)], "page-1") == text
+        assert mock_openai_client.chat.completions.create.call_count == 1
+    
+    def test_correct_regions_failure_keeps_tesseract(
+        self, processor, tesseract_data, mock_openai_client
+    ):
+        """Test that a failed region read keeps the Tesseract lines."""
+        mock_openai_client.chat.completions.create.side_effect = Exception("API error")
+        lines = self.lines(processor, tesseract_data, self.CLEAN)
+        
+        text = processor.correct_regions(Image.new('L', (400, 200)), lines, [(0, 0)])
+        
+        assert text.startswith("Die Prüfung wird")
+    
+    def test_escalation_cached(self, processor, tesseract_data, mock_openai_client):
+        """Test when a page can be processed from the cache without its image."""
+        image = Image.new('L', (400, 200), 255)
+        rows = self.CLEAN[:3] + [[("urid", 60)]] + self.CLEAN[3:]
+        assert processor.escalation_cached("page-1") is False
+        assert processor.escalation_cached(None) is False
+        
+        with patch('ocr_processor.pytesseract.image_to_data', return_value=tesseract_data(rows)):
+            lines = processor.tesseract_lines(image, "page-1")
+        assert processor.escalation_cached("page-1") is False  # Region not read yet
+        processor.correct_regions(image, lines, [(3, 3)], "page-1")
+        assert processor.escalation_cached("page-1") is True
+        
+        with patch('ocr_processor.pytesseract.image_to_data',
+                   return_value=tesseract_data([[("dle", 40)]])):
+            processor.tesseract_lines(image, "page-2")
+        assert processor.escalation_cached("page-2") is False
+        processor.extract_text_llm_vision(image, "page-2")
+        assert processor.escalation_cached("page-2") is True
+    
+    def test_extract_text_tiers(self, processor, tesseract_data, mock_openai_client):
+        """Test extract_text: accepted pages make no LLM calls, bad pages use all stages."""
+        image = Image.new('L', (400, 200), 255)
+        
+        with patch('ocr_processor.pytesseract.image_to_data',
+                   return_value=tesseract_data(self.CLEAN)):
+            assert processor.extract_text(image).startswith("Die Prüfung wird")
+        assert mock_openai_client.chat.completions.create.call_count == 0
+        
+        rows = self.CLEAN[:3] + [[("urid", 60)]] + self.CLEAN[3:]
+        with patch('ocr_processor.pytesseract.image_to_data', return_value=tesseract_data(rows)):
+            processor.extract_text(Image.new('L', (400, 200), 254))
+        assert mock_openai_client.chat.completions.create.call_count == 1
+        
+        with patch('ocr_processor.pytesseract.image_to_data',
+                   return_value=tesseract_data([[("dle", 40)]])):
+            result = processor.extract_text(Image.new('L', (400, 200), 253))
+        assert result == "Mocked LLM response"
+        assert mock_openai_client.chat.completions.create.call_count == 3  # vision + combine
+
+
+class TestOCRProcessorLocalMerge:
+    """Test suite for merging OCR results without the full LLM combination."""
+    
+    @pytest.fixture
+    def processor(self, temp_dir, mock_openai_client):
+        with patch('ocr_processor.openai.OpenAI', return_value=mock_openai_client):
+            return OCRProcessor(
+                use_llm_vision=True,
+                llm_model="test-model",
+                cache=PageCache(temp_dir / "cache.sqlite3"),
+                local_merge=True
+            )
+    
+    def test_local_merge_needs_vision(self):
+        """Test that local merge is off without LLM vision."""
+        assert OCRProcessor(local_merge=True).local_merge is False
+    
+    def test_agreeing_transcripts_no_llm(self, processor, mock_openai_client):
+        """Test that resolvable differences need no LLM request."""
+        text, requests = processor.merge_ocr_results(
+            "Die Prufung wird schrift1ich abgelegt.", "Die Prüfung wird schriftlich abgelegt."
+        )
+        
+        assert text == "Die Prüfung wird schriftlich abgelegt."
+        assert requests == 0
+        mock_openai_client.chat.completions.create.assert_not_called()
+    
+    def test_conflicts_resolved_by_short_request(self, processor, mock_openai_client):
+        """Test that only the undecided spans are sent, and answers are spliced in."""
+        mock_openai_client.chat.completions.create.return_value.choices[0].message.content = (
+            '1: "die"\n2:\nKommentar ohne Nummer\n7: außerhalb'
+        )
+        tesseract = "Der Betrieb zahlt die Vergütung jeden Monat pünktlich auf das Konto."
+        vision = "Der Betrieb zahlt eine Vergütung jeden Monat pünktlich auf das Konto. Zusatz"
+        
+        text, requests = processor.merge_ocr_results(tesseract, vision)
+        
+        assert text == tesseract
+        assert requests == 1
+        request = mock_openai_client.chat.completions.create.call_args[1]
+        prompt = request['messages'][1]['content']
+        assert 'Tesseract: "die"' in prompt and 'Vision: "eine"' in prompt
+        assert '2. Kontext: "Monat pünktlich auf das Konto. … "' in prompt
+        assert tesseract not in prompt
+        assert request['max_tokens'] < 3000
+        
+        # The answer is cached with the request
+        processor.merge_ocr_results(tesseract, vision)
+        assert mock_openai_client.chat.completions.create.call_count == 1
+    
+    def test_conflict_request_error_keeps_vision(self, processor, mock_openai_client):
+        """Test that a failed conflict request falls back to the vision readings."""
+        mock_openai_client.chat.completions.create.side_effect = Exception("API error")
+        vision = "Der Betrieb zahlt eine Vergütung jeden Monat pünktlich auf das Konto."
+        
+        text, requests = processor.merge_ocr_results(
+            "Der Betrieb zahlt die Vergütung jeden Monat pünktlich auf das Konto.", vision
+        )
+        
+        assert text == vision
+        assert requests == 1
+    
+    def test_many_conflicts_use_full_combination(self, processor, mock_openai_client):
+        """Test that mostly disagreeing transcripts go to the full combination."""
+        text, requests = processor.merge_ocr_results("völlig anderer Text hier", "ganz etwas sonst")
+        
+        assert text == "Mocked LLM response"
+        assert requests == 1
+        prompt = mock_openai_client.chat.completions.create.call_args[1]['messages'][1]['content']
+        assert "Tesseract OCR Ergebnis" in prompt
+    
+    def test_without_local_merge(self, mock_openai_client):
+        """Test that the full combination is used when local merge is off."""
+        with patch('ocr_processor.openai.OpenAI', return_value=mock_openai_client):
+            processor = OCRProcessor(use_llm_vision=True, llm_model="m")
+        
+        assert processor.merge_ocr_results("a", "b") == ("Mocked LLM response", 1)
@@ -0,0 +1,114 @@
+"""Tests for ocr_quality module."""
+from spellchecker import SpellChecker
+import pytest
+
+from ocr_quality import (
+    OCRLine, assess_page, dictionary_word, group_regions, join_lines,
+    parse_tesseract_data, region_box
+)
+
+
+@pytest.fixture(scope="module")
+def spell_checker():
+    return SpellChecker(language='de')
+
+
+class TestParsing:
+    """Test suite for turning image_to_data output into lines."""
+
+    def test_parse_lines_and_boxes(self, tesseract_data):
+        """Test grouping by line, confidences and merged bounding boxes."""
+        data = tesseract_data([[("Die", 95), ("Prüfung", 91)], [("findet", 88)]])
+        # Tesseract adds rows with conf -1 for blocks and paragraphs
+        data['text'].insert(0, "")
+        data['conf'].insert(0, -1)
+        for key in ('left', 'top', 'width', 'height', 'block_num', 'par_num', 'line_num'):
+            data[key].insert(0, 0)
+
+        lines = parse_tesseract_data(data)
+
+        assert [line.text for line in lines] == ["Die Prüfung", "findet"]
+        assert lines[0].words == [("Die", 95.0), ("Prüfung", 91.0)]
+        assert lines[0].box == (10, 20, 120, 35)
+
+    def test_join_lines_paragraphs(self, tesseract_data):
+        """Test line breaks within and blank lines between paragraphs."""
+        lines = parse_tesseract_data(tesseract_data(
+            [[("eins", 90)], [("zwei", 90)], [("drei", 90)]], paragraphs=[1, 1, 2]
+        ))
+
+        assert join_lines(lines) == "eins\nzwei\n\ndrei"
+        assert join_lines([]) == ""
+
+    def test_line_round_trip(self):
+        """Test serialization for the cache."""
+        line = OCRLine([("Wort", 87.5)], (1, 2, 3, 4), (1, 2))
+
+        assert OCRLine.from_dict(line.to_dict()) == line
+
+
+class TestAssessment:
+    """Test suite for confidence and dictionary checks."""
+
+    def test_dictionary_word(self):
+        """Test which words are checked against the dictionary."""
+        assert dictionary_word("wird,") == "wird"
+        assert dictionary_word("Prüfung") is None  # Nouns are not in the dictionary
+        assert dictionary_word("l1nie") is None
+        assert dictionary_word("a") is None
+
+    def test_reliable_page(self, tesseract_data, spell_checker):
+        """Test a clean page: high confidence, all words known."""
+        lines = parse_tesseract_data(tesseract_data(
+            [[("Die", 96), ("Prüfung", 93), ("wird", 95)], [("schriftlich", 92)]]
+        ))
+
+        quality = assess_page(lines, spell_checker)
+
+        assert quality.confidence == pytest.approx(94.0)
+        assert quality.dictionary_rate == 1.0
+        assert quality.word_count == 4
+        assert quality.low_lines == []
+
+    def test_low_lines(self, tesseract_data, spell_checker):
+        """Test low confidence and dictionary misses below the accept threshold."""
+        lines = parse_tesseract_data(tesseract_data([
+            [("Der", 95), ("Betrieb", 94)],
+            [("urid", 70)],  # Not a word, moderately confident
+            [("Zeugnis", 12)],  # Known shape, very low confidence
+            [("dle", 90)],  # Not a word, but confident
+        ]))
+
+        quality = assess_page(lines, spell_checker, min_confidence=30, accept_confidence=80)
+
+        assert quality.low_lines == [1, 2]
+        assert quality.dictionary_rate == 0.0
+
+    def test_without_dictionary(self, tesseract_data):
+        """Test confidence-only rating."""
+        lines = parse_tesseract_data(tesseract_data([[("urid", 70)], [("x", 10)]]))
+
+        quality = assess_page(lines)
+
+        assert quality.dictionary_rate is None
+        assert quality.low_lines == [1]
+        assert assess_page([]).confidence == 0.0
+
+
+class TestRegions:
+    """Test suite for region helpers."""
+
+    def test_group_regions(self):
+        """Test merging adjacent lines."""
+        assert group_regions([1, 2, 3, 7, 9, 10]) == [(1, 3), (7, 7), (9, 10)]
+        assert group_regions([]) == []
+
+    def test_region_box_padded_and_clipped(self):
+        """Test the crop box of a line range."""
+        lines = [
+            OCRLine([("a", 1)], (5, 5, 100, 20), (1, 1)),
+            OCRLine([("b", 1)], (30, 25, 190, 40), (1, 1)),
+        ]
+
+        assert region_box(lines, (0, 1), (200, 300)) == (0, 0, 200, 50)
+        assert region_box(lines, (1, 1), (500, 500), padding=5) == (25, 20, 195, 45)
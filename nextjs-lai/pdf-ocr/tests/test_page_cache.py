@@ -0,0 +1,105 @@
+"""Unit tests for page_cache module."""
+import threading
+from PIL import Image
+from page_cache import PageCache, cache_key, image_fingerprint, request_key
+
+
+class TestKeys:
+    """Test suite for cache key helpers."""
+
+    def test_cache_key_parts_do_not_run_together(self):
+        """Test that different splits of the same characters differ."""
+        assert cache_key("ab", "c") != cache_key("a", "bc")
+        assert cache_key("a", 300) == cache_key("a", "300")
+        assert len(cache_key("x")) == 64
+
+    def test_request_key_order_independent(self):
+        """Test that keyword order does not change the request key."""
+        first = request_key("cleanup", {"model": "m", "temperature": 0.2})
+        second = request_key("cleanup", {"temperature": 0.2, "model": "m"})
+
+        assert first == second
+        assert first != request_key("combine", {"model": "m", "temperature": 0.2})
+
+    def test_image_fingerprint(self):
+        """Test that equal pixels hash equal and any change is detected."""
+        image = Image.new('RGB', (20, 20), 'white')
+        same = Image.new('RGB', (20, 20), 'white')
+        other = image.copy()
+        other.putpixel((3, 3), (0, 0, 0))
+
+        assert image_fingerprint(image) == image_fingerprint(same)
+        assert image_fingerprint(image) != image_fingerprint(other)
+        assert image_fingerprint(image) != image_fingerprint(image.convert('L'))
+
+
+class TestPageCache:
+    """Test suite for PageCache."""
+
+    def test_get_put(self, temp_dir):
+        """Test storing, reading and hit/miss counting."""
+        cache = PageCache(temp_dir / "sub" / "cache.sqlite3")
+
+        assert cache.get("vision", "k1") is None
+        cache.put("vision", "k1", "Text")
+        assert cache.get("vision", "k1") == "Text"
+        assert cache.contains("k1") is True
+        assert cache.contains("k2") is False
+        assert cache.peek("k1") == "Text"
+        assert cache.peek("k2") is None
+
+        stats = cache.stats()
+        assert stats["stages"]["vision"] == {"hits": 1, "misses": 1}
+        assert stats["entries"] == 1
+        cache.close()
+
+    def test_persists_across_instances(self, temp_dir):
+        """Test that entries survive a restart (resume)."""
+        path = temp_dir / "cache.sqlite3"
+        cache = PageCache(path)
+        cache.put("cleanup", "k", "Sauberer Text")
+        cache.close()
+
+        reopened = PageCache(path)
+        assert reopened.get("cleanup", "k") == "Sauberer Text"
+        assert len(reopened) == 1
+        reopened.close()
+
+    def test_clear(self, temp_dir):
+        """Test deleting all entries."""
+        cache = PageCache(temp_dir / "cache.sqlite3")
+        cache.put("tesseract", "k", "Text")
+        cache.clear()
+
+        assert len(cache) == 0
+
+    def test_format_stats(self, temp_dir):
+        """Test the log summary."""
+        cache = PageCache(temp_dir / "cache.sqlite3")
+        assert cache.format_stats() == "Page cache: 0/0 hits, 0 entries"
+
+        cache.put("vision", "k", "Text")
+        cache.get("vision", "k")
+        cache.get("combine", "missing")
+
+        assert cache.format_stats() == (
+            "Page cache: 1/2 hits (combine 0/1, vision 1/1), 1 entries"
+        )
+
+    def test_thread_safe(self, temp_dir):
+        """Test concurrent writes and reads from worker threads."""
+        cache = PageCache(temp_dir / "cache.sqlite3")
+
+        def work(n):
+            for i in range(20):
+                cache.put("cleanup", f"{n}-{i}", "x")
+                cache.get("cleanup", f"{n}-{i}")
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(cache) == 80
+        assert cache.stats()["hits"] == 80
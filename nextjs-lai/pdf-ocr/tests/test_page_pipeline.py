@@ -0,0 +1,521 @@
+"""Tests for page_pipeline module."""
+import threading
+import time
+from collections import Counter
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PIL import Image
+
+from ocr_processor import OCRProcessor
+from page_cache import PageCache, cache_key
+from text_cleanup import TextCleanup
+from ocr_quality import OCRLine
+from page_pipeline import PagePipeline, PageSlots, Stage, format_escalations
+
+
+def make_pipeline(pages_to_render=(), use_llm_vision=True, **kwargs):
+    """Pipeline with mocked extractor, OCR and cleanup."""
+    extractor = MagicMock()
+    extractor.needs_ocr.side_effect = lambda page: not page['has_text']
+    extractor.iter_page_images.side_effect = lambda path, pages: iter(
+        [(n, MagicMock(name=f"image{n}")) for n in sorted(pages) if n in pages_to_render]
+    )
+    ocr = MagicMock()
+    ocr.use_llm_vision = use_llm_vision
+    ocr.escalation = False
+    ocr.is_cached.return_value = False
+    ocr.extract_text_tesseract.return_value = "Tesseract text"
+    ocr.extract_text_llm_vision.return_value = "Vision text"
+    ocr.merge_ocr_results.return_value = ("Combined text", 1)
+    cleanup = MagicMock()
+    cleanup.process_text.side_effect = lambda text, **kw: text
+    kwargs.setdefault("show_progress", False)
+    return PagePipeline(extractor, ocr, cleanup, **kwargs)
+
+
+class TestStage:
+    """Test suite for Stage."""
+
+    def test_limit_is_enforced(self):
+        """Test that no more than `limit` calls run at once."""
+        stage = Stage("vision", limit=2, show_progress=False)
+
+        def call():
+            with stage.run():
+                time.sleep(0.02)
+
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert stage.calls == 6
+        assert stage.max_active == 2
+        assert stage.active == 0
+        assert stage.busy_seconds > 0
+        assert "vision: 6 calls" in stage.summary()
+        assert "max 2/2 parallel" in stage.summary()
+        stage.close()
+
+    def test_counts_failed_calls(self):
+        """Test that a failing call still releases its slot."""
+        stage = Stage("cleanup", limit=1, show_progress=False)
+
+        with pytest.raises(ValueError):
+            with stage.run():
+                raise ValueError("boom")
+
+        with stage.run():
+            pass
+        assert stage.calls == 2
+
+    def test_limit_minimum(self):
+        """Test that limits below 1 are raised to 1."""
+        assert Stage("render", limit=0, show_progress=False).limit == 1
+
+
+class TestPageSlots:
+    """Test suite for PageSlots."""
+
+    def test_limit_and_release(self):
+        """Test that slots are counted per owner and released."""
+        slots = PageSlots(2)
+        slots.acquire("a")
+        slots.acquire("b")
+
+        assert slots.in_use == 2
+        assert slots.held("a") == 1
+        slots.release("a")
+        assert slots.held("a") == 0
+        assert slots.in_use == 1
+        assert slots.max_in_use == 2
+        assert PageSlots(0).limit == 1
+
+    def test_fair_share_prefers_document_with_fewest_slots(self):
+        """Test that a freed slot goes to the waiting document holding fewer slots."""
+        slots = PageSlots(3, fair=True)
+        for _ in range(3):
+            slots.acquire("big")
+        order = []
+
+        def take(owner):
+            slots.acquire(owner)
+            order.append(owner)
+
+        big = threading.Thread(target=take, args=("big",))
+        big.start()
+        time.sleep(0.02)
+        small = threading.Thread(target=take, args=("small",))
+        small.start()
+        time.sleep(0.02)
+
+        slots.release("big")
+        small.join(timeout=1)
+        assert order == ["small"]
+        slots.release("big")
+        big.join(timeout=1)
+        assert order == ["small", "big"]
+
+
+class TestPagePipeline:
+    """Test suite for PagePipeline."""
+
+    def test_text_pages_only_cleanup(self, temp_dir):
+        """Test that pages with text skip rendering and OCR."""
+        pipeline = make_pipeline()
+        pages = [
+            {'page': 1, 'text': 'Erste Seite', 'has_text': True},
+            {'page': 2, 'text': 'Zweite Seite', 'has_text': True},
+        ]
+
+        result = pipeline.run(temp_dir / "doc.pdf", pages, context="doc")
+
+        assert result == ["## Seite 1\n\nErste Seite", "## Seite 2\n\nZweite Seite"]
+        pipeline.ocr_processor.extract_text_tesseract.assert_not_called()
+        pipeline.text_cleanup.process_text.assert_any_call(
+            'Erste Seite', context="doc", page_num=1
+        )
+        assert pipeline.stages["cleanup"].calls == 2
+        assert pipeline.stages["render"].calls == 0
+
+    def test_iter_sections_reads_pages_lazily(self, temp_dir):
+        """Test chunked planning and in-order sections from a lazy page iterator."""
+        pipeline = make_pipeline(pages_to_render={2, 3, 5}, max_pages_in_flight=1)
+        read = []
+
+        def pages():
+            for n in range(1, 7):
+                read.append(n)
+                has_text = n not in (2, 3, 5)
+                yield {'page': n, 'text': f'Text {n}' if has_text else '', 'has_text': has_text}
+
+        sections = pipeline.iter_sections(temp_dir / "doc.pdf", pages(), chunk_pages=2)
+        first = next(sections)
+
+        assert first == "## Seite 1\n\nText 1"
+        assert read == [1, 2]
+        assert list(sections) == [
+            "## Seite 2\n\nCombined text", "## Seite 3\n\nCombined text",
+            "## Seite 4\n\nText 4", "## Seite 5\n\nCombined text", "## Seite 6\n\nText 6",
+        ]
+        assert [c[0][1] for c in pipeline.pdf_extractor.iter_page_images.call_args_list] == [
+            {2}, {3}, {5}
+        ]
+        assert pipeline.stages["render"].progress.total == 3
+        assert pipeline.stages["cleanup"].progress.total == 6
+        assert pipeline.escalations["llm_requests"] == 6
+
+    def test_ocr_pages_full_chain(self, temp_dir):
+        """Test Tesseract, vision and combination for a rendered page."""
+        pipeline = make_pipeline(pages_to_render={1})
+        pages = [{'page': 1, 'text': '', 'has_text': False}]
+
+        result = pipeline.run(temp_dir / "doc.pdf", pages)
+
+        assert result == ["## Seite 1\n\nCombined text"]
+        pipeline.pdf_extractor.iter_page_images.assert_called_once_with(
+            temp_dir / "doc.pdf", {1}
+        )
+        pipeline.ocr_processor.merge_ocr_results.assert_called_once_with(
+            "Tesseract text", "Vision text"
+        )
+        image = pipeline.ocr_processor.extract_text_tesseract.call_args[0][0]
+        assert pipeline.ocr_processor.extract_text_llm_vision.call_args[0][0] is image
+        image.save.assert_not_called()
+        for name in ("render", "tesseract", "vision", "combine", "cleanup"):
+            assert pipeline.stages[name].calls == 1
+
+    def test_ocr_text_appended_to_extracted_text(self, temp_dir):
+        """Test that OCR text is appended to a page's short text."""
+        pipeline = make_pipeline(pages_to_render={1}, use_llm_vision=False)
+        pipeline.pdf_extractor.needs_ocr.side_effect = lambda page: True
+        pages = [{'page': 1, 'text': 'Titel', 'has_text': True}]
+
+        result = pipeline.run(temp_dir / "doc.pdf", pages)
+
+        assert result == ["## Seite 1\n\nTitel\n\nTesseract text"]
+        pipeline.ocr_processor.extract_text_llm_vision.assert_not_called()
+
+    def test_vision_failure_falls_back_to_tesseract(self, temp_dir):
+        """Test the Tesseract fallback when LLM vision returns nothing."""
+        pipeline = make_pipeline(pages_to_render={1})
+        pipeline.ocr_processor.extract_text_llm_vision.return_value = ""
+        pages = [{'page': 1, 'text': '', 'has_text': False}]
+
+        result = pipeline.run(temp_dir / "doc.pdf", pages)
+
+        assert result == ["## Seite 1\n\nTesseract text"]
+        pipeline.ocr_processor.merge_ocr_results.assert_not_called()
+
+    def test_vision_only_result(self, temp_dir):
+        """Test that the vision text is used when Tesseract finds nothing."""
+        pipeline = make_pipeline(pages_to_render={1})
+        pipeline.ocr_processor.extract_text_tesseract.return_value = ""
+        pages = [{'page': 1, 'text': '', 'has_text': False}]
+
+        result = pipeline.run(temp_dir / "doc.pdf", pages)
+
+        assert result == ["## Seite 1\n\nVision text"]
+
+    def test_unrendered_pages_keep_text(self, temp_dir):
+        """Test that pages that failed to render keep their extracted text."""
+        pipeline = make_pipeline(pages_to_render={1, 4})
+        pipeline.pdf_extractor.needs_ocr.side_effect = lambda page: page['page'] != 2
+        pages = [
+            {'page': 1, 'text': '', 'has_text': False},
+            {'page': 2, 'text': 'Digital text', 'has_text': True},
+            {'page': 3, 'text': 'Scan', 'has_text': True},
+            {'page': 4, 'text': '', 'has_text': False},
+            {'page': 5, 'text': '', 'has_text': False},
+        ]
+
+        result = pipeline.run(temp_dir / "doc.pdf", pages)
+
+        pipeline.pdf_extractor.iter_page_images.assert_called_once_with(
+            temp_dir / "doc.pdf", {1, 3, 4, 5}
+        )
+        assert result == [
+            "## Seite 1\n\nCombined text",
+            "## Seite 2\n\nDigital text",
+            "## Seite 3\n\nScan",
+            "## Seite 4\n\nCombined text",
+        ]
+        assert pipeline.ocr_processor.extract_text_tesseract.call_count == 2
+
+    def test_empty_cleanup_result_dropped(self, temp_dir):
+        """Test that pages whose cleanup returns nothing are dropped."""
+        pipeline = make_pipeline()
+        pipeline.text_cleanup.process_text.side_effect = lambda text, **kw: ""
+        pages = [{'page': 1, 'text': 'x', 'has_text': True}]
+
+        assert pipeline.run(temp_dir / "doc.pdf", pages) == []
+
+    def test_results_in_page_order_and_concurrent(self, temp_dir):
+        """Test ordered reassembly when later pages finish first."""
+        pipeline = make_pipeline(cleanup_concurrency=4, max_pages_in_flight=4)
+
+        def slow_cleanup(text, **kwargs):
+            # Earlier pages take longer
+            time.sleep(0.01 * (5 - kwargs['page_num']))
+            return text
+
+        pipeline.text_cleanup.process_text.side_effect = slow_cleanup
+        pages = [{'page': n, 'text': f'Text {n}', 'has_text': True} for n in range(1, 5)]
+
+        result = pipeline.run(temp_dir / "doc.pdf", pages)
+
+        assert result == [f"## Seite {n}\n\nText {n}" for n in range(1, 5)]
+        assert pipeline.stages["cleanup"].max_active > 1
+
+    def test_stage_limits_respected(self, temp_dir):
+        """Test that per-stage limits hold with many pages in flight."""
+        pipeline = make_pipeline(
+            pages_to_render=set(range(1, 9)),
+            ocr_workers=2,
+            vision_concurrency=3,
+            combine_concurrency=1,
+            max_pages_in_flight=8
+        )
+
+        def slow(result):
+            def call(*args):
+                time.sleep(0.01)
+                return result
+            return call
+
+        pipeline.ocr_processor.extract_text_tesseract.side_effect = slow("Tesseract text")
+        pipeline.ocr_processor.extract_text_llm_vision.side_effect = slow("Vision text")
+        pipeline.ocr_processor.merge_ocr_results.side_effect = slow(("Combined text", 1))
+        pages = [{'page': n, 'text': '', 'has_text': False} for n in range(1, 9)]
+
+        result = pipeline.run(temp_dir / "doc.pdf", pages)
+
+        assert len(result) == 8
+        assert pipeline.stages["tesseract"].max_active <= 2
+        assert pipeline.stages["vision"].max_active <= 3
+        assert pipeline.stages["combine"].max_active == 1
+
+    def test_max_pages_in_flight(self, temp_dir):
+        """Test that no more than max_pages_in_flight pages are processed at once."""
+        pipeline = make_pipeline(cleanup_concurrency=8, max_pages_in_flight=2)
+
+        def slow_cleanup(text, **kwargs):
+            time.sleep(0.01)
+            return text
+
+        pipeline.text_cleanup.process_text.side_effect = slow_cleanup
+        pages = [{'page': n, 'text': f'Text {n}', 'has_text': True} for n in range(1, 7)]
+
+        pipeline.run(temp_dir / "doc.pdf", pages)
+
+        assert pipeline.stages["cleanup"].max_active <= 2
+
+    def test_limits_shared_between_concurrent_runs(self, temp_dir):
+        """Test that documents processed at once share stage limits and page slots."""
+        pipeline = make_pipeline(cleanup_concurrency=2, max_pages_in_flight=3)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_cleanup(text, **kwargs):
+            with lock:
+                active.append(text)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.remove(text)
+            return text
+
+        pipeline.text_cleanup.process_text.side_effect = slow_cleanup
+        results = {}
+
+        def run(name):
+            pages = [{'page': n, 'text': f'{name} {n}', 'has_text': True} for n in range(1, 6)]
+            results[name] = pipeline.run(temp_dir / f"{name}.pdf", pages)
+
+        threads = [threading.Thread(target=run, args=(name,)) for name in ("a", "b", "c")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results["b"] == [f"## Seite {n}\n\nb {n}" for n in range(1, 6)]
+        assert max(peak) <= 2
+        assert pipeline.page_slots.max_in_use <= 3
+        assert pipeline.page_slots.in_use == 0
+
+    def test_page_error_propagates(self, temp_dir):
+        """Test that an unexpected page error is raised to the caller."""
+        pipeline = make_pipeline()
+        pipeline.text_cleanup.process_text.side_effect = RuntimeError("cleanup crashed")
+        pages = [{'page': 1, 'text': 'Text', 'has_text': True}]
+
+        with pytest.raises(RuntimeError, match="cleanup crashed"):
+            pipeline.run(temp_dir / "doc.pdf", pages)
+
+    def test_cached_pages_not_rendered(self, temp_dir):
+        """Test that pages with cached OCR results skip rendering."""
+        pipeline = make_pipeline(pages_to_render={1, 2})
+        pipeline.pdf_extractor.dpi = 300
+        cached_key = cache_key("fp-1", 300)
+        pipeline.ocr_processor.is_cached.side_effect = (
+            lambda stage, page_key: page_key == cached_key
+        )
+        pages = [
+            {'page': 1, 'text': '', 'has_text': False, 'fingerprint': 'fp-1'},
+            {'page': 2, 'text': '', 'has_text': False, 'fingerprint': 'fp-2'},
+            {'page': 3, 'text': '', 'has_text': False, 'fingerprint': None},
+        ]
+
+        result = pipeline.run(temp_dir / "doc.pdf", pages)
+
+        pipeline.pdf_extractor.iter_page_images.assert_called_once_with(
+            temp_dir / "doc.pdf", {2, 3}
+        )
+        assert len(result) == 2
+        calls = pipeline.ocr_processor.extract_text_tesseract.call_args_list
+        # Page 1 runs from the cache without an image
+        assert calls[0][0] == (None, cached_key)
+        assert calls[1][0][1] == cache_key("fp-2", 300)
+        assert pipeline.stages["render"].progress.total == 2
+
+    def test_vision_cache_miss_forces_render(self, temp_dir):
+        """Test that a page is rendered if only the Tesseract result is cached."""
+        pipeline = make_pipeline(pages_to_render={1})
+        pipeline.pdf_extractor.dpi = 300
+        pipeline.ocr_processor.is_cached.side_effect = lambda stage, page_key: stage == "tesseract"
+        pages = [{'page': 1, 'text': '', 'has_text': False, 'fingerprint': 'fp'}]
+
+        pipeline.run(temp_dir / "doc.pdf", pages)
+
+        pipeline.pdf_extractor.iter_page_images.assert_called_once_with(
+            temp_dir / "doc.pdf", {1}
+        )
+
+
+class TestPagePipelineEscalation:
+    """Test suite for confidence-gated OCR in the pipeline."""
+
+    def make_escalating_pipeline(self, tiers):
+        pipeline = make_pipeline(pages_to_render=set(tiers))
+        ocr = pipeline.ocr_processor
+        ocr.escalation = True
+        ocr.escalation_cached.return_value = False
+        ocr.tesseract_lines.side_effect = lambda image, page_key: [
+            OCRLine([("Tesseract", 90.0), (image._mock_name, 90.0)], (0, 0, 1, 1), (1, 1))
+        ]
+        ocr.plan_escalation.side_effect = lambda lines: tiers[int(lines[0].words[1][0][5:])]
+        ocr.correct_regions.return_value = "Corrected text"
+        return pipeline
+
+    def test_tiers(self, temp_dir, caplog):
+        """Test accepted, region and whole-page escalation in one document."""
+        tiers = {1: ("none", []), 2: ("regions", [(0, 0), (3, 4)]), 3: ("page", [])}
+        pipeline = self.make_escalating_pipeline(tiers)
+        pages = [{'page': n, 'text': '', 'has_text': False} for n in tiers]
+
+        with caplog.at_level("INFO"):
+            result = pipeline.run(temp_dir / "doc.pdf", pages)
+
+        assert result == [
+            "## Seite 1\n\nTesseract image1",
+            "## Seite 2\n\nCorrected text",
+            "## Seite 3\n\nCombined text",
+        ]
+        ocr = pipeline.ocr_processor
+        ocr.extract_text_tesseract.assert_not_called()
+        assert ocr.correct_regions.call_args[0][2] == [(0, 0), (3, 4)]
+        ocr.extract_text_llm_vision.assert_called_once()
+        ocr.merge_ocr_results.assert_called_once_with("Tesseract image3", "Vision text")
+        assert pipeline.escalations["llm_requests"] == 4
+        assert ("2/3 OCR pages escalated (67%; 1 by region, 1 whole page), "
+                "4 LLM requests instead of 6 (2 saved)") in caplog.text
+
+    def test_local_merge_counted(self, temp_dir, caplog):
+        """Test that combinations merged without the LLM save a request."""
+        pipeline = self.make_escalating_pipeline({1: ("page", []), 2: ("page", [])})
+        pipeline.ocr_processor.merge_ocr_results.side_effect = [("Merged", 0), ("Combined", 1)]
+        pages = [{'page': n, 'text': '', 'has_text': False} for n in (1, 2)]
+
+        with caplog.at_level("INFO"):
+            pipeline.run(temp_dir / "doc.pdf", pages)
+
+        assert pipeline.escalations["llm_requests"] == 3
+        assert ("3 LLM requests instead of 4 (1 saved), "
+                "1 combinations merged without LLM") in caplog.text
+
+    def test_cached_pages_use_escalation_cache(self, temp_dir):
+        """Test that the render skip follows the escalation cache."""
+        pipeline = self.make_escalating_pipeline({1: ("none", [])})
+        pipeline.pdf_extractor.dpi = 300
+        pipeline.ocr_processor.escalation_cached.return_value = True
+        pages = [{'page': 1, 'text': '', 'has_text': False, 'fingerprint': 'fp'}]
+        pipeline.ocr_processor.tesseract_lines.side_effect = None
+        pipeline.ocr_processor.tesseract_lines.return_value = [
+            OCRLine([("Cached", 90.0), ("image1", 90.0)], (0, 0, 1, 1), (1, 1))
+        ]
+
+        result = pipeline.run(temp_dir / "doc.pdf", pages)
+
+        pipeline.pdf_extractor.iter_page_images.assert_called_once_with(
+            temp_dir / "doc.pdf", set()
+        )
+        pipeline.ocr_processor.escalation_cached.assert_called_once_with(cache_key("fp", 300))
+        assert result == ["## Seite 1\n\nCached image1"]
+
+    def test_format_escalations_without_escalation(self):
+        """Test the summary when every page runs vision (escalation off)."""
+        assert format_escalations(Counter(page=3, llm_requests=5)) == (
+            "3/3 OCR pages escalated (100%; 0 by region, 3 whole page), "
+            "5 LLM requests instead of 6 (1 saved)"
+        )
+        assert format_escalations(Counter()).startswith("0/0 OCR pages escalated (0%")
+
+
+class TestPagePipelineResume:
+    """Re-running a document against a persistent cache."""
+
+    @patch('ocr_processor.pytesseract.image_to_string')
+    def test_rerun_skips_render_and_llm(self, mock_tesseract, temp_dir, mock_openai_client):
+        """Test that a second run is served entirely from the cache."""
+        mock_tesseract.return_value = "Tesseract Text der Seite"
+        mock_openai_client.chat.completions.create.return_value.choices[0].message.content = (
+            "Text der Seite vom LLM"
+        )
+        extractor = MagicMock()
+        extractor.dpi = 300
+        extractor.needs_ocr.side_effect = lambda page: not page['has_text']
+        extractor.iter_page_images.side_effect = lambda path, pages: iter(
+            [(n, Image.new('RGB', (40, 40), 'white')) for n in sorted(pages)]
+        )
+        pages = [
+            {'page': 1, 'text': '', 'has_text': False, 'fingerprint': 'cover'},
+            {'page': 2, 'text': 'Digitaler Text auf der Seite', 'has_text': True,
+             'fingerprint': 'digital'},
+        ]
+
+        def convert():
+            cache = PageCache(temp_dir / "cache.sqlite3")
+            with patch('ocr_processor.openai.OpenAI', return_value=mock_openai_client), \
+                    patch('text_cleanup.openai.OpenAI', return_value=mock_openai_client):
+                ocr = OCRProcessor(use_llm_vision=True, llm_model="m", cache=cache)
+                cleanup = TextCleanup(use_llm=True, llm_model="m", cache=cache)
+            pipeline = PagePipeline(extractor, ocr, cleanup, show_progress=False)
+            result = pipeline.run(temp_dir / "doc.pdf", pages, context="doc")
+            cache.close()
+            return result
+
+        first = convert()
+        llm_calls = mock_openai_client.chat.completions.create.call_count
+        assert llm_calls == 4  # vision, combine, 2x cleanup
+        extractor.iter_page_images.reset_mock()
+
+        second = convert()
+
+        assert second == first
+        assert mock_openai_client.chat.completions.create.call_count == llm_calls
+        assert mock_tesseract.call_count == 1
+        extractor.iter_page_images.assert_called_once_with(temp_dir / "doc.pdf", set())
+
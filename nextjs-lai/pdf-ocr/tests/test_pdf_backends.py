@@ -0,0 +1,110 @@
+"""Tests for pdf_backends module."""
+import builtins
+
+import pytest
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from pdf_backends import TEXT_BACKENDS, PyPDF2Backend, get_backend
+from pdf_extractor import PDFExtractor
+
+PAGE_TEXTS = [
+    "Die Abschlussprüfung besteht aus einem schriftlichen und einem mündlichen Teil.",
+    "Anlage 2",
+    "",
+]
+
+
+@pytest.fixture
+def text_pdf(temp_dir):
+    """PDF with two text pages (Helvetica) and an empty page."""
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+        NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+    }))
+    for text in PAGE_TEXTS:
+        page = PageObject.create_blank_page(None, 595, 842)
+        content = DecodedStreamObject()
+        content.set_data(
+            b"BT /F1 10 Tf 50 790 Td (" + text.encode("cp1252") + b") Tj ET" if text else b""
+        )
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})
+        })
+        page[NameObject("/Contents")] = writer._add_object(content)
+        writer.add_page(page)
+    path = temp_dir / "text.pdf"
+    with open(path, "wb") as file:
+        writer.write(file)
+    return path
+
+
+class TestGetBackend:
+    """Test suite for backend selection."""
+
+    def test_unknown_backend(self):
+        """Test that an unknown name lists the available backends."""
+        with pytest.raises(ValueError, match="pypdfium2"):
+            get_backend("poppler")
+
+    def test_missing_package(self, monkeypatch):
+        """Test that a missing optional package names the pip package."""
+        real_import = builtins.__import__
+
+        def failing_import(name, *args, **kwargs):
+            if name.startswith("pdfminer"):
+                raise ImportError(f"No module named {name!r}")
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "__import__", failing_import)
+
+        with pytest.raises(ImportError, match=r"pip install pdfminer\.six"):
+            get_backend("pdfminer")
+
+    def test_default_backend(self):
+        """Test that the default backend is PyPDF2."""
+        assert isinstance(PDFExtractor().backend, PyPDF2Backend)
+
+
+@pytest.mark.parametrize("name", list(TEXT_BACKENDS))
+class TestBackends:
+    """Test suite running every installed backend on the same PDF."""
+
+    @pytest.fixture
+    def backend(self, name):
+        try:
+            return get_backend(name)
+        except ImportError as e:
+            pytest.skip(str(e))
+
+    def test_page_texts(self, backend, text_pdf):
+        """Test that every page is returned in order with its text."""
+        texts = list(backend.iter_text(text_pdf))
+
+        assert len(texts) == len(PAGE_TEXTS)
+        for text, expected in zip(texts, PAGE_TEXTS):
+            assert text.split() == expected.split()
+
+    def test_iter_text_is_lazy(self, backend, text_pdf):
+        """Test that stopping early does not need the remaining pages."""
+        iterator = backend.iter_text(text_pdf)
+
+        assert "Abschlussprüfung" in next(iterator)
+        iterator.close()
+
+    def test_extractor_keeps_fingerprints(self, name, text_pdf):
+        """Test that fingerprints and OCR decisions do not depend on the backend."""
+        try:
+            extractor = PDFExtractor(text_backend=name)
+        except ImportError as e:
+            pytest.skip(str(e))
+        reference = PDFExtractor().extract_text(text_pdf)
+
+        pages = extractor.extract_text(text_pdf)
+
+        assert [page['page'] for page in pages] == [1, 2, 3]
+        assert [page['fingerprint'] for page in pages] == [page['fingerprint'] for page in reference]
+        assert [extractor.needs_ocr(page) for page in pages] == [False, True, True]
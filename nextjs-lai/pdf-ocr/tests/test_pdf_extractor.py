@@ -58,6 +58,33 @@ class TestPDFExtractor:
         assert result[0]['text'] == ''
         assert result[0]['has_text'] is False
     
+    @patch('pdf_extractor.PyPDF2.PdfReader')
+    @patch('builtins.open', new_callable=mock_open)
+    def test_iter_text_is_lazy(self, mock_file, mock_pdf_reader):
+        """Test that pages are extracted only as far as they are read."""
+        pages = [MagicMock() for _ in range(3)]
+        for n, page in enumerate(pages, start=1):
+            page.extract_text.return_value = f"Text {n}"
+        mock_pdf_reader.return_value.pages = pages
+        
+        extractor = PDFExtractor()
+        iterator = extractor.iter_text(Path("/fake/path.pdf"))
+        first = next(iterator)
+        
+        assert first['page'] == 1
+        assert first['text'] == "Text 1"
+        pages[1].extract_text.assert_not_called()
+        assert [page['page'] for page in iterator] == [2, 3]
+    
+    @patch('pdf_extractor.PyPDF2.PdfReader')
+    @patch('builtins.open', new_callable=mock_open)
+    def test_iter_text_raises(self, mock_file, mock_pdf_reader):
+        """Test that iter_text leaves error handling to the caller."""
+        mock_pdf_reader.side_effect = Exception("PDF read error")
+        
+        with pytest.raises(Exception, match="PDF read error"):
+            list(PDFExtractor().iter_text(Path("/fake/path.pdf")))
+    
     @patch('pdf_extractor.PyPDF2.PdfReader')
     @patch('builtins.open', new_callable=mock_open)
     def test_extract_text_error(self, mock_file, mock_pdf_reader):
@@ -126,3 +153,109 @@ class TestPDFExtractor:
         result = extractor.convert_to_images(pdf_path, temp_dir)
         
         assert result == []
+
+    def test_init_render_settings(self):
+        """Test render settings are clamped to sensible minimums."""
+        extractor = PDFExtractor(render_batch_size=0, render_thread_count=0, render_max_gap=-1)
+        assert extractor.render_batch_size == 1
+        assert extractor.render_thread_count == 1
+        assert extractor.render_max_gap == 0
+    
+    def test_page_ranges_contiguous_and_gaps(self):
+        """Test grouping of pages into ranges with small gaps joined."""
+        extractor = PDFExtractor(render_max_gap=2)
+        
+        assert extractor.page_ranges([]) == []
+        assert extractor.page_ranges([3, 1, 2, 2]) == [(1, 3)]
+        assert extractor.page_ranges([1, 2, 5, 6]) == [(1, 6)]
+        assert extractor.page_ranges([1, 2, 6, 7]) == [(1, 2), (6, 7)]
+    
+    def test_page_ranges_respects_batch_size(self):
+        """Test that no range exceeds the batch size."""
+        extractor = PDFExtractor(render_batch_size=4, render_max_gap=0)
+        
+        assert extractor.page_ranges(range(1, 11)) == [(1, 4), (5, 8), (9, 10)]
+    
+    @patch('pdf_extractor.convert_from_path')
+    def test_iter_page_images_batches(self, mock_convert):
+        """Test one poppler call per range and only requested pages yielded."""
+        images = {n: MagicMock(name=f"page{n}") for n in range(1, 11)}
+        mock_convert.side_effect = lambda path, dpi, first_page, last_page, thread_count: [
+            images[n] for n in range(first_page, last_page + 1)
+        ]
+        
+        extractor = PDFExtractor(dpi=150, render_thread_count=4, render_max_gap=1)
+        result = list(extractor.iter_page_images(Path("/fake.pdf"), [1, 2, 4, 9]))
+        
+        assert [page for page, _ in result] == [1, 2, 4, 9]
+        assert result[2][1] is images[4]
+        assert mock_convert.call_count == 2
+        mock_convert.assert_any_call(
+            Path("/fake.pdf"), dpi=150, first_page=1, last_page=4, thread_count=4
+        )
+        mock_convert.assert_any_call(
+            Path("/fake.pdf"), dpi=150, first_page=9, last_page=9, thread_count=1
+        )
+    
+    @patch('pdf_extractor.convert_from_path')
+    def test_iter_page_images_is_lazy(self, mock_convert):
+        """Test that batches are rendered only when the consumer reaches them."""
+        mock_convert.side_effect = lambda path, **kwargs: [MagicMock()]
+        
+        extractor = PDFExtractor(render_max_gap=0)
+        pages = extractor.iter_page_images(Path("/fake.pdf"), [1, 5])
+        
+        assert mock_convert.call_count == 0
+        next(pages)
+        assert mock_convert.call_count == 1
+    
+    @patch('pdf_extractor.convert_from_path')
+    def test_iter_page_images_error_skips_batch(self, mock_convert):
+        """Test that a failing batch is skipped and later batches still render."""
+        mock_convert.side_effect = [Exception("poppler error"), [MagicMock()]]
+        
+        extractor = PDFExtractor(render_max_gap=0)
+        result = list(extractor.iter_page_images(Path("/fake.pdf"), [1, 5]))
+        
+        assert [page for page, _ in result] == [5]
+    
+    def test_page_fingerprint_real_pdf(self, temp_dir):
+        """Test fingerprints of image pages across documents."""
+        from PIL import Image
+        import PyPDF2
+        
+        cover = Image.new('RGB', (200, 300), 'white')
+        scan = Image.new('RGB', (200, 300), 'gray')
+        cover.save(temp_dir / "a.pdf", save_all=True, append_images=[scan])
+        cover.save(temp_dir / "b.pdf")
+        
+        extractor = PDFExtractor()
+        pages_a = PyPDF2.PdfReader(str(temp_dir / "a.pdf")).pages
+        pages_b = PyPDF2.PdfReader(str(temp_dir / "b.pdf")).pages
+        fingerprints = [extractor.page_fingerprint(page) for page in pages_a]
+        
+        # Same cover sheet in another document, different scan on page 2
+        assert fingerprints[0] == extractor.page_fingerprint(pages_b[0])
+        assert fingerprints[0] != fingerprints[1]
+        
+        result = extractor.extract_text(temp_dir / "a.pdf")
+        assert [page['fingerprint'] for page in result] == fingerprints
+    
+    def test_page_fingerprint_unreadable_page(self):
+        """Test that unreadable page structures give no fingerprint."""
+        page = MagicMock()
+        page.get_contents.side_effect = Exception("broken")
+        
+        assert PDFExtractor().page_fingerprint(page) is None
+    
+    def test_page_count(self, temp_dir):
+        """Test counting pages of a real PDF and of an unreadable file."""
+        from PIL import Image
+        
+        page = Image.new('RGB', (100, 100), 'white')
+        page.save(temp_dir / "doc.pdf", save_all=True, append_images=[page, page])
+        (temp_dir / "broken.pdf").write_bytes(b"not a pdf")
+        
+        extractor = PDFExtractor()
+        assert extractor.page_count(temp_dir / "doc.pdf") == 3
+        assert extractor.page_count(temp_dir / "broken.pdf") == 0
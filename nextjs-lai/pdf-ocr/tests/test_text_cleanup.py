@@ -1,7 +1,8 @@
 """Unit tests for text_cleanup module."""
 import pytest
 from unittest.mock import MagicMock, patch
-from text_cleanup import TextCleanup
+from page_cache import PageCache
+from text_cleanup import Paragraph, TextCleanup, split_paragraphs
 
 
 class TestTextCleanup:
@@ -90,6 +91,15 @@ class TestTextCleanup:
         assert "Line 1" in result
         assert "Line 2" in result
     
+    def test_basic_cleanup_keeps_paragraph_breaks(self):
+        """Test that blank lines survive as single paragraph breaks."""
+        cleanup = TextCleanup(use_llm=False)
+        text = "Erster Absatz\nzweite Zeile\n\n\nab\n\nZweiter Absatz\n\n"
+        
+        result = cleanup.basic_cleanup(text)
+        
+        assert result == "Erster Absatz\nzweite Zeile\n\nZweiter Absatz"
+    
     def test_basic_cleanup_strips_whitespace(self):
         """Test stripping of leading/trailing whitespace."""
         cleanup = TextCleanup(use_llm=False)
@@ -135,6 +145,46 @@ class TestTextCleanup:
         # Should return original text on error
         assert result == "Original text"
     
+    @patch('text_cleanup.openai.OpenAI')
+    def test_cleanup_with_llm_cache(self, mock_openai_class, mock_openai_client, temp_dir):
+        """Test that a repeated cleanup request is served from the cache."""
+        mock_openai_client.chat.completions.create.return_value.choices[0].message.content = "Clean"
+        mock_openai_class.return_value = mock_openai_client
+        cache = PageCache(temp_dir / "cache.sqlite3")
+        
+        cleanup = TextCleanup(
+            use_llm=True,
+            llm_api_base="http://test/v1",
+            llm_model="test-model",
+            llm_api_key="key",
+            cache=cache
+        )
+        assert cleanup.cleanup_with_llm("Dirty text", "doc") == "Clean"
+        assert cleanup.cleanup_with_llm("Dirty text", "doc") == "Clean"
+        assert cleanup.cleanup_with_llm("Dirty text", "other doc") == "Clean"
+        
+        # Context is part of the prompt, so "other doc" is a new request
+        assert mock_openai_client.chat.completions.create.call_count == 2
+        assert cache.stats()["stages"]["cleanup"] == {"hits": 1, "misses": 2}
+    
+    @patch('text_cleanup.openai.OpenAI')
+    def test_cleanup_with_llm_error_not_cached(self, mock_openai_class, mock_openai_client, temp_dir):
+        """Test that failed cleanups are retried on the next run."""
+        mock_openai_client.chat.completions.create.side_effect = Exception("API error")
+        mock_openai_class.return_value = mock_openai_client
+        cache = PageCache(temp_dir / "cache.sqlite3")
+        
+        cleanup = TextCleanup(
+            use_llm=True,
+            llm_api_base="http://test/v1",
+            llm_model="test-model",
+            llm_api_key="key",
+            cache=cache
+        )
+        cleanup.cleanup_with_llm("Original text")
+        
+        assert len(cache) == 0
+    
     def test_cleanup_with_llm_empty_text(self, mock_openai_client):
         """Test LLM cleanup with empty text."""
         with patch('text_cleanup.openai.OpenAI', return_value=mock_openai_client):
@@ -239,3 +289,147 @@ class TestTextCleanup:
         result = cleanup.merge_page_texts(pages)
         
         assert result == "Only page"
+
+
+CLEAN = "Die Prüfung besteht aus einem schriftlichen und einem mündlichen Teil."
+DIRTY = "Die Prüfung besteht aus einern schriftlichen urid einem Feh1er Teil."
+
+
+def llm_answer(client, *contents):
+    """Let the mocked LLM answer the given contents in turn."""
+    responses = []
+    for content in contents:
+        response = MagicMock()
+        response.choices[0].message.content = content
+        responses.append(response)
+    client.chat.completions.create.side_effect = responses
+
+
+def sent_prompts(client):
+    return [c.kwargs["messages"][1]["content"] for c in client.chat.completions.create.call_args_list]
+
+
+class TestSelectiveCleanup:
+    """Test suite for the paragraph cleanup planner."""
+    
+    @pytest.fixture
+    def cleanup(self, mock_openai_client):
+        with patch('text_cleanup.openai.OpenAI', return_value=mock_openai_client):
+            return TextCleanup(use_llm=True, llm_model="m", selective=True, batch_chars=200)
+    
+    def test_split_paragraphs(self):
+        """Test splitting at blank lines and long blocks at line breaks."""
+        text = "Eins\nzwei\n\nDrei\n" + "\n".join(["x" * 30] * 3)
+        
+        paragraphs = split_paragraphs(text, max_chars=50)
+        
+        assert [(p.text, p.separator) for p in paragraphs] == [
+            ("Eins\nzwei", "\n\n"),
+            ("Drei\n" + "x" * 30, "\n"),
+            ("x" * 30, "\n"),
+            ("x" * 30, "\n\n"),
+        ]
+        assert "".join(p.text + p.separator for p in paragraphs).strip() == text
+    
+    def test_score_paragraph(self, cleanup):
+        """Test unknown word and OCR noise counts."""
+        assert cleanup.score_paragraph(CLEAN).unknown == 0
+        assert cleanup.score_paragraph(CLEAN).noise == 0
+        dirty = cleanup.score_paragraph(DIRTY)
+        assert dirty.unknown == 2  # einern, urid
+        assert dirty.noise == 1  # Feh1er
+        assert dirty.unknown_rate == pytest.approx(2 / dirty.checked)
+        assert cleanup.score_paragraph("Aus-\nbildung und 0rdnung | hier").noise == 3
+        assert cleanup.score_paragraph("Seite 12 von 30, 2024er Werte").noise == 0
+    
+    def test_is_dirty_thresholds(self, cleanup):
+        """Test that clean paragraphs, headings and numbers pass."""
+        assert not cleanup.is_dirty(cleanup.score_paragraph(CLEAN))
+        assert not cleanup.is_dirty(cleanup.score_paragraph("Prüfungsordnung"))
+        assert cleanup.is_dirty(cleanup.score_paragraph(DIRTY))
+        cleanup.max_unknown_rate = 0.5
+        assert not cleanup.is_dirty(cleanup.score_paragraph("einern schriftlichen und mündlichen"))
+    
+    def test_batch_paragraphs(self, cleanup):
+        """Test grouping dirty paragraphs up to batch_chars."""
+        paragraphs = [Paragraph("a" * 80, dirty=True), Paragraph("b" * 80),
+                      Paragraph("c" * 80, dirty=True), Paragraph("d" * 80, dirty=True),
+                      Paragraph("e" * 300, dirty=True)]
+        
+        batches = cleanup.batch_paragraphs(paragraphs)
+        
+        assert [[p.text[0] for p in batch] for batch in batches] == [["a", "c"], ["d"], ["e"]]
+    
+    def test_clean_page_skips_llm(self, cleanup, mock_openai_client):
+        """Test that a clean page passes through untouched."""
+        text = f"{CLEAN}\n\n{CLEAN}"
+        
+        assert cleanup.process_text(text, "doc") == text
+        
+        mock_openai_client.chat.completions.create.assert_not_called()
+        stats = cleanup.stats()
+        assert stats["paragraphs"] == 2
+        assert stats["llm_paragraphs"] == 0
+        assert stats["llm_share"] == 0.0
+    
+    def test_dirty_paragraphs_batched(self, cleanup, mock_openai_client):
+        """Test that dirty paragraphs go out in one request, clean ones stay."""
+        llm_answer(mock_openai_client, "[[1]]\nErster korrigiert\n\n[[2]]\nZweiter korrigiert")
+        text = f"{DIRTY}\n\n{CLEAN}\n\n0rdnung muss sein."
+        
+        result = cleanup.process_text(text, "doc")
+        
+        assert result == f"Erster korrigiert\n\n{CLEAN}\n\nZweiter korrigiert"
+        prompt = sent_prompts(mock_openai_client)[0]
+        assert f"[[1]]\n{DIRTY}" in prompt
+        assert "[[2]]\n0rdnung muss sein." in prompt
+        assert CLEAN not in prompt
+        assert "Kontext: doc" in prompt
+        stats = cleanup.stats()
+        assert stats["requests"] == 1
+        assert stats["llm_paragraphs"] == 2
+        assert 0 < stats["llm_share"] < 1
+        assert "2/3 paragraphs sent to LLM" in cleanup.format_stats()
+        assert "1 passed through" in cleanup.format_stats()
+    
+    def test_single_dirty_paragraph_plain_prompt(self, cleanup, mock_openai_client):
+        """Test that a lone dirty paragraph uses the regular cleanup prompt."""
+        llm_answer(mock_openai_client, "Korrigiert")
+        
+        assert cleanup.process_text(f"{DIRTY}\n\n{CLEAN}") == f"Korrigiert\n\n{CLEAN}"
+        assert "[[1]]" not in sent_prompts(mock_openai_client)[0]
+    
+    def test_missing_markers_fall_back_to_single_requests(self, cleanup, mock_openai_client):
+        """Test that an answer without all markers cleans each paragraph alone."""
+        llm_answer(mock_openai_client, "[[1]]\nNur einer", "Eins", "Zwei")
+        
+        result = cleanup.process_text(f"{DIRTY}\n\n0rdnung muss sein.")
+        
+        assert result == "Eins\n\nZwei"
+        assert mock_openai_client.chat.completions.create.call_count == 3
+    
+    def test_batch_error_keeps_paragraphs(self, cleanup, mock_openai_client):
+        """Test that a failed batch request keeps the original paragraphs."""
+        mock_openai_client.chat.completions.create.side_effect = Exception("API error")
+        text = f"{DIRTY}\n\n0rdnung muss sein."
+        
+        assert cleanup.process_text(text) == text
+    
+    def test_removed_paragraph_dropped(self, cleanup, mock_openai_client):
+        """Test that a paragraph the LLM empties leaves no gap."""
+        llm_answer(mock_openai_client, "[[1]]\nKorrigiert\n\n[[2]]\n")
+        
+        result = cleanup.process_text(f"{DIRTY}\n\n0rdnung muss sein.\n\n{CLEAN}")
+        
+        assert result == f"Korrigiert\n\n{CLEAN}"
+    
+    def test_whole_page_mode_counts_everything(self, mock_openai_client):
+        """Test that without selection every page is sent and counted as such."""
+        with patch('text_cleanup.openai.OpenAI', return_value=mock_openai_client):
+            cleanup = TextCleanup(use_llm=True, llm_model="m")
+        
+        cleanup.process_text(f"{CLEAN}\n\n{CLEAN}")
+        
+        mock_openai_client.chat.completions.create.assert_called_once()
+        assert cleanup.stats()["llm_share"] == 1.0
+        assert "1/1 paragraphs sent to LLM (100% of text) in 1 requests" in cleanup.format_stats()
@@ -1,12 +1,85 @@
 """Text cleanup and spell checking module using LLM."""
 import logging
 import re
-from typing import List
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional
 import openai
 from spellchecker import SpellChecker
 
+from ocr_quality import dictionary_word
+from page_cache import PageCache, request_key
+
 logger = logging.getLogger(__name__)
 
+# Blocks longer than this are split at line breaks before they are scored
+MAX_PARAGRAPH_CHARS = 1000
+
+# OCR noise inside a word: digits between letters ("Feh1er") or a leading
+# digit read for a letter ("0rdnung"), stray marks, hyphenation left at a line end
+_MIXED_WORD = re.compile(r"[^\W\d_]\d+[^\W\d_]|^\d[^\W\d_]{3,}\W*$")
+_STRAY_MARK = re.compile(r"^[|~^¬\\_=<>{}]+$")
+_BROKEN_HYPHENATION = re.compile(r"[^\W\d_]-\n[a-zäöüß]")
+_BATCH_MARKER = re.compile(r"^\[\[(\d+)\]\][ \t]*$", re.MULTILINE)
+
+BATCH_PROMPT = """Du bist ein Experte für die Korrektur von OCR-Fehlern in deutschen Texten.
+
+Aufgabe:
+1. Korrigiere Rechtschreibfehler und OCR-Fehler
+2. Entferne verstreuten, sinnlosen Text
+3. Behalte die Formatierung sowie alle sinnvollen Zahlen, Formeln und Fachbegriffe
+4. Jeder Absatz beginnt mit einer Markierung wie [[1]] in einer eigenen Zeile. Gib jeden Absatz korrigiert unter derselben Markierung zurück, ohne Kommentare
+{context}
+Absätze:
+{paragraphs}"""
+
+
+@dataclass
+class ParagraphScore:
+    """Dictionary and OCR noise counts of one paragraph."""
+    
+    words: int
+    checked: int  # Lowercase words looked up in the dictionary
+    unknown: int  # Checked words not in the dictionary
+    noise: int  # Words with digits inside, stray marks and broken hyphenation
+    
+    @property
+    def unknown_rate(self) -> float:
+        return self.unknown / self.checked if self.checked else 0.0
+
+
+@dataclass
+class Paragraph:
+    """One piece of a page for the cleanup planner."""
+    
+    text: str
+    separator: str = "\n\n"  # Whitespace after the paragraph
+    dirty: bool = False
+
+
+def split_paragraphs(text: str, max_chars: int = MAX_PARAGRAPH_CHARS) -> List[Paragraph]:
+    """Split text at blank lines; longer blocks are cut at line breaks.
+    
+    Args:
+        text: Page text
+        max_chars: Max length of a piece (single longer lines stay whole)
+        
+    Returns:
+        Paragraphs whose text and separators rebuild the text
+    """
+    paragraphs = []
+    for block in re.split(r"\n\s*\n", text.strip()):
+        lines = block.split("\n")
+        piece = []
+        for line in lines:
+            if piece and len("\n".join(piece + [line])) > max_chars:
+                paragraphs.append(Paragraph("\n".join(piece), "\n"))
+                piece = []
+            piece.append(line)
+        paragraphs.append(Paragraph("\n".join(piece)))
+    return paragraphs
+
 
 class TextCleanup:
     """Clean up and validate OCR text using LLM and spell checking."""
@@ -17,7 +90,11 @@ class TextCleanup:
         llm_api_base: str = None,
         llm_model: str = None,
         llm_api_key: str = None,
-        min_text_length: int = 3
+        min_text_length: int = 3,
+        cache: Optional[PageCache] = None,
+        selective: bool = False,
+        max_unknown_rate: float = 0.1,
+        batch_chars: int = 3000
     ):
         """Initialize text cleanup.
         
@@ -27,10 +104,21 @@ class TextCleanup:
             llm_model: LLM model name
             llm_api_key: LLM API key
             min_text_length: Minimum text length to keep
+            cache: Optional cache for LLM cleanup results
+            selective: Send only dirty paragraphs to the LLM instead of whole pages
+            max_unknown_rate: Share of unknown lowercase words above which a
+                paragraph is dirty
+            batch_chars: Max characters of dirty paragraphs per LLM request
         """
         self.use_llm = use_llm
         self.min_text_length = min_text_length
+        self.cache = cache
+        self.selective = selective
+        self.max_unknown_rate = max_unknown_rate
+        self.batch_chars = max(1, batch_chars)
         self.spell_checker = SpellChecker(language='de')
+        self._stats = Counter()
+        self._stats_lock = threading.Lock()
         
         if use_llm:
             self.llm_client = openai.OpenAI(
@@ -54,6 +142,12 @@ class TextCleanup:
         for line in lines:
             line = line.strip()
             
+            # Keep blank lines as paragraph breaks
+            if not line:
+                if cleaned_lines and cleaned_lines[-1]:
+                    cleaned_lines.append('')
+                continue
+            
             # Skip very short lines (likely noise)
             if len(line) < self.min_text_length:
                 continue
@@ -129,23 +223,7 @@ Text:
 
 Korrigierter Text:"""
 
-            response = self.llm_client.chat.completions.create(
-                model=self.llm_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Du bist ein präziser Text-Korrektor für deutsche OCR-Texte."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=4000,
-                temperature=0.2
-            )
-            
-            cleaned_text = response.choices[0].message.content.strip()
+            cleaned_text = self._complete(prompt)
             logger.info(f"LLM cleanup: {len(text)} -> {len(cleaned_text)} chars")
             return cleaned_text
             
@@ -153,6 +231,182 @@ Korrigierter Text:"""
             logger.error(f"LLM cleanup error: {e}")
             return text
     
+    def _complete(self, prompt: str) -> str:
+        """Send a cleanup prompt to the LLM, served from the cache if possible."""
+        request = dict(
+            model=self.llm_model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Du bist ein präziser Text-Korrektor für deutsche OCR-Texte."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            max_tokens=4000,
+            temperature=0.2
+        )
+        key = request_key("cleanup", request) if self.cache is not None else None
+        if key:
+            cached = self.cache.get("cleanup", key)
+            if cached is not None:
+                return cached
+        
+        response = self.llm_client.chat.completions.create(**request)
+        
+        cleaned_text = response.choices[0].message.content.strip()
+        if key and cleaned_text:
+            self.cache.put("cleanup", key, cleaned_text)
+        return cleaned_text
+    
+    def score_paragraph(self, text: str) -> ParagraphScore:
+        """Count unknown lowercase words and OCR noise in a paragraph.
+        
+        Args:
+            text: Paragraph text
+            
+        Returns:
+            ParagraphScore of the paragraph
+        """
+        words = text.split()
+        checked = [w for w in (dictionary_word(word) for word in words) if w]
+        known = self.spell_checker.known(checked) if checked else set()
+        noise = sum(bool(_MIXED_WORD.search(word) or _STRAY_MARK.match(word)) for word in words)
+        noise += len(_BROKEN_HYPHENATION.findall(text))
+        return ParagraphScore(
+            words=len(words),
+            checked=len(checked),
+            unknown=sum(word not in known for word in checked),
+            noise=noise
+        )
+    
+    def is_dirty(self, score: ParagraphScore) -> bool:
+        """Whether a paragraph needs the LLM (any OCR noise or too many unknown words)."""
+        return score.noise > 0 or score.unknown_rate > self.max_unknown_rate
+    
+    def plan_cleanup(self, text: str) -> List[Paragraph]:
+        """Split a page into paragraphs and mark the dirty ones.
+        
+        Args:
+            text: Page text after basic cleanup
+            
+        Returns:
+            Paragraphs in page order
+        """
+        paragraphs = split_paragraphs(text)
+        for paragraph in paragraphs:
+            paragraph.dirty = self.is_dirty(self.score_paragraph(paragraph.text))
+        return paragraphs
+    
+    def batch_paragraphs(self, paragraphs: List[Paragraph]) -> List[List[Paragraph]]:
+        """Group dirty paragraphs into requests of at most batch_chars characters.
+        
+        Args:
+            paragraphs: Paragraphs from plan_cleanup
+            
+        Returns:
+            Batches of dirty paragraphs in page order (a longer paragraph is a batch of its own)
+        """
+        batches = []
+        size = 0
+        for paragraph in paragraphs:
+            if not paragraph.dirty:
+                continue
+            if batches and size + len(paragraph.text) <= self.batch_chars:
+                batches[-1].append(paragraph)
+                size += len(paragraph.text)
+            else:
+                batches.append([paragraph])
+                size = len(paragraph.text)
+        return batches
+    
+    def cleanup_batch(self, texts: List[str], context: str = "") -> List[str]:
+        """Clean several paragraphs in one LLM request.
+        
+        The paragraphs are sent under numbered markers. If the answer does
+        not return every marker, each paragraph is cleaned on its own.
+        
+        Args:
+            texts: Paragraph texts
+            context: Context about the document
+            
+        Returns:
+            Cleaned texts in the same order
+        """
+        if len(texts) == 1:
+            return [self.cleanup_with_llm(texts[0], context)]
+        
+        prompt = BATCH_PROMPT.format(
+            context=f"\nKontext: {context}\n" if context else "",
+            paragraphs="\n\n".join(f"[[{i}]]\n{text}" for i, text in enumerate(texts, start=1))
+        )
+        try:
+            answer = self._complete(prompt)
+        except Exception as e:
+            logger.error(f"LLM cleanup error: {e}")
+            return texts
+        
+        parts = _BATCH_MARKER.split(answer)
+        cleaned = {int(number): part.strip() for number, part in zip(parts[1::2], parts[2::2])}
+        if set(cleaned) != set(range(1, len(texts) + 1)):
+            logger.warning(f"LLM cleanup returned {len(cleaned)} of {len(texts)} paragraphs, "
+                           "cleaning them one by one")
+            return [self.cleanup_with_llm(text, context) for text in texts]
+        logger.info(f"LLM cleanup: {len(texts)} paragraphs in one request")
+        return [cleaned[i] for i in range(1, len(texts) + 1)]
+    
+    def selective_cleanup(self, text: str, context: str = "") -> str:
+        """Send only the dirty paragraphs of a page to the LLM, batched.
+        
+        Args:
+            text: Page text after basic cleanup
+            context: Context about the document
+            
+        Returns:
+            Page text with the dirty paragraphs replaced by their cleaned versions
+        """
+        paragraphs = self.plan_cleanup(text)
+        batches = self.batch_paragraphs(paragraphs)
+        dirty = [p for p in paragraphs if p.dirty]
+        self._count(
+            paragraphs=len(paragraphs),
+            llm_paragraphs=len(dirty),
+            chars=len(text),
+            llm_chars=sum(len(p.text) for p in dirty),
+            requests=len(batches)
+        )
+        
+        for batch in batches:
+            for paragraph, cleaned in zip(
+                batch, self.cleanup_batch([p.text for p in batch], context)
+            ):
+                paragraph.text = cleaned
+        
+        merged = "".join(p.text + p.separator for p in paragraphs if p.text)
+        return re.sub(r'\n{3,}', '\n\n', merged)
+    
+    def _count(self, **counts):
+        with self._stats_lock:
+            self._stats.update(counts)
+    
+    def stats(self) -> dict:
+        """Paragraphs, characters and requests sent to the LLM so far."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        for key in ("paragraphs", "llm_paragraphs", "chars", "llm_chars", "requests"):
+            stats.setdefault(key, 0)
+        stats["llm_share"] = stats["llm_chars"] / stats["chars"] if stats["chars"] else 0.0
+        return stats
+    
+    def format_stats(self) -> str:
+        """One-line summary for the log."""
+        s = self.stats()
+        return (f"Text cleanup: {s['llm_paragraphs']}/{s['paragraphs']} paragraphs sent to LLM "
+                f"({s['llm_share']:.0%} of text) in {s['requests']} requests, "
+                f"{s['paragraphs'] - s['llm_paragraphs']} passed through")
+    
     def process_text(self, text: str, context: str = "", page_num: int = None) -> str:
         """Process and clean text.
         
@@ -174,7 +428,12 @@ Korrigierter Text:"""
         
         # LLM cleanup if enabled and text is substantial
         if self.use_llm and len(text) > 20:
-            text = self.cleanup_with_llm(text, context)
+            if self.selective:
+                text = self.selective_cleanup(text, context)
+            else:
+                self._count(paragraphs=1, llm_paragraphs=1, chars=len(text),
+                            llm_chars=len(text), requests=1)
+                text = self.cleanup_with_llm(text, context)
         
         return text.strip()
     